@@ -29,6 +29,9 @@ from routes.validation_cleanup import validation_cleanup_bp
 from routes.execution_review import execution_review_bp
 from routes.import_logs import import_logs_bp
 from scripts.TradingLog_db import FuturesDB
+from scripts.database_bootstrap import bootstrap_database
+from scripts.connection_pool import get_pool_stats, close_all_pools
+from scripts.write_queue import get_write_queue_stats, shutdown_write_queues
 from services.background_services import start_background_services, stop_background_services, get_services_status
 from services.background_data_manager import background_data_manager
 from scripts.automated_data_sync import start_automated_data_sync, stop_automated_data_sync, get_data_sync_status, force_data_sync
@@ -106,6 +109,9 @@ system_cpu_usage = None
 system_memory_usage = None
 system_disk_usage = None
 database_connections = None
+database_write_queue_depth = None
+database_commit_latency = None
+fill_to_commit_latency = None
 redis_connections = None
 background_services_status = None
 file_watcher_status = None
@@ -119,6 +125,9 @@ try:
     system_memory_usage = Gauge('system_memory_usage_bytes', 'Memory usage in bytes')
     system_disk_usage = Gauge('system_disk_usage_bytes', 'Disk usage in bytes')
     database_connections = Gauge('trading_database_connections_active', 'Active database connections')
+    database_write_queue_depth = Gauge('trading_database_write_queue_depth', 'Write jobs waiting for the single writer')
+    database_commit_latency = Gauge('trading_database_commit_latency_p95_seconds', 'p95 group-commit batch latency')
+    fill_to_commit_latency = Gauge('trading_fill_to_commit_latency_p95_seconds', 'p95 NinjaTrader fill time to DB commit latency')
     redis_connections = Gauge('trading_redis_connections_active', 'Active Redis connections')
 
     # Application Health Metrics
@@ -220,6 +229,33 @@ def collect_system_metrics():
             except Exception as e:
                 logger.debug(f"Could not collect cache stats: {e}")
 
+            # Pooled database connections
+            try:
+                if database_connections:
+                    pool_stats = get_pool_stats().get(str(config.db_path), {})
+                    database_connections.set(pool_stats.get('in_use', 0))
+            except Exception as e:
+                logger.debug(f"Could not collect database pool stats: {e}")
+
+            # Single-writer queue
+            try:
+                writer_stats = get_write_queue_stats().get(str(config.db_path), {})
+                if database_write_queue_depth:
+                    database_write_queue_depth.set(writer_stats.get('queue_depth', 0))
+                if database_commit_latency:
+                    database_commit_latency.set(writer_stats.get('commit_latency_p95_ms', 0) / 1000)
+            except Exception as e:
+                logger.debug(f"Could not collect write queue stats: {e}")
+
+            # NinjaTrader fill -> DB commit latency
+            try:
+                if fill_to_commit_latency and NINJATRADER_IMPORT_AVAILABLE:
+                    p95 = ninjatrader_import_service.fill_latency.quantile(0.95)
+                    if p95 is not None:
+                        fill_to_commit_latency.set(p95)
+            except Exception as e:
+                logger.debug(f"Could not collect fill latency stats: {e}")
+
             # Background services status
             try:
                 from services.background_services import get_services_status
@@ -461,7 +497,9 @@ def detailed_health_check():
                 'status': db_status,
                 'response_time_ms': round(db_response_time * 1000, 2),
                 'trade_count': trade_count,
-                'ohlc_count': ohlc_count
+                'ohlc_count': ohlc_count,
+                'connection_pool': get_pool_stats().get(str(config.db_path), {}),
+                'write_queue': get_write_queue_stats().get(str(config.db_path), {})
             },
             'system': {
                 'cpu_percent': cpu_percent,
@@ -812,12 +850,13 @@ if __name__ == '__main__':
     # Log system information for troubleshooting
     log_system_info()
 
-    # Initialize database schema before any services start
+    # Initialize database schema once, before any services start or requests
+    # are served; pooled connections skip schema setup from here on
     try:
         logger.info("Initializing database schema...")
-        with FuturesDB() as db:
-            logger.info("Database schema initialized successfully")
-            print("[OK] Database schema initialized successfully")
+        bootstrap_database()
+        logger.info("Database schema initialized successfully")
+        print("[OK] Database schema initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize database schema: {e}")
         print(f"[ERROR] Database initialization failed: {e}")
@@ -848,9 +887,9 @@ if __name__ == '__main__':
 
     if NINJATRADER_IMPORT_AVAILABLE and enable_continuous_watcher:
         try:
-        # ninjatrader_import_service.start_watcher()
+            ninjatrader_import_service.start_watcher()
             logger.info("NinjaTrader import background watcher started successfully")
-            print(f"NinjaTrader import watcher started (polling every {ninjatrader_import_service._poll_interval} seconds)")
+            print(f"NinjaTrader import watcher started ({ninjatrader_import_service.get_status()['watch_mode']} mode)")
         except Exception as e:
             logger.warning(f"NinjaTrader import watcher failed to start: {e}")
             print(f"Warning: NinjaTrader import watcher failed to start: {e}")
@@ -918,6 +957,10 @@ if __name__ == '__main__':
         atexit.register(daily_import_scheduler.stop)
         logger.info("Daily import scheduler cleanup handler registered")
 
+    atexit.register(close_all_pools)
+    # atexit runs handlers in reverse order: flush queued writes before closing pools
+    atexit.register(shutdown_write_queues)
+
     logger.info(f"Starting Flask application on {config.host}:{config.port}")
 
     try:
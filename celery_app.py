@@ -8,6 +8,7 @@ Provides durability, retries, monitoring, and horizontal scaling capabilities.
 import os
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init, worker_shutdown, worker_process_shutdown
 from kombu import Queue
 from config import config
 
@@ -111,6 +112,21 @@ app.conf.update(
 # Auto-discover tasks
 app.autodiscover_tasks(['tasks'])
 
+
+@worker_init.connect
+def bootstrap_database_on_worker_init(**kwargs):
+    """Run schema setup once in the worker parent so forked children skip it"""
+    from scripts.database_bootstrap import bootstrap_database
+    bootstrap_database()
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def flush_write_queue_on_shutdown(**kwargs):
+    """Commit any queued writes before the worker process exits"""
+    from scripts.write_queue import shutdown_write_queues
+    shutdown_write_queues()
+
 # Celery signal handlers for monitoring
 @app.task(bind=True)
 def debug_task(self):
@@ -3,6 +3,6 @@ Configuration package for the Futures Trading Log application
 """
 
 from .validation import ConfigValidator, validate_configuration, validate_and_print
-from .config import config, SUPPORTED_TIMEFRAMES, YFINANCE_TIMEFRAME_MAP, BACKGROUND_DATA_CONFIG, PAGE_LOAD_CONFIG, YAHOO_FINANCE_CONFIG
+from .config import config, SUPPORTED_TIMEFRAMES, YFINANCE_TIMEFRAME_MAP, BACKGROUND_DATA_CONFIG, PAGE_LOAD_CONFIG, YAHOO_FINANCE_CONFIG, DATABASE_POOL_CONFIG, DATABASE_WRITER_CONFIG, POSITION_REBUILD_CONFIG, OHLC_RESAMPLE_CONFIG, OHLC_FETCH_PLANNER_CONFIG, OHLC_EMPTY_RANGE_CONFIG
 
-__all__ = ['ConfigValidator', 'validate_configuration', 'validate_and_print', 'config', 'SUPPORTED_TIMEFRAMES', 'YFINANCE_TIMEFRAME_MAP', 'BACKGROUND_DATA_CONFIG', 'PAGE_LOAD_CONFIG', 'YAHOO_FINANCE_CONFIG']
\ No newline at end of file
+__all__ = ['ConfigValidator', 'validate_configuration', 'validate_and_print', 'config', 'SUPPORTED_TIMEFRAMES', 'YFINANCE_TIMEFRAME_MAP', 'BACKGROUND_DATA_CONFIG', 'PAGE_LOAD_CONFIG', 'YAHOO_FINANCE_CONFIG', 'DATABASE_POOL_CONFIG', 'DATABASE_WRITER_CONFIG', 'POSITION_REBUILD_CONFIG', 'OHLC_RESAMPLE_CONFIG', 'OHLC_FETCH_PLANNER_CONFIG', 'OHLC_EMPTY_RANGE_CONFIG']
\ No newline at end of file
@@ -155,6 +155,51 @@ BACKGROUND_DATA_CONFIG = {
     'all_timeframes': SUPPORTED_TIMEFRAMES
 }
 
+# SQLite connection pool configuration (see scripts/connection_pool.py)
+DATABASE_POOL_CONFIG = {
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 16)),                             # Connections per database file
+    'max_idle': int(os.getenv('DB_POOL_MAX_IDLE', 16)),                              # Idle connections kept open between uses
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 30.0)),                           # Seconds to wait for a free connection
+    'busy_timeout_ms': int(os.getenv('DB_BUSY_TIMEOUT_MS', 30000)),                 # SQLite lock wait
+    'health_check_interval': float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', 60)), # Probe connections idle longer than this
+    'journal_mode': os.getenv('DB_JOURNAL_MODE', 'WAL'),                            # Applied once by the bootstrap step
+}
+
+# Single-writer group-commit queue (scripts/write_queue.py)
+DATABASE_WRITER_CONFIG = {
+    'enabled': os.getenv('DB_WRITER_ENABLED', 'true').lower() == 'true',    # false: write inline on the caller's connection
+    'max_batch_size': int(os.getenv('DB_WRITER_MAX_BATCH_SIZE', 256)),      # Jobs committed together
+    'max_batch_delay': float(os.getenv('DB_WRITER_MAX_BATCH_DELAY', 0.0)),   # Extra wait for more jobs (0: batch what queued up during the last commit)
+    'idle_timeout': float(os.getenv('DB_WRITER_IDLE_TIMEOUT', 30.0)),       # Writer thread exits when idle this long
+}
+
+# Full position rebuild (EnhancedPositionServiceV2.rebuild_positions_from_trades)
+POSITION_REBUILD_CONFIG = {
+    'workers': int(os.getenv('POSITION_REBUILD_WORKERS', 0)),                        # Worker processes (0: one per CPU, 1: serial)
+    'parallel_min_trades': int(os.getenv('POSITION_REBUILD_PARALLEL_MIN_TRADES', 20000)),  # Smaller rebuilds stay serial
+    'fetch_size': int(os.getenv('POSITION_REBUILD_FETCH_SIZE', 5000)),                 # Trade rows read per fetchmany()
+    'diff': os.getenv('POSITION_REBUILD_DIFF', 'true').lower() == 'true',                # Account/instrument rebuilds only write changed positions
+}
+
+# Local resampling of higher timeframes from stored 1m bars (services/ohlc_resampler.py)
+OHLC_RESAMPLE_CONFIG = {
+    'enabled': os.getenv('OHLC_LOCAL_RESAMPLING', 'true').lower() == 'true',                      # false: fetch every timeframe from Yahoo
+    'timeframes': os.getenv('OHLC_RESAMPLE_TIMEFRAMES', '3m,5m,15m,30m,1h,4h,1d').split(','),  # Derived from 1m instead of fetched
+}
+
+# Ledger of OHLC ranges confirmed empty (services/ohlc_empty_ranges.py)
+OHLC_EMPTY_RANGE_CONFIG = {
+    'settle_hours': int(os.getenv('OHLC_EMPTY_RANGE_SETTLE_HOURS', 24)),             # Ranges ending more recently may still fill in
+    'recent_ttl_minutes': int(os.getenv('OHLC_EMPTY_RANGE_RECENT_TTL_MINUTES', 30)),  # Lifetime of recent empty ranges
+    'settled_ttl_days': int(os.getenv('OHLC_EMPTY_RANGE_SETTLED_TTL_DAYS', 30)),      # Lifetime of settled empty ranges
+}
+
+# Coalesced OHLC gap fetching (tasks/gap_filling.py, services/ohlc_fetch_planner.py)
+OHLC_FETCH_PLANNER_CONFIG = {
+    'debounce_seconds': int(os.getenv('OHLC_FETCH_PLAN_DEBOUNCE', 30)),    # Collect intents this long before planning
+    'request_interval': float(os.getenv('OHLC_FETCH_REQUEST_INTERVAL', 1.0)),  # Seconds between provider calls
+}
+
 # Page load optimization configuration
 PAGE_LOAD_CONFIG = {
     'cache_only_mode': os.getenv('PAGE_CACHE_ONLY_MODE', 'true').lower() == 'true',
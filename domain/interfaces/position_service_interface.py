@@ -3,7 +3,7 @@ Position Service Interface - Contract for position management operations
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from ..models.position import Position
 
 
@@ -103,6 +103,19 @@ class IPositionEngine(ABC):
         """
         pass
     
+    @abstractmethod
+    def build_positions_with_executions(self, trades_data: List[Dict]) -> List[Tuple[Position, List[Dict]]]:
+        """
+        Build positions from trade data, each paired with its trades
+        
+        Args:
+            trades_data: List of trade dictionaries
+            
+        Returns:
+            List of (Position, trade dictionaries in execution order) tuples
+        """
+        pass
+    
     @abstractmethod
     def rebuild_positions_from_trades(self, trades_data: List[Dict]) -> Dict[str, int]:
         """
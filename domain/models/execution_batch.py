@@ -0,0 +1,265 @@
+"""
+Execution Batch - Compact struct-of-arrays form of one account/instrument's executions
+
+Position building reads a handful of numeric columns per execution. Holding
+them in NumPy arrays instead of one Trade object per execution keeps the
+builder hot loop free of per-execution allocations: rows are validated as a
+whole when the batch is built (with the same rules as Trade.__post_init__)
+and Trade objects are only created at the API boundary, see to_trades().
+"""
+
+import logging
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .trade import MarketSide, Trade
+
+logger = logging.getLogger('execution_batch')
+
+# Side codes index SIDES
+SIDES = tuple(MarketSide)
+SIDE_CODES = {side: code for code, side in enumerate(SIDES)}
+SIDE_CODES_BY_NAME = {side.value.upper(): code for side, code in SIDE_CODES.items()}
+
+# +1 adds to a long / covers a short, -1 the opposite, per side code
+SIDE_CODE_SIGN = np.array([1 if side in (MarketSide.BUY, MarketSide.BUY_TO_COVER, MarketSide.LONG) else -1
+                           for side in SIDES], dtype=np.int8)
+
+
+class ExecutionBatch:
+    """
+    Executions of one account/instrument as parallel arrays
+
+    Columns (one entry per execution):
+        ids: Trade IDs (a list; they are only passed through)
+        side_codes: int8 index into SIDES
+        quantities: int64, positive
+        entry_prices / exit_prices: float64, NaN where the trade has none
+        commissions: float64
+        entry_times: datetime64[us] (NaT for none), or an object array of
+            datetimes when some time has no NumPy form (e.g. a UTC offset)
+        sources: The dict or Trade each execution came from
+    """
+
+    __slots__ = ('ids', 'side_codes', 'quantities', 'entry_prices', 'exit_prices',
+                 'commissions', 'entry_times', 'sources')
+
+    def __init__(self, ids: List[Any], side_codes: np.ndarray, quantities: np.ndarray,
+                 entry_prices: np.ndarray, exit_prices: np.ndarray, commissions: np.ndarray,
+                 entry_times: np.ndarray, sources: List[Any]):
+        self.ids = ids
+        self.side_codes = side_codes
+        self.quantities = quantities
+        self.entry_prices = entry_prices
+        self.exit_prices = exit_prices
+        self.commissions = commissions
+        self.entry_times = entry_times
+        self.sources = sources
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_dicts(cls, rows: Sequence[Dict[str, Any]],
+                   default_side: Optional[MarketSide] = None) -> Tuple['ExecutionBatch', List[Tuple[Dict, str]]]:
+        """
+        Validate trade rows as a batch and keep the valid ones
+
+        Args:
+            rows: Trade dictionaries (from the database)
+            default_side: Side for rows whose side_of_market is unknown
+                (case-insensitive); by default such rows are rejected
+
+        Returns:
+            (batch of the valid rows in input order, [(rejected row, reason)])
+        """
+        n = len(rows)
+        side_codes = np.fromiter(
+            (SIDE_CODES_BY_NAME.get(str(row.get('side_of_market') or '').strip().upper(), -1) for row in rows),
+            dtype=np.int8, count=n
+        )
+        unknown_side = side_codes < 0
+        if default_side is not None and unknown_side.any():
+            unknown = np.flatnonzero(unknown_side)
+            logger.warning(
+                f"Unknown side_of_market for {len(unknown)} trades (e.g. trade {rows[unknown[0]].get('id')}: "
+                f"'{rows[unknown[0]].get('side_of_market')}'), defaulting to {default_side.value}"
+            )
+            side_codes[unknown_side] = SIDE_CODES[default_side]
+            unknown_side[:] = False
+
+        quantities = np.fromiter((row.get('quantity') or 0 for row in rows), dtype=np.int64, count=n)
+        entry_prices = _float_column(rows, 'entry_price')
+        exit_prices = _float_column(rows, 'exit_price')
+        entry_times, bad_time = _time_column([row.get('entry_time') for row in rows])
+
+        checks = (
+            (unknown_side, 'Unknown side_of_market'),
+            (quantities <= 0, 'Quantity must be positive'),
+            (np.isnan(entry_prices) & np.isnan(exit_prices), 'Trade must have at least entry_price or exit_price'),
+            (entry_prices <= 0, 'Entry price must be positive when set'),
+            (exit_prices <= 0, 'Exit price must be positive when set'),
+            (bad_time, 'Invalid entry_time'),
+        )
+        invalid = np.zeros(n, dtype=bool)
+        rejected = []
+        for failed, reason in checks:
+            for index in np.flatnonzero(failed & ~invalid).tolist():
+                rejected.append((rows[index], reason))
+            invalid |= failed
+
+        batch = cls(
+            ids=[row.get('id') for row in rows],
+            side_codes=side_codes,
+            quantities=quantities,
+            entry_prices=entry_prices,
+            exit_prices=exit_prices,
+            commissions=np.nan_to_num(_float_column(rows, 'commission'), nan=0.0),
+            entry_times=entry_times,
+            sources=list(rows),
+        )
+        if invalid.any():
+            batch = batch.take(np.flatnonzero(~invalid))
+        return batch, rejected
+
+    @classmethod
+    def from_trades(cls, trades: Sequence[Trade]) -> 'ExecutionBatch':
+        """Batch of already validated Trade objects, in the given order"""
+        n = len(trades)
+
+        def column(name):
+            return np.fromiter((np.nan if getattr(t, name) is None else getattr(t, name) for t in trades),
+                               dtype=np.float64, count=n)
+
+        return cls(
+            ids=[t.id for t in trades],
+            side_codes=np.fromiter((SIDE_CODES[t.side_of_market] for t in trades), dtype=np.int8, count=n),
+            quantities=np.fromiter((t.quantity for t in trades), dtype=np.int64, count=n),
+            entry_prices=column('entry_price'),
+            exit_prices=column('exit_price'),
+            commissions=np.nan_to_num(column('commission'), nan=0.0),
+            entry_times=_time_column([t.entry_time for t in trades])[0],
+            sources=list(trades),
+        )
+
+    def take(self, indices) -> 'ExecutionBatch':
+        """Batch of the executions at the given indices, in that order"""
+        indices = np.asarray(indices, dtype=np.intp)
+        index_list = indices.tolist()
+        return ExecutionBatch(
+            ids=[self.ids[i] for i in index_list],
+            side_codes=self.side_codes[indices],
+            quantities=self.quantities[indices],
+            entry_prices=self.entry_prices[indices],
+            exit_prices=self.exit_prices[indices],
+            commissions=self.commissions[indices],
+            entry_times=self.entry_times[indices],
+            sources=[self.sources[i] for i in index_list],
+        )
+
+    def sorted_by_time(self) -> 'ExecutionBatch':
+        """
+        The executions in chronological order
+
+        Stable, with executions without a time first - the order
+        sorted(key=lambda t: t.entry_time or datetime.min) gives.
+        """
+        if self.entry_times.dtype == object:
+            order = np.array(sorted(range(len(self)), key=lambda i: self.entry_times[i] or datetime.min),
+                             dtype=np.intp)
+        else:
+            # NaT is the smallest int64
+            order = np.argsort(self.entry_times.view(np.int64), kind='stable')
+        if np.array_equal(order, np.arange(len(self))):
+            return self
+        return self.take(order)
+
+    @property
+    def side_sign(self) -> np.ndarray:
+        """+1/-1 quantity direction per execution"""
+        return SIDE_CODE_SIGN[self.side_codes]
+
+    def fifo_prices(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (entry, exit) price FIFO matching uses per execution
+
+        As PnLCalculator._fifo_prices(): entry is entry_price, falling back
+        to exit_price; exit is exit_price, falling back to that entry price;
+        missing prices count as 0.
+        """
+        entry = np.where(np.isnan(self.entry_prices), self.exit_prices, self.entry_prices)
+        entry = np.nan_to_num(entry, nan=0.0)
+        exit_prices = np.nan_to_num(self.exit_prices, nan=0.0)
+        return entry, np.where(exit_prices != 0, exit_prices, entry)
+
+    def entry_time(self, index: int) -> Optional[datetime]:
+        """Entry time of one execution as a datetime (None if it has none)"""
+        value = self.entry_times[index]
+        return value if self.entry_times.dtype == object else value.item()
+
+    def to_trades(self) -> List[Trade]:
+        """The executions as Trade domain objects"""
+        trades = []
+        for index, source in enumerate(self.sources):
+            if isinstance(source, Trade):
+                trades.append(source)
+                continue
+            trades.append(Trade(
+                id=source.get('id'),
+                entry_execution_id=source.get('entry_execution_id') or '',
+                exit_execution_id=source.get('exit_execution_id'),
+                instrument=source.get('instrument') or '',
+                account=source.get('account') or '',
+                side_of_market=SIDES[self.side_codes[index]],
+                quantity=int(self.quantities[index]),
+                entry_price=None if np.isnan(self.entry_prices[index]) else float(self.entry_prices[index]),
+                exit_price=None if np.isnan(self.exit_prices[index]) else float(self.exit_prices[index]),
+                entry_time=self.entry_time(index),
+                exit_time=_to_datetime(source.get('exit_time')),
+                points_gain_loss=source.get('points_gain_loss'),
+                dollars_gain_loss=source.get('dollars_gain_loss'),
+                commission=float(self.commissions[index]),
+                link_group_id=source.get('link_group_id'),
+                deleted=bool(source.get('deleted')),
+            ))
+        return trades
+
+
+def _float_column(rows: Sequence[Dict[str, Any]], name: str) -> np.ndarray:
+    """float64 column of the rows, NaN where the value is missing"""
+    return np.fromiter(
+        (np.nan if row.get(name) is None else row.get(name) for row in rows), dtype=np.float64, count=len(rows)
+    )
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _time_column(values: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (times, unparseable mask) for ISO strings / datetimes / None
+
+    datetime64[us] when NumPy can hold every value as it is; otherwise an
+    object array of datetimes, parsed with datetime.fromisoformat.
+    """
+    try:
+        with warnings.catch_warnings():
+            # NumPy would silently shift times with a UTC offset
+            warnings.simplefilter('error')
+            if not any(isinstance(v, datetime) and v.tzinfo is not None for v in values):
+                return np.array(values, dtype='datetime64[us]'), np.zeros(len(values), dtype=bool)
+    except (ValueError, TypeError, Warning):
+        pass
+
+    times = np.empty(len(values), dtype=object)
+    bad = np.zeros(len(values), dtype=bool)
+    for index, value in enumerate(values):
+        try:
+            times[index] = _to_datetime(value)
+        except (ValueError, TypeError):
+            bad[index] = True
+    return times, bad
@@ -3,7 +3,7 @@ P&L domain model - Profit and Loss calculation entity
 """
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, NamedTuple
 from datetime import datetime
 
 
@@ -103,6 +103,25 @@ class FIFOMatch:
         return int(duration.total_seconds() / 60)
 
 
+class ExecutionPair(NamedTuple):
+    """
+    A FIFO-matched lot of a position: quantity units of one entry execution
+    closed by one exit execution, with that lot's P&L
+    """
+
+    entry_trade_id: Optional[int]
+    exit_trade_id: Optional[int]
+    entry_time: Optional[datetime]
+    exit_time: Optional[datetime]
+    quantity: int
+    entry_price: float
+    exit_price: float
+    points_pnl: float
+    dollars_pnl: float
+    entry_commission: float  # the lot's share of each execution's commission
+    exit_commission: float
+
+
 @dataclass
 class FIFOCalculator:
     """FIFO P&L calculator for position entries and exits"""
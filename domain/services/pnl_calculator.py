@@ -4,7 +4,7 @@ P&L Calculator - Pure domain service for calculating position P&L
 Extracted from position_service.py to isolate P&L calculation logic
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import logging
 import json
@@ -13,6 +13,7 @@ import os
 from ..models.position import Position, PositionType
 from ..models.trade import Trade, MarketSide
 from ..models.pnl import PnLCalculation, FIFOCalculator
+from . import position_kernel
 
 logger = logging.getLogger('pnl_calculator')
 
@@ -77,6 +78,7 @@ class PnLCalculator:
 
         Matches entries with exits in chronological order to calculate precise P&L.
         This accounts for different entry/exit prices and quantities accurately.
+        The matching itself is position_kernel.fifo_pnl(), on integer price ticks.
         """
         if not entries or not exits:
             return {'points_pnl': 0, 'matched_quantity': 0}
@@ -85,57 +87,29 @@ class PnLCalculator:
         sorted_entries = sorted(entries, key=lambda x: x.get('entry_time', ''))
         sorted_exits = sorted(exits, key=lambda x: x.get('entry_time', ''))
 
-        total_pnl = 0
-        matched_quantity = 0
-
-        # FIFO matching algorithm
-        entry_idx = 0
-        exit_idx = 0
-        remaining_entry_qty = 0
-        remaining_exit_qty = 0
-
-        while entry_idx < len(sorted_entries) and exit_idx < len(sorted_exits):
-            entry = sorted_entries[entry_idx]
-            exit = sorted_exits[exit_idx]
-
-            # Get remaining quantities
-            if remaining_entry_qty == 0:
-                remaining_entry_qty = int(entry.get('quantity', 0))
-            if remaining_exit_qty == 0:
-                remaining_exit_qty = int(exit.get('quantity', 0))
-
-            # Match the smaller quantity
-            match_qty = min(remaining_entry_qty, remaining_exit_qty)
-
-            if match_qty > 0:
-                entry_price = float(entry.get('entry_price') or 0)
-                exit_price = float(exit.get('exit_price') or exit.get('entry_price') or 0)
-
-                # Calculate P&L for this match based on position type
-                if position_type.lower() == 'long':
-                    pnl_per_unit = exit_price - entry_price
-                else:  # Short
-                    pnl_per_unit = entry_price - exit_price
-
-                match_pnl = pnl_per_unit * match_qty
-                total_pnl += match_pnl
-                matched_quantity += match_qty
-
-                # Update remaining quantities
-                remaining_entry_qty -= match_qty
-                remaining_exit_qty -= match_qty
-
-                # Move to next entry/exit if current one is fully matched
-                if remaining_entry_qty == 0:
-                    entry_idx += 1
-                if remaining_exit_qty == 0:
-                    exit_idx += 1
+        matched_quantity, points_pnl = position_kernel.fifo_pnl(
+            entry_quantities=[int(entry.get('quantity', 0)) for entry in sorted_entries],
+            entry_prices=[float(entry.get('entry_price') or 0) for entry in sorted_entries],
+            exit_quantities=[int(exit.get('quantity', 0)) for exit in sorted_exits],
+            exit_prices=[float(exit.get('exit_price') or exit.get('entry_price') or 0) for exit in sorted_exits],
+            direction=1 if position_type.lower() == 'long' else -1
+        )
 
         return {
-            'points_pnl': total_pnl,
+            'points_pnl': points_pnl if matched_quantity else 0,
             'matched_quantity': matched_quantity
         }
 
+    def _fifo_prices(self, trade: Trade) -> Tuple[float, float]:
+        """
+        (entry, exit) price FIFO matching uses for a trade, as calculate_position_pnl() resolves them
+
+        Entry: entry_price, falling back to exit_price (see _trade_to_dict()).
+        Exit: exit_price, falling back to the entry price. Missing or zero prices count as 0.
+        """
+        entry_price = trade.entry_price if trade.entry_price is not None else trade.exit_price
+        return float(entry_price or 0), float(trade.exit_price or entry_price or 0)
+
     def _trade_to_dict(self, trade: Trade) -> Dict:
         """
         Convert Trade object to dictionary for FIFO calculation
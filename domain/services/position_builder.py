@@ -9,12 +9,17 @@ from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import logging
 
+import numpy as np
+
 from ..models.position import Position, PositionType, PositionStatus
 from ..models.trade import Trade, MarketSide
 from .quantity_flow_analyzer import QuantityFlowAnalyzer
 from .pnl_calculator import PnLCalculator
+from . import position_kernel
 from .position_execution_integrity_validator import PositionExecutionIntegrityValidator
 from ..models.execution import Execution
+from ..models.execution_batch import ExecutionBatch
+from ..models.pnl import ExecutionPair
 
 logger = logging.getLogger('position_builder')
 
@@ -48,6 +53,16 @@ class PositionBuilder:
         - Position ends when quantity returns to 0
         - Ignores P&L values on individual executions (P&L is recalculated for the complete position)
         """
+        return [position for position, _ in self.build_positions_with_executions(trades, account, instrument)]
+
+    def build_positions_with_executions(self, trades: List[Trade], account: str,
+                                        instrument: str) -> List[Tuple[Position, List[Trade]]]:
+        """
+        Build positions as build_positions_from_trades() does, each paired with its executions.
+
+        Executions are in chronological order; a reversal execution closes one
+        position and opens the next, so it is listed with both.
+        """
         logger.info(f"=== BUILDING POSITIONS FOR {account}/{instrument} ===")
         logger.info(f"Processing {len(trades)} trades using QUANTITY FLOW MODEL")
         
@@ -57,7 +72,8 @@ class PositionBuilder:
         # Process all trades using quantity flow analysis
         # This ignores any P&L on individual executions and aggregates by quantity flow (0 → +/- → 0)
         logger.info("Using quantity flow analysis to aggregate all executions into positions")
-        positions = self._aggregate_executions_into_positions(trades_sorted, account, instrument)
+        positions_with_executions = self._build_positions_with_kernel(trades_sorted, account, instrument)
+        positions = [position for position, _ in positions_with_executions]
         
         logger.info(f"=== POSITION BUILDING COMPLETE ===")
         logger.info(f"Created {len(positions)} positions from {len(trades_sorted)} trades")
@@ -67,8 +83,149 @@ class PositionBuilder:
             logger.info("Running integrity validation on built positions")
             self._validate_positions(positions, trades_sorted)
 
-        return positions
+        return positions_with_executions
     
+    def _build_positions_with_kernel(self, trades: List[Trade], account: str,
+                                     instrument: str) -> List[Tuple[Position, List[Trade]]]:
+        """
+        Build positions from chronologically sorted trades with position_kernel.
+
+        Produces exactly what the per-event _aggregate_executions_into_positions()
+        does, see build_positions_from_batch().
+        """
+        batch = ExecutionBatch.from_trades(trades)
+        return [(position, trades[start:end + 1])
+                for position, start, end in self.build_positions_from_batch(batch, account, instrument)]
+
+    def build_positions_from_batch(self, batch: ExecutionBatch, account: str,
+                                   instrument: str) -> List[Tuple[Position, int, int]]:
+        """
+        Build positions from a chronologically sorted ExecutionBatch with position_kernel.
+
+        Keeps the per-event builder's conventions: total_quantity is the
+        quantity held before the closing execution, max_quantity ignores the
+        closing execution, and P&L uses each execution's full quantity.
+
+        Returns:
+            (position, first execution index, last execution index) per
+            position; a reversal execution ends one position and starts the next
+        """
+        if not len(batch):
+            return []
+
+        side_sign, quantities, flow, spans, direction = self._batch_spans(batch)
+        if not len(spans.starts):
+            return []
+
+        entry_prices, exit_prices = batch.fifo_prices()
+        pnl = position_kernel.span_fifo_pnl(
+            spans, side_sign, quantities,
+            entry_prices=entry_prices,
+            exit_prices=exit_prices,
+            direction=direction,
+        )
+
+        # Peak quantity over the start/modify executions only
+        member_index, member_span = position_kernel.span_members(spans)
+        offsets = position_kernel.span_offsets(spans)
+        held = np.abs(flow.running[member_index])
+        closing = (member_index == spans.ends[member_span]) & spans.closed[member_span]
+        max_quantity = np.maximum.reduceat(np.where(closing, 0, held), offsets).tolist()
+        total_quantity = np.where(
+            spans.closed, np.abs(flow.previous[spans.ends]), np.abs(flow.running[spans.ends])
+        ).tolist()
+
+        instrument_config = self.pnl_calculator._get_instrument_config(instrument)
+        dollars_pnl = (pnl.points_pnl * instrument_config['multiplier']).tolist()
+        points_pnl = pnl.points_pnl.tolist()
+        average_entry = pnl.average_entry_price.tolist()
+        average_exit = pnl.average_exit_price.tolist()
+        span_commission = np.add.reduceat(batch.commissions[member_index], offsets).tolist()
+        span_quantity = np.add.reduceat(quantities[member_index], offsets).tolist()
+
+        positions = []
+        for k, (start, end, closed) in enumerate(zip(spans.starts.tolist(), spans.ends.tolist(),
+                                                      spans.closed.tolist())):
+            position = Position(
+                instrument=instrument,
+                account=account,
+                position_type=PositionType.LONG if direction[k] > 0 else PositionType.SHORT,
+                entry_time=batch.entry_time(start),
+                exit_time=batch.entry_time(end) if closed else None,
+                total_quantity=total_quantity[k],
+                max_quantity=max_quantity[k],
+                position_status=PositionStatus.CLOSED if closed else PositionStatus.OPEN,
+                execution_count=end - start + 1
+            )
+            position.average_entry_price = average_entry[k]
+            position.average_exit_price = average_exit[k] if closed else None
+            position.total_points_pnl = points_pnl[k]
+            position.total_dollars_pnl = dollars_pnl[k]
+
+            if span_commission[k] > 0:
+                position.total_commission = span_commission[k]
+            else:
+                position.total_commission = instrument_config['commission'] * span_quantity[k]
+            self._set_risk_reward_ratio(position)
+
+            positions.append((position, start, end))
+
+        logger.info(f"Quantity flow analysis complete: {len(positions)} positions created")
+        return positions
+
+    def build_execution_pairs_from_batch(self, batch: ExecutionBatch, instrument: str) -> List[List[ExecutionPair]]:
+        """
+        FIFO entry/exit pairs of each position build_positions_from_batch() builds, in the same order
+
+        Pairs are the lots span_fifo_pnl() matches, so a position's pair
+        P&L adds up to its total P&L. Each execution's commission is split
+        over its quantity.
+        """
+        if not len(batch):
+            return []
+
+        side_sign, quantities, _, spans, direction = self._batch_spans(batch)
+        entry_prices, exit_prices = batch.fifo_prices()
+        lots = position_kernel.span_fifo_pairs(
+            spans, side_sign, quantities,
+            entry_prices=entry_prices,
+            exit_prices=exit_prices,
+            direction=direction,
+        )
+
+        multiplier = self.pnl_calculator._get_instrument_config(instrument)['multiplier']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unit_commission = np.where(quantities > 0, batch.commissions / quantities, 0.0)
+
+        pairs = [[] for _ in range(len(spans.starts))]
+        for span, entry, exit_index, quantity, points in zip(
+            lots.span.tolist(), lots.entry_index.tolist(), lots.exit_index.tolist(),
+            lots.quantity.tolist(), lots.points_pnl.tolist()
+        ):
+            pairs[span].append(ExecutionPair(
+                entry_trade_id=batch.ids[entry],
+                exit_trade_id=batch.ids[exit_index],
+                entry_time=batch.entry_time(entry),
+                exit_time=batch.entry_time(exit_index),
+                quantity=quantity,
+                entry_price=float(entry_prices[entry]),
+                exit_price=float(exit_prices[exit_index]),
+                points_pnl=points,
+                dollars_pnl=points * multiplier,
+                entry_commission=float(unit_commission[entry]) * quantity,
+                exit_commission=float(unit_commission[exit_index]) * quantity,
+            ))
+        return pairs
+
+    def _batch_spans(self, batch: ExecutionBatch):
+        """(side sign, quantities, quantity flow, position spans, direction per span) of a sorted batch"""
+        side_sign = batch.side_sign
+        quantities = np.abs(batch.quantities)
+        flow = position_kernel.quantity_flow(side_sign.astype(np.int64) * quantities)
+        spans = position_kernel.position_spans(flow.events)
+        direction = np.sign(flow.running[spans.starts])
+        return side_sign, quantities, flow, spans, direction
+
     def _convert_completed_trade_to_position(self, trade: Trade, account: str, instrument: str) -> Optional[Position]:
         """
         Convert a completed trade directly to a position
@@ -101,6 +258,9 @@ class PositionBuilder:
     def _aggregate_executions_into_positions(self, trades: List[Trade], account: str, instrument: str) -> List[Position]:
         """
         Aggregate raw executions into complete positions using quantity flow tracking
+
+        Per-event reference for _build_positions_with_kernel(), which must
+        produce the same positions.
         
         Algorithm: Track running position quantity (0 → +/- → 0)
         - Position starts when quantity goes from 0 to non-zero
@@ -225,14 +385,7 @@ class PositionBuilder:
             commission_per_side = self.pnl_calculator._get_instrument_commission(position.instrument)
             position.total_commission = commission_per_side * abs(trade.quantity)
 
-        # Calculate risk/reward ratio
-        if position.total_dollars_pnl != 0 and position.total_commission > 0:
-            if position.total_dollars_pnl > 0:
-                position.risk_reward_ratio = abs(position.total_dollars_pnl) / position.total_commission
-            else:
-                position.risk_reward_ratio = position.total_commission / abs(position.total_dollars_pnl)
-        else:
-            position.risk_reward_ratio = 0.0
+        self._set_risk_reward_ratio(position)
     
     def _calculate_position_totals_from_executions(self, position: Position, executions: List[Trade]):
         """Calculate position totals from aggregated executions using FIFO methodology"""
@@ -272,7 +425,10 @@ class PositionBuilder:
             total_contracts = sum(abs(t.quantity) for t in executions)
             position.total_commission = commission_per_side * total_contracts
 
-        # Calculate risk/reward ratio
+        self._set_risk_reward_ratio(position)
+
+    def _set_risk_reward_ratio(self, position: Position):
+        """Calculate risk/reward ratio from dollar P&L and commission"""
         if position.total_dollars_pnl != 0 and position.total_commission > 0:
             if position.total_dollars_pnl > 0:
                 position.risk_reward_ratio = abs(position.total_dollars_pnl) / position.total_commission
@@ -280,6 +436,7 @@ class PositionBuilder:
                 position.risk_reward_ratio = position.total_commission / abs(position.total_dollars_pnl)
         else:
             position.risk_reward_ratio = 0.0
+
     def _validate_positions(self, positions: List[Position], trades: List[Trade]):
         """
         Validate built positions against source executions
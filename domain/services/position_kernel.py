@@ -0,0 +1,349 @@
+"""
+Position Kernel - Array-based quantity flow and FIFO P&L
+
+Shared core of QuantityFlowAnalyzer, PositionBuilder, PnLCalculator and
+services/position_algorithms. Works on parallel NumPy arrays holding one
+account/instrument's executions in chronological order:
+
+- running quantity is the cumulative sum of signed quantities
+- positions are the spans between zero crossings; a reversal execution
+  (sign flip without passing through zero) ends one span and starts the next
+- FIFO P&L is computed on integer price ticks, so sums are exact and only
+  the final division back to points rounds
+"""
+
+from decimal import Decimal
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..models.trade import MarketSide
+
+# Flow event codes, indexing EVENT_TYPES
+EVENT_NONE, EVENT_START, EVENT_MODIFY, EVENT_CLOSE, EVENT_REVERSAL = range(5)
+EVENT_TYPES = (None, 'position_start', 'position_modify', 'position_close', 'position_reversal')
+
+# +1 adds to a long / covers a short, -1 the opposite
+SIDE_SIGN = {
+    MarketSide.BUY: 1,
+    MarketSide.BUY_TO_COVER: 1,
+    MarketSide.LONG: 1,
+    MarketSide.SELL: -1,
+    MarketSide.SELL_SHORT: -1,
+    MarketSide.SHORT: -1,
+}
+
+# Prices with more decimals than this use float arithmetic instead of ticks
+MAX_PRICE_DECIMALS = 9
+
+
+class FlowArrays(NamedTuple):
+    """Running quantity before/after each execution and its flow event code"""
+    previous: np.ndarray
+    running: np.ndarray
+    events: np.ndarray
+
+
+class PositionSpans(NamedTuple):
+    """First and last execution index of each position, and whether it closed"""
+    starts: np.ndarray
+    ends: np.ndarray
+    closed: np.ndarray
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self.ends - self.starts + 1
+
+
+class SpanPnL(NamedTuple):
+    """FIFO results per position span (zeros where a span lacks entries or exits)"""
+    matched_quantity: np.ndarray
+    points_pnl: np.ndarray
+    average_entry_price: np.ndarray
+    average_exit_price: np.ndarray
+
+
+class FifoPairs(NamedTuple):
+    """FIFO-matched lots: span, entry and exit execution index, quantity and points P&L per lot"""
+    span: np.ndarray
+    entry_index: np.ndarray
+    exit_index: np.ndarray
+    quantity: np.ndarray
+    points_pnl: np.ndarray
+
+
+def quantity_flow(signed_quantities) -> FlowArrays:
+    """
+    Classify each execution's effect on the running quantity.
+
+    0 -> non-zero is a start, non-zero -> 0 a close, a sign flip a reversal,
+    same sign a modify; 0 -> 0 (e.g. an unknown side while flat) is no event.
+    """
+    signed = np.asarray(signed_quantities, dtype=np.int64)
+    running = np.cumsum(signed)
+    previous = running - signed
+
+    was_open = previous != 0
+    is_open = running != 0
+    direction_product = np.sign(previous) * np.sign(running)
+
+    events = np.full(len(signed), EVENT_NONE, dtype=np.int8)
+    events[~was_open & is_open] = EVENT_START
+    events[was_open & ~is_open] = EVENT_CLOSE
+    events[direction_product > 0] = EVENT_MODIFY
+    events[direction_product < 0] = EVENT_REVERSAL
+    return FlowArrays(previous, running, events)
+
+
+def position_spans(events) -> PositionSpans:
+    """
+    Execution index ranges of the positions in a flow.
+
+    Each start or reversal opens a span that runs to the next close or
+    reversal; only the last span can still be open, and then runs to the
+    last execution. Executions with no event are never inside a span.
+    """
+    events = np.asarray(events)
+    starts = np.flatnonzero((events == EVENT_START) | (events == EVENT_REVERSAL))
+    ends = np.flatnonzero((events == EVENT_CLOSE) | (events == EVENT_REVERSAL))
+
+    closed = np.ones(len(starts), dtype=bool)
+    if len(ends) < len(starts):
+        ends = np.append(ends, len(events) - 1)
+        closed[-1] = False
+    return PositionSpans(starts, ends, closed)
+
+
+def span_members(spans: PositionSpans) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Flatten spans into (execution index, span number) per member.
+
+    A reversal execution appears twice: last member of one span, first of the next.
+    """
+    lengths = spans.lengths
+    span = np.repeat(np.arange(len(lengths)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    index = np.repeat(spans.starts - offsets, lengths) + np.arange(int(lengths.sum()))
+    return index, span
+
+
+def span_offsets(spans: PositionSpans) -> np.ndarray:
+    """Position of each span's first member in the span_members() arrays"""
+    lengths = spans.lengths
+    return np.cumsum(lengths) - lengths
+
+
+def price_scale(prices) -> Optional[int]:
+    """
+    Smallest power of ten turning every price into an integer tick count.
+
+    Decimals are those of the prices' shortest repr, so 21000.25 is
+    2100025 ticks at scale 100. None when prices need more than
+    MAX_PRICE_DECIMALS or the ticks would not fit exactly in a float.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    if len(prices) == 0:
+        return 1
+    if not np.all(np.isfinite(prices)):
+        return None
+
+    # k / 10**d rounds back to the price exactly iff its shortest repr has <= d decimals
+    for decimals in range(MAX_PRICE_DECIMALS + 1):
+        scale = 10 ** decimals
+        if np.array_equal(np.rint(prices * scale) / scale, prices):
+            break
+    else:
+        return None
+
+    if np.abs(prices).max() * scale >= 2 ** 52:
+        return None
+    return scale
+
+
+def to_ticks(prices, scale: int) -> np.ndarray:
+    """Integer tick counts for prices at a price_scale() scale"""
+    return np.rint(np.asarray(prices, dtype=np.float64) * scale).astype(np.int64)
+
+
+def decimal_ticks(values: Iterable) -> Tuple[List[int], int]:
+    """
+    Exact integer ticks and their common scale for arbitrary numeric values.
+
+    Values go through Decimal(str(value)), as the Decimal code paths did,
+    so strings and floats convert without binary rounding.
+    """
+    decimals = [Decimal(str(value)) for value in values]
+    places = max([-d.as_tuple().exponent for d in decimals if d.is_finite()] + [0])
+    scale = 10 ** places
+    return [int(d.scaleb(places)) for d in decimals], scale
+
+
+def span_fifo_pnl(spans: PositionSpans, side_sign, quantities, entry_prices, exit_prices,
+                  direction) -> SpanPnL:
+    """
+    FIFO-match every span's entries against its exits at once.
+
+    Args:
+        spans: Position spans over the executions
+        side_sign: +1/-1 per execution (0: neither entry nor exit)
+        quantities: Positive execution quantities
+        entry_prices: Price used when an execution is an entry
+        exit_prices: Price used when an execution is an exit
+        direction: +1 (long) or -1 (short) per span
+
+    With FIFO every matched unit pairs one entry unit with one exit unit,
+    so a span's P&L is the value of its first `matched` exit units minus
+    that of its first `matched` entry units - no per-fill pairing needed.
+    Entries and exits are taken in execution order; averages cover every
+    entry/exit, matched or not.
+    """
+    n_spans = len(spans.starts)
+    if n_spans == 0:
+        empty = np.zeros(0)
+        return SpanPnL(np.zeros(0, dtype=np.int64), empty, empty, empty)
+
+    index, span = span_members(spans)
+    offsets = span_offsets(spans)
+
+    member_sign = np.asarray(side_sign, dtype=np.int64)[index]
+    member_direction = np.asarray(direction, dtype=np.int64)[span]
+    qty = np.asarray(quantities, dtype=np.int64)[index]
+    entry_qty = np.where(member_sign == member_direction, qty, 0)
+    exit_qty = np.where(member_sign == -member_direction, qty, 0)
+
+    entry_total = np.add.reduceat(entry_qty, offsets)
+    exit_total = np.add.reduceat(exit_qty, offsets)
+    entry_count = np.add.reduceat((member_sign == member_direction).astype(np.int64), offsets)
+    exit_count = np.add.reduceat((member_sign == -member_direction).astype(np.int64), offsets)
+    matched = np.minimum(entry_total, exit_total)
+
+    # Units of each member that fall inside its span's first `matched` units
+    def matched_units(member_qty):
+        before = np.cumsum(member_qty) - member_qty
+        before -= np.repeat(before[offsets], spans.lengths)
+        return np.clip(np.repeat(matched, spans.lengths) - before, 0, member_qty)
+
+    entry_matched = matched_units(entry_qty)
+    exit_matched = matched_units(exit_qty)
+
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)[index]
+    exit_prices = np.asarray(exit_prices, dtype=np.float64)[index]
+    scale = price_scale(np.concatenate([entry_prices, exit_prices]))
+    if scale is not None:
+        entry_prices = to_ticks(entry_prices, scale)
+        exit_prices = to_ticks(exit_prices, scale)
+    else:
+        scale = 1
+
+    entry_value = np.add.reduceat(entry_prices * entry_qty, offsets)
+    exit_value = np.add.reduceat(exit_prices * exit_qty, offsets)
+    pnl = (np.add.reduceat(exit_prices * exit_matched, offsets)
+           - np.add.reduceat(entry_prices * entry_matched, offsets)) * np.asarray(direction)
+
+    # Like FIFOCalculator: a span without entries or without exits has no P&L at all
+    valid = (entry_count > 0) & (exit_count > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        average_entry = np.where(valid & (entry_total > 0), entry_value / scale / entry_total, 0.0)
+        average_exit = np.where(valid & (exit_total > 0), exit_value / scale / exit_total, 0.0)
+    return SpanPnL(
+        matched_quantity=np.where(valid, matched, 0),
+        points_pnl=np.where(valid, pnl / scale, 0.0),
+        average_entry_price=average_entry,
+        average_exit_price=average_exit,
+    )
+
+
+def span_fifo_pairs(spans: PositionSpans, side_sign, quantities, entry_prices, exit_prices,
+                    direction) -> FifoPairs:
+    """
+    The entry/exit lots behind span_fifo_pnl(): one per stretch of matched
+    units where both the entry and the exit execution stay the same.
+
+    Same arguments and matching as span_fifo_pnl(), so a span's pair P&L
+    adds up to its points P&L. Lots come out span by span, in FIFO order.
+    """
+    index, span = span_members(spans)
+    offsets = span_offsets(spans)
+    if not len(index):
+        empty = np.zeros(0, dtype=np.int64)
+        return FifoPairs(empty, empty, empty, empty, np.zeros(0))
+
+    member_sign = np.asarray(side_sign, dtype=np.int64)[index]
+    member_direction = np.asarray(direction, dtype=np.int64)[span]
+    qty = np.asarray(quantities, dtype=np.int64)[index]
+    is_entry = member_sign == member_direction
+    is_exit = member_sign == -member_direction
+
+    entry_total = np.add.reduceat(np.where(is_entry, qty, 0), offsets)
+    exit_total = np.add.reduceat(np.where(is_exit, qty, 0), offsets)
+    matched = np.minimum(entry_total, exit_total)
+
+    # Matched units of all spans laid end to end: span k covers [base[k], base_end[k])
+    base_end = np.cumsum(matched)
+    base = base_end - matched
+
+    # Entry/exit members in order, with the unit each one ends at
+    entry_members = np.flatnonzero(is_entry)
+    exit_members = np.flatnonzero(is_exit)
+    entry_end = np.cumsum(qty[entry_members])
+    exit_end = np.cumsum(qty[exit_members])
+    entry_before = np.cumsum(entry_total) - entry_total
+    exit_before = np.cumsum(exit_total) - exit_total
+
+    def breaks(members, unit_end, before):
+        local = unit_end - before[span[members]]
+        inside = local < matched[span[members]]
+        return base[span[members]][inside] + local[inside]
+
+    has_pairs = matched > 0
+    bounds = np.unique(np.concatenate([
+        base[has_pairs], base_end[has_pairs],
+        breaks(entry_members, entry_end, entry_before),
+        breaks(exit_members, exit_end, exit_before),
+    ]))
+    lot_start = bounds[:-1]
+    lot_span = np.searchsorted(base_end, lot_start, side='right')
+    local = lot_start - base[lot_span]
+    lot_entry = index[entry_members[np.searchsorted(entry_end, entry_before[lot_span] + local, side='right')]]
+    lot_exit = index[exit_members[np.searchsorted(exit_end, exit_before[lot_span] + local, side='right')]]
+    lot_quantity = np.diff(bounds)
+
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)[lot_entry]
+    exit_prices = np.asarray(exit_prices, dtype=np.float64)[lot_exit]
+    scale = price_scale(np.concatenate([entry_prices, exit_prices]))
+    if scale is not None:
+        entry_prices = to_ticks(entry_prices, scale)
+        exit_prices = to_ticks(exit_prices, scale)
+    else:
+        scale = 1
+    lot_direction = np.asarray(direction, dtype=np.int64)[lot_span]
+    points = (exit_prices - entry_prices) * lot_quantity * lot_direction / scale
+
+    return FifoPairs(lot_span, lot_entry, lot_exit, lot_quantity, points)
+
+
+def fifo_pnl(entry_quantities, entry_prices, exit_quantities, exit_prices,
+             direction: int = 1) -> Tuple[int, float]:
+    """
+    FIFO P&L of one position's entries and exits, each in chronological order.
+
+    Returns:
+        (matched quantity, points P&L)
+    """
+    entry_quantities = list(entry_quantities)
+    exit_quantities = list(exit_quantities)
+    n_entries = len(entry_quantities)
+    n_exits = len(exit_quantities)
+    if not n_entries or not n_exits:
+        return 0, 0.0
+
+    spans = PositionSpans(np.array([0]), np.array([n_entries + n_exits - 1]), np.array([True]))
+    result = span_fifo_pnl(
+        spans,
+        side_sign=[direction] * n_entries + [-direction] * n_exits,
+        quantities=entry_quantities + exit_quantities,
+        entry_prices=list(entry_prices) + [0.0] * n_exits,
+        exit_prices=[0.0] * n_entries + list(exit_prices),
+        direction=[direction],
+    )
+    return int(result.matched_quantity[0]), float(result.points_pnl[0])
@@ -8,7 +8,10 @@ from typing import List, NamedTuple, Optional
 from datetime import datetime
 import logging
 
+import numpy as np
+
 from ..models.trade import Trade, MarketSide
+from . import position_kernel
 
 logger = logging.getLogger('quantity_flow_analyzer')
 
@@ -42,6 +45,7 @@ class QuantityFlowAnalyzer:
 
         Positions are defined by quantity flow (0 → +/- → 0) per account.
         No session boundaries - positions can span multiple days until quantity returns to 0.
+        Running quantities and event types come from position_kernel.quantity_flow().
         """
         if not trades:
             return []
@@ -49,35 +53,23 @@ class QuantityFlowAnalyzer:
         # Sort trades by entry time for chronological processing
         sorted_trades = sorted(trades, key=lambda t: t.entry_time or datetime.min)
 
-        events = []
-        running_quantity = 0
-
         logger.info(f"Starting quantity flow analysis for {len(sorted_trades)} trades")
 
-        for i, trade in enumerate(sorted_trades):
-            # Calculate signed quantity change
-            signed_qty_change = self._get_signed_quantity_change(trade)
-
-            previous_quantity = running_quantity
-            running_quantity += signed_qty_change
-
-            logger.info(f"Trade {i+1}: {trade.side_of_market.value} {trade.quantity} @ {trade.entry_time} | "
-                       f"Running: {previous_quantity} → {running_quantity}")
+        flow = position_kernel.quantity_flow([self._get_signed_quantity_change(t) for t in sorted_trades])
 
-            # Determine event type based on position lifecycle
-            event_type = self._determine_event_type(previous_quantity, running_quantity)
-
-            if event_type:
-                event = FlowEvent(
-                    event_type=event_type,
-                    trade=trade,
-                    previous_quantity=previous_quantity,
-                    running_quantity=running_quantity,
-                    timestamp=trade.entry_time or datetime.now()
-                )
-                events.append(event)
-
-                logger.info(f"  → {event_type.upper()}")
+        events = []
+        codes = flow.events.tolist()
+        previous = flow.previous.tolist()
+        running = flow.running.tolist()
+        for i in np.flatnonzero(flow.events).tolist():
+            trade = sorted_trades[i]
+            events.append(FlowEvent(
+                event_type=position_kernel.EVENT_TYPES[codes[i]],
+                trade=trade,
+                previous_quantity=previous[i],
+                running_quantity=running[i],
+                timestamp=trade.entry_time or datetime.now()
+            ))
 
         logger.info(f"Quantity flow analysis complete: {len(events)} events generated")
         return events
@@ -89,15 +81,11 @@ class QuantityFlowAnalyzer:
         Buy actions: +quantity (increase position)
         Sell actions: -quantity (decrease position)
         """
-        quantity = abs(trade.quantity)
-        
-        if trade.side_of_market in [MarketSide.BUY, MarketSide.BUY_TO_COVER, MarketSide.LONG]:
-            return quantity  # Buying contracts (+)
-        elif trade.side_of_market in [MarketSide.SELL, MarketSide.SELL_SHORT, MarketSide.SHORT]:
-            return -quantity  # Selling contracts (-)
-        else:
+        sign = position_kernel.SIDE_SIGN.get(trade.side_of_market)
+        if sign is None:
             logger.warning(f"Unknown side_of_market '{trade.side_of_market.value}' for trade {trade.id}")
             return 0
+        return sign * abs(trade.quantity)
     
     def _determine_event_type(self, previous_quantity: int, running_quantity: int) -> Optional[str]:
         """
@@ -8,11 +8,16 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+from services.position_algorithms import peak_rss_mb, stream_trade_groups
+
 # Get logger
 logger = logging.getLogger('position_service')
 
 
 class PositionService:
+    # Characters str.strip() removes that matter in account/instrument names, as a SQL expression
+    WHITESPACE = "char(9, 10, 11, 12, 13, 32)"
+
     def __init__(self, db_path: str = None):
         from config import config
         self.db_path = db_path or config.db_path
@@ -98,45 +103,42 @@ class PositionService:
     
     def rebuild_positions_from_trades(self) -> Dict[str, int]:
         """Rebuild all positions from existing trades data using position flow analysis"""
+        from config import POSITION_REBUILD_CONFIG
+
         try:
             # Clear existing positions
             self.cursor.execute("DELETE FROM positions")
             self.cursor.execute("DELETE FROM position_executions")
             
-            # Get all non-deleted trades ordered by account, instrument, and execution ID (chronological without time dependency)
-            self.cursor.execute("""
+            # Stream non-deleted trades one account/instrument group at a time, in execution ID
+            # order (chronological without time dependency). Groups use the trimmed names, so
+            # those sort first; within a group rows keep the account, instrument, id order.
+            # The stream has its own cursor: _save_position() executes on self.cursor, which
+            # would reset a SELECT still being read from it.
+            trade_cursor = self.conn.cursor()
+            trade_cursor.execute(f"""
                 SELECT * FROM trades 
                 WHERE deleted = 0 OR deleted IS NULL
-                ORDER BY account, instrument, id
+                ORDER BY TRIM(account, {self.WHITESPACE}), TRIM(instrument, {self.WHITESPACE}), account, instrument, id
             """)
+            groups = stream_trade_groups(
+                trade_cursor,
+                # Normalize account and instrument for consistent grouping
+                key=lambda trade: ((trade.get('account') or '').strip(), (trade.get('instrument') or '').strip()),
+                fetch_size=POSITION_REBUILD_CONFIG['fetch_size']
+            )
             
-            trades = [dict(row) for row in self.cursor.fetchall()]
-            
-            if not trades:
-                return {'positions_created': 0, 'trades_processed': 0}
+            positions_created = 0
+            trades_processed = 0
             
-            # Group trades by account and instrument for position tracking
-            account_instrument_groups = {}
-            for trade in trades:
-                # Normalize account and instrument for consistent grouping
-                account = (trade.get('account') or '').strip()
-                instrument = (trade.get('instrument') or '').strip()
-                
+            # Process each account-instrument combination as soon as all its trades are read
+            for (account, instrument), group_trades in groups:
                 # Skip trades with missing critical fields
                 if not account or not instrument:
-                    logger.warning(f"Skipping trade with missing account/instrument: {trade.get('entry_execution_id', 'Unknown')}")
+                    for trade in group_trades:
+                        logger.warning(f"Skipping trade with missing account/instrument: {trade.get('entry_execution_id', 'Unknown')}")
                     continue
                 
-                key = (account, instrument)
-                if key not in account_instrument_groups:
-                    account_instrument_groups[key] = []
-                account_instrument_groups[key].append(trade)
-            
-            positions_created = 0
-            trades_processed = 0
-            
-            # Process each account-instrument combination
-            for (account, instrument), group_trades in account_instrument_groups.items():
                 logger.info(f"Processing {len(group_trades)} trades for {account}/{instrument}")
                 
                 # Build positions from execution flow
@@ -154,7 +156,8 @@ class PositionService:
             
             return {
                 'positions_created': positions_created,
-                'trades_processed': trades_processed
+                'trades_processed': trades_processed,
+                'peak_rss_mb': peak_rss_mb()
             }
             
         except Exception as e:
@@ -21,15 +21,17 @@ class BaseRepository(ABC):
         self.cursor = cursor
     
     def _execute_with_monitoring(self, query: str, params: tuple = None, 
-                               operation: str = "query", table: str = "unknown") -> sqlite3.Cursor:
+                               operation: str = "query", table: str = "unknown",
+                               cursor: Optional[sqlite3.Cursor] = None) -> sqlite3.Cursor:
         """Execute query with monitoring metrics collection"""
         start_time = time.time()
+        cursor = cursor or self.cursor
         
         try:
             if params:
-                result = self.cursor.execute(query, params)
+                result = cursor.execute(query, params)
             else:
-                result = self.cursor.execute(query)
+                result = cursor.execute(query)
             
             duration = time.time() - start_time
             
@@ -53,6 +55,17 @@ class BaseRepository(ABC):
                 pass
             raise e
     
+    def _execute_write(self, fn):
+        """
+        Run a write job through the single-writer queue for this connection's
+        database file (see scripts/write_queue.py). ``fn`` receives a cursor.
+        """
+        from scripts.write_queue import run_write
+
+        # seq, name, file - file is '' for in-memory databases
+        db_path = self.conn.execute("PRAGMA database_list").fetchone()[2]
+        return run_write(db_path, lambda conn: fn(conn.cursor()), self.conn)
+
     def _detect_table_from_query(self, query: str) -> str:
         """Detect the primary table being queried for monitoring purposes"""
         query_lower = query.lower().strip()
@@ -348,13 +348,14 @@ class CustomFieldsRepository(BaseRepository):
 
         params = (position_id, field_id, value, position_id, field_id)
 
-        result = self._execute_with_monitoring(
+        rowcount = self._execute_write(lambda cursor: self._execute_with_monitoring(
             query, params,
             operation='upsert',
-            table='position_custom_field_values'
-        )
+            table='position_custom_field_values',
+            cursor=cursor
+        ).rowcount)
 
-        success = result.rowcount > 0
+        success = rowcount > 0
         if success:
             db_logger.debug(f"Set custom field value: position {position_id}, field {field_id}")
 
@@ -415,13 +416,14 @@ class CustomFieldsRepository(BaseRepository):
             WHERE position_id = ? AND custom_field_id = ?
         """
 
-        result = self._execute_with_monitoring(
+        rowcount = self._execute_write(lambda cursor: self._execute_with_monitoring(
             query, (position_id, field_id),
             operation='delete',
-            table='position_custom_field_values'
-        )
+            table='position_custom_field_values',
+            cursor=cursor
+        ).rowcount)
 
-        return result.rowcount > 0
+        return rowcount > 0
 
     def delete_all_position_field_values(self, position_id: int) -> bool:
         """Delete all custom field values for a position"""
@@ -430,13 +432,14 @@ class CustomFieldsRepository(BaseRepository):
             WHERE position_id = ?
         """
 
-        result = self._execute_with_monitoring(
+        rowcount = self._execute_write(lambda cursor: self._execute_with_monitoring(
             query, (position_id,),
             operation='delete',
-            table='position_custom_field_values'
-        )
+            table='position_custom_field_values',
+            cursor=cursor
+        ).rowcount)
 
-        return result.rowcount > 0
+        return rowcount > 0
 
     def bulk_set_position_field_values(self, position_id: int,
                                       field_values: Dict[int, str]) -> bool:
@@ -444,12 +447,14 @@ class CustomFieldsRepository(BaseRepository):
         if not field_values:
             return True
 
-        success = True
-        for field_id, value in field_values.items():
-            if not self.set_position_field_value(position_id, field_id, value):
-                success = False
+        def set_all(cursor):
+            success = True
+            for field_id, value in field_values.items():
+                if not self.set_position_field_value(position_id, field_id, value):
+                    success = False
+            return success
 
-        return success
+        return self._execute_write(set_all)
 
     # ========== UTILITY AND ANALYTICS OPERATIONS ==========
 
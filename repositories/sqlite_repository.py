@@ -3,6 +3,7 @@ import logging
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from contextlib import contextmanager
+from scripts.connection_pool import get_connection_pool
 from .interfaces import (
     ITradeRepository, IPositionRepository, IOHLCRepository, 
     ISettingsRepository, IProfileRepository, IStatisticsRepository,
@@ -19,19 +20,9 @@ class SQLiteRepository:
     
     @contextmanager
     def get_connection(self):
-        """Get database connection with proper context management"""
-        conn = None
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+        """Check out a pooled database connection with proper context management"""
+        with get_connection_pool(self.db_path).connection() as conn:
             yield conn
-        except Exception as e:
-            if conn:
-                conn.rollback()
-            raise e
-        finally:
-            if conn:
-                conn.close()
     
     def _execute_with_monitoring(self, conn: sqlite3.Connection, query: str, params: tuple = None, 
                                 operation: str = "query", table: str = "unknown"):
@@ -3,7 +3,7 @@ Repository for persisting validation results and integrity issues
 """
 import sqlite3
 import json
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime, timezone
 
 from domain.validation_result import ValidationResult, ValidationStatus
@@ -168,6 +168,89 @@ class ValidationRepository:
             logger.error(f"Error saving validation with issues: {e}")
             raise
 
+    def save_validations_bulk(
+        self,
+        validations: List[Tuple[ValidationResult, List[IntegrityIssue]]]
+    ) -> List[int]:
+        """
+        Save many validation results and their issues in one transaction
+
+        Args:
+            validations: (ValidationResult, issues) pairs; the issues'
+                validation_id is replaced with their result's ID
+
+        Returns:
+            The validation_id of each saved result, in input order (also set
+            on the results)
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                validation_ids, issue_count = self._insert_validations(cursor, validations)
+                conn.commit()
+
+                logger.info(f"Saved {len(validation_ids)} validations with {issue_count} issues")
+                return validation_ids
+
+        except sqlite3.Error as e:
+            logger.error(f"Error saving validations in bulk: {e}")
+            raise
+
+    def _insert_validations(
+        self,
+        cursor: sqlite3.Cursor,
+        validations: List[Tuple[ValidationResult, List[IntegrityIssue]]]
+    ) -> Tuple[List[int], int]:
+        """Insert results and their issues (see save_validations_bulk); returns (validation IDs, issue count)"""
+        validation_ids = []
+        issue_rows = []
+
+        for result, issues in validations:
+            cursor.execute("""
+                INSERT INTO validation_results (
+                    position_id, status, timestamp, issue_count,
+                    validation_type, details, completed_at, error_message
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                result.position_id,
+                result.status.value,
+                result.timestamp.isoformat(),
+                result.issue_count,
+                result.validation_type,
+                json.dumps(result.details) if result.details else None,
+                result.completed_at.isoformat() if result.completed_at else None,
+                result.error_message
+            ))
+            result.validation_id = cursor.lastrowid
+            validation_ids.append(result.validation_id)
+
+            for issue in issues:
+                issue.validation_id = result.validation_id
+                issue_rows.append((
+                    issue.validation_id,
+                    issue.issue_type.value,
+                    issue.severity.value,
+                    issue.description,
+                    issue.resolution_status.value,
+                    issue.position_id,
+                    issue.execution_id,
+                    issue.detected_at.isoformat(),
+                    issue.resolved_at.isoformat() if issue.resolved_at else None,
+                    issue.resolution_method,
+                    json.dumps(issue.resolution_details) if issue.resolution_details else None,
+                    json.dumps(issue.metadata) if issue.metadata else None
+                ))
+
+        cursor.executemany("""
+            INSERT INTO integrity_issues (
+                validation_id, issue_type, severity, description,
+                resolution_status, position_id, execution_id,
+                detected_at, resolved_at, resolution_method,
+                resolution_details, metadata
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, issue_rows)
+        return validation_ids, len(issue_rows)
+
     def get_validation_result(self, validation_id: int) -> Optional[ValidationResult]:
         """
         Retrieve a validation result by ID
@@ -498,6 +581,193 @@ class ValidationRepository:
             logger.error(f"Error updating issue repair info: {e}")
             return False
 
+    # ------------------------------------------------------------------
+    # Chunked validation jobs
+    # ------------------------------------------------------------------
+
+    def create_validation_job(
+        self,
+        job_id: str,
+        chunks: List[Tuple[int, int, int]],
+        position_status: Optional[str] = None,
+        since: Optional[str] = None,
+        auto_repair: bool = False
+    ) -> None:
+        """
+        Record a validation job and its chunks (all pending)
+
+        Args:
+            job_id: Job identifier
+            chunks: (min_position_id, max_position_id, position_count) per chunk
+            position_status: Status filter the job validates with
+            since: Time filter the job validates with
+            auto_repair: Whether chunks repair the positions they find issues in
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO validation_jobs (
+                        job_id, status, position_status, since, auto_repair,
+                        total_positions, chunk_count, created_at
+                    ) VALUES (?, 'running', ?, ?, ?, ?, ?, ?)
+                """, (
+                    job_id, position_status, since, int(auto_repair),
+                    sum(chunk[2] for chunk in chunks), len(chunks),
+                    datetime.now(timezone.utc).isoformat()
+                ))
+                cursor.executemany("""
+                    INSERT INTO validation_job_chunks (
+                        job_id, chunk_index, min_position_id, max_position_id, position_count
+                    ) VALUES (?, ?, ?, ?, ?)
+                """, [(job_id, index) + tuple(chunk) for index, chunk in enumerate(chunks)])
+                conn.commit()
+
+                logger.info(f"Created validation job {job_id} with {len(chunks)} chunks")
+
+        except sqlite3.Error as e:
+            logger.error(f"Error creating validation job {job_id}: {e}")
+            raise
+
+    def get_validation_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a validation job with its chunk progress
+
+        Returns:
+            Job dictionary (with 'chunks_completed' and 'positions_validated'),
+            or None if there is no such job
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT j.*,
+                           COALESCE(SUM(c.status = 'completed'), 0) AS chunks_completed,
+                           COALESCE(SUM(c.validated_count), 0) AS positions_validated,
+                           MAX(c.completed_at) AS last_chunk_completed_at
+                    FROM validation_jobs j
+                    LEFT JOIN validation_job_chunks c ON c.job_id = j.job_id
+                    WHERE j.job_id = ?
+                    GROUP BY j.job_id
+                """, (job_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    return None
+
+                job = dict(row)
+                job['auto_repair'] = bool(job['auto_repair'])
+                job['result'] = json.loads(job['result']) if job['result'] else None
+                return job
+
+        except sqlite3.Error as e:
+            logger.error(f"Error getting validation job {job_id}: {e}")
+            return None
+
+    def get_validation_job_chunks(self, job_id: str, status: Optional[str] = None) -> List[Dict]:
+        """
+        Get a job's chunks in order, optionally only those with a status
+
+        Returns:
+            Chunk dictionaries ('summary' decoded for completed chunks)
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                query = "SELECT * FROM validation_job_chunks WHERE job_id = ?"
+                params = [job_id]
+                if status:
+                    query += " AND status = ?"
+                    params.append(status)
+                cursor.execute(query + " ORDER BY chunk_index", params)
+
+                chunks = []
+                for row in cursor.fetchall():
+                    chunk = dict(row)
+                    chunk['summary'] = json.loads(chunk['summary']) if chunk['summary'] else None
+                    chunks.append(chunk)
+                return chunks
+
+        except sqlite3.Error as e:
+            logger.error(f"Error getting chunks of validation job {job_id}: {e}")
+            return []
+
+    def complete_validation_job_chunk(
+        self,
+        job_id: str,
+        chunk_index: int,
+        validations: List[Tuple[ValidationResult, List[IntegrityIssue]]],
+        summary: Dict
+    ) -> bool:
+        """
+        Save a chunk's validations and mark it completed, in one transaction
+
+        A chunk that is already completed (e.g. a task redelivered after a
+        worker restart) is left as it is and nothing is saved.
+
+        Returns:
+            True if the chunk was completed by this call
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE validation_job_chunks
+                    SET status = 'completed', validated_count = ?, summary = ?, completed_at = ?
+                    WHERE job_id = ? AND chunk_index = ? AND status != 'completed'
+                """, (
+                    summary.get('validated', 0), json.dumps(summary),
+                    datetime.now(timezone.utc).isoformat(), job_id, chunk_index
+                ))
+                if cursor.rowcount == 0:
+                    return False
+
+                self._insert_validations(cursor, validations)
+                conn.commit()
+                return True
+
+        except sqlite3.Error as e:
+            logger.error(f"Error completing chunk {chunk_index} of validation job {job_id}: {e}")
+            raise
+
+    def update_validation_job_status(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict] = None
+    ) -> bool:
+        """
+        Set a job's status ('running', 'completed', 'incomplete', 'cancelled')
+
+        Args:
+            job_id: Job identifier
+            status: New status
+            result: Merged job summary to store with a finished job
+
+        Returns:
+            True if the job exists
+        """
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE validation_jobs
+                    SET status = ?,
+                        result = COALESCE(?, result),
+                        completed_at = CASE WHEN ? = 'running' THEN NULL ELSE ? END
+                    WHERE job_id = ?
+                """, (
+                    status, json.dumps(result) if result is not None else None,
+                    status, datetime.now(timezone.utc).isoformat(), job_id
+                ))
+                conn.commit()
+                return cursor.rowcount > 0
+
+        except sqlite3.Error as e:
+            logger.error(f"Error updating validation job {job_id}: {e}")
+            return False
+
     # Private helper methods
 
     def _row_to_validation_result(self, row: tuple) -> ValidationResult:
@@ -35,62 +35,81 @@ def review_executions():
                              message=str(e)), 500
 
 
+# Executions per /api/list page
+EXECUTION_PAGE_SIZE = 500
+MAX_EXECUTION_PAGE_SIZE = 5000
+
+
 @execution_review_bp.route('/api/list')
 def list_executions():
-    """API endpoint to get executions with filtering and running quantity calculation"""
+    """
+    API endpoint to get executions with filtering and running quantity
+
+    Running quantity is stored per (account, instrument) on each trade (see
+    services/running_quantity.py). Pages are keyed on (entry_time, id): pass
+    the previous response's next_cursor as after_time/after_id to continue.
+    total_count and final_quantity (the net quantity at the end of the
+    filtered range, summed over account/instrument groups) are returned
+    with the first page.
+    """
     try:
         account = request.args.get('account', '')
         instrument = request.args.get('instrument', '')
         start_date = request.args.get('start_date', '')
         end_date = request.args.get('end_date', '')
+        after_time = request.args.get('after_time')
+        after_id = request.args.get('after_id', type=int)
+        limit = request.args.get('limit', EXECUTION_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_EXECUTION_PAGE_SIZE))
 
         with FuturesDB() as db:
-            # Build query with filters
-            query = """
-                SELECT id, instrument, account, side_of_market, quantity,
-                       entry_price, exit_price, entry_time, entry_execution_id
-                FROM trades
-                WHERE (deleted = 0 OR deleted IS NULL)
-            """
+            db.refresh_running_quantities(account or None, instrument or None)
+
+            # Build filters (entry_time comparisons stay index-friendly)
+            filters = " WHERE (deleted = 0 OR deleted IS NULL)"
             params = []
 
             if account:
-                query += " AND account = ?"
+                filters += " AND account = ?"
                 params.append(account)
             if instrument:
-                query += " AND instrument = ?"
+                filters += " AND instrument = ?"
                 params.append(instrument)
             if start_date:
-                query += " AND DATE(entry_time) >= ?"
+                filters += " AND entry_time >= ?"
                 params.append(start_date)
             if end_date:
-                query += " AND DATE(entry_time) <= ?"
+                filters += " AND entry_time < date(?, '+1 day')"
                 params.append(end_date)
 
-            query += " ORDER BY entry_time ASC"
+            query = """
+                SELECT id, instrument, account, side_of_market, quantity,
+                       entry_price, exit_price, entry_time, entry_execution_id,
+                       running_qty_before, running_qty_after
+                FROM trades
+            """ + filters
+            page_params = list(params)
+
+            if after_time is not None and after_id is not None:
+                query += " AND (entry_time > ? OR (entry_time = ? AND id > ?))"
+                page_params.extend([after_time, after_time, after_id])
 
-            db.cursor.execute(query, params)
+            query += " ORDER BY entry_time ASC, id ASC LIMIT ?"
+            page_params.append(limit + 1)
+
+            db.cursor.execute(query, page_params)
             rows = db.cursor.fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
 
-            # Calculate running quantity for each execution
             executions = []
-            running_qty = 0
 
             for row in rows:
                 trade = dict(row)
                 side = trade['side_of_market']
                 qty = trade['quantity']
-
-                # Calculate signed quantity change
-                if side in ['Buy', 'BuyToCover', 'Long']:
-                    signed_change = qty
-                elif side in ['Sell', 'SellShort', 'Short']:
-                    signed_change = -qty
-                else:
-                    signed_change = 0
-
-                prev_qty = running_qty
-                running_qty += signed_change
+                prev_qty = trade['running_qty_before'] or 0
+                running_qty = trade['running_qty_after'] or 0
 
                 # Detect potential issues
                 issue = None
@@ -121,12 +140,36 @@ def list_executions():
                     'execution_id': trade['entry_execution_id']
                 })
 
-            return jsonify({
+            response = {
                 'success': True,
                 'executions': executions,
                 'count': len(executions),
-                'final_quantity': running_qty
-            })
+                'next_cursor': {
+                    'after_time': executions[-1]['entry_time'],
+                    'after_id': executions[-1]['id']
+                } if has_more else None
+            }
+
+            if after_time is None:
+                # Totals for the whole filtered range, from the last trade of each group
+                end_filter = "AND t.entry_time < date(?, '+1 day')" if end_date else ""
+                db.cursor.execute(f"""
+                    SELECT COALESCE(SUM(group_count), 0), COALESCE(SUM(last_qty), 0) FROM (
+                        SELECT COUNT(*) AS group_count, (
+                            SELECT t.running_qty_after FROM trades t
+                            WHERE t.account = g.account AND t.instrument = g.instrument
+                              AND (t.deleted = 0 OR t.deleted IS NULL)
+                              {end_filter}
+                            ORDER BY t.entry_time DESC, t.id DESC
+                            LIMIT 1
+                        ) AS last_qty
+                        FROM trades g {filters}
+                        GROUP BY g.account, g.instrument
+                    )
+                """, ([end_date] if end_date else []) + params)
+                response['total_count'], response['final_quantity'] = db.cursor.fetchone()
+
+            return jsonify(response)
 
     except Exception as e:
         logger.error(f"Error listing executions: {e}")
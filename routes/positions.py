@@ -388,8 +388,7 @@ def position_detail(position_id):
     if position['position_status'] == 'closed':
         try:
             with FuturesDB() as db:
-                instrument_multiplier = 2.0  # $2/point for MNQ
-                execution_pairs = db.get_position_execution_pairs(position_id, instrument_multiplier)
+                execution_pairs = db.get_position_execution_pairs(position_id)
                 logger.debug(f"Position {position_id} execution pairs: {len(execution_pairs.get('execution_pairs', []))} pairs")
         except Exception as e:
             logger.error(f"Error getting execution pairs for position {position_id}: {e}")
@@ -537,11 +536,9 @@ def api_position_execution_pairs(position_id):
                 'error': 'Cannot calculate pairs for open positions'
             }), 400
 
-        # Get execution pairs using FuturesDB
+        # Pairs are stored when the position is built (priced with the instrument's multiplier)
         with FuturesDB() as db:
-            # Use $2/point multiplier for MNQ (standard for micro futures)
-            instrument_multiplier = 2.0
-            pairs_data = db.get_position_execution_pairs(position_id, instrument_multiplier)
+            pairs_data = db.get_position_execution_pairs(position_id)
 
         return jsonify({
             'success': True,
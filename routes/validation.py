@@ -847,9 +847,13 @@ def trigger_validation_job():
             "position_id": int (optional, validate single position),
             "position_status": str (optional, filter by status),
             "days_back": int (optional, only validate recent positions),
-            "auto_repair": bool (optional, default false)
+            "auto_repair": bool (optional, default false),
+            "chunk_size": int (optional, positions per chunk of a batch job)
         }
 
+    Batch jobs are split into chunks validated in parallel; their progress
+    is reported by the job status endpoint.
+
     Returns:
         {
             "job_id": str,
@@ -858,7 +862,7 @@ def trigger_validation_job():
         }
     """
     try:
-        from tasks.validation_tasks import validate_position_task, validate_all_positions_task
+        from tasks.validation_tasks import validate_position_task, run_validation_job_task, VALIDATION_CHUNK_SIZE
 
         data = request.get_json() or {}
         position_id = data.get('position_id')
@@ -872,7 +876,10 @@ def trigger_validation_job():
             # Validate batch
             position_status = data.get('position_status')
             days_back = data.get('days_back')
-            task = validate_all_positions_task.delay(position_status, days_back, auto_repair)
+            chunk_size = int(data.get('chunk_size') or VALIDATION_CHUNK_SIZE)
+            if chunk_size < 1:
+                return jsonify({"error": "chunk_size must be positive"}), 400
+            task = run_validation_job_task.delay(position_status, days_back, auto_repair, chunk_size)
             message = "Started batch validation job"
 
         return jsonify({
@@ -902,11 +909,23 @@ def get_job_status(job_id: str):
             "status": str,
             "result": dict (if completed)
         }
+
+        Batch jobs also report progress and throughput:
+        {
+            "chunks_total": int, "chunks_completed": int,
+            "positions_total": int, "positions_validated": int,
+            "percent_complete": float, "elapsed_seconds": float,
+            "positions_per_second": float, "eta_seconds": float or null
+        }
     """
     try:
         from celery.result import AsyncResult
         from celery_app import app as celery_app
 
+        progress = get_integrity_service().get_validation_job_progress(job_id)
+        if progress is not None:
+            return jsonify(progress), 200
+
         task = AsyncResult(job_id, app=celery_app)
 
         response = {
@@ -948,6 +967,9 @@ def cancel_job(job_id: str):
         from celery.result import AsyncResult
         from celery_app import app as celery_app
 
+        # Pending chunks of a batch job are skipped from now on
+        get_integrity_service().cancel_validation_job(job_id)
+
         task = AsyncResult(job_id, app=celery_app)
         task.revoke(terminate=True)
 
@@ -965,6 +987,55 @@ def cancel_job(job_id: str):
         }), 500
 
 
+@validation_bp.route('/jobs/<job_id>/resume', methods=['POST'])
+def resume_job(job_id: str):
+    """
+    Resume an interrupted or cancelled batch validation job
+
+    POST /api/validation/jobs/{job_id}/resume
+
+    Only the chunks that have not completed are validated again.
+
+    Returns:
+        {
+            "job_id": str,
+            "status": str,
+            "message": str
+        }
+    """
+    try:
+        from tasks.validation_tasks import run_validation_job_task
+
+        job = get_integrity_service().get_validation_job(job_id)
+        if job is None:
+            return jsonify({
+                "error": "Job not found",
+                "message": f"No batch validation job {job_id}"
+            }), 404
+
+        if job['status'] == 'completed':
+            return jsonify({
+                "job_id": job_id,
+                "status": job['status'],
+                "message": "Job already completed"
+            }), 200
+
+        run_validation_job_task.delay(job_id=job_id)
+
+        return jsonify({
+            "job_id": job_id,
+            "status": "submitted",
+            "message": f"Resuming job: {job['chunk_count'] - job['chunks_completed']} chunks pending"
+        }), 202
+
+    except Exception as e:
+        logger.error(f"Error resuming job {job_id}: {e}")
+        return jsonify({
+            "error": "Failed to resume job",
+            "message": str(e)
+        }), 500
+
+
 @validation_bp.route('/schedule', methods=['GET'])
 def get_validation_schedule():
     """
@@ -6,30 +6,38 @@ import os
 import logging
 import json
 
+from scripts.connection_pool import get_connection_pool
+from scripts.database_bootstrap import ensure_database_bootstrapped
+from scripts.write_queue import run_write
+from services.running_quantity import create_running_quantity_schema, ensure_running_quantities
+from services.ohlc_resampler import create_resample_schema
+from services.ohlc_empty_ranges import create_empty_range_schema, subtract_known_empty
+from services.ohlc_gap_engine import find_gaps
+
 # Get database logger
 db_logger = logging.getLogger('database')
 
-# Global flag to prevent repeated initialization
-_database_initialized = False
-
 class FuturesDB:
     def __init__(self, db_path: str = None):
         from config import config
         self.db_path = db_path or config.db_path
         self.conn = None
         self.cursor = None
+        self._pool = None
     
-    def _execute_with_monitoring(self, query: str, params: tuple = None, operation: str = "query", table: str = "unknown"):
+    def _execute_with_monitoring(self, query: str, params: tuple = None, operation: str = "query", table: str = "unknown",
+                                 cursor=None):
         """Execute query with monitoring metrics collection"""
         import time
         
         start_time = time.time()
+        cursor = cursor or self.cursor
         
         try:
             if params:
-                result = self.cursor.execute(query, params)
+                result = cursor.execute(query, params)
             else:
-                result = self.cursor.execute(query)
+                result = cursor.execute(query)
             
             duration = time.time() - start_time
             
@@ -89,33 +97,38 @@ class FuturesDB:
         else:
             return 'other'
     def __enter__(self):
-        """Establish database connection when entering context"""
-        global _database_initialized
-        
-        try:
-            db_logger.debug(f"Connecting to database: {self.db_path}")
-            # timeout=30.0 makes SQLite wait up to 30 seconds for locks instead of failing immediately
-            self.conn = sqlite3.connect(self.db_path, timeout=30.0)
-            self.conn.row_factory = sqlite3.Row
+        """Check out a pooled database connection when entering context"""
+        try:
+            db_logger.debug(f"Acquiring pooled connection: {self.db_path}")
+            # Schema setup normally happens once at startup via bootstrap_database();
+            # this is only a set lookup once the database has been bootstrapped
+            ensure_database_bootstrapped(self.db_path)
+            self._pool = get_connection_pool(self.db_path)
+            self.conn = self._pool.acquire()
             self.cursor = self.conn.cursor()
-            
-            # Skip heavy initialization if already done
-            if _database_initialized:
-                db_logger.debug("Database already initialized, skipping setup")
-                return self
-            
-            # Verify database structure
-            self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='trades'")
-            table_exists = self.cursor.fetchone() is not None
-            
-            if not table_exists:
-                db_logger.info("Trades table does not exist, will be created")
-            else:
-                db_logger.info("Database connection established, performing initial setup")
+            return self
         except Exception as e:
             db_logger.error(f"Failed to connect to database: {e}")
             raise
-        
+
+    def initialize_schema(self, conn: sqlite3.Connection, run_migrations: bool = True) -> None:
+        """Create tables and indexes, then (optionally) run pending migrations.
+
+        Called once per database by scripts.database_bootstrap.bootstrap_database()
+        on a dedicated (non-pooled) connection.
+        """
+        self.conn = conn
+        self.cursor = conn.cursor()
+
+        # Verify database structure
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='trades'")
+        table_exists = self.cursor.fetchone() is not None
+
+        if not table_exists:
+            db_logger.info("Trades table does not exist, will be created")
+        else:
+            db_logger.info("Database connection established, performing initial setup")
+
         if not table_exists:
             print("Creating trades table...")
         else:
@@ -131,13 +144,8 @@ class FuturesDB:
                 self.conn.commit()
                 print("Added entry_execution_id column successfully")
         
-        # Apply SQLite performance optimizations
-        self.cursor.execute("PRAGMA busy_timeout = 30000")    # Wait up to 30 seconds for locks
-        self.cursor.execute("PRAGMA journal_mode = WAL")
-        self.cursor.execute("PRAGMA synchronous = normal")
-        self.cursor.execute("PRAGMA temp_store = memory")
-        self.cursor.execute("PRAGMA mmap_size = 1073741824")  # 1GB
-        self.cursor.execute("PRAGMA cache_size = -64000")     # 64MB cache
+        # Per-connection PRAGMAs are applied by the connection pool and the
+        # journal mode by the bootstrap step
         
         # Create trades table if it doesn't exist
         self.cursor.execute("""
@@ -206,7 +214,10 @@ class FuturesDB:
                 print(f"Created/verified index: {index_name}")
             except Exception as e:
                 print(f"Warning: Could not create index {index_name}: {e}")
-        
+
+        # Stored per-(account, instrument) running quantity (see services/running_quantity.py)
+        create_running_quantity_schema(self.cursor)
+
         # Create OHLC data table for performance-first chart data
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS ohlc_data (
@@ -251,7 +262,11 @@ class FuturesDB:
                 print(f"Created/verified OHLC index: {index_name}")
             except Exception as e:
                 print(f"Warning: Could not create OHLC index {index_name}: {e}")
-        
+
+        # Provenance of locally resampled bars and the resample watermark
+        create_resample_schema(self.cursor)
+        create_empty_range_schema(self.cursor)
+
         self.conn.commit()
         
         # Create chart settings table for user preferences  
@@ -408,7 +423,13 @@ class FuturesDB:
         self.cursor.execute("ANALYZE")
         self.conn.commit()
 
-        # Run pending database migrations
+        if run_migrations:
+            self.run_migrations()
+
+        db_logger.info("Database initialization completed successfully")
+
+    def run_migrations(self) -> None:
+        """Run pending database migrations (they open their own connections)"""
         try:
             db_logger.info("Checking for pending database migrations...")
             from scripts.migrations.migration_runner import MigrationRunner
@@ -428,12 +449,6 @@ class FuturesDB:
             print(f"[WARNING] Migration check failed: {e}")
             # Don't fail the entire initialization if migrations fail
 
-        # Mark database as initialized to prevent repeated setup
-        _database_initialized = True
-        db_logger.info("Database initialization completed successfully")
-
-        return self
-
     def update_trade_details(self, trade_id: int, chart_url: Optional[str] = None, notes: Optional[str] = None,
                            confirmed_valid: Optional[bool] = None, reviewed: Optional[bool] = None) -> bool:
         """Update the notes and/or chart URL for a trade."""
@@ -526,13 +541,25 @@ class FuturesDB:
             return False
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Close database connection when exiting context"""
+        """Commit or roll back, then return the connection to the pool"""
         if self.conn:
-            if exc_type is None:
-                self.conn.commit()
-            else:
-                self.conn.rollback()
-            self.conn.close()
+            try:
+                if exc_type is None:
+                    self.conn.commit()
+                else:
+                    self.conn.rollback()
+            finally:
+                self._pool.release(self.conn)
+                self.conn = None
+                self.cursor = None
+
+    def _run_write(self, fn):
+        """Run a write job through the single-writer queue (see scripts/write_queue.py)"""
+        return run_write(self.db_path, fn, self.conn)
+
+    def refresh_running_quantities(self, account: Optional[str] = None, instrument: Optional[str] = None) -> int:
+        """Bring stored trade running quantities up to date before reading them (see services/running_quantity.py)"""
+        return ensure_running_quantities(self.db_path, self.conn, account, instrument)
 
     def execute_query(self, query: str, params: tuple = None) -> List[tuple]:
         """Execute a raw SQL query and return results"""
@@ -2015,15 +2042,13 @@ class FuturesDB:
                 if not isinstance(price, (int, float)):
                     return False
             
-            # Use monitoring wrapper for database operation
-            self._execute_with_monitoring("""
+            # Use monitoring wrapper for database operation, committed by the writer queue
+            self._run_write(lambda conn: self._execute_with_monitoring("""
                 INSERT OR IGNORE INTO ohlc_data 
                 (instrument, timeframe, timestamp, open_price, high_price, low_price, close_price, volume)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """, (instrument, timeframe, timestamp, open_price, high_price, low_price, close_price, volume),
-            operation="insert", table="ohlc_data")
-            
-            self.conn.commit()
+            operation="insert", table="ohlc_data", cursor=conn.cursor()))
             
             # Record business metric for OHLC data points
             try:
@@ -2074,9 +2099,8 @@ class FuturesDB:
                     record.get('volume', 0)  # Default to 0 if volume not provided
                 ))
             
-            # Execute bulk insert
-            self.cursor.executemany(query, data_tuples)
-            self.conn.commit()
+            # Execute bulk insert through the writer queue
+            self._run_write(lambda conn: conn.executemany(query, data_tuples))
             
             # Record metrics for monitoring
             try:
@@ -2086,11 +2110,11 @@ class FuturesDB:
             except ImportError:
                 pass
             
-            self.logger.info(f"Bulk inserted {len(records)} OHLC records")
+            db_logger.info(f"Bulk inserted {len(records)} OHLC records")
             return True
             
         except Exception as e:
-            self.logger.error(f"Error during bulk OHLC insert: {e}")
+            db_logger.error(f"Error during bulk OHLC insert: {e}")
             self.conn.rollback()
             return False
 
@@ -2174,49 +2198,22 @@ class FuturesDB:
 
 
     def find_ohlc_gaps(self, instrument: str, timeframe: str, start_timestamp: int, 
-                      end_timestamp: int) -> List[Tuple[int, int]]:
-        """Find gaps in OHLC data for smart backfilling."""
+                      end_timestamp: int, exclude_known_empty: bool = True,
+                      session_filter: bool = True) -> List[Tuple[int, int]]:
+        """Find gaps in OHLC data for smart backfilling.
+
+        Gaps come from one LAG() window query (services/ohlc_gap_engine.py)
+        and are clipped to CME trading sessions unless session_filter is False.
+        Ranges recorded in the empty range ledger (services/ohlc_empty_ranges.py)
+        are not gaps unless exclude_known_empty is False.
+        """
         try:
-            # Get all existing timestamps in range
-            self.cursor.execute("""
-                SELECT timestamp FROM ohlc_data 
-                WHERE instrument = ? AND timeframe = ? 
-                AND timestamp BETWEEN ? AND ?
-                ORDER BY timestamp
-            """, (instrument, timeframe, start_timestamp, end_timestamp))
-            
-            existing_timestamps = [row[0] for row in self.cursor.fetchall()]
-            
-            if not existing_timestamps:
-                return [(start_timestamp, end_timestamp)]
-            
-            gaps = []
-            expected_interval = self._get_timeframe_seconds(timeframe)
-            
-            # Check for gap at the beginning
-            if existing_timestamps[0] > start_timestamp:
-                gap_end = existing_timestamps[0] - expected_interval
-                if gap_end > start_timestamp:
-                    gaps.append((start_timestamp, gap_end))
-            
-            # Check for gaps between existing data
-            for i in range(len(existing_timestamps) - 1):
-                current_ts = existing_timestamps[i]
-                next_ts = existing_timestamps[i + 1]
-                expected_next = current_ts + expected_interval
-                
-                if next_ts > expected_next:
-                    # Calculate gap end (last missing timestamp)
-                    gap_end = next_ts - expected_interval
-                    if gap_end >= expected_next:
-                        gaps.append((expected_next, gap_end))
-            
-            # Check for gap at the end
-            if existing_timestamps[-1] < end_timestamp:
-                gap_start = existing_timestamps[-1] + expected_interval
-                if gap_start < end_timestamp:
-                    gaps.append((gap_start, end_timestamp))
-            
+            gaps = find_gaps(self.conn, instrument, timeframe, start_timestamp, end_timestamp,
+                             session_filter=session_filter)
+
+            if exclude_known_empty:
+                gaps, _ = subtract_known_empty(self.conn, instrument, timeframe, gaps)
+
             return gaps
         except Exception as e:
             print(f"Error finding OHLC gaps: {e}")
@@ -2249,6 +2246,21 @@ class FuturesDB:
             print(f"Error getting latest OHLC timestamp: {e}")
             return None
 
+    def get_earliest_ohlc_timestamp(self, instrument: str, timeframe: str) -> Optional[int]:
+        """Get the earliest timestamp for a given instrument and timeframe."""
+        try:
+            self.cursor.execute("""
+                SELECT MIN(timestamp) FROM ohlc_data
+                WHERE instrument = ? AND timeframe = ?
+            """, (instrument, timeframe))
+
+            result = self.cursor.fetchone()
+            return result[0] if result and result[0] else None
+
+        except Exception as e:
+            print(f"Error getting earliest OHLC timestamp: {e}")
+            return None
+
     def get_position_executions(self, trade_id: int) -> Dict[str, Any]:
         """Get detailed execution breakdown for a position with FIFO analysis."""
         try:
@@ -2400,171 +2412,67 @@ class FuturesDB:
             print(f"Error calculating position summary: {e}")
             return {}
 
-    def get_position_execution_pairs(self, position_id: int, instrument_multiplier: float = 2.0) -> Dict[str, Any]:
+    def get_position_execution_pairs(self, position_id: int, instrument_multiplier: Optional[float] = None) -> Dict[str, Any]:
         """
         Get FIFO-matched execution pairs for a position with per-pair P&L.
 
-        For a position with multiple entries/exits, this matches them using FIFO
-        (First-In-First-Out) to calculate P&L for each entry/exit pair.
+        The position builder matches each position's entries against its exits
+        while it builds the position and stores the lots in
+        position_execution_pairs, so this is one indexed read. Positions
+        without stored pairs (built before the table existed, or by another
+        builder) are matched from their executions here instead.
 
         Args:
             position_id: The position ID to analyze
-            instrument_multiplier: Dollar value per point (default $2 for MNQ)
+            instrument_multiplier: Dollar value per point; by default the
+                instrument's configured multiplier (the one stored pairs use)
 
         Returns:
             Dictionary with execution_pairs list and summary statistics
         """
         try:
-            # Get position details
-            self.cursor.execute("SELECT * FROM positions WHERE id = ?", (position_id,))
-            position = self.cursor.fetchone()
-            if not position:
-                return {'success': False, 'error': 'Position not found'}
-
-            position = dict(position)
-            is_long = position['position_type'] == 'Long'
-
-            # Get all executions for this position
             self.cursor.execute("""
-                SELECT t.*, pe.execution_order
-                FROM trades t
-                JOIN position_executions pe ON t.id = pe.trade_id
-                WHERE pe.position_id = ?
-                ORDER BY t.entry_time, pe.execution_order
+                SELECT p.instrument, p.position_type, pp.*
+                FROM positions p
+                LEFT JOIN position_execution_pairs pp ON pp.position_id = p.id
+                WHERE p.id = ?
+                ORDER BY pp.pair_number
             """, (position_id,))
+            rows = [dict(row) for row in self.cursor.fetchall()]
+            if not rows:
+                return {'success': False, 'error': 'Position not found'}
 
-            trades = [dict(row) for row in self.cursor.fetchall()]
-
-            if not trades:
-                return {'success': False, 'error': 'No executions found'}
-
-            # Separate into entries and exits based on position type
-            # For Long: Buy = entry, Sell = exit
-            # For Short: Sell = entry, Buy = exit
-            entry_queue = []  # List of (price, quantity, time, trade_id, commission)
-            exit_queue = []   # List of (price, quantity, time, trade_id, commission)
-
-            for trade in trades:
-                side = trade['side_of_market']
-                qty = trade['quantity']
-                commission = trade['commission'] or 0
-
-                if is_long:
-                    if side == 'Buy' and trade['entry_price']:
-                        # Entry for long position
-                        entry_queue.append({
-                            'price': trade['entry_price'],
-                            'quantity': qty,
-                            'time': trade['entry_time'],
-                            'trade_id': trade['id'],
-                            'commission': commission
-                        })
-                    elif side == 'Sell' and trade['exit_price']:
-                        # Exit for long position
-                        exit_queue.append({
-                            'price': trade['exit_price'],
-                            'quantity': qty,
-                            'time': trade['entry_time'],  # exit time stored in entry_time for sell trades
-                            'trade_id': trade['id'],
-                            'commission': commission
-                        })
-                else:  # Short position
-                    if side == 'Sell' and trade['entry_price']:
-                        # Entry for short position
-                        entry_queue.append({
-                            'price': trade['entry_price'],
-                            'quantity': qty,
-                            'time': trade['entry_time'],
-                            'trade_id': trade['id'],
-                            'commission': commission
-                        })
-                    elif side == 'Buy' and trade['exit_price']:
-                        # Exit for short position
-                        exit_queue.append({
-                            'price': trade['exit_price'],
-                            'quantity': qty,
-                            'time': trade['entry_time'],
-                            'trade_id': trade['id'],
-                            'commission': commission
-                        })
-
-            # FIFO matching: pair entries with exits
-            execution_pairs = []
-            pair_number = 0
-
-            # Expand entries and exits to individual units for FIFO matching
-            entry_units = []
-            for entry in entry_queue:
-                for _ in range(entry['quantity']):
-                    entry_units.append({
-                        'price': entry['price'],
-                        'time': entry['time'],
-                        'trade_id': entry['trade_id'],
-                        'commission': entry['commission'] / entry['quantity']  # Split commission per unit
-                    })
-
-            exit_units = []
-            for exit in exit_queue:
-                for _ in range(exit['quantity']):
-                    exit_units.append({
-                        'price': exit['price'],
-                        'time': exit['time'],
-                        'trade_id': exit['trade_id'],
-                        'commission': exit['commission'] / exit['quantity']
-                    })
-
-            # Match entry units with exit units (FIFO)
-            for i, exit_unit in enumerate(exit_units):
-                if i < len(entry_units):
-                    entry_unit = entry_units[i]
-                    pair_number += 1
-
-                    # Calculate P&L for this pair
-                    if is_long:
-                        points_pnl = exit_unit['price'] - entry_unit['price']
-                    else:
-                        points_pnl = entry_unit['price'] - exit_unit['price']
-
-                    dollars_pnl = points_pnl * instrument_multiplier
-                    total_commission = entry_unit['commission'] + exit_unit['commission']
-
-                    # Calculate duration
-                    from datetime import datetime
-                    try:
-                        entry_dt = datetime.strptime(entry_unit['time'], '%Y-%m-%d %H:%M:%S')
-                        exit_dt = datetime.strptime(exit_unit['time'], '%Y-%m-%d %H:%M:%S')
-                        duration_seconds = (exit_dt - entry_dt).total_seconds()
-
-                        # Format duration display
-                        if duration_seconds < 60:
-                            duration_display = f"{int(duration_seconds)}s"
-                        elif duration_seconds < 3600:
-                            duration_display = f"{int(duration_seconds // 60)}m"
-                        elif duration_seconds < 86400:
-                            hours = int(duration_seconds // 3600)
-                            mins = int((duration_seconds % 3600) // 60)
-                            duration_display = f"{hours}h {mins}m"
-                        else:
-                            days = int(duration_seconds // 86400)
-                            hours = int((duration_seconds % 86400) // 3600)
-                            duration_display = f"{days}d {hours}h"
-                    except:
-                        duration_seconds = 0
-                        duration_display = "-"
-
+            position = {'instrument': rows[0]['instrument'], 'position_type': rows[0]['position_type']}
+            if rows[0]['pair_number'] is None:
+                if instrument_multiplier is None:
+                    from domain.services.pnl_calculator import PnLCalculator
+                    instrument_multiplier = PnLCalculator()._get_instrument_multiplier(position['instrument'])
+                execution_pairs = self._match_position_execution_pairs(position_id, position, instrument_multiplier)
+                if execution_pairs is None:
+                    return {'success': False, 'error': 'No executions found'}
+            else:
+                execution_pairs = []
+                for row in rows:
+                    dollars_pnl = row['dollars_pnl']
+                    if instrument_multiplier is not None:
+                        dollars_pnl = row['points_pnl'] * instrument_multiplier
+                    total_commission = row['entry_commission'] + row['exit_commission']
+                    duration_seconds, duration_display = self._pair_duration(row['entry_time'], row['exit_time'])
                     execution_pairs.append({
-                        'pair_number': pair_number,
-                        'entry_time': entry_unit['time'],
-                        'exit_time': exit_unit['time'],
-                        'entry_price': entry_unit['price'],
-                        'exit_price': exit_unit['price'],
-                        'quantity': 1,
+                        'pair_number': row['pair_number'],
+                        'entry_trade_id': row['entry_trade_id'],
+                        'exit_trade_id': row['exit_trade_id'],
+                        'entry_time': row['entry_time'],
+                        'exit_time': row['exit_time'],
+                        'entry_price': row['entry_price'],
+                        'exit_price': row['exit_price'],
+                        'quantity': row['quantity'],
                         'duration_seconds': duration_seconds,
                         'duration_display': duration_display,
-                        'points_pnl': points_pnl,
+                        'points_pnl': row['points_pnl'],
                         'dollars_pnl': dollars_pnl,
-                        'entry_commission': entry_unit['commission'],
-                        'exit_commission': exit_unit['commission'],
+                        'entry_commission': row['entry_commission'],
+                        'exit_commission': row['exit_commission'],
                         'total_commission': total_commission,
                         'net_pnl': dollars_pnl - total_commission
                     })
@@ -2587,7 +2495,7 @@ class FuturesDB:
                 'execution_pairs': execution_pairs,
                 'summary': {
                     'total_pairs': total_pairs,
-                    'total_quantity': total_pairs,  # Each pair is 1 unit
+                    'total_quantity': sum(p['quantity'] for p in execution_pairs),
                     'winning_pairs': winning_pairs,
                     'losing_pairs': losing_pairs,
                     'breakeven_pairs': breakeven_pairs,
@@ -2603,6 +2511,163 @@ class FuturesDB:
             db_logger.error(f"Error getting position execution pairs: {e}")
             return {'success': False, 'error': str(e)}
 
+    def _pair_duration(self, entry_time, exit_time) -> Tuple[float, str]:
+        """(seconds, display string) between a pair's entry and exit"""
+        try:
+            duration_seconds = (datetime.fromisoformat(str(exit_time)) - datetime.fromisoformat(str(entry_time))).total_seconds()
+        except (TypeError, ValueError):
+            return 0, "-"
+
+        # Format duration display
+        if duration_seconds < 60:
+            duration_display = f"{int(duration_seconds)}s"
+        elif duration_seconds < 3600:
+            duration_display = f"{int(duration_seconds // 60)}m"
+        elif duration_seconds < 86400:
+            hours = int(duration_seconds // 3600)
+            mins = int((duration_seconds % 3600) // 60)
+            duration_display = f"{hours}h {mins}m"
+        else:
+            days = int(duration_seconds // 86400)
+            hours = int((duration_seconds % 86400) // 3600)
+            duration_display = f"{days}d {hours}h"
+        return duration_seconds, duration_display
+
+    def _match_position_execution_pairs(self, position_id: int, position: Dict[str, Any],
+                                        instrument_multiplier: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        FIFO-match a position's executions into unit pairs (for positions without stored pairs)
+
+        Returns:
+            The pairs, each one unit; None if the position has no executions
+        """
+        is_long = position['position_type'] == 'Long'
+
+        # Get all executions for this position
+        self.cursor.execute("""
+            SELECT t.*, pe.execution_order
+            FROM trades t
+            JOIN position_executions pe ON t.id = pe.trade_id
+            WHERE pe.position_id = ?
+            ORDER BY t.entry_time, pe.execution_order
+        """, (position_id,))
+
+        trades = [dict(row) for row in self.cursor.fetchall()]
+
+        if not trades:
+            return None
+
+        # Separate into entries and exits based on position type
+        # For Long: Buy = entry, Sell = exit
+        # For Short: Sell = entry, Buy = exit
+        entry_queue = []  # List of (price, quantity, time, trade_id, commission)
+        exit_queue = []   # List of (price, quantity, time, trade_id, commission)
+
+        for trade in trades:
+            side = trade['side_of_market']
+            qty = trade['quantity']
+            commission = trade['commission'] or 0
+
+            if is_long:
+                if side == 'Buy' and trade['entry_price']:
+                    # Entry for long position
+                    entry_queue.append({
+                        'price': trade['entry_price'],
+                        'quantity': qty,
+                        'time': trade['entry_time'],
+                        'trade_id': trade['id'],
+                        'commission': commission
+                    })
+                elif side == 'Sell' and trade['exit_price']:
+                    # Exit for long position
+                    exit_queue.append({
+                        'price': trade['exit_price'],
+                        'quantity': qty,
+                        'time': trade['entry_time'],  # exit time stored in entry_time for sell trades
+                        'trade_id': trade['id'],
+                        'commission': commission
+                    })
+            else:  # Short position
+                if side == 'Sell' and trade['entry_price']:
+                    # Entry for short position
+                    entry_queue.append({
+                        'price': trade['entry_price'],
+                        'quantity': qty,
+                        'time': trade['entry_time'],
+                        'trade_id': trade['id'],
+                        'commission': commission
+                    })
+                elif side == 'Buy' and trade['exit_price']:
+                    # Exit for short position
+                    exit_queue.append({
+                        'price': trade['exit_price'],
+                        'quantity': qty,
+                        'time': trade['entry_time'],
+                        'trade_id': trade['id'],
+                        'commission': commission
+                    })
+
+        # FIFO matching: pair entries with exits
+        execution_pairs = []
+        pair_number = 0
+
+        # Expand entries and exits to individual units for FIFO matching
+        entry_units = []
+        for entry in entry_queue:
+            for _ in range(entry['quantity']):
+                entry_units.append({
+                    'price': entry['price'],
+                    'time': entry['time'],
+                    'trade_id': entry['trade_id'],
+                    'commission': entry['commission'] / entry['quantity']  # Split commission per unit
+                })
+
+        exit_units = []
+        for exit in exit_queue:
+            for _ in range(exit['quantity']):
+                exit_units.append({
+                    'price': exit['price'],
+                    'time': exit['time'],
+                    'trade_id': exit['trade_id'],
+                    'commission': exit['commission'] / exit['quantity']
+                })
+
+        # Match entry units with exit units (FIFO)
+        for i, exit_unit in enumerate(exit_units):
+            if i < len(entry_units):
+                entry_unit = entry_units[i]
+                pair_number += 1
+
+                # Calculate P&L for this pair
+                if is_long:
+                    points_pnl = exit_unit['price'] - entry_unit['price']
+                else:
+                    points_pnl = entry_unit['price'] - exit_unit['price']
+
+                dollars_pnl = points_pnl * instrument_multiplier
+                total_commission = entry_unit['commission'] + exit_unit['commission']
+
+                duration_seconds, duration_display = self._pair_duration(entry_unit['time'], exit_unit['time'])
+
+                execution_pairs.append({
+                    'pair_number': pair_number,
+                    'entry_time': entry_unit['time'],
+                    'exit_time': exit_unit['time'],
+                    'entry_price': entry_unit['price'],
+                    'exit_price': exit_unit['price'],
+                    'quantity': 1,
+                    'duration_seconds': duration_seconds,
+                    'duration_display': duration_display,
+                    'points_pnl': points_pnl,
+                    'dollars_pnl': dollars_pnl,
+                    'entry_commission': entry_unit['commission'],
+                    'exit_commission': exit_unit['commission'],
+                    'total_commission': total_commission,
+                    'net_pnl': dollars_pnl - total_commission
+                })
+
+        return execution_pairs
+
     def get_linked_trades_with_stats(self, group_id: int) -> Dict[str, Any]:
         """Get linked trades with comprehensive statistics - replaces the buggy approach."""
         try:
@@ -0,0 +1,359 @@
+"""
+SQLite Connection Pool
+
+Process-wide pool of reusable SQLite connections shared by FuturesDB,
+DatabaseManager and the SQLite repositories.
+
+Opening a connection and re-applying the PRAGMAs used to happen on every
+``with FuturesDB() as db:`` block, and chart routes open several of those per
+request. The pool keeps connections open between uses, prefers handing a
+thread the same connection it used last (hot page cache, prepared statement
+cache) and bounds the total number of connections per database file.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+# Get database logger
+db_logger = logging.getLogger('database')
+
+
+class PoolExhaustedError(sqlite3.OperationalError):
+    """Raised when no pooled connection became available within the timeout"""
+    pass
+
+
+class _PooledConnection:
+    """Bookkeeping wrapper around a pooled sqlite3 connection"""
+
+    __slots__ = ('conn', 'file_id', 'created_at', 'last_used', 'uses')
+
+    def __init__(self, conn: sqlite3.Connection, file_id: Optional[tuple] = None):
+        self.conn = conn
+        self.file_id = file_id
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class SQLiteConnectionPool:
+    """
+    Thread-aware, bounded pool of SQLite connections for a single database file.
+
+    Each thread keeps an affinity to the connection it released last, so the
+    common case (one ``with FuturesDB()`` after another on the same request
+    thread) reuses the same connection without touching shared state beyond a
+    short lock. Nested acquisitions on one thread get a second connection so
+    that an inner block can never commit or roll back the outer block's work.
+    At most ``max_idle`` connections are kept open between uses; extra ones
+    are closed on release.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 16, timeout: float = 30.0,
+                 busy_timeout_ms: int = 30000, health_check_interval: float = 60.0,
+                 pragmas: Optional[List[str]] = None, max_idle: Optional[int] = None):
+        self.db_path = str(db_path)
+        self.max_size = max(1, int(max_size))
+        self.max_idle = self.max_size if max_idle is None else max(0, min(int(max_idle), self.max_size))
+        self.timeout = timeout
+        self.busy_timeout_ms = busy_timeout_ms
+        self.health_check_interval = health_check_interval
+        self.pragmas = list(pragmas) if pragmas is not None else [
+            "PRAGMA synchronous = normal",
+            "PRAGMA temp_store = memory",
+            "PRAGMA mmap_size = 1073741824",  # 1GB
+            "PRAGMA cache_size = -64000",     # 64MB cache
+        ]
+
+        self._lock = threading.Condition(threading.Lock())
+        self._local = threading.local()
+        self._idle: Dict[int, _PooledConnection] = {}
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._pid = os.getpid()
+        self._file_id = self._current_file_id()
+        self._closed = False
+
+        self._stats = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'acquisitions': 0,
+            'thread_affinity_hits': 0,
+            'idle_reuses': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'total_wait_time': 0.0,
+            'max_in_use': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+
+    def _create_connection(self) -> _PooledConnection:
+        """Open a new connection and apply per-connection PRAGMAs"""
+        # check_same_thread=False is safe here because the pool guarantees a
+        # connection is only ever checked out by one thread at a time
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        for pragma in self.pragmas:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error as e:
+                db_logger.warning(f"Could not apply '{pragma}' to pooled connection: {e}")
+
+        self._file_id = self._current_file_id()
+        self._stats['connections_created'] += 1
+        db_logger.debug(f"Opened pooled connection #{self._stats['connections_created']} to {self.db_path}")
+        return _PooledConnection(conn, self._file_id)
+
+    def _close_connection(self, pooled: _PooledConnection) -> None:
+        try:
+            pooled.conn.close()
+        except Exception as e:
+            db_logger.debug(f"Error closing pooled connection: {e}")
+        self._stats['connections_closed'] += 1
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        """Run a cheap probe on connections that have been idle for a while"""
+        if time.time() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            pooled.conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            self._stats['health_check_failures'] += 1
+            db_logger.warning(f"Discarding unhealthy pooled connection: {e}")
+            return False
+
+    def _reset_after_fork(self) -> None:
+        """Drop connections inherited from a parent process (e.g. Celery prefork)"""
+        # SQLite connections must never be used across fork(); the parent still
+        # owns them, so they are abandoned rather than closed
+        self._idle = {}
+        self._in_use = {}
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _current_file_id(self) -> Optional[tuple]:
+        """Identity of the database file on disk (None for in-memory/missing)"""
+        if self.db_path == ':memory:' or self.db_path.startswith('file:'):
+            return None
+        try:
+            st = os.stat(self.db_path)
+            return (st.st_dev, st.st_ino)
+        except OSError:
+            return None
+
+    def _check_file_replaced(self) -> None:
+        """Drop idle connections if the database file was deleted or replaced
+
+        Restores and test fixtures swap the file underneath us; an idle
+        connection would otherwise keep reading the old, unlinked inode.
+        """
+        file_id = self._current_file_id()
+        if file_id != self._file_id:
+            if self._idle:
+                db_logger.info(f"Database file {self.db_path} changed on disk; recycling idle connections")
+                for pooled in self._idle.values():
+                    self._close_connection(pooled)
+                self._idle = {}
+            self._file_id = file_id
+
+    def _take_idle(self) -> Optional[_PooledConnection]:
+        """Pop an idle connection, preferring the calling thread's last one"""
+        preferred = getattr(self._local, 'conn_id', None)
+        if preferred is not None and preferred in self._idle:
+            self._stats['thread_affinity_hits'] += 1
+            return self._idle.pop(preferred)
+        if self._idle:
+            self._stats['idle_reuses'] += 1
+            # Most recently released connection is the one most likely cached
+            conn_id = next(reversed(self._idle))
+            return self._idle.pop(conn_id)
+        return None
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Check out a connection.
+
+        Raises:
+            PoolExhaustedError: if the pool is at max_size and nothing was
+                released within ``timeout`` seconds
+        """
+        deadline = time.time() + self.timeout
+        waited = False
+        wait_start = time.time()
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_after_fork()
+            if self._closed:
+                raise sqlite3.ProgrammingError(f"Connection pool for {self.db_path} is closed")
+            self._check_file_replaced()
+
+            while True:
+                pooled = self._take_idle()
+                if pooled is not None:
+                    if self._is_healthy(pooled):
+                        break
+                    self._close_connection(pooled)
+                    continue
+
+                if len(self._in_use) < self.max_size:
+                    pooled = self._create_connection()
+                    break
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolExhaustedError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(max_size={self.max_size}, in_use={len(self._in_use)})"
+                    )
+                if not waited:
+                    self._stats['waits'] += 1
+                    waited = True
+                self._lock.wait(remaining)
+
+            if waited:
+                self._stats['total_wait_time'] += time.time() - wait_start
+
+            pooled.uses += 1
+            self._in_use[id(pooled.conn)] = pooled
+            self._stats['acquisitions'] += 1
+            self._stats['max_in_use'] = max(self._stats['max_in_use'], len(self._in_use))
+            return pooled.conn
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False) -> None:
+        """
+        Return a connection to the pool.
+
+        Any transaction left open by the caller is rolled back so the next
+        user always starts from a clean state.
+        """
+        if conn is None:
+            return
+
+        with self._lock:
+            pooled = self._in_use.pop(id(conn), None)
+            if pooled is None:
+                # Connection from before a fork or already released
+                return
+
+            if not discard:
+                try:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    if conn.row_factory is not sqlite3.Row:
+                        conn.row_factory = sqlite3.Row
+                except sqlite3.Error as e:
+                    db_logger.warning(f"Discarding pooled connection after failed reset: {e}")
+                    discard = True
+
+            if (discard or self._closed or pooled.file_id != self._file_id
+                    or len(self._idle) >= self.max_idle):
+                self._close_connection(pooled)
+            else:
+                pooled.last_used = time.time()
+                self._idle[id(conn)] = pooled
+                self._local.conn_id = id(conn)
+
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager yielding a pooled connection"""
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            self.release(conn)
+
+    def close_all(self) -> None:
+        """Close every idle connection and stop handing out new ones"""
+        with self._lock:
+            self._closed = True
+            for pooled in self._idle.values():
+                self._close_connection(pooled)
+            self._idle = {}
+            self._lock.notify_all()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool metrics for health checks and Prometheus"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'db_path': self.db_path,
+                'max_size': self.max_size,
+                'max_idle': self.max_idle,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'open_connections': len(self._in_use) + len(self._idle),
+            })
+        reused = stats['thread_affinity_hits'] + stats['idle_reuses']
+        stats['reuse_ratio'] = round(reused / stats['acquisitions'], 4) if stats['acquisitions'] else 0.0
+        stats['avg_wait_ms'] = round(stats['total_wait_time'] * 1000 / stats['waits'], 2) if stats['waits'] else 0.0
+        stats['total_wait_time'] = round(stats['total_wait_time'], 4)
+        return stats
+
+
+# Global pool registry (one pool per database file)
+_pools: Dict[str, SQLiteConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(db_path: str) -> SQLiteConnectionPool:
+    """Get or create the process-wide pool for a database file"""
+    key = str(db_path)
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            from config import DATABASE_POOL_CONFIG
+            pool = SQLiteConnectionPool(
+                key,
+                max_size=DATABASE_POOL_CONFIG['max_size'],
+                timeout=DATABASE_POOL_CONFIG['timeout'],
+                busy_timeout_ms=DATABASE_POOL_CONFIG['busy_timeout_ms'],
+                health_check_interval=DATABASE_POOL_CONFIG['health_check_interval'],
+                max_idle=DATABASE_POOL_CONFIG['max_idle'],
+            )
+            _pools[key] = pool
+            db_logger.info(f"Created SQLite connection pool for {key} (max_size={pool.max_size})")
+        return pool
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Return metrics for every pool in this process keyed by database path"""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {path: pool.get_stats() for path, pool in pools}
+
+
+def close_all_pools() -> None:
+    """Close all pools (used on shutdown and by tests that delete database files)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,138 @@
+"""
+Database Bootstrap
+
+One-time schema setup for the SQLite database: journal mode, tables, indexes,
+ANALYZE and pending migrations. This used to run inside the first
+``FuturesDB.__enter__`` of each process, i.e. on whichever request happened
+to connect first. It now runs as an explicit startup step:
+
+    python -m scripts.database_bootstrap            # deploy / container start
+    bootstrap_database()                            # app.py / Celery worker init
+
+Connections handed out by the pool afterwards do no schema work at all.
+"""
+
+import gc
+import sqlite3
+import threading
+import time
+import logging
+from typing import Optional, Set
+
+# Get database logger
+db_logger = logging.getLogger('database')
+
+# Database paths already bootstrapped by this process (inherited across fork)
+_bootstrapped_paths: Set[str] = set()
+_bootstrap_lock = threading.Lock()
+
+
+def is_database_bootstrapped(db_path: str) -> bool:
+    """Return True if bootstrap_database() already ran for this path in this process"""
+    return str(db_path) in _bootstrapped_paths
+
+
+def bootstrap_database(db_path: Optional[str] = None, force: bool = False) -> bool:
+    """
+    Create/upgrade the schema and run migrations once for a database file.
+
+    Args:
+        db_path: Database path (defaults to config.db_path)
+        force: Re-run even if this process already bootstrapped the path
+
+    Returns:
+        True if the bootstrap ran, False if it had already been done
+    """
+    from config import config, DATABASE_POOL_CONFIG
+
+    path = str(db_path or config.db_path)
+    if not force and path in _bootstrapped_paths:
+        return False
+
+    with _bootstrap_lock:
+        if not force and path in _bootstrapped_paths:
+            return False
+
+        # Imported here: both modules import this one
+        from scripts.TradingLog_db import FuturesDB
+        from scripts.database_manager import DatabaseManager
+        from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+
+        start_time = time.time()
+        db_logger.info(f"Bootstrapping database schema: {path}")
+
+        conn = sqlite3.connect(path, timeout=DATABASE_POOL_CONFIG['busy_timeout_ms'] / 1000)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute(f"PRAGMA busy_timeout = {int(DATABASE_POOL_CONFIG['busy_timeout_ms'])}")
+            journal_mode = conn.execute(
+                f"PRAGMA journal_mode = {DATABASE_POOL_CONFIG['journal_mode']}"
+            ).fetchone()[0]
+            db_logger.info(f"SQLite journal mode: {journal_mode}")
+
+            FuturesDB(path).initialize_schema(conn, run_migrations=False)
+            DatabaseManager(path).initialize_schema(conn)
+            EnhancedPositionServiceV2(path).initialize_schema(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        # Migrations alter trades and positions, so they run last, once every
+        # table they expect exists (a fresh database used to need a second
+        # start before they applied)
+        FuturesDB(path).run_migrations()
+        # Failed migrations keep their `with sqlite3.connect()` connections
+        # alive in traceback cycles; collect them so the -wal/-shm files are
+        # not held open until the next GC pass
+        gc.collect()
+
+        _bootstrapped_paths.add(path)
+        db_logger.info(f"Database bootstrap completed in {time.time() - start_time:.2f}s")
+        return True
+
+
+def reset_bootstrap_state(db_path: Optional[str] = None) -> None:
+    """
+    Forget that this process bootstrapped db_path (every path if None).
+
+    For callers that delete or replace a database file, so the next
+    connection to that path bootstraps the new file instead of trusting
+    the cached set.
+    """
+    with _bootstrap_lock:
+        if db_path is None:
+            _bootstrapped_paths.clear()
+        else:
+            _bootstrapped_paths.discard(str(db_path))
+
+
+def ensure_database_bootstrapped(db_path: str) -> None:
+    """
+    Hot-path guard used when a connection is checked out.
+
+    The application, Celery workers and deploy scripts call bootstrap_database()
+    at startup, so this is a set lookup. Ad-hoc scripts and tests that point at
+    a fresh database file still get a working schema, with a warning.
+    """
+    if str(db_path) in _bootstrapped_paths:
+        return
+
+    db_logger.warning(
+        f"Database {db_path} was not bootstrapped at startup; bootstrapping on first connection"
+    )
+    bootstrap_database(db_path)
+
+
+if __name__ == '__main__':
+    import sys
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
+
+    target = sys.argv[1] if len(sys.argv) > 1 else None
+    bootstrap_database(target, force=True)
+    print("[OK] Database schema bootstrapped")
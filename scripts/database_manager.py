@@ -11,6 +11,8 @@ import logging
 from typing import Optional
 from contextlib import contextmanager
 
+from scripts.connection_pool import get_connection_pool
+from scripts.database_bootstrap import ensure_database_bootstrapped
 from repositories import (
     TradeRepository,
     PositionRepository,
@@ -39,6 +41,7 @@ class DatabaseManager:
         self.db_path = db_path or config.db_path
         self.conn = None
         self.cursor = None
+        self._pool = None
         
         # Repository instances (created when connection is established)
         self.trades = None
@@ -50,20 +53,15 @@ class DatabaseManager:
         self.custom_fields = None
     
     def __enter__(self):
-        """Establish database connection and initialize repositories"""
+        """Check out a pooled connection and initialize repositories"""
         try:
-            db_logger.info(f"Connecting to database: {self.db_path}")
-            # timeout=30.0 makes SQLite wait up to 30 seconds for locks instead of failing immediately
-            self.conn = sqlite3.connect(self.db_path, timeout=30.0)
-            self.conn.row_factory = sqlite3.Row
+            db_logger.debug(f"Acquiring pooled connection: {self.db_path}")
+            # Schema setup runs once at startup (scripts.database_bootstrap)
+            ensure_database_bootstrapped(self.db_path)
+            self._pool = get_connection_pool(self.db_path)
+            self.conn = self._pool.acquire()
             self.cursor = self.conn.cursor()
             
-            # Apply SQLite performance optimizations
-            self._apply_sqlite_optimizations()
-            
-            # Initialize database schema if needed
-            self._initialize_schema()
-            
             # Create repository instances
             self._initialize_repositories()
             
@@ -72,35 +70,34 @@ class DatabaseManager:
             
         except Exception as e:
             db_logger.error(f"Failed to initialize database: {e}")
+            if self.conn:
+                self._pool.release(self.conn)
+                self.conn = None
             raise
     
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Clean up database connection"""
+        """Commit or roll back, then return the connection to the pool"""
         if self.conn:
-            if exc_type is None:
-                self.conn.commit()
-            else:
-                self.conn.rollback()
-                db_logger.error(f"Transaction rolled back due to error: {exc_val}")
-            
-            self.conn.close()
-            db_logger.debug("Database connection closed")
+            try:
+                if exc_type is None:
+                    self.conn.commit()
+                else:
+                    self.conn.rollback()
+                    db_logger.error(f"Transaction rolled back due to error: {exc_val}")
+            finally:
+                self._pool.release(self.conn)
+                self.conn = None
+                self.cursor = None
+                db_logger.debug("Database connection returned to pool")
     
-    def _apply_sqlite_optimizations(self):
-        """Apply SQLite performance optimizations"""
-        optimizations = [
-            "PRAGMA busy_timeout = 30000",    # Wait up to 30 seconds for locks (prevents 'database is locked' errors)
-            "PRAGMA journal_mode = DELETE",   # Use DELETE mode instead of WAL for Docker compatibility
-            "PRAGMA synchronous = normal",
-            "PRAGMA temp_store = memory",
-            "PRAGMA mmap_size = 1073741824",  # 1GB
-            "PRAGMA cache_size = -64000"      # 64MB cache
-        ]
-        
-        for pragma in optimizations:
-            self.cursor.execute(pragma)
-        
-        db_logger.debug("Applied SQLite performance optimizations")
+    def initialize_schema(self, conn: sqlite3.Connection) -> None:
+        """Create tables/indexes and run the import-tracking migrations.
+
+        Called once per database by scripts.database_bootstrap.bootstrap_database().
+        """
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self._initialize_schema()
     
     def _initialize_schema(self):
         """Initialize database schema if tables don't exist"""
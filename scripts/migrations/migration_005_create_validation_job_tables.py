@@ -0,0 +1,181 @@
+"""
+Migration: Create validation_jobs and validation_job_chunks tables
+
+Validation jobs split the positions in scope into ID-range chunks that are
+validated independently. Each chunk's completion (and summary) is recorded
+so a job interrupted by a worker restart resumes with the chunks still
+pending, and job progress can be read while it runs.
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CreateValidationJobTablesMigration:
+    """Migration to create validation_jobs and validation_job_chunks tables"""
+
+    def __init__(self, db_path: str):
+        """
+        Initialize migration
+
+        Args:
+            db_path: Path to the SQLite database
+        """
+        self.db_path = db_path
+        self.migration_name = "005_create_validation_job_tables"
+
+    def up(self) -> bool:
+        """
+        Apply the migration
+
+        Returns:
+            True if migration successful, False otherwise
+        """
+        logger.info(f"Applying migration: {self.migration_name}")
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                # Create validation_jobs table
+                logger.info("Creating validation_jobs table")
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS validation_jobs (
+                        job_id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL DEFAULT 'running',
+                        position_status TEXT,
+                        since TEXT,
+                        auto_repair INTEGER NOT NULL DEFAULT 0,
+                        total_positions INTEGER NOT NULL DEFAULT 0,
+                        chunk_count INTEGER NOT NULL DEFAULT 0,
+                        result TEXT,
+                        created_at TEXT NOT NULL,
+                        completed_at TEXT
+                    )
+                """)
+
+                # Create validation_job_chunks table
+                logger.info("Creating validation_job_chunks table")
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS validation_job_chunks (
+                        job_id TEXT NOT NULL,
+                        chunk_index INTEGER NOT NULL,
+                        min_position_id INTEGER NOT NULL,
+                        max_position_id INTEGER NOT NULL,
+                        position_count INTEGER NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        validated_count INTEGER NOT NULL DEFAULT 0,
+                        summary TEXT,
+                        completed_at TEXT,
+                        PRIMARY KEY (job_id, chunk_index),
+                        FOREIGN KEY (job_id) REFERENCES validation_jobs(job_id) ON DELETE CASCADE
+                    )
+                """)
+
+                logger.info("Creating indexes for validation_jobs")
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_validation_jobs_created_at
+                    ON validation_jobs(created_at DESC)
+                """)
+
+                conn.commit()
+
+                # Verify the tables were created
+                cursor.execute("""
+                    SELECT name FROM sqlite_master
+                    WHERE type='table' AND name IN ('validation_jobs', 'validation_job_chunks')
+                """)
+                tables = [row[0] for row in cursor.fetchall()]
+
+                if 'validation_jobs' in tables and 'validation_job_chunks' in tables:
+                    logger.info(f"Migration {self.migration_name} completed successfully")
+                    return True
+                else:
+                    logger.error(f"Migration {self.migration_name} failed - tables not created")
+                    return False
+
+        except sqlite3.Error as e:
+            logger.error(f"Database error during migration: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error during migration: {e}")
+            return False
+
+    def down(self) -> bool:
+        """
+        Rollback the migration
+
+        Returns:
+            True if rollback successful, False otherwise
+        """
+        logger.info(f"Rolling back migration: {self.migration_name}")
+
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                # Drop validation_job_chunks first (has foreign key to validation_jobs)
+                logger.info("Dropping validation_job_chunks table")
+                cursor.execute("DROP TABLE IF EXISTS validation_job_chunks")
+
+                logger.info("Dropping validation_jobs table")
+                cursor.execute("DROP TABLE IF EXISTS validation_jobs")
+
+                conn.commit()
+
+                logger.info(f"Migration {self.migration_name} rolled back successfully")
+                return True
+
+        except sqlite3.Error as e:
+            logger.error(f"Database error during rollback: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error during rollback: {e}")
+            return False
+
+
+def main():
+    """Run the migration"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create validation job tables migration")
+    parser.add_argument(
+        '--db-path',
+        type=str,
+        default='data/db/trading_log.db',
+        help='Path to the SQLite database'
+    )
+    parser.add_argument(
+        '--rollback',
+        action='store_true',
+        help='Rollback the migration'
+    )
+
+    args = parser.parse_args()
+
+    migration = CreateValidationJobTablesMigration(args.db_path)
+
+    if args.rollback:
+        success = migration.down()
+        action = "rolled back"
+    else:
+        success = migration.up()
+        action = "applied"
+
+    if success:
+        print(f"[OK] Migration {action} successfully")
+        sys.exit(0)
+    else:
+        print(f"[FAIL] Migration {action} failed")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Differential harness: the canonical position engine against the legacy builders.
+
+Runs every position builder over the same execution streams - generated
+ones (scale-ins, partial exits, reversals, a trailing open position) and/or
+recorded ones read from trades databases - asserts they produce the same
+positions and reports each builder's throughput.
+
+Builders:
+    position_engine             services.position_engine.PositionEngine (canonical,
+                                IPositionEngine, PositionBuilder array kernel)
+    enhanced_position_service   EnhancedPositionServiceV2's rebuild path (dedupe,
+                                batch validation, then the canonical engine)
+    position_builder_reference  PositionBuilder._aggregate_executions_into_positions
+                                (per-event reference of the kernel)
+    position_service            position_service.PositionService (root, dict based)
+    pure_position_engine        services/position_engine.py (shadowed by the
+                                services/position_engine package, loaded by path)
+
+Every builder is compared on position boundaries: account, instrument,
+side, status, entry/exit time and execution count. Quantities, prices, P&L
+and commission are compared wherever both builders report them; each
+builder reports the detail fields it defines the way the canonical engine
+does:
+    - the domain builders report all of them
+    - position_service stores the peak quantity as total_quantity, so it
+      reports max_quantity only; it prices open positions differently (no
+      realized P&L from partial exits, average prices before close), so for
+      those it reports max_quantity and commission only
+    - pure_position_engine reports none: its quantity is traded volume, its
+      points P&L is per contract, its dollar P&L ignores the contract
+      multiplier and it splits reversal commissions pro rata
+The legacy dict builders predate BuyToCover/SellShort, so they get each
+execution as the equivalent Buy/Sell with its fill price in entry_price.
+position_service also takes any row with non-zero P&L - including the
+importer's NULL - for a completed round trip, so it gets NULL P&L as 0.
+
+Usage:
+    python scripts/position_engine_harness.py [--accounts 2] [--instruments 2]
+        [--executions 2000] [--seed 42] [--recorded DB [DB ...]] [--engines NAME ...]
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from domain.models.trade import Trade
+from domain.services.pnl_calculator import PnLCalculator
+from domain.services.position_builder import PositionBuilder
+from services.position_engine import PositionEngine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INSTRUMENTS = ['MNQ MAR25', 'MES MAR25', 'NQ MAR25', 'ES MAR25', 'YM MAR25', 'RTY MAR25', 'CL MAR25', 'GC MAR25']
+
+BOUNDARY_FIELDS = ('account', 'instrument', 'side', 'status', 'entry_time', 'exit_time', 'execution_count')
+DETAIL_FIELDS = ('total_quantity', 'max_quantity', 'average_entry_price', 'average_exit_price',
+                 'total_points_pnl', 'total_dollars_pnl', 'total_commission')
+
+# Decimal places detail fields are compared at: the kernel sums prices on
+# integer ticks, the reference in floats
+DETAIL_DECIMALS = 6
+
+# Signed quantity sides in the four-way form the importer stores
+BUY_SIDES = ('Buy', 'BuyToCover', 'Long')
+SELL_SIDES = ('Sell', 'SellShort', 'Short')
+
+
+def generate_executions(accounts: int = 2, instruments: int = 2, executions: int = 2000,
+                        seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Trade rows for accounts x instruments groups of random execution streams
+
+    Each group walks its running quantity through scale-ins, partial and full
+    exits and reversals (one execution crossing zero); the last position may
+    stay open. Sides, prices and timestamps follow the importer's layout.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 2, 6, 30)
+    rows = []
+    for a in range(accounts):
+        account = f'APEX{a:03d}'
+        for instrument in INSTRUMENTS[:instruments]:
+            when = start
+            price = 21000.0
+            running = 0
+            for n in range(executions):
+                direction = 1 if running > 0 else -1
+                choice = rng.random()
+                if running == 0:
+                    change = int(rng.choice([-1, 1])) * int(rng.integers(1, 5))
+                elif choice < 0.3 and abs(running) < 8:
+                    change = direction * int(rng.integers(1, 4))  # scale in
+                elif choice < 0.5 and abs(running) > 1:
+                    change = -direction * int(rng.integers(1, abs(running)))  # partial exit
+                elif choice < 0.85:
+                    change = -running  # flat
+                else:
+                    change = -running - direction * int(rng.integers(1, 4))  # reversal
+
+                previous, running = running, running + change
+                if change > 0:
+                    side = 'BuyToCover' if previous < 0 <= -running else 'Buy'
+                else:
+                    side = 'Sell' if previous > 0 <= running else 'SellShort'
+                opening = side in ('Buy', 'SellShort')
+
+                when += timedelta(seconds=int(rng.integers(1, 300)))
+                price += float(rng.integers(-20, 21)) * 0.25
+                rows.append({
+                    'id': len(rows) + 1,
+                    'instrument': instrument,
+                    'account': account,
+                    'side_of_market': side,
+                    'quantity': abs(change),
+                    'entry_price': price if opening else None,
+                    'exit_price': None if opening else price,
+                    'entry_time': when.strftime('%Y-%m-%d %H:%M:%S'),
+                    'exit_time': None,
+                    'entry_execution_id': f'{account}-{instrument}-{n}',
+                    'commission': 0.52,
+                    'points_gain_loss': None,
+                    'dollars_gain_loss': None,
+                    'deleted': 0,
+                })
+    return rows
+
+
+def load_recorded_executions(db_path: str) -> List[Dict[str, Any]]:
+    """Non-deleted trade rows of a trades database, in execution order per account/instrument"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        # Older databases predate the deleted column
+        rows = conn.execute("SELECT * FROM trades ORDER BY account, instrument, entry_time, id")
+        return [trade for trade in map(dict, rows) if not trade.get('deleted')]
+    finally:
+        conn.close()
+
+
+def group_executions(trades: List[Dict]) -> Dict[Tuple[str, str], List[Dict]]:
+    """Trades per (account, instrument) with surrounding whitespace removed, skipping unnamed ones"""
+    groups = {}
+    for trade in trades:
+        key = ((trade.get('account') or '').strip(), (trade.get('instrument') or '').strip())
+        if all(key):
+            groups.setdefault(key, []).append(trade)
+    return groups
+
+
+def two_action(trade: Dict) -> Dict:
+    """A trade as the legacy Buy/Sell builders expect it (see the module docstring)"""
+    side = (trade.get('side_of_market') or '').strip()
+    price = trade.get('entry_price') if trade.get('entry_price') is not None else trade.get('exit_price')
+    return dict(
+        trade,
+        side_of_market='Buy' if side in BUY_SIDES else 'Sell' if side in SELL_SIDES else side,
+        entry_price=price,
+        points_gain_loss=trade.get('points_gain_loss') or 0,
+        dollars_gain_loss=trade.get('dollars_gain_loss') or 0,
+    )
+
+
+def _timestamp(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(' ')
+    try:
+        return datetime.fromisoformat(str(value)).isoformat(' ')
+    except ValueError:
+        return str(value)
+
+
+def _domain_record(position) -> Dict[str, Any]:
+    """Comparable fields of a domain Position"""
+    return {
+        'account': position.account,
+        'instrument': position.instrument,
+        'side': position.position_type.value,
+        'status': position.position_status.value,
+        'entry_time': _timestamp(position.entry_time),
+        'exit_time': _timestamp(position.exit_time),
+        'execution_count': position.execution_count,
+        **{field: getattr(position, field) for field in DETAIL_FIELDS},
+    }
+
+
+def run_position_engine(trades: List[Dict]) -> List[Dict[str, Any]]:
+    engine = PositionEngine()
+    records = []
+    for position, executions in engine.build_positions_with_executions(trades):
+        record = _domain_record(position)
+        record['execution_count'] = len(executions)
+        records.append(record)
+    return records
+
+
+def run_enhanced_position_service(trades: List[Dict]) -> List[Dict[str, Any]]:
+    from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+
+    service = EnhancedPositionServiceV2(db_path=':memory:')
+    records = []
+    for (account, instrument), group in group_executions(trades).items():
+        built = service._build_positions_for_instrument(group, account, instrument)
+        positions_with_trades = built[0] if built else []
+        for position, trade_ids in positions_with_trades:
+            record = _domain_record(position)
+            record['execution_count'] = len(trade_ids)
+            records.append(record)
+    return records
+
+
+def run_position_builder_reference(trades: List[Dict]) -> List[Dict[str, Any]]:
+    builder = PositionBuilder(PnLCalculator())
+    records = []
+    for (account, instrument), group in group_executions(trades).items():
+        trade_objects = [Trade.from_dict(trade) for trade in group]
+        records.extend(
+            _domain_record(position)
+            for position in builder._aggregate_executions_into_positions(trade_objects, account, instrument)
+        )
+    return records
+
+
+def run_position_service(trades: List[Dict]) -> List[Dict[str, Any]]:
+    from position_service import PositionService
+
+    service = PositionService(db_path=':memory:')
+    records = []
+    for (account, instrument), group in group_executions(trades).items():
+        positions = service._build_positions_from_execution_flow([two_action(t) for t in group], account, instrument)
+        for position in positions:
+            record = {
+                'account': position['account'],
+                'instrument': position['instrument'],
+                'side': position['position_type'],
+                'status': position['position_status'],
+                'entry_time': _timestamp(position['entry_time']),
+                'exit_time': _timestamp(position['exit_time']),
+                'execution_count': len(position['executions']),
+            }
+            # total_quantity holds the peak here (see the module docstring)
+            details = [field for field in DETAIL_FIELDS if field != 'total_quantity']
+            if position['position_status'] != 'closed':
+                details = ['max_quantity', 'total_commission']
+            record.update((field, position[field]) for field in details)
+            records.append(record)
+    return records
+
+
+def load_pure_position_engine():
+    """services/position_engine.py, which the services.position_engine package hides from imports"""
+    name = 'services._pure_position_engine'
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, 'services', 'position_engine.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+def run_pure_position_engine(trades: List[Dict]) -> List[Dict[str, Any]]:
+    engine = load_pure_position_engine().PositionEngine
+    return [{
+        'account': position.account,
+        'instrument': position.instrument,
+        'side': position.side.value,
+        'status': 'closed' if position.is_closed else 'open',
+        'entry_time': _timestamp(position.entry_time),
+        'exit_time': _timestamp(position.exit_time),
+        'execution_count': len(position.executions),
+    } for position in engine.build_positions_from_executions([two_action(t) for t in trades])]
+
+
+# Builders by name; the first is the one the others are checked against
+ENGINES: Dict[str, Callable[[List[Dict]], List[Dict[str, Any]]]] = {
+    'position_engine': run_position_engine,
+    'enhanced_position_service': run_enhanced_position_service,
+    'position_builder_reference': run_position_builder_reference,
+    'position_service': run_position_service,
+    'pure_position_engine': run_pure_position_engine,
+}
+
+
+def _key(record: Dict[str, Any], fields) -> Tuple:
+    return tuple(
+        round(record[field], DETAIL_DECIMALS) if isinstance(record[field], float) else record[field]
+        for field in fields
+    )
+
+
+def compare_positions(expected: List[Dict[str, Any]], actual: List[Dict[str, Any]],
+                      limit: int = 10) -> List[str]:
+    """
+    Differences between two builders' positions, at most `limit` of them
+
+    Positions are paired in boundary order; detail fields are compared when
+    both records of a pair report them.
+    """
+    def ordered(records):
+        return sorted(records, key=lambda record: tuple(
+            '' if value is None else str(value) for value in _key(record, BOUNDARY_FIELDS)
+        ))
+
+    expected, actual = ordered(expected), ordered(actual)
+    mismatches = []
+    if len(expected) != len(actual):
+        mismatches.append(f"{len(actual)} positions, expected {len(expected)}")
+
+    for want, got in zip(expected, actual):
+        fields = BOUNDARY_FIELDS + tuple(field for field in DETAIL_FIELDS if field in want and field in got)
+        want_key, got_key = _key(want, fields), _key(got, fields)
+        if want_key != got_key:
+            diff = {field: (w, g) for field, w, g in zip(fields, want_key, got_key) if w != g}
+            mismatches.append(f"{want['account']}/{want['instrument']} at {want['entry_time']}: {diff}")
+        if len(mismatches) >= limit:
+            break
+    return mismatches
+
+
+def run_harness(trades: List[Dict], engines: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Build positions from the trades with every builder and compare them
+
+    Returns:
+        {'executions': n, 'identical': bool, 'engines': {name: {'seconds',
+        'executions_per_second', 'positions', 'mismatches'}}}; mismatches
+        are against the first builder
+    """
+    names = engines or list(ENGINES)
+    report = {'executions': len(trades), 'identical': True, 'engines': {}}
+    baseline = None
+    for name in names:
+        start = time.perf_counter()
+        records = ENGINES[name](trades)
+        elapsed = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = records
+        mismatches = compare_positions(baseline, records)
+        report['identical'] = report['identical'] and not mismatches
+        report['engines'][name] = {
+            'seconds': elapsed,
+            'executions_per_second': len(trades) / elapsed if elapsed > 0 else float('inf'),
+            'positions': len(records),
+            'mismatches': mismatches,
+        }
+    return report
+
+
+def print_report(title: str, report: Dict[str, Any]):
+    print(f"\n{title}: {report['executions']} executions")
+    print(f"{'engine':<28} {'seconds':>9} {'exec/s':>11} {'positions':>10} {'mismatches':>11}")
+    for name, stats in report['engines'].items():
+        print(f"{name:<28} {stats['seconds']:>9.3f} {stats['executions_per_second']:>11.0f} "
+              f"{stats['positions']:>10} {len(stats['mismatches']):>11}")
+        for mismatch in stats['mismatches']:
+            print(f"    {mismatch}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--accounts', type=int, default=2)
+    parser.add_argument('--instruments', type=int, default=2, choices=range(1, len(INSTRUMENTS) + 1))
+    parser.add_argument('--executions', type=int, default=2000, help='Executions per account/instrument group')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--recorded', nargs='+', default=[], metavar='DB', help='Trades databases to replay')
+    parser.add_argument('--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES))
+    args = parser.parse_args()
+
+    # Per-execution INFO logging would dominate the timings
+    logging.disable(logging.WARNING)
+
+    streams = []
+    if args.executions:
+        streams.append((f"generated (seed {args.seed})",
+                        generate_executions(args.accounts, args.instruments, args.executions, args.seed)))
+    streams.extend((path, load_recorded_executions(path)) for path in args.recorded)
+
+    identical = True
+    for title, trades in streams:
+        report = run_harness(trades, args.engines)
+        print_report(title, report)
+        identical = identical and report['identical']
+
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+"""
+SQLite Write Queue
+
+Single-writer service for a SQLite database file. Celery workers, the
+NinjaTrader watcher thread, the daily import scheduler and Flask handlers used
+to each open their own write transaction and rely on ``busy_timeout`` to get
+through lock contention, which showed up as multi-second stalls during import
+bursts.
+
+Mutating code now submits a job (a callable taking a connection) to the
+process-wide queue for the database file. One writer thread drains the queue
+and runs every job that arrived within a short window inside one
+``BEGIN IMMEDIATE`` transaction (group commit): N concurrent writes cost one
+fsync instead of N. Each job runs under its own SAVEPOINT, so a failing job
+rolls back only its own changes. Callers get a Future that resolves after the
+batch has committed.
+
+Readers keep using pooled connections; in WAL mode they never wait on the
+writer.
+
+Jobs must not call ``commit()``/``rollback()`` on the connection they are
+given; the writer owns the transaction.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+import logging
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+# Get database logger
+db_logger = logging.getLogger('database')
+
+
+class WriteResult(NamedTuple):
+    """Outcome of a single execute()/executemany() job"""
+    rowcount: int
+    lastrowid: Optional[int]
+
+
+class _WriteJob:
+    """A unit of work waiting for the writer thread"""
+
+    __slots__ = ('fn', 'future', 'submitted_at')
+
+    def __init__(self, fn: Callable[[sqlite3.Connection], Any]):
+        self.fn = fn
+        self.future: Future = Future()
+        self.submitted_at = time.time()
+
+
+class SQLiteWriteQueue:
+    """
+    Group-commit write queue for a single database file.
+
+    The writer thread is started lazily on the first submission and exits
+    after ``idle_timeout`` seconds without work, closing its connection.
+    """
+
+    def __init__(self, db_path: str, max_batch_size: int = 256,
+                 max_batch_delay: float = 0.0, idle_timeout: float = 30.0,
+                 busy_timeout_ms: int = 30000):
+        self.db_path = str(db_path)
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_delay = max(0.0, float(max_batch_delay))
+        self.idle_timeout = max(0.0, float(idle_timeout))
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self._queue: "queue.Queue[_WriteJob]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = os.getpid()
+        self._closed = False
+
+        self._commit_latencies: deque = deque(maxlen=1000)
+        self._stats = {
+            'jobs_submitted': 0,
+            'jobs_completed': 0,
+            'jobs_failed': 0,
+            'batches_committed': 0,
+            'batches_failed': 0,
+            'max_batch_size_seen': 0,
+            'total_queue_wait': 0.0,
+            'max_queue_depth': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, fn: Callable[[sqlite3.Connection], Any]) -> Future:
+        """
+        Queue a write job and return a Future for its result.
+
+        ``fn`` is called on the writer thread with the writer's connection
+        and must not commit. The Future resolves once the surrounding batch
+        has committed (or with the job's exception).
+        """
+        if self._thread is not None and threading.current_thread() is self._thread:
+            # Job submitting more work: run it inside the current savepoint
+            future: Future = Future()
+            try:
+                future.set_result(fn(self._conn))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        job = _WriteJob(fn)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_after_fork()
+            if self._closed:
+                raise sqlite3.ProgrammingError(f"Write queue for {self.db_path} is shut down")
+            self._queue.put(job)
+            self._stats['jobs_submitted'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queue.qsize())
+            if self._thread is None or not self._thread.is_alive():
+                self._start_writer()
+        return job.future
+
+    def run(self, fn: Callable[[sqlite3.Connection], Any], timeout: Optional[float] = None) -> Any:
+        """Submit a job and block until it has been committed; returns its result"""
+        return self.submit(fn).result(timeout)
+
+    def execute(self, sql: str, params: Sequence = (), timeout: Optional[float] = None) -> WriteResult:
+        """Run one statement through the queue and return rowcount/lastrowid"""
+        def job(conn):
+            cursor = conn.execute(sql, params)
+            return WriteResult(cursor.rowcount, cursor.lastrowid)
+        return self.run(job, timeout)
+
+    def executemany(self, sql: str, seq_of_params, timeout: Optional[float] = None) -> WriteResult:
+        """Run executemany() through the queue"""
+        def job(conn):
+            cursor = conn.executemany(sql, seq_of_params)
+            return WriteResult(cursor.rowcount, cursor.lastrowid)
+        return self.run(job, timeout)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Drain outstanding jobs and stop the writer thread"""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _reset_after_fork(self) -> None:
+        """The writer thread does not survive fork(); start over in the child"""
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def _start_writer(self) -> None:
+        self._thread = threading.Thread(
+            target=self._writer_loop,
+            name=f"sqlite-writer-{os.path.basename(self.db_path)}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        # isolation_level=None: the writer issues BEGIN/COMMIT itself
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000,
+                               isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous = normal")
+        return conn
+
+    def _next_batch(self) -> Optional[List[_WriteJob]]:
+        """Wait for the first job, then collect whatever arrives in the batch window"""
+        try:
+            if self.idle_timeout > 0:
+                first = self._queue.get(timeout=self.idle_timeout)
+            else:
+                first = self._queue.get_nowait()
+        except queue.Empty:
+            return None
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.time() + self.max_batch_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            try:
+                job = self._queue.get_nowait() if remaining <= 0 else self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if job is None:
+                # Shutdown requested: finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(job)
+        return batch
+
+    def _writer_loop(self) -> None:
+        conn = None
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    with self._lock:
+                        # Re-check under the lock so a concurrent submit either
+                        # sees this thread alive or starts a new one
+                        if self._queue.empty():
+                            self._thread = None
+                            return
+                    continue
+
+                if conn is None:
+                    conn = self._conn = self._open_connection()
+                self._resolve(self._run_batch(conn, batch))
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+
+    def _run_batch(self, conn: sqlite3.Connection, batch: List[_WriteJob]) -> list:
+        """Run one batch in a single transaction; returns (job, ok, value) tuples"""
+        started = time.time()
+        outcomes = []
+
+        for job in batch:
+            self._stats['total_queue_wait'] += started - job.submitted_at
+
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job in batch:
+                conn.execute("SAVEPOINT write_job")
+                try:
+                    result = job.fn(conn)
+                    conn.execute("RELEASE SAVEPOINT write_job")
+                    outcomes.append((job, True, result))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO SAVEPOINT write_job")
+                    conn.execute("RELEASE SAVEPOINT write_job")
+                    outcomes.append((job, False, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            db_logger.error(f"Write batch of {len(batch)} jobs failed for {self.db_path}: {e}")
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            self._stats['batches_failed'] += 1
+            return [(job, False, e) for job in batch]
+
+        self._commit_latencies.append(time.time() - started)
+        self._stats['batches_committed'] += 1
+        self._stats['max_batch_size_seen'] = max(self._stats['max_batch_size_seen'], len(batch))
+        return outcomes
+
+    def _resolve(self, resolutions: list) -> None:
+        for job, ok, value in resolutions:
+            if ok:
+                self._stats['jobs_completed'] += 1
+                job.future.set_result(value)
+            else:
+                self._stats['jobs_failed'] += 1
+                job.future.set_exception(value)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth, batch sizes and commit latency for health checks"""
+        stats = dict(self._stats)
+        latencies = sorted(self._commit_latencies)
+        batches = stats['batches_committed']
+        finished = stats['jobs_completed'] + stats['jobs_failed']
+
+        stats.update({
+            'db_path': self.db_path,
+            'queue_depth': self._queue.qsize(),
+            'writer_running': self._thread is not None and self._thread.is_alive(),
+            'avg_batch_size': round(stats['jobs_completed'] / batches, 2) if batches else 0.0,
+            'avg_queue_wait_ms': round(stats['total_queue_wait'] * 1000 / finished, 2) if finished else 0.0,
+            'commit_latency_avg_ms': round(sum(latencies) * 1000 / len(latencies), 2) if latencies else 0.0,
+            'commit_latency_p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2) if latencies else 0.0,
+            'commit_latency_max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        })
+        stats['total_queue_wait'] = round(stats['total_queue_wait'], 4)
+        return stats
+
+
+# Global queue registry (one writer per database file)
+_write_queues: Dict[str, SQLiteWriteQueue] = {}
+_write_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_path: str) -> SQLiteWriteQueue:
+    """Get or create the process-wide write queue for a database file"""
+    key = str(db_path)
+    write_queue = _write_queues.get(key)
+    if write_queue is not None:
+        return write_queue
+
+    with _write_queues_lock:
+        write_queue = _write_queues.get(key)
+        if write_queue is None:
+            from config import DATABASE_WRITER_CONFIG, DATABASE_POOL_CONFIG
+            write_queue = SQLiteWriteQueue(
+                key,
+                max_batch_size=DATABASE_WRITER_CONFIG['max_batch_size'],
+                max_batch_delay=DATABASE_WRITER_CONFIG['max_batch_delay'],
+                idle_timeout=DATABASE_WRITER_CONFIG['idle_timeout'],
+                busy_timeout_ms=DATABASE_POOL_CONFIG['busy_timeout_ms'],
+            )
+            _write_queues[key] = write_queue
+        return write_queue
+
+
+def run_write(db_path: Optional[str], fn: Callable[[sqlite3.Connection], Any],
+              conn: Optional[sqlite3.Connection] = None) -> Any:
+    """
+    Run a write job through the queue on behalf of a caller.
+
+    Falls back to running ``fn`` directly when:
+
+    * ``conn`` already holds an open write transaction (the writer would wait
+      for the caller's lock while the caller waits for the writer); the
+      caller keeps ownership of that transaction
+    * the queue is disabled (``DB_WRITER_ENABLED=false``) or the database has
+      no file path (in-memory); ``fn`` runs on ``conn`` or a pooled
+      connection and is committed immediately, as before the queue existed
+    """
+    if conn is not None and conn.in_transaction:
+        return fn(conn)
+
+    from config import DATABASE_WRITER_CONFIG
+    if DATABASE_WRITER_CONFIG['enabled'] and db_path and str(db_path) != ':memory:':
+        return get_write_queue(db_path).run(fn)
+
+    if conn is None:
+        from scripts.connection_pool import get_connection_pool
+        with get_connection_pool(db_path).connection() as pooled:
+            result = fn(pooled)
+            pooled.commit()
+            return result
+
+    try:
+        result = fn(conn)
+        conn.commit()
+        return result
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def get_write_queue_stats() -> Dict[str, Dict[str, Any]]:
+    """Return metrics for every write queue in this process keyed by database path"""
+    with _write_queues_lock:
+        queues = list(_write_queues.items())
+    return {path: write_queue.get_stats() for path, write_queue in queues}
+
+
+def shutdown_write_queues(timeout: float = 5.0) -> None:
+    """Flush and stop all writer threads (application/worker shutdown)"""
+    with _write_queues_lock:
+        queues = list(_write_queues.values())
+        _write_queues.clear()
+    for write_queue in queues:
+        write_queue.shutdown(timeout)
@@ -0,0 +1,356 @@
+"""
+Batch Integrity Validator
+
+Set-based position-execution integrity validation. Instead of loading each
+position and its executions separately (a handful of queries per position),
+all positions in scope are checked together: per-position aggregates come
+from one GROUP BY over position_executions joined to trades, the quantity
+flow of every position is checked with NumPy over one ordered scan of the
+links, and orphaned executions come from one anti-join.
+
+Checks:
+- Positions without executions, links to missing/deleted trades and
+  execution count mismatches
+- Quantity consistency: each position's running quantity, replayed from its
+  linked trades, stays on one side of zero until its last execution and
+  matches total_quantity (a reversal execution shared with the previous
+  position only counts beyond what closed that position)
+- Timestamp consistency: entry/exit time against the first/last execution,
+  executions in the future
+- Incomplete execution data
+- Orphaned executions: live trades linked to no position
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import sqlite3
+import numpy as np
+
+from domain.integrity_issue import IntegrityIssue, IssueSeverity, IssueType
+from domain.validation_result import ValidationResult, ValidationStatus
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Issues are created before their validation row exists, as in PositionExecutionIntegrityValidator
+PLACEHOLDER_VALIDATION_ID = 999
+
+# Per-execution tolerance for position entry/exit times, in seconds
+TIMESTAMP_TOLERANCE_SECONDS = 1
+
+# Bound parameters per IN (...) lookup, below SQLite's default variable limit
+SQL_VARIABLE_CHUNK = 900
+
+SIDE_SIGNS_SQL = """
+    CASE UPPER(t.side_of_market)
+        WHEN 'BUY' THEN 1 WHEN 'BUYTOCOVER' THEN 1 WHEN 'LONG' THEN 1
+        WHEN 'SELL' THEN -1 WHEN 'SELLSHORT' THEN -1 WHEN 'SHORT' THEN -1
+        ELSE 0
+    END
+"""
+
+
+class BatchValidation(NamedTuple):
+    """Outcome of one batch validation run"""
+    results: List[Tuple[ValidationResult, List[IntegrityIssue]]]  # per position
+    orphan_issues: List[IntegrityIssue]  # executions linked to no position
+
+
+class BatchIntegrityValidator:
+    """Validates the integrity of many positions at once"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def validate(
+        self,
+        position_status: Optional[str] = None,
+        since: Optional[str] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+        include_orphans: bool = True
+    ) -> BatchValidation:
+        """
+        Validate the positions in scope
+
+        Args:
+            position_status: Only positions with this status ('open'/'closed')
+            since: Only positions entered or exited at or after this ISO time
+            id_range: Only positions with min <= id <= max
+            include_orphans: Also look for executions linked to no position
+
+        Returns:
+            BatchValidation with one (result, issues) per position in id order
+        """
+        where_clause, params = _scope(position_status, since, id_range)
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            issues_by_position: Dict[int, List[IntegrityIssue]] = {}
+            positions = self._check_aggregates(conn, where_clause, params, issues_by_position)
+            self._check_links(conn, where_clause, params, positions, issues_by_position)
+            orphan_issues = self._detect_orphaned_executions(conn) if include_orphans else []
+        finally:
+            conn.close()
+
+        timestamp = datetime.now(timezone.utc)
+        results = []
+        for position_id in positions[0].tolist():
+            issues = issues_by_position.get(position_id, [])
+            result = ValidationResult(position_id=position_id, status=ValidationStatus.PASSED, timestamp=timestamp)
+            if issues:
+                result.mark_failed(len(issues))
+            else:
+                result.mark_passed()
+            results.append((result, issues))
+
+        logger.info(
+            f"Batch validated {len(results)} positions: "
+            f"{sum(1 for _, issues in results if issues)} with issues, {len(orphan_issues)} orphaned executions"
+        )
+        return BatchValidation(results, orphan_issues)
+
+    def plan_chunks(
+        self,
+        chunk_size: int,
+        position_status: Optional[str] = None,
+        since: Optional[str] = None
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Split the positions in scope into ID ranges of up to chunk_size positions
+
+        Returns:
+            (min_id, max_id, position_count) per chunk, for validate(id_range=...)
+        """
+        where_clause, params = _scope(position_status, since)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            ids = [row[0] for row in conn.execute(f"SELECT p.id FROM positions p {where_clause} ORDER BY p.id", params)]
+        finally:
+            conn.close()
+        return [
+            (ids[i], ids[min(i + chunk_size, len(ids)) - 1], min(chunk_size, len(ids) - i))
+            for i in range(0, len(ids), chunk_size)
+        ]
+
+    def detect_orphaned_executions(self) -> List[IntegrityIssue]:
+        """Live trades linked to no position"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return self._detect_orphaned_executions(conn)
+        finally:
+            conn.close()
+
+    def _check_aggregates(self, conn, where_clause: str, params: List,
+                          issues: Dict[int, List[IntegrityIssue]]) -> Tuple[np.ndarray, ...]:
+        """
+        Per-position checks on GROUP BY aggregates
+
+        Returns (id, is_long, closed, total_quantity) arrays of the positions in scope, by id
+        """
+        rows = conn.execute(f"""
+            SELECT p.id, p.position_status, p.execution_count, p.entry_time, p.exit_time,
+                   p.position_type, p.total_quantity,
+                   COUNT(pe.trade_id) AS links,
+                   COUNT(t.id) AS executions,
+                   MIN(t.entry_time) AS first_time,
+                   MAX(t.entry_time) AS last_time,
+                   ABS(julianday(p.entry_time) - julianday(MIN(t.entry_time))) * 86400 AS entry_gap,
+                   ABS(julianday(p.exit_time) - julianday(MAX(t.entry_time))) * 86400 AS exit_gap,
+                   SUM(julianday(t.entry_time) > julianday('now', '+1 hour')) AS future_executions
+            FROM positions p
+            LEFT JOIN position_executions pe ON pe.position_id = p.id
+            LEFT JOIN trades t ON t.id = pe.trade_id AND COALESCE(t.deleted, 0) = 0
+            {where_clause}
+            GROUP BY p.id
+            ORDER BY p.id
+        """, params).fetchall()
+
+        for (position_id, status, execution_count, entry_time, exit_time, _, _, links, executions,
+             first_time, last_time, entry_gap, exit_gap, future_executions) in rows:
+            if links == 0:
+                _add_issue(issues, position_id, IssueType.POSITION_WITHOUT_EXECUTIONS, IssueSeverity.CRITICAL,
+                           f"Position {position_id} has no associated executions")
+                continue
+            if executions < links:
+                _add_issue(issues, position_id, IssueType.MISSING_EXECUTION, IssueSeverity.CRITICAL,
+                           f"Position {position_id} links {links - executions} executions that no longer exist",
+                           metadata={'linked': links, 'found': executions})
+            if execution_count and execution_count != executions:
+                _add_issue(issues, position_id, IssueType.INCOMPLETE_DATA, IssueSeverity.HIGH,
+                           f"Position {position_id} reports {execution_count} executions but {executions} found",
+                           metadata={'expected': execution_count, 'actual': executions})
+            if entry_gap is not None and entry_gap > TIMESTAMP_TOLERANCE_SECONDS:
+                _add_issue(issues, position_id, IssueType.TIMESTAMP_ANOMALY, IssueSeverity.LOW,
+                           f"Position {position_id} entry time ({entry_time}) differs from first execution "
+                           f"time ({first_time})",
+                           metadata={'position_entry_time': entry_time, 'first_execution_time': first_time,
+                                     'difference_seconds': entry_gap})
+            if status == 'closed' and exit_gap is not None and exit_gap > TIMESTAMP_TOLERANCE_SECONDS:
+                _add_issue(issues, position_id, IssueType.TIMESTAMP_ANOMALY, IssueSeverity.LOW,
+                           f"Position {position_id} exit time ({exit_time}) differs from last execution "
+                           f"time ({last_time})",
+                           metadata={'position_exit_time': exit_time, 'last_execution_time': last_time,
+                                     'difference_seconds': exit_gap})
+            if future_executions:
+                _add_issue(issues, position_id, IssueType.TIMESTAMP_ANOMALY, IssueSeverity.MEDIUM,
+                           f"Position {position_id} has {future_executions} executions timestamped in the future",
+                           metadata={'future_executions': future_executions, 'last_execution_time': last_time})
+
+        return (
+            np.array([row[0] for row in rows], dtype=np.int64),
+            np.array([row[5] == 'Long' for row in rows], dtype=bool),
+            np.array([row[1] == 'closed' for row in rows], dtype=bool),
+            np.array([row[6] or 0 for row in rows], dtype=np.int64),
+        )
+
+    def _check_links(self, conn, where_clause: str, params: List, positions: Tuple[np.ndarray, ...],
+                     issues: Dict[int, List[IntegrityIssue]]):
+        """Quantity flow and execution data checks over every linked execution, in position order"""
+        rows = conn.execute(f"""
+            SELECT pe.position_id,
+                   t.id,
+                   {SIDE_SIGNS_SQL} * COALESCE(t.quantity, 0),
+                   t.entry_time IS NULL
+                       OR COALESCE(t.entry_price, t.exit_price) IS NULL
+                       OR COALESCE(t.entry_price, t.exit_price) <= 0
+                       OR t.quantity IS NULL OR t.quantity <= 0
+                       OR t.instrument IS NULL OR t.instrument = ''
+            FROM positions p
+            JOIN position_executions pe ON pe.position_id = p.id
+            JOIN trades t ON t.id = pe.trade_id AND COALESCE(t.deleted, 0) = 0
+            {where_clause}
+            ORDER BY pe.position_id, pe.execution_order
+        """, params).fetchall()
+        if not rows:
+            return
+
+        columns = list(zip(*rows))
+        position_ids, trade_ids = np.array(columns[0]), np.array(columns[1])
+        signed_quantities = np.array(columns[2], dtype=np.int64)
+        incomplete = np.array(columns[3], dtype=bool)
+
+        # Segment per position
+        starts = np.flatnonzero(np.r_[True, position_ids[1:] != position_ids[:-1]])
+        ends = np.r_[starts[1:], len(rows)] - 1
+        segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(rows)]))
+        at = np.searchsorted(positions[0], position_ids[starts])
+        seg_long, seg_closed, seg_total = (column[at] for column in positions[1:])
+        shared_quantity = self._shared_closed_quantities(
+            conn, position_ids[starts].tolist(), trade_ids[starts].tolist()
+        )
+
+        # Quantity each execution adds to the position's side; a first execution
+        # that also closed the previous position only opens its remainder
+        held_change = np.where(seg_long, 1, -1)[segment] * signed_quantities
+        held_change[starts] -= shared_quantity
+        running = np.cumsum(held_change)
+        held = running - (running[starts] - held_change[starts])[segment]
+
+        # Held quantity must stay positive until the last execution
+        is_last = np.zeros(len(rows), dtype=bool)
+        is_last[ends] = True
+        went_flat = np.bincount(segment[~is_last & (held <= 0)], minlength=len(starts)) > 0
+
+        before_last = np.where(ends > starts, held[np.maximum(ends - 1, 0)], 0)
+        after_last = held[ends]
+        expected_total = np.where(seg_closed, before_last, after_last)
+        inconsistent = went_flat | (expected_total != seg_total) | (expected_total <= 0)
+        inconsistent |= seg_closed & (after_last > 0)
+        inconsistent |= ~seg_closed & (after_last <= 0)
+
+        for k in np.flatnonzero(inconsistent).tolist():
+            position_id = int(position_ids[starts[k]])
+            _add_issue(issues, position_id, IssueType.QUANTITY_MISMATCH, IssueSeverity.HIGH,
+                       f"Position {position_id} quantity mismatch: executions give {int(expected_total[k])}, "
+                       f"position has {int(seg_total[k])}"
+                       + (" (running quantity reaches zero before the last execution)" if went_flat[k] else ""),
+                       metadata={'expected_quantity': int(expected_total[k]), 'actual_quantity': int(seg_total[k]),
+                                 'quantity_after_last_execution': int(after_last[k]),
+                                 'flat_before_last_execution': bool(went_flat[k])})
+
+        for i in np.flatnonzero(incomplete).tolist():
+            position_id, trade_id = int(position_ids[i]), int(trade_ids[i])
+            _add_issue(issues, position_id, IssueType.INCOMPLETE_DATA, IssueSeverity.HIGH,
+                       f"Execution {trade_id} of position {position_id} has missing time, price, "
+                       f"quantity or instrument",
+                       execution_id=trade_id)
+
+    @staticmethod
+    def _shared_closed_quantities(conn, position_ids: List[int], trade_ids: List[int]) -> np.ndarray:
+        """
+        Per (position, first trade): the largest total_quantity of another closed
+        position the trade is also linked to, i.e. what a reversal execution closed
+        """
+        closed_by: Dict[int, List[Tuple[int, int]]] = {}
+        unique_trade_ids = list(set(trade_ids))
+        for i in range(0, len(unique_trade_ids), SQL_VARIABLE_CHUNK):
+            chunk = unique_trade_ids[i:i + SQL_VARIABLE_CHUNK]
+            for trade_id, position_id, total_quantity in conn.execute(f"""
+                SELECT pe.trade_id, pe.position_id, p.total_quantity
+                FROM position_executions pe
+                CROSS JOIN positions p ON p.id = pe.position_id  -- keep the trade_id lookup as the outer loop
+                WHERE pe.trade_id IN ({','.join('?' * len(chunk))}) AND p.position_status = 'closed'
+            """, chunk):
+                closed_by.setdefault(trade_id, []).append((position_id, total_quantity or 0))
+
+        return np.array([
+            max((quantity for other, quantity in closed_by.get(trade_id, ()) if other != position_id), default=0)
+            for position_id, trade_id in zip(position_ids, trade_ids)
+        ], dtype=np.int64)
+
+    def _detect_orphaned_executions(self, conn) -> List[IntegrityIssue]:
+        """Live trades linked to no position"""
+        rows = conn.execute("""
+            SELECT t.id, t.entry_execution_id, t.account, t.instrument
+            FROM trades t
+            WHERE (t.deleted = 0 OR t.deleted IS NULL)
+              AND NOT EXISTS (SELECT 1 FROM position_executions pe WHERE pe.trade_id = t.id)
+            ORDER BY t.id
+        """).fetchall()
+
+        issues: Dict[int, List[IntegrityIssue]] = {}
+        for trade_id, execution_id, account, instrument in rows:
+            _add_issue(issues, None, IssueType.ORPHANED_EXECUTION, IssueSeverity.HIGH,
+                       f"Execution {execution_id or trade_id} ({account}/{instrument}) is not linked to any position",
+                       execution_id=trade_id)
+        return issues.get(None, [])
+
+
+def _scope(
+    position_status: Optional[str] = None,
+    since: Optional[str] = None,
+    id_range: Optional[Tuple[int, int]] = None
+) -> Tuple[str, List]:
+    """WHERE clause (on positions p) and parameters for the positions in scope"""
+    conditions, params = [], []
+    if position_status:
+        conditions.append("p.position_status = ?")
+        params.append(position_status)
+    if since:
+        conditions.append("(p.entry_time >= ? OR p.exit_time >= ?)")
+        params.extend([since, since])
+    if id_range:
+        conditions.append("p.id BETWEEN ? AND ?")
+        params.extend(id_range)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+def _add_issue(
+    issues: Dict[Optional[int], List[IntegrityIssue]],
+    position_id: Optional[int],
+    issue_type: IssueType,
+    severity: IssueSeverity,
+    description: str,
+    execution_id: Optional[int] = None,
+    metadata: Optional[Dict] = None
+) -> None:
+    issues.setdefault(position_id, []).append(IntegrityIssue(
+        validation_id=PLACEHOLDER_VALIDATION_ID,
+        issue_type=issue_type,
+        severity=severity,
+        description=description,
+        position_id=position_id,
+        execution_id=execution_id,
+        metadata=metadata or {}
+    ))
@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from services.redis_cache_service import get_cache_service
 from services.background_data_manager import background_data_manager
 from services.symbol_service import symbol_service
+from services.session_calendar import expected_bars
 from scripts.TradingLog_db import FuturesDB
 from config import config
 
@@ -303,7 +304,7 @@ class CacheOnlyChartService:
             start_date = end_date - timedelta(hours=24)  # Check last 24 hours
             
             # Calculate expected data points based on timeframe
-            expected_points = self._calculate_expected_data_points(timeframe, start_date, end_date)
+            expected_points = self._calculate_expected_data_points(timeframe, start_date, end_date, instrument)
             
             # Get actual data points from cache
             start_timestamp = int(start_date.timestamp())
@@ -326,29 +327,12 @@ class CacheOnlyChartService:
             self.logger.error(f"Error calculating completeness score for {instrument} {timeframe}: {e}")
             return 0.0
     
-    def _calculate_expected_data_points(self, timeframe: str, start_date: datetime, end_date: datetime) -> int:
+    def _calculate_expected_data_points(self, timeframe: str, start_date: datetime, end_date: datetime,
+                                        instrument: Optional[str] = None) -> int:
         """Calculate expected number of data points for a timeframe and date range"""
         try:
-            # Convert timeframe to minutes
-            timeframe_minutes = {
-                '1m': 1,
-                '3m': 3,
-                '5m': 5,
-                '15m': 15,
-                '1h': 60,
-                '4h': 240,
-                '1d': 1440
-            }
-            
-            minutes_per_point = timeframe_minutes.get(timeframe, 1)
-            total_minutes = (end_date - start_date).total_seconds() / 60
-            
-            # Account for market hours (futures trade ~23 hours per day)
-            market_hours_factor = 23 / 24 if timeframe != '1d' else 5 / 7  # 5 trading days per week for daily
-            
-            expected_points = int((total_minutes / minutes_per_point) * market_hours_factor)
-            
-            return max(expected_points, 0)
+            # In-session bars only: weekends, holidays and the daily halt have none
+            return expected_bars(start_date, end_date, timeframe, instrument)
             
         except Exception as e:
             self.logger.error(f"Error calculating expected data points: {e}")
@@ -3,14 +3,24 @@ CSV File Watcher Service
 
 Monitors the CSV directory for file changes and automatically triggers imports
 with debouncing to handle NinjaTrader's frequent file writes.
+
+Close-write events (inotify IN_CLOSE_WRITE) trigger an import almost
+immediately; plain modification events fall back to the debounce delay.
 """
 import logging
 import threading
 import time
 from pathlib import Path
 from typing import Optional, Callable
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
 
 from config import config
 
@@ -20,18 +30,24 @@ class CSVFileEventHandler(FileSystemEventHandler):
     Handles file system events for CSV files with debouncing logic.
     """
 
-    def __init__(self, on_csv_change: Callable[[Path], None], debounce_seconds: float = 5.0):
+    def __init__(self, on_csv_change: Callable[[Path], None], debounce_seconds: float = 5.0,
+                 close_write_delay: float = 0.05):
         """
         Initialize the CSV file event handler.
 
         Args:
             on_csv_change: Callback function to call when a CSV file changes
             debounce_seconds: Delay before triggering import (default: 5 seconds)
+            close_write_delay: Delay after a close-write event, used to coalesce
+                bursts of appends into one import (default: 50 ms)
         """
         super().__init__()
         self.on_csv_change = on_csv_change
         self.debounce_seconds = debounce_seconds
+        self.close_write_delay = close_write_delay
         self.pending_timers: dict[str, threading.Timer] = {}
+        # Monotonic time each pending import is due at
+        self.pending_due: dict[str, float] = {}
         self.lock = threading.Lock()
         self.logger = logging.getLogger('CSVWatcher')
 
@@ -45,35 +61,54 @@ class CSVFileEventHandler(FileSystemEventHandler):
         if not event.is_directory and event.src_path.endswith('.csv'):
             self._handle_csv_change(event.src_path, 'created')
 
-    def _handle_csv_change(self, file_path: str, event_type: str):
+    def on_closed(self, event):
+        """Handle close-write events (writer finished appending)"""
+        if not event.is_directory and event.src_path.endswith('.csv'):
+            self._handle_csv_change(event.src_path, 'closed', delay=self.close_write_delay)
+
+    def _handle_csv_change(self, file_path: str, event_type: str, delay: Optional[float] = None):
         """
         Handle CSV file change with debouncing.
 
+        Events for a file coalesce into one pending import. A new event only
+        reschedules that import if it would run sooner, so a close-write
+        pulls a debounced import forward and later modifications never push
+        it back.
+
         Args:
             file_path: Path to the changed CSV file
-            event_type: Type of event ('created' or 'modified')
+            event_type: Type of event ('created', 'modified' or 'closed')
+            delay: Seconds before triggering import (default: debounce_seconds)
         """
         file_path_obj = Path(file_path)
         filename = file_path_obj.name
+        if delay is None:
+            delay = self.debounce_seconds
+        due = time.monotonic() + delay
 
         with self.lock:
-            # Cancel existing timer for this file if any
             if filename in self.pending_timers:
+                if self.pending_due[filename] <= due:
+                    self.logger.debug(f"CSV file {event_type}: {filename} - coalesced into pending import")
+                    return
+
+                # Cancel existing timer for this file; the new one fires sooner
                 self.pending_timers[filename].cancel()
                 self.logger.debug(f"Cancelled pending import for {filename}")
 
-            # Create new timer to trigger import after debounce delay
+            # Create new timer to trigger import after the delay
             timer = threading.Timer(
-                self.debounce_seconds,
+                delay,
                 self._trigger_import,
                 args=[file_path_obj, event_type]
             )
             self.pending_timers[filename] = timer
+            self.pending_due[filename] = due
             timer.start()
 
-            self.logger.info(
+            self.logger.debug(
                 f"CSV file {event_type}: {filename} - "
-                f"import scheduled in {self.debounce_seconds}s"
+                f"import scheduled in {delay}s"
             )
 
     def _trigger_import(self, file_path: Path, event_type: str):
@@ -90,6 +125,7 @@ class CSVFileEventHandler(FileSystemEventHandler):
             # Remove from pending timers
             if filename in self.pending_timers:
                 del self.pending_timers[filename]
+                del self.pending_due[filename]
 
         # Call the import callback
         self.logger.info(f"Triggering import for {filename} (event: {event_type})")
@@ -105,6 +141,7 @@ class CSVFileEventHandler(FileSystemEventHandler):
                 timer.cancel()
                 self.logger.debug(f"Cancelled pending import for {filename}")
             self.pending_timers.clear()
+            self.pending_due.clear()
 
 
 class CSVWatcherService:
@@ -166,7 +203,15 @@ class CSVWatcherService:
 
         Args:
             import_callback: Function to call when CSV file changes are detected
+
+        Raises:
+            RuntimeError: If watchdog is not installed
+            OSError: If the native observer cannot start (e.g. inotify
+                unavailable or out of watches); callers fall back to polling
         """
+        if not WATCHDOG_AVAILABLE:
+            raise RuntimeError("watchdog is not installed")
+
         if self.running:
             self.logger.warning("CSV watcher is already running")
             return
@@ -183,9 +228,10 @@ class CSVWatcherService:
         )
 
         # Create and start observer
-        self.observer = Observer()
-        self.observer.schedule(self.event_handler, str(self.csv_dir), recursive=False)
-        self.observer.start()
+        observer = Observer()
+        observer.schedule(self.event_handler, str(self.csv_dir), recursive=False)
+        observer.start()
+        self.observer = observer
 
         self.running = True
         self.logger.info(
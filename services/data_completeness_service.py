@@ -8,7 +8,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
 from scripts.TradingLog_db import FuturesDB
+from services.ohlc_gap_engine import missing_bar_count
 from services.redis_cache_service import get_cache_service
+from services.session_calendar import expected_bars, session_seconds
 from config import config
 
 logger = logging.getLogger(__name__)
@@ -23,18 +25,18 @@ class DataCompletenessService:
     # Priority timeframes to monitor
     PRIORITY_TIMEFRAMES = ['1m', '5m', '15m', '1h', '4h', '1d']
 
-    # Expected minimum record counts based on Yahoo Finance limits
-    # These are approximate values for data that should be available
-    EXPECTED_MINIMUMS = {
-        '1m': 2730,    # 7 days * 390 bars/day (6.5 hours * 60 mins)
-        '5m': 4680,    # 60 days * 78 bars/day
-        '15m': 1560,   # 60 days * 26 bars/day
-        '1h': 2372,    # 365 days * 6.5 bars/day
-        '4h': 584,     # 365 days * 1.6 bars/day
-        '1d': 365,     # 365 days * 1 bar/day
+    # Days of history Yahoo Finance serves per timeframe; the expected record
+    # count is the number of in-session bars over this window
+    HISTORICAL_DAYS = {
+        '1m': 7,
+        '5m': 60,
+        '15m': 60,
+        '1h': 365,
+        '4h': 365,
+        '1d': 365,
     }
 
-    # Freshness thresholds in hours - data older than this is considered stale
+    # Freshness thresholds in trading hours - data older than this is considered stale
     FRESHNESS_THRESHOLDS_HOURS = {
         '1m': 24,      # 1-minute data stale after 24 hours
         '5m': 48,      # 5-minute data stale after 48 hours
@@ -47,6 +49,9 @@ class DataCompletenessService:
     # Cache TTL in seconds (5 minutes)
     CACHE_TTL = 300
 
+    # Most recent gaps listed in gap details
+    MAX_REPORTED_GAPS = 100
+
     def __init__(self):
         """Initialize the service with cache connection (DB accessed via context manager)"""
         self.cache_service = get_cache_service()
@@ -59,12 +64,22 @@ class DataCompletenessService:
         """Generate cache key for completeness matrix"""
         return "data_completeness:matrix"
 
-    def _calculate_freshness_status(self, timeframe: str, last_timestamp: Optional[int]) -> str:
+    def _expected_minimum(self, timeframe: str, instrument: Optional[str] = None) -> int:
+        """Bars a complete series has over the timeframe's history window, from the session calendar"""
+        now = datetime.now()
+        days_back = self.HISTORICAL_DAYS.get(timeframe, 60)
+        return expected_bars(now - timedelta(days=days_back), now, timeframe, instrument)
+
+    def _calculate_freshness_status(self, timeframe: str, last_timestamp: Optional[int],
+                                    instrument: Optional[str] = None) -> str:
         """Calculate freshness status based on data age
 
+        Only trading time counts, so data is not stale over weekends and holidays.
+
         Args:
             timeframe: The timeframe to check
             last_timestamp: Unix timestamp of most recent data
+            instrument: Instrument whose trading sessions apply
 
         Returns:
             'fresh', 'stale', or 'missing'
@@ -73,37 +88,38 @@ class DataCompletenessService:
             return 'missing'
 
         threshold_hours = self.FRESHNESS_THRESHOLDS_HOURS.get(timeframe, 72)
-        threshold_timestamp = datetime.now() - timedelta(hours=threshold_hours)
+        trading_seconds = session_seconds(last_timestamp, datetime.now(), instrument)
 
-        data_datetime = datetime.fromtimestamp(last_timestamp)
-
-        if data_datetime >= threshold_timestamp:
+        if trading_seconds <= threshold_hours * 3600:
             return 'fresh'
         else:
             return 'stale'
 
-    def _calculate_completeness_pct(self, record_count: int, timeframe: str) -> float:
+    def _calculate_completeness_pct(self, record_count: int, timeframe: str,
+                                    instrument: Optional[str] = None) -> float:
         """Calculate completeness percentage based on expected minimum
 
         Args:
             record_count: Actual number of records
             timeframe: The timeframe to check
+            instrument: Instrument whose trading sessions apply
 
         Returns:
             Percentage of expected minimum (can exceed 100%)
         """
-        expected = self.EXPECTED_MINIMUMS.get(timeframe, 1000)
+        expected = self._expected_minimum(timeframe, instrument)
         if expected == 0:
             return 100.0
 
         return round((record_count / expected) * 100, 1)
 
-    def _determine_status(self, record_count: int, timeframe: str) -> str:
+    def _determine_status(self, record_count: int, timeframe: str, instrument: Optional[str] = None) -> str:
         """Determine status based on record count vs expected minimum
 
         Args:
             record_count: Actual number of records
             timeframe: The timeframe to check
+            instrument: Instrument whose trading sessions apply
 
         Returns:
             'complete', 'partial', or 'missing'
@@ -111,10 +127,8 @@ class DataCompletenessService:
         if record_count == 0:
             return 'missing'
 
-        expected = self.EXPECTED_MINIMUMS.get(timeframe, 1000)
-        percentage = (record_count / expected) * 100
-
-        if percentage >= 100:
+        expected = self._expected_minimum(timeframe, instrument)
+        if record_count >= expected:
             return 'complete'
         else:
             return 'partial'
@@ -197,13 +211,13 @@ class DataCompletenessService:
                 record_count = data['count']
                 last_timestamp = data['latest']
 
-                status = self._determine_status(record_count, timeframe)
-                freshness = self._calculate_freshness_status(timeframe, last_timestamp)
+                status = self._determine_status(record_count, timeframe, instrument)
+                freshness = self._calculate_freshness_status(timeframe, last_timestamp, instrument)
 
                 matrix[instrument][timeframe] = {
                     'record_count': record_count,
-                    'expected_minimum': self.EXPECTED_MINIMUMS.get(timeframe, 0),
-                    'completeness_pct': self._calculate_completeness_pct(record_count, timeframe),
+                    'expected_minimum': self._expected_minimum(timeframe, instrument),
+                    'completeness_pct': self._calculate_completeness_pct(record_count, timeframe, instrument),
                     'status': status,
                     'last_timestamp': datetime.fromtimestamp(last_timestamp).isoformat() if last_timestamp else None,
                     'data_age_hours': self._calculate_data_age_hours(last_timestamp),
@@ -275,6 +289,13 @@ class DataCompletenessService:
                 'valid_timeframes': self.PRIORITY_TIMEFRAMES
             }
 
+        # Calculate expected date range based on Yahoo Finance limits
+        days_back = self.HISTORICAL_DAYS.get(timeframe, 60)
+        now = datetime.now()
+        window_start = now - timedelta(days=days_back)
+        expected_start = window_start.strftime('%Y-%m-%d')
+        expected_end = now.strftime('%Y-%m-%d')
+
         # Query for details
         try:
             with self._get_db_connection() as db:
@@ -288,6 +309,10 @@ class DataCompletenessService:
                 record_count = row[0] if row else 0
                 latest_timestamp = row[1] if row else None
                 earliest_timestamp = row[2] if row else None
+
+                # Missing in-session bars of the expected window, minus known-empty ranges
+                gaps = db.find_ohlc_gaps(instrument, timeframe,
+                                         int(window_start.timestamp()), int(now.timestamp()))
         except Exception as e:
             logger.error(f"Database query failed for gap details: {e}")
             return {
@@ -295,30 +320,17 @@ class DataCompletenessService:
                 'status': 'error'
             }
 
-        status = self._determine_status(record_count, timeframe)
-        expected_minimum = self.EXPECTED_MINIMUMS.get(timeframe, 0)
-
-        # Calculate expected date range based on Yahoo Finance limits
-        historical_days = {
-            '1m': 7,
-            '5m': 60,
-            '15m': 60,
-            '1h': 365,
-            '4h': 365,
-            '1d': 365
-        }
-        days_back = historical_days.get(timeframe, 60)
-        expected_start = (datetime.now() - timedelta(days=days_back)).strftime('%Y-%m-%d')
-        expected_end = datetime.now().strftime('%Y-%m-%d')
+        status = self._determine_status(record_count, timeframe, instrument)
+        expected_minimum = self._expected_minimum(timeframe, instrument)
 
         return {
             'instrument': instrument,
             'timeframe': timeframe,
             'record_count': record_count,
             'expected_minimum': expected_minimum,
-            'completeness_pct': self._calculate_completeness_pct(record_count, timeframe),
+            'completeness_pct': self._calculate_completeness_pct(record_count, timeframe, instrument),
             'status': status,
-            'freshness_status': self._calculate_freshness_status(timeframe, latest_timestamp),
+            'freshness_status': self._calculate_freshness_status(timeframe, latest_timestamp, instrument),
             'data_age_hours': self._calculate_data_age_hours(latest_timestamp),
             'date_range': {
                 'earliest': datetime.fromtimestamp(earliest_timestamp).isoformat() if earliest_timestamp else None,
@@ -326,6 +338,16 @@ class DataCompletenessService:
                 'expected_start': expected_start,
                 'expected_end': expected_end
             },
+            'gap_count': len(gaps),
+            'missing_bars': missing_bar_count(gaps, timeframe),
+            'gaps': [
+                {
+                    'start': datetime.fromtimestamp(gap_start).isoformat(),
+                    'end': datetime.fromtimestamp(gap_end).isoformat(),
+                    'missing_bars': missing_bar_count([(gap_start, gap_end)], timeframe)
+                }
+                for gap_start, gap_end in gaps[-self.MAX_REPORTED_GAPS:]
+            ],
             'repair_available': True,
             'yahoo_symbol': f"{instrument}=F"
         }
@@ -9,9 +9,13 @@ import time
 from typing import List, Dict, Tuple, Optional
 import logging
 from scripts.TradingLog_db import FuturesDB
-from config import config, YAHOO_FINANCE_CONFIG
+from config import config, YAHOO_FINANCE_CONFIG, OHLC_RESAMPLE_CONFIG
 from services.redis_cache_service import get_cache_service
 from services.symbol_service import symbol_service
+from services.ohlc_resampler import BASE_TIMEFRAME, DERIVED_TIMEFRAMES, OHLCResampler
+from services.ohlc_empty_ranges import EmptyRangeLedger, bar_free_ranges, subtract_known_empty
+from services.session_calendar import (expected_bars, get_session_calendar, is_session_open, market_holidays,
+                                      session_seconds)
 from services.error_handling import CircuitBreaker, RateLimitError, NetworkError, DataQualityError, InvalidSymbolError
 import redis
 
@@ -256,13 +260,6 @@ class OHLCDataService:
             recovery_timeout=error_handling_config.get('circuit_breaker_timeout', 300)
         )
         
-        self.market_open_utc = {
-            'sunday': 22, 'monday': 22, 'tuesday': 22,
-            'wednesday': 22, 'thursday': 22, 'friday': 21
-        }
-        
-        self.maintenance_break = (21, 22)
-
         # REMOVED: self._migrate_instrument_names()
         # Contract-specific OHLC data must be preserved for accurate rollover handling.
         # Different contract months (MNQ SEP25 vs MNQ DEC25) have completely different prices.
@@ -412,7 +409,15 @@ class OHLCDataService:
             if data.empty:
                 self.logger.warning(f"❌ No data returned for {instrument} {timeframe}")
                 self.logger.warning(f"Possible reasons: Symbol delisted, incorrect format, API rate limit, or market closed")
+                if self._covers_one_session_at_most(instrument, start_date, end_date):
+                    self._record_empty_ranges(instrument, timeframe, [(start_date.timestamp(), end_date.timestamp())])
                 return []
+
+            # Stretches without bars in a response that has data are confirmed empty
+            bars = (data.index.asi8 // 10**9).tolist()
+            self._record_empty_ranges(instrument, timeframe, bar_free_ranges(
+                bars, int(start_date.timestamp()), int(end_date.timestamp()), self._get_timeframe_seconds(timeframe)
+            ))
             
             ohlc_records = []
             # Store with full contract name (e.g., "MNQ SEP25") to keep contract-specific data separate
@@ -455,141 +460,79 @@ class OHLCDataService:
             self.logger.error(f"═══════════════════════════════")
             return []
 
-    def get_market_holidays(self, year: int) -> List[datetime]:
-        """Get major US market holidays that affect futures trading"""
-        import calendar
-
-        holidays = []
-
-        # New Year's Day
-        holidays.append(datetime(year, 1, 1))
-
-        # Martin Luther King Jr. Day (3rd Monday in January)
-        jan_1 = datetime(year, 1, 1)
-        days_to_monday = (7 - jan_1.weekday()) % 7
-        first_monday_jan = jan_1 + timedelta(days=days_to_monday)
-        mlk_day = first_monday_jan + timedelta(weeks=2)
-        holidays.append(mlk_day)
-
-        # Presidents Day (3rd Monday in February)
-        feb_1 = datetime(year, 2, 1)
-        days_to_monday = (7 - feb_1.weekday()) % 7
-        first_monday_feb = feb_1 + timedelta(days=days_to_monday)
-        presidents_day = first_monday_feb + timedelta(weeks=2)
-        holidays.append(presidents_day)
-
-        # Good Friday (Friday before Easter)
-        easter = self._calculate_easter(year)
-        good_friday = easter - timedelta(days=2)
-        holidays.append(good_friday)
-
-        # Memorial Day (last Monday in May)
-        may_31 = datetime(year, 5, 31)
-        days_back_to_monday = (may_31.weekday() - 0) % 7
-        memorial_day = may_31 - timedelta(days=days_back_to_monday)
-        holidays.append(memorial_day)
-
-        # Independence Day
-        july_4 = datetime(year, 7, 4)
-        if july_4.weekday() == 5:  # Saturday
-            holidays.append(july_4 - timedelta(days=1))  # Friday
-        elif july_4.weekday() == 6:  # Sunday
-            holidays.append(july_4 + timedelta(days=1))  # Monday
-        else:
-            holidays.append(july_4)
-
-        # Labor Day (1st Monday in September)
-        sep_1 = datetime(year, 9, 1)
-        days_to_monday = (7 - sep_1.weekday()) % 7
-        labor_day = sep_1 + timedelta(days=days_to_monday)
-        holidays.append(labor_day)
-
-        # Thanksgiving (4th Thursday in November)
-        nov_1 = datetime(year, 11, 1)
-        days_to_thursday = (3 - nov_1.weekday()) % 7
-        first_thursday_nov = nov_1 + timedelta(days=days_to_thursday)
-        thanksgiving = first_thursday_nov + timedelta(weeks=3)
-        holidays.append(thanksgiving)
-
-        # Christmas
-        christmas = datetime(year, 12, 25)
-        if christmas.weekday() == 5:  # Saturday
-            holidays.append(christmas - timedelta(days=1))  # Friday
-        elif christmas.weekday() == 6:  # Sunday
-            holidays.append(christmas + timedelta(days=1))  # Monday
-        else:
-            holidays.append(christmas)
-
-        return holidays
-
-    def _calculate_easter(self, year: int) -> datetime:
-        """Calculate Easter date using simple algorithm"""
-        a = year % 19
-        b = year // 100
-        c = year % 100
-        d = b // 4
-        e = b % 4
-        f = (b + 8) // 25
-        g = (b - f + 1) // 3
-        h = (19 * a + b - d - g + 15) % 30
-        i = c // 4
-        k = c % 4
-        l = (32 + 2 * e + 2 * i - h - k) % 7
-        m = (a + 11 * h + 22 * l) // 451
-        month = (h + l - 7 * m + 114) // 31
-        day = ((h + l - 7 * m + 114) % 31) + 1
-        return datetime(year, month, day)
+    def _covers_one_session_at_most(self, instrument: str, start_date: datetime, end_date: datetime) -> bool:
+        """Whether an empty response for the window plausibly means the market was closed
 
-    def is_market_holiday(self, timestamp: datetime) -> bool:
-        """Check if the given date is a market holiday"""
-        date_only = timestamp.date()
-        year = timestamp.year
+        Throttling and symbol problems also come back empty, so an empty
+        response only confirms a window that overlaps at most one trading
+        session (an unlisted holiday, or no session at all). An empty
+        backfill window proves nothing and is fetched again next time.
+        """
+        start, end = int(start_date.timestamp()), int(end_date.timestamp())
+        opens, _ = get_session_calendar(start, end, instrument).sessions_between(start, end)
+        if len(opens) > 1:
+            self.logger.info(f"Not recording {instrument} {start_date} to {end_date} as empty: spans {len(opens)} sessions")
+            return False
+        return True
 
-        holidays = self.get_market_holidays(year)
-        if timestamp.month == 12:  # Also check next year's holidays
-            holidays.extend(self.get_market_holidays(year + 1))
+    def _record_empty_ranges(self, instrument: str, timeframe: str, ranges: List[Tuple[float, float]]):
+        """Remember that Yahoo has no data for ranges (see services/ohlc_empty_ranges.py)"""
+        if not ranges:
+            return
+        try:
+            EmptyRangeLedger().record_ranges(
+                self._normalize_for_ohlc_storage(instrument), timeframe,
+                [(int(start), int(end)) for start, end in ranges]
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not record empty ranges for {instrument} {timeframe}: {e}")
 
-        holiday_dates = [h.date() for h in holidays]
-        return date_only in holiday_dates
+    def _subtract_known_empty(self, storage_instrument: str, timeframe: str,
+                              start_date: datetime, end_date: datetime) -> Tuple[Optional[Tuple[datetime, datetime]], int]:
+        """Fetch window minus the ranges known to be empty
 
-    def is_market_open(self, timestamp: datetime) -> bool:
-        """Check if market is open at given time with holiday awareness"""
-        if self.is_market_holiday(timestamp):
-            return False
+        Remainders shorter than one bar are not worth a request.
 
-        weekday = timestamp.weekday()
-        hour_utc = timestamp.hour
-
-        if weekday == 5: return False
-        if weekday == 6: return hour_utc >= 22
-        if weekday <= 3:
-            if self.maintenance_break[0] <= hour_utc < self.maintenance_break[1]:
-                return False
-            return True
-        if weekday == 4: return hour_utc < 21
+        Returns:
+            (window from the first to the last remaining range or None when
+            nothing remains, 1 if the ledger trimmed the window else 0)
+        """
+        try:
+            remaining, ledger_hits = EmptyRangeLedger().subtract(
+                storage_instrument, timeframe, [(int(start_date.timestamp()), int(end_date.timestamp()))]
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not check empty range ledger for {storage_instrument} {timeframe}: {e}")
+            return (start_date, end_date), 0
+        bar_seconds = self._get_timeframe_seconds(timeframe)
+        remaining = [(start, end) for start, end in remaining if end - start >= bar_seconds]
+        if not remaining:
+            return None, ledger_hits
+        if not ledger_hits:
+            return (start_date, end_date), 0
+        return (datetime.fromtimestamp(remaining[0][0]), datetime.fromtimestamp(remaining[-1][1])), ledger_hits
 
-        return True
+    def get_market_holidays(self, year: int) -> List[datetime]:
+        """Get major US market holidays that affect futures trading"""
+        return [datetime.combine(holiday, datetime.min.time()) for holiday in market_holidays(year)]
 
-    def is_trading_session_active(self, timestamp: datetime) -> bool:
-        """More granular check for active trading sessions including pre/post market"""
-        if self.is_market_holiday(timestamp):
-            return False
+    def is_market_holiday(self, timestamp: datetime) -> bool:
+        """Check if the given date is a market holiday"""
+        return timestamp.date() in market_holidays(timestamp.year)
 
-        weekday = timestamp.weekday()
-        hour_utc = timestamp.hour
+    def _session_timestamp(self, timestamp: datetime) -> int:
+        # Naive datetimes are read as UTC here, as the hour-based checks these replace did
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp())
 
-        # Extended trading hours for futures (almost 24/5)
-        if weekday == 5:  # Saturday - closed
-            return False
-        elif weekday == 6:  # Sunday - opens at 5 PM ET (22 UTC)
-            return hour_utc >= 22
-        elif weekday <= 3:  # Monday-Thursday
-            # Closed only during brief maintenance window
-            return not (21 <= hour_utc < 22)
-        elif weekday == 4:  # Friday - closes at 4 PM ET (21 UTC)
-            return hour_utc < 21
+    def is_market_open(self, timestamp: datetime) -> bool:
+        """Check if market is open at given time, from the session calendar"""
+        return is_session_open(self._session_timestamp(timestamp))
 
-        return True
+    def is_trading_session_active(self, timestamp: datetime) -> bool:
+        """Check if a Globex trading session is active (outside weekends, holidays and the daily halt)"""
+        return is_session_open(self._session_timestamp(timestamp))
 
     def get_expected_freshness_window(self, timeframe: str) -> int:
         """Get expected data freshness window in seconds for different timeframes
@@ -635,12 +578,13 @@ class OHLCDataService:
 
                 latest_timestamp = latest_data
                 latest_datetime = datetime.fromtimestamp(latest_timestamp)
-                time_since_last = (current_time - latest_datetime).total_seconds()
 
-                # Only consider it stale if market should be open
-                if self.is_trading_session_active(current_time) and time_since_last > freshness_window:
+                # Only trading time counts towards staleness
+                trading_since_last = session_seconds(latest_timestamp, current_time, instrument)
+                if trading_since_last > freshness_window:
                     self.logger.warning(f"Stale data detected for {instrument} {timeframe}: "
-                                      f"Latest data from {latest_datetime}, {time_since_last/60:.1f} minutes ago")
+                                      f"Latest data from {latest_datetime}, "
+                                      f"{trading_since_last/60:.1f} trading minutes ago")
                     return True
 
                 return False
@@ -679,9 +623,9 @@ class OHLCDataService:
                         staleness_seconds = (current_time - latest_datetime).total_seconds()
                         staleness_minutes = staleness_seconds / 60
 
-                        # Check if data is stale
+                        # Check if data is stale (only trading time counts)
                         freshness_window = self.get_expected_freshness_window(timeframe)
-                        is_stale = staleness_seconds > freshness_window and self.is_market_open(current_time)
+                        is_stale = session_seconds(latest_timestamp, current_time, instrument) > freshness_window
 
                         if is_stale:
                             status = 'stale'
@@ -909,6 +853,11 @@ class OHLCDataService:
                         self.logger.info(f"Added recent data gap for {instrument} {timeframe}: "
                                        f"{datetime.fromtimestamp(latest_timestamp)} to {datetime.fromtimestamp(current_timestamp)}")
 
+                        # find_ohlc_gaps already skips known-empty ranges; apply the ledger to the recent gap too
+                        gaps, ledger_hits = subtract_known_empty(db.conn, instrument, timeframe, gaps)
+                        if ledger_hits:
+                            self.logger.info(f"Skipped known-empty ranges for {instrument} {timeframe}")
+
                 if not gaps:
                     self.logger.info(f"No gaps found for {instrument} {timeframe}")
                     return True
@@ -931,7 +880,8 @@ class OHLCDataService:
                     gap_end_dt = datetime.fromtimestamp(gap_end_ts)
 
                     # Skip gaps during market closure
-                    if not self.is_market_open(gap_start_dt):
+                    if not expected_bars(gap_start_ts, gap_end_ts + self._get_timeframe_seconds(timeframe),
+                                         timeframe, instrument):
                         continue
 
                     self.logger.info(f"Filling gap: {gap_start_dt} to {gap_end_dt}")
@@ -1157,18 +1107,59 @@ class OHLCDataService:
         start_date = end_date - timedelta(days=days_limit)
         return start_date, end_date
 
+    def _get_resampled_timeframes(self, timeframes: List[str]) -> List[str]:
+        """Timeframes derived locally from 1m bars instead of fetched (see services/ohlc_resampler.py)"""
+        if not OHLC_RESAMPLE_CONFIG['enabled']:
+            return []
+        return [tf for tf in timeframes if tf in DERIVED_TIMEFRAMES and tf in OHLC_RESAMPLE_CONFIG['timeframes']]
+
+    def _get_pre_resample_window(self, storage_instrument: str, timeframe: str,
+                                 start_date: datetime) -> Optional[Tuple[datetime, datetime]]:
+        """Part of a resampled timeframe's fetch window older than the stored 1m history
+
+        Resampled timeframes are only fetched from Yahoo for history the 1m
+        bars cannot provide, and only once: the window is skipped when stored
+        bars of the timeframe already reach its start.
+
+        Returns:
+            (start_date, first 1m bar) to fetch, or None
+        """
+        if timeframe not in self.ALL_YAHOO_TIMEFRAMES:
+            return None
+
+        with FuturesDB() as db:
+            earliest_base = db.get_earliest_ohlc_timestamp(storage_instrument, BASE_TIMEFRAME)
+            earliest_stored = db.get_earliest_ohlc_timestamp(storage_instrument, timeframe)
+
+        if earliest_base is None:
+            # No 1m history to resample from yet
+            return start_date, datetime.now()
+
+        # Tolerate a weekend (plus holiday) between the window start and the first bar
+        slack = timedelta(days=4).total_seconds()
+        start_ts = start_date.timestamp()
+        if earliest_base <= start_ts + slack:
+            return None
+        if earliest_stored is not None and earliest_stored <= start_ts + slack:
+            return None
+        return start_date, datetime.fromtimestamp(earliest_base)
+
     def _sync_instrument(self, instrument: str, timeframes: List[str]) -> Dict[str, any]:
         """Sync all timeframes for a single instrument with automatic 365-day backfill
 
         Detects zero-record instruments and triggers automatic backfill for up to 365 days
         of historical data (respecting Yahoo Finance API limits per timeframe).
 
+        Timeframes enabled in OHLC_RESAMPLE_CONFIG are resampled from the
+        stored 1m bars after 1m is synced; Yahoo is only asked for the part of
+        their window older than the 1m history.
+
         Args:
             instrument: Yahoo Finance symbol (e.g., 'NQ=F')
             timeframes: List of timeframes to sync
 
         Returns:
-            Dictionary with sync statistics including backfill metrics
+            Dictionary with sync statistics including backfill and resample metrics
         """
         stats = {
             'instrument': instrument,
@@ -1177,11 +1168,20 @@ class OHLCDataService:
             'candles_added': 0,
             'api_calls': 0,
             'errors': [],
-            'backfilled_timeframes': []
+            'backfilled_timeframes': [],
+            'resampled_timeframes': [],
+            'candles_resampled': 0,
+            'ledger_hits': 0
         }
 
         self.logger.info(f"Syncing {instrument} for {len(timeframes)} timeframes...")
         base_instrument = self._get_base_instrument(instrument)
+        storage_instrument = self._normalize_for_ohlc_storage(instrument)
+
+        resampled_timeframes = self._get_resampled_timeframes(timeframes)
+        if resampled_timeframes:
+            # 1m is the resample source: sync it first, even when not requested
+            timeframes = [BASE_TIMEFRAME] + [tf for tf in timeframes if tf != BASE_TIMEFRAME]
 
         for timeframe in timeframes:
             try:
@@ -1197,10 +1197,31 @@ class OHLCDataService:
                     actual_backfill_days = min(365, days_limit)
                     end_date = datetime.now()
                     start_date = end_date - timedelta(days=actual_backfill_days)
+                else:
+                    # NORMAL SYNC MODE: Records exist - use standard fetch window
+                    start_date, end_date = self._get_fetch_window(timeframe)
+
+                if timeframe in resampled_timeframes:
+                    window = self._get_pre_resample_window(storage_instrument, timeframe, start_date)
+                    if window is None:
+                        self.logger.debug(f"  {timeframe}: Resampled from 1m, no Yahoo fetch needed")
+                        continue
+                    start_date, end_date = window
+                    self.logger.debug(f"  {timeframe}: Fetching history older than the 1m bars")
 
+                # Skip ranges Yahoo already returned no data for
+                window, ledger_hits = self._subtract_known_empty(storage_instrument, timeframe, start_date, end_date)
+                stats['ledger_hits'] += ledger_hits
+                if window is None:
+                    self.logger.debug(f"  {timeframe}: Fetch window known to be empty, skipping")
+                    continue
+                start_date, end_date = window
+
+                if is_backfill:
                     self.logger.info(
                         f"BACKFILL: Zero records detected for {base_instrument} {timeframe} - "
-                        f"fetching {actual_backfill_days} days (API limit: {days_limit}d)"
+                        f"fetching {(end_date - start_date).days} days "
+                        f"(API limit: {self.HISTORICAL_LIMITS.get(timeframe, 365)}d)"
                     )
                     self.logger.info(
                         f"BACKFILL: Date range {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
@@ -1208,8 +1229,6 @@ class OHLCDataService:
 
                     stats['backfilled_timeframes'].append(timeframe)
                 else:
-                    # NORMAL SYNC MODE: Records exist - use standard fetch window
-                    start_date, end_date = self._get_fetch_window(timeframe)
                     self.logger.debug(f"  {timeframe}: Normal sync ({record_count} existing records)")
 
                 # Fetch OHLC data (same flow for both backfill and normal sync)
@@ -1218,19 +1237,10 @@ class OHLCDataService:
 
                 if data:
                     # Insert into database using batch optimization
-                    inserted_count = 0
                     with FuturesDB() as db:
-                        for record in data:
-                            try:
-                                db.insert_ohlc_data(
-                                    record['instrument'], record['timeframe'], record['timestamp'],
-                                    record['open_price'], record['high_price'], record['low_price'],
-                                    record['close_price'], record['volume']
-                                )
-                                inserted_count += 1
-                            except Exception as e:
-                                # Skip duplicates silently
-                                pass
+                        if not db.insert_ohlc_batch(data):
+                            raise RuntimeError(f"Failed to store {len(data)} candles")
+                        inserted_count = len(data)
 
                         # Update cache if cache service available with smart TTL
                         if self.cache_service and data:
@@ -1243,7 +1253,8 @@ class OHLCDataService:
                             )
 
                     stats['candles_added'] += inserted_count
-                    stats['timeframes_synced'] += 1
+                    if timeframe not in resampled_timeframes:
+                        stats['timeframes_synced'] += 1
 
                     if is_backfill:
                         self.logger.info(
@@ -1256,7 +1267,8 @@ class OHLCDataService:
                     if is_backfill:
                         log_msg = f"BACKFILL: No data available for {base_instrument} {timeframe}"
                     self.logger.warning(log_msg)
-                    stats['timeframes_failed'] += 1
+                    if timeframe not in resampled_timeframes:
+                        stats['timeframes_failed'] += 1
 
                 # Exponential backoff between timeframe requests to avoid rate limiting
                 # This increases delay progressively: 2s, 3s, 4.5s, 6.75s, etc.
@@ -1265,9 +1277,21 @@ class OHLCDataService:
             except Exception as e:
                 error_msg = f"{timeframe}: {str(e)}"
                 stats['errors'].append(error_msg)
-                stats['timeframes_failed'] += 1
+                if timeframe not in resampled_timeframes:
+                    stats['timeframes_failed'] += 1
                 self.logger.error(f"  Failed to sync {instrument} {timeframe}: {e}")
 
+        if resampled_timeframes:
+            try:
+                resample_stats = OHLCResampler().resample_instrument(storage_instrument, resampled_timeframes)
+                stats['resampled_timeframes'] = resampled_timeframes
+                stats['candles_resampled'] = sum(resample_stats['bars_written'].values())
+                stats['timeframes_synced'] += len(resampled_timeframes)
+            except Exception as e:
+                stats['errors'].append(f"resample: {str(e)}")
+                stats['timeframes_failed'] += len(resampled_timeframes)
+                self.logger.error(f"  Failed to resample {instrument} {', '.join(resampled_timeframes)}: {e}")
+
         return stats
 
     def sync_instruments(self, instruments: List[str], timeframes: List[str] = None,
@@ -1347,6 +1371,8 @@ class OHLCDataService:
             'timeframes_synced': 0,
             'timeframes_failed': 0,
             'candles_added': 0,
+            'candles_resampled': 0,
+            'ledger_hits': 0,
             'api_calls': 0,
             'duration_seconds': 0,
             'instrument_details': []
@@ -1360,6 +1386,8 @@ class OHLCDataService:
                 overall_stats['timeframes_synced'] += instrument_stats['timeframes_synced']
                 overall_stats['timeframes_failed'] += instrument_stats['timeframes_failed']
                 overall_stats['candles_added'] += instrument_stats['candles_added']
+                overall_stats['candles_resampled'] += instrument_stats['candles_resampled']
+                overall_stats['ledger_hits'] += instrument_stats['ledger_hits']
                 overall_stats['api_calls'] += instrument_stats['api_calls']
 
                 if instrument_stats['timeframes_failed'] > 0:
@@ -1399,7 +1427,9 @@ class OHLCDataService:
         self.logger.info(f"Timeframes: {stats['timeframes_synced']} succeeded, "
                         f"{stats['timeframes_failed']} failed")
         self.logger.info(f"Candles Added: {stats['candles_added']}")
+        self.logger.info(f"Candles Resampled: {stats['candles_resampled']}")
         self.logger.info(f"API Calls: {stats['api_calls']}")
+        self.logger.info(f"Known-Empty Ranges Skipped: {stats['ledger_hits']}")
 
         if stats['instruments_failed'] > 0 or stats['timeframes_failed'] > 0:
             self.logger.warning("⚠️  Sync completed with failures - check logs for details")
@@ -5,26 +5,39 @@ Integrates the new modular position algorithms with the existing position servic
 Maintains backward compatibility while providing improved maintainability.
 """
 
+import os
+import pickle
+import queue
 import sqlite3
+import tempfile
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from decimal import Decimal
 import logging
 
+import billiard
+from billiard.exceptions import WorkerLostError
+
 from services.position_algorithms import (
     calculate_running_quantity,
     group_executions_by_position,
     calculate_position_pnl,
     validate_position_boundaries,
     aggregate_position_statistics,
-    create_position_summary
+    create_position_summary,
+    peak_rss_mb,
+    stream_trade_groups
 )
 
 
 # Import domain services for position building
-from domain.services.position_builder import PositionBuilder
-from domain.services.pnl_calculator import PnLCalculator
-from domain.models.trade import Trade, MarketSide
+from domain.models.execution_batch import ExecutionBatch
+from domain.models.trade import MarketSide
+from domain.models.position import PositionStatus, PositionType
+from scripts.write_queue import run_write
+from services.position_engine import PositionEngine
+from services.running_quantity import refresh_running_quantities
 
 # Get logger
 logger = logging.getLogger('enhanced_position_service_v2')
@@ -38,6 +51,20 @@ class EnhancedPositionServiceV2:
     the new modular, testable functions internally.
     """
 
+    POSITION_INSERT_COLUMNS = (
+        'instrument', 'account', 'position_type', 'entry_time', 'exit_time',
+        'total_quantity', 'average_entry_price', 'average_exit_price',
+        'total_points_pnl', 'total_dollars_pnl', 'total_commission',
+        'position_status', 'execution_count', 'max_quantity', 'risk_reward_ratio',
+        'validation_status'
+    )
+    EXECUTION_PAIR_COLUMNS = (
+        'entry_trade_id', 'exit_trade_id', 'entry_time', 'exit_time', 'quantity',
+        'entry_price', 'exit_price', 'points_pnl', 'dollars_pnl',
+        'entry_commission', 'exit_commission'
+    )
+    SQL_VARIABLE_CHUNK = 900  # IDs per IN (...) list, under SQLite's host parameter limit
+
     def __init__(self, db_path: str = None):
         from config import config
         self.db_path = db_path or config.db_path
@@ -61,6 +88,16 @@ class EnhancedPositionServiceV2:
                 self.conn.rollback()
             self.conn.close()
 
+    def initialize_schema(self, conn: sqlite3.Connection) -> None:
+        """Create the positions tables on a bootstrap connection (see scripts/database_bootstrap.py)"""
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self._create_positions_table()
+
+    def _run_write(self, fn):
+        """Run a write job through the single-writer queue (see scripts/write_queue.py)"""
+        return run_write(self.db_path, fn, self.conn)
+
     def _create_positions_table(self):
         """Create the positions table for aggregated position tracking"""
         self.cursor.execute("""
@@ -121,35 +158,175 @@ class EnhancedPositionServiceV2:
             ON position_executions(position_id)
         """)
 
+        # Trade -> position lookups (reversal executions, orphaned executions)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_position_executions_trade_id
+            ON position_executions(trade_id)
+        """)
+
+        self._create_execution_pairs_table()
+        self._create_rebuild_checkpoints_table()
+
         self.conn.commit()
 
-    def rebuild_positions_from_trades(self) -> Dict[str, int]:
-        """Rebuild all positions from existing trades data using new algorithms"""
-        logger.info("Starting position rebuild using enhanced algorithms")
+    def _create_execution_pairs_table(self):
+        """
+        Create the table of FIFO entry/exit pairs per position.
 
-        # Clear existing positions
-        self.cursor.execute("DELETE FROM position_executions")
-        self.cursor.execute("DELETE FROM positions")
+        Pairs are computed by the position builder while it builds (see
+        PositionBuilder.build_execution_pairs_from_batch) and written with
+        their position, so reading them is one indexed query. A trigger
+        drops a position's pairs when the position is deleted by any code
+        path, so reused position IDs never see stale pairs.
+        """
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS position_execution_pairs (
+                id INTEGER PRIMARY KEY,
+                position_id INTEGER NOT NULL,
+                pair_number INTEGER NOT NULL,  -- FIFO order within the position
+                entry_trade_id INTEGER,
+                exit_trade_id INTEGER,
+                entry_time TIMESTAMP,
+                exit_time TIMESTAMP,
+                quantity INTEGER NOT NULL,
+                entry_price REAL NOT NULL,
+                exit_price REAL NOT NULL,
+                points_pnl REAL NOT NULL,
+                dollars_pnl REAL NOT NULL,
+                entry_commission REAL NOT NULL DEFAULT 0,
+                exit_commission REAL NOT NULL DEFAULT 0,
+                FOREIGN KEY (position_id) REFERENCES positions (id),
+                UNIQUE(position_id, pair_number)
+            )
+        """)
 
-        # Get all trades grouped by account and instrument (excluding deleted trades)
         self.cursor.execute("""
-            SELECT * FROM trades
-            WHERE deleted = 0 OR deleted IS NULL
-            ORDER BY account, instrument, entry_time
+            CREATE TRIGGER IF NOT EXISTS trg_positions_delete_execution_pairs
+            AFTER DELETE ON positions
+            BEGIN
+                DELETE FROM position_execution_pairs WHERE position_id = OLD.id;
+            END
+        """)
+
+    def _create_rebuild_checkpoints_table(self):
+        """
+        Create the per-(account, instrument) rebuild checkpoint table.
+
+        A checkpoint is the last trade after which running quantity was zero
+        (and the next trade is strictly later). Positions up to it cannot
+        change when executions are appended, so
+        rebuild_positions_for_account_instrument() only rebuilds the trades
+        after last_flat_time. Triggers on trades drop the checkpoint when an
+        insert, edit or delete lands at or before it, forcing a full rebuild.
+        """
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS position_rebuild_checkpoints (
+                account TEXT NOT NULL,
+                instrument TEXT NOT NULL,
+                last_flat_trade_id INTEGER NOT NULL,
+                last_flat_time TIMESTAMP NOT NULL,
+                last_closed_position_id INTEGER NOT NULL,  -- position closed at the flat point
+                open_position_id INTEGER,  -- position open after the checkpoint, if any
+                open_quantity INTEGER NOT NULL DEFAULT 0,  -- running quantity after the last trade
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (account, instrument)
+            )
         """)
 
-        all_trades = [dict(row) for row in self.cursor.fetchall()]
+        triggers = [
+            ("trg_trades_checkpoint_insert", """
+                CREATE TRIGGER IF NOT EXISTS trg_trades_checkpoint_insert
+                AFTER INSERT ON trades
+                BEGIN
+                    DELETE FROM position_rebuild_checkpoints
+                    WHERE account = NEW.account AND instrument = NEW.instrument
+                      AND (NEW.entry_time IS NULL OR NEW.entry_time <= last_flat_time);
+                END
+            """),
+            ("trg_trades_checkpoint_update", """
+                CREATE TRIGGER IF NOT EXISTS trg_trades_checkpoint_update
+                AFTER UPDATE OF account, instrument, side_of_market, quantity, entry_price,
+                    exit_price, entry_time, exit_time, points_gain_loss, dollars_gain_loss,
+                    commission, entry_execution_id, deleted, trade_validation
+                ON trades
+                BEGIN
+                    DELETE FROM position_rebuild_checkpoints
+                    WHERE (account = OLD.account AND instrument = OLD.instrument
+                           AND (OLD.entry_time IS NULL OR OLD.entry_time <= last_flat_time))
+                       OR (account = NEW.account AND instrument = NEW.instrument
+                           AND (NEW.entry_time IS NULL OR NEW.entry_time <= last_flat_time));
+                END
+            """),
+            ("trg_trades_checkpoint_delete", """
+                CREATE TRIGGER IF NOT EXISTS trg_trades_checkpoint_delete
+                AFTER DELETE ON trades
+                BEGIN
+                    DELETE FROM position_rebuild_checkpoints
+                    WHERE account = OLD.account AND instrument = OLD.instrument
+                      AND (OLD.entry_time IS NULL OR OLD.entry_time <= last_flat_time);
+                END
+            """),
+        ]
 
-        # Group trades by account and instrument
-        grouped_trades = {}
-        for trade in all_trades:
-            key = (trade['account'], trade['instrument'])
-            if key not in grouped_trades:
-                grouped_trades[key] = []
-            grouped_trades[key].append(trade)
+        for trigger_name, create_sql in triggers:
+            try:
+                self.cursor.execute(create_sql)
+            except Exception as e:
+                # trades may not exist yet on a bare positions database
+                logger.warning(f"Could not create trigger {trigger_name}: {e}")
 
-        # Process each group using new algorithms
-        stats = {
+    def rebuild_positions_from_trades(self, workers: Optional[int] = None,
+                                      progress_callback: Optional[Callable[[int, int, str, str], None]] = None) -> Dict[str, int]:
+        """
+        Rebuild all positions from existing trades data using new algorithms
+
+        Account/instrument groups are independent, so large rebuilds build
+        them in worker processes (see POSITION_REBUILD_CONFIG) and persist
+        every group in one write job. Either way only one group's trades are
+        held in memory at a time; stats report the peak RSS reached.
+
+        Args:
+            workers: Worker processes to use; None picks from POSITION_REBUILD_CONFIG,
+                1 forces the serial rebuild
+            progress_callback: Called as (completed, total, account, instrument)
+                after each group is built
+        """
+        logger.info("Starting position rebuild using enhanced algorithms")
+
+        groups = [tuple(row) for row in self.conn.execute("""
+            SELECT account, instrument, COUNT(*) FROM trades
+            WHERE deleted = 0 OR deleted IS NULL
+            GROUP BY account, instrument
+            ORDER BY account, instrument
+        """).fetchall()]
+        workers = self._rebuild_workers(workers, groups)
+
+        stats = None
+        if workers > 1:
+            try:
+                stats = self._rebuild_positions_parallel(groups, workers, progress_callback)
+            except (OSError, WorkerLostError) as e:
+                logger.warning(f"Parallel position rebuild unavailable ({e}), rebuilding serially")
+
+        if stats is None:
+            # Delete and rebuild in one write job so readers never see a half-built table
+            stats = self._run_write(lambda conn: self._rebuild_all_serial(conn, progress_callback))
+
+        logger.info(f"Position rebuild completed: {stats['total_positions']} positions created, {len(stats['position_ids'])} IDs tracked")
+        return stats
+
+    def _rebuild_workers(self, workers: Optional[int], groups: List[Tuple]) -> int:
+        """Worker processes for a full rebuild of the given (account, instrument, trade count) groups"""
+        from config import POSITION_REBUILD_CONFIG
+
+        if workers is None:
+            if sum(group[2] for group in groups) < POSITION_REBUILD_CONFIG['parallel_min_trades']:
+                return 1
+            workers = POSITION_REBUILD_CONFIG['workers'] or os.cpu_count() or 1
+        return max(1, min(workers, len(groups)))
+
+    def _new_rebuild_stats(self) -> Dict[str, Any]:
+        return {
             'total_positions': 0,
             'accounts_processed': 0,
             'instruments_processed': 0,
@@ -157,9 +334,52 @@ class EnhancedPositionServiceV2:
             'position_ids': []  # Track created position IDs
         }
 
-        for (account, instrument), trades in grouped_trades.items():
+    def _clear_all_positions(self, cursor):
+        cursor.execute("DELETE FROM position_execution_pairs")
+        cursor.execute("DELETE FROM position_executions")
+        cursor.execute("DELETE FROM positions")
+        cursor.execute("DELETE FROM position_rebuild_checkpoints")
+
+    def _rebuild_all_serial(self, conn, progress_callback=None) -> Dict[str, Any]:
+        """Rebuild every account/instrument group in this process, inside the caller's write job"""
+        from config import POSITION_REBUILD_CONFIG
+
+        cursor = conn.cursor()
+
+        # Clear existing positions
+        self._clear_all_positions(cursor)
+        refresh_running_quantities(conn)
+
+        # Stream trades (excluding deleted ones) one account/instrument group at a time
+        cursor.execute("""
+            SELECT * FROM trades
+            WHERE deleted = 0 OR deleted IS NULL
+            ORDER BY account, instrument, entry_time, id
+        """)
+        groups = stream_trade_groups(
+            cursor, key=lambda trade: (trade['account'], trade['instrument']),
+            fetch_size=POSITION_REBUILD_CONFIG['fetch_size']
+        )
+        total_groups = None
+        if progress_callback:
+            total_groups = conn.execute("""
+                SELECT COUNT(*) FROM (
+                    SELECT 1 FROM trades WHERE deleted = 0 OR deleted IS NULL GROUP BY account, instrument
+                )
+            """).fetchone()[0]
+
+        # Build and save each group as soon as its last trade has been read
+        stats = self._new_rebuild_stats()
+        accounts, instruments = set(), set()
+        trades_processed = 0
+
+        for completed, ((account, instrument), trades) in enumerate(groups, start=1):
+            accounts.add(account)
+            instruments.add(instrument)
+            trades_processed += len(trades)
             try:
                 result = self._process_trades_for_instrument(trades, account, instrument)
+                self._save_rebuild_checkpoint(conn, account, instrument, result)
                 stats['total_positions'] += result['positions_created']
 
                 # Collect position IDs if returned
@@ -174,16 +394,121 @@ class EnhancedPositionServiceV2:
                 logger.error(error_msg)
                 stats['validation_errors'].append(error_msg)
 
-        stats['accounts_processed'] = len(set(key[0] for key in grouped_trades.keys()))
-        stats['instruments_processed'] = len(set(key[1] for key in grouped_trades.keys()))
+            if progress_callback:
+                progress_callback(completed, total_groups, account, instrument)
+            del trades  # release this group before the next one is read
+
+        stats['accounts_processed'] = len(accounts)
+        stats['instruments_processed'] = len(instruments)
 
         # Add expected keys for backward compatibility with routes
         stats['positions_created'] = stats['total_positions']
-        stats['trades_processed'] = len(all_trades)
+        stats['trades_processed'] = trades_processed
+        stats['workers'] = 1
+        stats['peak_rss_mb'] = peak_rss_mb()
 
-        logger.info(f"Position rebuild completed: {stats['total_positions']} positions created, {len(stats['position_ids'])} IDs tracked")
         return stats
 
+    def _rebuild_positions_parallel(self, groups: List[Tuple], workers: int, progress_callback=None) -> Dict[str, Any]:
+        """
+        Build groups in worker processes, then persist them all in one write job.
+
+        Workers read trades outside the write job, so the job compares a
+        fingerprint of the trades table with the one taken before the workers
+        started and falls back to the serial rebuild if executions changed
+        in between. Finished groups are spooled to a temporary file as they
+        arrive and read back one at a time, so the parent never holds more
+        than one group's rows.
+
+        The pool is billiard's (Celery's multiprocessing fork): Celery prefork
+        workers are daemonic, and unlike the standard library, billiard lets
+        daemonic processes start children, so the rebuild_all_positions task
+        builds in parallel too.
+        """
+        fingerprint = self._trades_fingerprint(self.conn)
+        logger.info(f"Building {len(groups)} account/instrument groups with {workers} worker processes")
+
+        with tempfile.TemporaryFile() as spool:
+            offsets = [None] * len(groups)
+            # One apply_async job per group: billiard only tracks which worker ran
+            # a job for apply_async results, and workers whose results it cannot
+            # match wait out a 30 second guard before exiting
+            finished = queue.Queue()
+            pool = billiard.Pool(processes=workers)
+            try:
+                for index, (account, instrument, _) in enumerate(groups):
+                    pool.apply_async(
+                        _build_group_rows, (self.db_path, account, instrument),
+                        callback=lambda result, index=index: finished.put((index, result, None)),
+                        error_callback=lambda einfo, index=index: finished.put((index, None, einfo.exception)),
+                    )
+                pool.close()
+                for completed in range(1, len(groups) + 1):
+                    index, result, error = finished.get()
+                    if error is not None:
+                        raise error
+                    offsets[index] = spool.tell()
+                    pickle.dump(result, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                    if progress_callback:
+                        progress_callback(completed, len(groups), result['account'], result['instrument'])
+                    del result  # keep only the spool offset
+            except BaseException:
+                pool.terminate()
+                raise
+            finally:
+                pool.join()
+
+            stats = self._run_write(lambda conn: self._persist_spooled_groups(
+                conn, spool, offsets, groups, fingerprint, progress_callback
+            ))
+
+        stats['workers'] = stats.get('workers', workers)
+        stats['peak_rss_mb'] = peak_rss_mb()
+        if stats['workers'] > 1:
+            stats['worker_peak_rss_mb'] = peak_rss_mb(children=True)
+        return stats
+
+    def _persist_spooled_groups(self, conn, spool, offsets: List[int], groups: List[Tuple], fingerprint: Tuple,
+                                progress_callback=None) -> Dict[str, Any]:
+        """Write job of the parallel rebuild: replace all positions with the spooled groups, in group order"""
+        if self._trades_fingerprint(conn) != fingerprint:
+            logger.warning("Trades changed while building positions in parallel, rebuilding serially")
+            return self._rebuild_all_serial(conn, progress_callback)
+
+        cursor = conn.cursor()
+        self._clear_all_positions(cursor)
+        refresh_running_quantities(conn)
+
+        stats = self._new_rebuild_stats()
+        for offset in offsets:
+            spool.seek(offset)
+            result = pickle.load(spool)
+            saved_ids = self._insert_positions(cursor, result['positions'], result['execution_pairs'])
+            checkpoint = None
+            if not result['validation_errors']:
+                checkpoint = self._checkpoint_from_flat_point(result['flat_point'], saved_ids)
+            self._save_rebuild_checkpoint(conn, result['account'], result['instrument'], {'checkpoint': checkpoint})
+
+            stats['total_positions'] += len(saved_ids)
+            stats['position_ids'].extend(saved_ids)
+            stats['validation_errors'].extend(result['validation_errors'])
+
+        stats['accounts_processed'] = len(set(group[0] for group in groups))
+        stats['instruments_processed'] = len(set(group[1] for group in groups))
+        stats['positions_created'] = stats['total_positions']
+        stats['trades_processed'] = sum(group[2] for group in groups)
+        return stats
+
+    def _trades_fingerprint(self, conn) -> Tuple:
+        """Cheap aggregate over the position-relevant trade columns, to detect concurrent changes"""
+        return tuple(conn.execute("""
+            SELECT COUNT(*), MAX(id), TOTAL(quantity), TOTAL(julianday(entry_time)),
+                   TOTAL(COALESCE(entry_price, exit_price)),
+                   TOTAL(LENGTH(side_of_market || account || instrument))
+            FROM trades
+            WHERE deleted = 0 OR deleted IS NULL
+        """).fetchone())
+
     def _deduplicate_trades(self, trades: List[Dict]) -> List[Dict]:
         """
         Deduplicate trades by entry_execution_id (unique NinjaTrader execution identifier).
@@ -245,99 +570,51 @@ class EnhancedPositionServiceV2:
 
 
 
-    def _process_trades_for_instrument(self, trades: List[Dict], account: str, instrument: str) -> Dict[str, Any]:
-        """Process trades for a single account/instrument combination using PositionBuilder with quantity flow analysis"""
+    def _process_trades_for_instrument(self, trades: List[Dict], account: str, instrument: str,
+                                       replace_position_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """
+        Process trades for a single account/instrument combination using PositionBuilder with quantity flow analysis
+
+        Args:
+            replace_position_ids: Stored positions the new ones replace; when
+                given they are diffed (see _apply_position_diff) instead of the
+                new positions being inserted alongside them
+        """
         if not trades:
             return {'positions_created': 0, 'position_ids': [], 'validation_errors': []}
 
         logger.info(f"Processing {len(trades)} trades for {account}/{instrument} using PositionBuilder")
 
         try:
-            # Deduplicate trades that have same timestamp/price/side (CSV import creates duplicates)
-            trades = self._deduplicate_trades(trades)
-            logger.info(f"After deduplication: {len(trades)} unique trades")
-
-            # Convert dict trades to Trade domain objects
-            trade_objects = []
-            for trade_dict in trades:
-                try:
-                    # Map side_of_market string to MarketSide enum
-                    side_str = trade_dict.get('side_of_market', '').upper()
-                    if side_str == 'BUY':
-                        market_side = MarketSide.BUY
-                    elif side_str == 'SELL':
-                        market_side = MarketSide.SELL
-                    elif side_str == 'BUYTOCOVER':
-                        market_side = MarketSide.BUY_TO_COVER
-                    elif side_str == 'SELLSHORT':
-                        market_side = MarketSide.SELL_SHORT
-                    elif side_str == 'LONG':
-                        market_side = MarketSide.LONG
-                    elif side_str == 'SHORT':
-                        market_side = MarketSide.SHORT
-                    else:
-                        logger.warning(f"Unknown side_of_market '{side_str}' for trade {trade_dict['id']}, defaulting to BUY")
-                        market_side = MarketSide.BUY
-
-                    # Create Trade domain object
-                    trade_obj = Trade(
-                        id=trade_dict['id'],
-                        instrument=trade_dict['instrument'],
-                        account=trade_dict['account'],
-                        side_of_market=market_side,
-                        quantity=trade_dict['quantity'],
-                        entry_price=trade_dict['entry_price'],
-                        exit_price=trade_dict.get('exit_price'),
-                        entry_time=datetime.fromisoformat(trade_dict['entry_time']) if isinstance(trade_dict['entry_time'], str) else trade_dict['entry_time'],
-                        exit_time=datetime.fromisoformat(trade_dict['exit_time']) if isinstance(trade_dict.get('exit_time'), str) else trade_dict.get('exit_time'),
-                        points_gain_loss=trade_dict.get('points_gain_loss', 0),
-                        dollars_gain_loss=trade_dict.get('dollars_gain_loss', 0),
-                        commission=trade_dict.get('commission', 0)
-                    )
-                    trade_objects.append(trade_obj)
-                except Exception as e:
-                    logger.error(f"Failed to convert trade dict to Trade object: {e}")
-                    continue
-
-            if not trade_objects:
-                logger.warning(f"No valid trade objects created for {account}/{instrument}")
+            built = self._build_positions_for_instrument(trades, account, instrument)
+            if built is None:
                 return {'positions_created': 0, 'position_ids': [], 'validation_errors': ['No valid trades to process']}
+            positions_with_trades, flat_point, execution_pairs = built
 
-            # Use PositionBuilder to build positions from trades using quantity flow analysis
-            pnl_calculator = PnLCalculator()
-            position_builder = PositionBuilder(pnl_calculator)
-
-            # Build positions - the PositionBuilder tracks which trades belong to each position internally
-            # We need to map positions to their trades for the database relationship
-            # Create a dict mapping trade object IDs to trade dict IDs
-            trade_id_map = {trade_obj.id: trade_dict['id'] for trade_obj, trade_dict in zip(trade_objects, trades)}
-            positions_with_trades = self._build_positions_with_trade_mapping(position_builder, trade_objects, trade_id_map, account, instrument)
-
-            logger.info(f"PositionBuilder created {len(positions_with_trades)} positions from {len(trade_objects)} trades")
-
-            # Save positions to database with trade mappings
-            positions_created = 0
+            # Save positions, their trade mappings and execution pairs in one batch
             validation_errors = []
-            position_ids = []  # Track created position IDs
-
-            for position, trade_ids in positions_with_trades:
-                try:
-                    position_id = self._save_position_to_db(position, trade_ids)
-                    if position_id:
-                        positions_created += 1
-                        position_ids.append(position_id)
-                        logger.info(f"Saved position {position_id} with {len(trade_ids)} trade mappings for {account}/{instrument}")
-                    else:
-                        logger.warning(f"Failed to save position for {account}/{instrument}")
-                except Exception as e:
-                    error_msg = f"Failed to save position: {str(e)}"
-                    logger.error(error_msg)
-                    validation_errors.append(error_msg)
+            try:
+                if replace_position_ids is None:
+                    position_ids = self._save_positions_to_db(positions_with_trades, trades, execution_pairs)
+                    changes = {'inserted': position_ids, 'updated': [], 'deleted': []}
+                else:
+                    position_ids, changes = self._save_positions_diff(
+                        positions_with_trades, trades, replace_position_ids, execution_pairs
+                    )
+                logger.info(f"Saved {len(position_ids)} positions with trade mappings for {account}/{instrument}")
+            except Exception as e:
+                error_msg = f"Failed to save positions: {str(e)}"
+                logger.error(error_msg)
+                validation_errors.append(error_msg)
+                position_ids = []
+                changes = {'inserted': [], 'updated': [], 'deleted': []}
 
             return {
-                'positions_created': positions_created,
+                'positions_created': len(position_ids),
                 'position_ids': position_ids,
-                'validation_errors': validation_errors
+                'position_changes': changes,
+                'validation_errors': validation_errors,
+                'checkpoint': None if validation_errors else self._checkpoint_from_flat_point(flat_point, position_ids)
             }
 
         except Exception as e:
@@ -349,67 +626,108 @@ class EnhancedPositionServiceV2:
                 'validation_errors': [error_msg]
             }
 
+    def _build_positions_for_instrument(self, trades: List[Dict], account: str, instrument: str) -> Optional[Tuple[List, Optional[Dict]]]:
+        """
+        Build positions for one account/instrument without touching the database.
+
+        Returns:
+            (list of (position, [trade_ids]), flat point, execution pairs per
+            position): the first two as from _build_positions_with_trade_mapping(),
+            with the flat trade's entry_time added to the flat point; None if
+            no trade converts
+        """
+        # Deduplicate trades that have same timestamp/price/side (CSV import creates duplicates)
+        trades = self._deduplicate_trades(trades)
+        logger.info(f"After deduplication: {len(trades)} unique trades")
+
+        # Validate the trades as one batch; the builder works on its arrays,
+        # so no Trade object is created per execution
+        batch, rejected = ExecutionBatch.from_dicts(trades, default_side=MarketSide.BUY)
+        for trade_dict, reason in rejected:
+            logger.error(f"Skipping trade {trade_dict.get('id')}: {reason}")
+
+        if not len(batch):
+            logger.warning(f"No valid trade objects created for {account}/{instrument}")
+            return None
+
+        position_engine = PositionEngine()
+        batch = batch.sorted_by_time()
+        positions_with_trades, flat_point = self._build_positions_with_trade_mapping(
+            position_engine, batch, account, instrument
+        )
+        execution_pairs = position_engine.build_execution_pairs_from_batch(batch, instrument)
+        if flat_point:
+            # Keep the raw DB value so later trades compare against it in SQL
+            flat_point['last_flat_time'] = next(
+                t['entry_time'] for t in trades if t['id'] == flat_point['trade_id']
+            )
+
+        logger.info(f"PositionEngine created {len(positions_with_trades)} positions from {len(batch)} trades")
+        return positions_with_trades, flat_point, execution_pairs
 
-    def _build_positions_with_trade_mapping(self, position_builder, trade_objects, trade_id_map, account, instrument):
+    def _checkpoint_from_flat_point(self, flat_point: Optional[Dict], saved_ids: List[Optional[int]]) -> Optional[Dict[str, Any]]:
+        """Rebuild checkpoint at the flat point, if every position up to it was saved"""
+        if not flat_point or not all(saved_ids[:flat_point['positions_closed']]):
+            return None
+
+        open_positions = saved_ids[flat_point['positions_closed']:]
+        return {
+            'last_flat_trade_id': flat_point['trade_id'],
+            'last_flat_time': flat_point['last_flat_time'],
+            'last_closed_position_id': saved_ids[flat_point['positions_closed'] - 1],
+            'open_position_id': open_positions[-1] if open_positions else None,
+            'open_quantity': flat_point['open_quantity'],
+        }
+
+
+    def _build_positions_with_trade_mapping(self, position_engine, batch, account, instrument):
         """
         Build positions and track which trades belong to each position.
 
         Args:
-            position_builder: PositionBuilder instance
-            trade_objects: List of Trade domain objects
-            trade_id_map: Dict mapping trade object IDs to database trade IDs
+            position_engine: PositionEngine instance
+            batch: ExecutionBatch of the trades, in chronological order
             account: Account name
             instrument: Instrument name
 
-        Returns: List of tuples (position, [trade_ids])
+        Returns: Tuple of (list of (position, [trade_ids]), flat point). The
+            flat point is the last position_close after which the next trade
+            is strictly later in time, as a dict with trade_id,
+            positions_closed (positions up to and including it) and
+            open_quantity (running quantity after the last trade); None if
+            quantity never returns to zero that way.
         """
-        from domain.services.quantity_flow_analyzer import QuantityFlowAnalyzer
-
-        # Build positions using PositionBuilder
-        positions = position_builder.build_positions_from_trades(trade_objects, account, instrument)
-
-        # Match positions with their trades using quantity flow analysis
-        sorted_trades = sorted(trade_objects, key=lambda t: t.entry_time or datetime.min)
-        flow_analyzer = QuantityFlowAnalyzer()
-        flow_events = flow_analyzer.analyze_quantity_flow(sorted_trades)
+        # Build positions with the execution range of each (a reversal
+        # trade ends the closing position and starts the opening one)
+        positions_with_spans = position_engine.build_positions_from_batch(batch, account, instrument)
 
         positions_with_trades = []
-        position_index = 0
-        current_trade_ids = []
-
-        for event in flow_events:
-            if event.event_type == 'position_start':
-                # Start tracking new position
-                current_trade_ids = [event.trade.id]
-
-            elif event.event_type in ['position_modify']:
-                # Add trade to current position
-                current_trade_ids.append(event.trade.id)
-
-            elif event.event_type == 'position_close':
-                # Close position and save mapping
-                current_trade_ids.append(event.trade.id)
-                if position_index < len(positions):
-                    positions_with_trades.append((positions[position_index], current_trade_ids))
-                    position_index += 1
-                # Clear trade IDs for next position (which will start with position_start event)
-                current_trade_ids = []
-
-            elif event.event_type == 'position_reversal':
-                # Position reversal: closes current position AND immediately starts a new one
-                # The reversal trade belongs to BOTH the closing and opening position
-                current_trade_ids.append(event.trade.id)
-                if position_index < len(positions):
-                    positions_with_trades.append((positions[position_index], current_trade_ids))
-                    position_index += 1
-                # Start new position with the reversal trade (it's the first trade of new position)
-                current_trade_ids = [event.trade.id]
-
-        # Handle any remaining open position (no position_close event)
-        if current_trade_ids and position_index < len(positions):
-            positions_with_trades.append((positions[position_index], current_trade_ids))
-
-        return positions_with_trades
+        flat_point = None
+        for position_index, (position, start, end) in enumerate(positions_with_spans, start=1):
+            positions_with_trades.append((position, batch.ids[start:end + 1]))
+
+            if position.position_status != PositionStatus.CLOSED:
+                continue
+            reversed_into_next = (
+                position_index < len(positions_with_spans)
+                and positions_with_spans[position_index][1] == end
+            )
+            # Only checkpoint where appended trades cannot tie with the flat trade's timestamp
+            last_time = batch.entry_time(end)
+            following = batch.entry_time(end + 1) if end + 1 < len(batch) else None
+            if not reversed_into_next and last_time and (following is None or following > last_time):
+                flat_point = {'trade_id': batch.ids[end], 'positions_closed': position_index}
+
+        if flat_point:
+            last_position = positions_with_spans[-1][0]
+            open_quantity = 0
+            if last_position.position_status == PositionStatus.OPEN:
+                open_quantity = last_position.total_quantity
+                if last_position.position_type == PositionType.SHORT:
+                    open_quantity = -open_quantity
+            flat_point['open_quantity'] = open_quantity
+
+        return positions_with_trades, flat_point
 
     def _aggregate_validation_status(self, executions: List[Dict]) -> Optional[str]:
         """
@@ -448,67 +766,326 @@ class EnhancedPositionServiceV2:
         # If multiple different values, return 'Mixed'
         return 'Mixed'
 
-    def _save_position_to_db(self, position, trade_ids=None) -> Optional[int]:
-        """Save a Position domain object to the database with trade mappings and validation status"""
+    def _position_row(self, position, validation_status: Optional[str]) -> Tuple:
+        """Values for a positions INSERT, in POSITION_INSERT_COLUMNS order"""
+        return (
+            position.instrument,
+            position.account,
+            position.position_type.value,  # Convert enum to string
+            position.entry_time,
+            position.exit_time,
+            position.total_quantity,
+            position.average_entry_price,
+            position.average_exit_price,
+            position.total_points_pnl,
+            position.total_dollars_pnl,
+            position.total_commission,
+            position.position_status.value,  # Convert enum to string
+            position.execution_count,
+            position.max_quantity,
+            position.risk_reward_ratio,
+            validation_status
+        )
+
+    def _validation_statuses(self, positions_with_trades: List[Tuple], trade_validation: Dict[int, Optional[str]]) -> List[Optional[str]]:
+        """Aggregated validation_status per (position, trade_ids) pair, from trade ID -> trade_validation"""
+        return [
+            self._aggregate_validation_status(
+                [{'trade_validation': trade_validation[trade_id]} for trade_id in set(trade_ids) if trade_id in trade_validation]
+            )
+            for _, trade_ids in positions_with_trades
+        ]
+
+    def _fetch_trade_validation(self, conn, trade_ids) -> Dict[int, Optional[str]]:
+        """trade_validation for the given trade IDs, in one query per chunk of IDs"""
+        trade_ids = list(set(trade_ids))
+        trade_validation = {}
+        for start in range(0, len(trade_ids), self.SQL_VARIABLE_CHUNK):
+            chunk = trade_ids[start:start + self.SQL_VARIABLE_CHUNK]
+            rows = conn.execute(f"""
+                SELECT id, trade_validation FROM trades
+                WHERE id IN ({','.join('?' * len(chunk))})
+            """, chunk).fetchall()
+            trade_validation.update((row[0], row[1]) for row in rows)
+        return trade_validation
+
+    def _insert_positions(self, cursor, positions: List[Tuple[Tuple, List[int]]],
+                          execution_pairs: Optional[List[List[Tuple]]] = None) -> List[int]:
+        """
+        Insert position rows and their position_executions mappings in two batches.
+
+        Args:
+            cursor: Cursor on the write connection
+            positions: (row in POSITION_INSERT_COLUMNS order, trade_ids) pairs
+            execution_pairs: FIFO pairs per position (in EXECUTION_PAIR_COLUMNS
+                order), stored in a third batch
+
+        Returns:
+            The new position IDs, in input order
+        """
+        if not positions:
+            return []
+
+        conn = cursor.connection
+        if not conn.in_transaction:
+            # Hold the write lock from the MAX(id) read until the inserts commit
+            cursor.execute("BEGIN IMMEDIATE")
+
+        cursor.execute("SAVEPOINT insert_positions")
         try:
-            # Query trade validation data for this position's executions
-            validation_status = None
-            if trade_ids:
-                placeholders = ','.join('?' * len(trade_ids))
-                self.cursor.execute(f"""
-                    SELECT trade_validation FROM trades
-                    WHERE id IN ({placeholders})
-                """, trade_ids)
-                executions = [{'trade_validation': row[0]} for row in self.cursor.fetchall()]
-                validation_status = self._aggregate_validation_status(executions)
-                logger.info(f"Calculated validation_status={validation_status} for position with {len(executions)} executions")
+            # executemany() discards RETURNING rows, so assign the IDs up front
+            first_id = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM positions").fetchone()[0]
+            position_ids = list(range(first_id, first_id + len(positions)))
+
+            cursor.executemany(f"""
+                INSERT INTO positions (id, {', '.join(self.POSITION_INSERT_COLUMNS)})
+                VALUES (?, {', '.join('?' * len(self.POSITION_INSERT_COLUMNS))})
+            """, [(position_id,) + tuple(row) for position_id, (row, _) in zip(position_ids, positions)])
+
+            # OR IGNORE skips a repeated trade within one position, as the per-row inserts did
+            cursor.executemany("""
+                INSERT OR IGNORE INTO position_executions (position_id, trade_id, execution_order)
+                VALUES (?, ?, ?)
+            """, [
+                (position_id, trade_id, execution_order)
+                for position_id, (_, trade_ids) in zip(position_ids, positions)
+                for execution_order, trade_id in enumerate(trade_ids or [], start=1)
+            ])
+            if execution_pairs is not None:
+                self._insert_execution_pairs(cursor, zip(position_ids, execution_pairs))
+        except Exception:
+            cursor.execute("ROLLBACK TO insert_positions")
+            cursor.execute("RELEASE insert_positions")
+            raise
+        cursor.execute("RELEASE insert_positions")
 
-            # Insert position record
-            self.cursor.execute("""
-                INSERT INTO positions (
-                    instrument, account, position_type, entry_time, exit_time,
-                    total_quantity, average_entry_price, average_exit_price,
-                    total_points_pnl, total_dollars_pnl, total_commission,
-                    position_status, execution_count, max_quantity, risk_reward_ratio,
-                    validation_status
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                position.instrument,
-                position.account,
-                position.position_type.value,  # Convert enum to string
-                position.entry_time,
-                position.exit_time,
-                position.total_quantity,
-                position.average_entry_price,
-                position.average_exit_price,
-                position.total_points_pnl,
-                position.total_dollars_pnl,
-                position.total_commission,
-                position.position_status.value,  # Convert enum to string
-                position.execution_count,
-                position.max_quantity,
-                position.risk_reward_ratio,
-                validation_status
-            ))
+        logger.debug(f"Saved positions {position_ids[0]}-{position_ids[-1]} to database")
+        return position_ids
 
-            position_id = self.cursor.lastrowid
-            logger.debug(f"Saved position {position_id} to database")
+    def _save_positions_to_db(self, positions_with_trades: List[Tuple], trades: Optional[List[Dict]] = None,
+                              execution_pairs: Optional[List[List[Tuple]]] = None) -> List[int]:
+        """
+        Save Position domain objects with their trade mappings and validation status in one write job.
+
+        Args:
+            positions_with_trades: (position, trade_ids) pairs
+            trades: Trade dicts covering every trade ID, to take trade_validation
+                from instead of querying the trades table
+            execution_pairs: FIFO pairs per position, to store with it
 
-            # Save position_executions mappings if provided
-            if trade_ids:
-                for execution_order, trade_id in enumerate(trade_ids, start=1):
-                    try:
-                        self.cursor.execute("""
-                            INSERT INTO position_executions (position_id, trade_id, execution_order)
-                            VALUES (?, ?, ?)
-                        """, (position_id, trade_id, execution_order))
-                    except Exception as e:
-                        logger.warning(f"Failed to save position_execution mapping for position {position_id}, trade {trade_id}: {e}")
+        Returns:
+            The new position IDs, in input order
+        """
+        if not positions_with_trades:
+            return []
 
-                logger.info(f"Saved {len(trade_ids)} position_executions mappings for position {position_id}")
+        return self._run_write(lambda conn: self._insert_positions(
+            conn.cursor(), self._position_rows(conn, positions_with_trades, trades), execution_pairs
+        ))
 
-            return position_id
+    def _position_rows(self, conn, positions_with_trades: List[Tuple], trades: Optional[List[Dict]] = None) -> List[Tuple[Tuple, List[int]]]:
+        """(row in POSITION_INSERT_COLUMNS order, trade_ids) per (position, trade_ids) pair, with validation status"""
+        if trades is not None:
+            trade_validation = {trade['id']: trade.get('trade_validation') for trade in trades}
+        else:
+            trade_validation = self._fetch_trade_validation(
+                conn, [trade_id for _, trade_ids in positions_with_trades for trade_id in trade_ids or []]
+            )
+        statuses = self._validation_statuses(positions_with_trades, trade_validation)
 
+        return [
+            (self._position_row(position, status), trade_ids)
+            for (position, trade_ids), status in zip(positions_with_trades, statuses)
+        ]
+
+    def _save_positions_diff(self, positions_with_trades: List[Tuple], trades: Optional[List[Dict]],
+                             stored_position_ids: List[int],
+                             execution_pairs: Optional[List[List[Tuple]]] = None) -> Tuple[List[int], Dict[str, List[int]]]:
+        """
+        Save positions over the stored ones they replace, writing only what changed.
+
+        Returns:
+            (position ID per input pair, changes as from _apply_position_diff())
+        """
+        return self._run_write(lambda conn: self._apply_position_diff(
+            conn, self._position_rows(conn, positions_with_trades, trades), stored_position_ids, execution_pairs
+        ))
+
+    def _apply_position_diff(self, conn, positions: List[Tuple[Tuple, List[int]]],
+                             stored_position_ids: List[int],
+                             execution_pairs: Optional[List[List[Tuple]]] = None) -> Tuple[List[int], Dict[str, List[int]]]:
+        """
+        Turn the stored positions into the given ones with the fewest writes.
+
+        Positions are keyed by the trade ID of their first execution (callers
+        scope the stored positions to one account/instrument): a built
+        position whose key matches a stored one keeps that position's ID and is
+        only updated if its row or executions differ; unmatched built
+        positions are inserted and unmatched stored ones deleted. With
+        execution_pairs, a position whose stored pairs differ is updated too
+        and gets its pairs rewritten.
+
+        Args:
+            conn: Write connection
+            positions: (row in POSITION_INSERT_COLUMNS order, trade_ids) pairs
+            stored_position_ids: Existing positions to replace
+            execution_pairs: FIFO pairs per position, aligned with positions
+
+        Returns:
+            (position ID per input pair, {'inserted': [...], 'updated': [...], 'deleted': [...]})
+        """
+        stored = {}
+        duplicates = []
+        for position_id, row, executions in self._fetch_stored_positions(conn, stored_position_ids):
+            key = executions[0][0] if executions else None
+            if key is None or key in stored:
+                duplicates.append(position_id)
+            else:
+                stored[key] = (position_id, row, executions)
+
+        stored_pairs = {}
+        if execution_pairs is not None:
+            stored_pairs = self._fetch_stored_execution_pairs(
+                conn, [position_id for position_id, _, _ in stored.values()]
+            )
+
+        position_ids = [None] * len(positions)
+        to_insert, updated = [], []
+        for index, (row, trade_ids) in enumerate(positions):
+            match = stored.pop(trade_ids[0], None) if trade_ids else None
+            if match is None:
+                to_insert.append(index)
+                continue
+
+            position_id, stored_row, stored_executions = match
+            position_ids[index] = position_id
+            row_changed = self._comparable_row(row) != self._comparable_row(stored_row)
+            executions_changed = self._execution_orders(trade_ids) != stored_executions
+            pairs = None
+            if execution_pairs is not None:
+                pairs = execution_pairs[index]
+                if [self._comparable_row(pair) for pair in pairs] == stored_pairs.get(position_id, []):
+                    pairs = None
+            if row_changed or executions_changed or pairs is not None:
+                updated.append((position_id, row, trade_ids if executions_changed else None, pairs))
+
+        deleted = sorted(duplicates + [match[0] for match in stored.values()])
+        remapped = [position_id for position_id, _, trade_ids, _ in updated if trade_ids is not None]
+        repaired = [position_id for position_id, _, _, pairs in updated if pairs is not None]
+
+        cursor = conn.cursor()
+        for start in range(0, len(deleted + remapped), self.SQL_VARIABLE_CHUNK):
+            chunk = (deleted + remapped)[start:start + self.SQL_VARIABLE_CHUNK]
+            cursor.execute(f"""
+                DELETE FROM position_executions WHERE position_id IN ({','.join('?' * len(chunk))})
+            """, chunk)
+        for start in range(0, len(repaired), self.SQL_VARIABLE_CHUNK):
+            chunk = repaired[start:start + self.SQL_VARIABLE_CHUNK]
+            cursor.execute(f"""
+                DELETE FROM position_execution_pairs WHERE position_id IN ({','.join('?' * len(chunk))})
+            """, chunk)
+        # Deleting a position drops its pairs (trg_positions_delete_execution_pairs)
+        for start in range(0, len(deleted), self.SQL_VARIABLE_CHUNK):
+            chunk = deleted[start:start + self.SQL_VARIABLE_CHUNK]
+            cursor.execute(f"DELETE FROM positions WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+
+        if updated:
+            cursor.executemany(f"""
+                UPDATE positions
+                SET {', '.join(f'{column} = ?' for column in self.POSITION_INSERT_COLUMNS)},
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, [tuple(row) + (position_id,) for position_id, row, _, _ in updated])
+            cursor.executemany("""
+                INSERT OR IGNORE INTO position_executions (position_id, trade_id, execution_order)
+                VALUES (?, ?, ?)
+            """, [
+                (position_id, trade_id, execution_order)
+                for position_id, _, trade_ids, _ in updated if trade_ids is not None
+                for trade_id, execution_order in self._execution_orders(trade_ids)
+            ])
+            self._insert_execution_pairs(cursor, [
+                (position_id, pairs) for position_id, _, _, pairs in updated if pairs is not None
+            ])
+
+        inserted = self._insert_positions(
+            cursor, [positions[index] for index in to_insert],
+            None if execution_pairs is None else [execution_pairs[index] for index in to_insert]
+        )
+        for index, position_id in zip(to_insert, inserted):
+            position_ids[index] = position_id
+
+        changes = {'inserted': inserted, 'updated': [position_id for position_id, _, _, _ in updated], 'deleted': deleted}
+        logger.debug(
+            f"Position diff: {len(inserted)} inserted, {len(updated)} updated, {len(deleted)} deleted, "
+            f"{len(positions) - len(inserted) - len(updated)} unchanged"
+        )
+        return position_ids, changes
+
+    def _fetch_stored_positions(self, conn, position_ids: List[int]) -> List[Tuple[int, Tuple, List[Tuple[int, int]]]]:
+        """(id, row in POSITION_INSERT_COLUMNS order, [(trade_id, execution_order)]) per stored position"""
+        rows = {}
+        executions = {position_id: [] for position_id in position_ids}
+        for start in range(0, len(position_ids), self.SQL_VARIABLE_CHUNK):
+            chunk = position_ids[start:start + self.SQL_VARIABLE_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            for row in conn.execute(f"""
+                SELECT id, {', '.join(self.POSITION_INSERT_COLUMNS)} FROM positions WHERE id IN ({placeholders})
+            """, chunk):
+                rows[row[0]] = tuple(row)[1:]
+            for row in conn.execute(f"""
+                SELECT position_id, trade_id, execution_order FROM position_executions
+                WHERE position_id IN ({placeholders})
+                ORDER BY position_id, execution_order
+            """, chunk):
+                executions[row[0]].append((row[1], row[2]))
+
+        return [(position_id, rows[position_id], executions[position_id])
+                for position_id in position_ids if position_id in rows]
+
+    def _fetch_stored_execution_pairs(self, conn, position_ids: List[int]) -> Dict[int, List[Tuple]]:
+        """Stored pairs (in EXECUTION_PAIR_COLUMNS order) per position ID, in pair order"""
+        pairs = {}
+        for start in range(0, len(position_ids), self.SQL_VARIABLE_CHUNK):
+            chunk = position_ids[start:start + self.SQL_VARIABLE_CHUNK]
+            for row in conn.execute(f"""
+                SELECT position_id, {', '.join(self.EXECUTION_PAIR_COLUMNS)} FROM position_execution_pairs
+                WHERE position_id IN ({','.join('?' * len(chunk))})
+                ORDER BY position_id, pair_number
+            """, chunk):
+                pairs.setdefault(row[0], []).append(tuple(row)[1:])
+        return pairs
+
+    def _insert_execution_pairs(self, cursor, position_pairs) -> None:
+        """Insert the FIFO pairs of each (position_id, pairs), numbering them in order"""
+        cursor.executemany(f"""
+            INSERT INTO position_execution_pairs (position_id, pair_number, {', '.join(self.EXECUTION_PAIR_COLUMNS)})
+            VALUES (?, ?, {', '.join('?' * len(self.EXECUTION_PAIR_COLUMNS))})
+        """, [
+            (position_id, pair_number) + tuple(pair)
+            for position_id, pairs in position_pairs
+            for pair_number, pair in enumerate(pairs, start=1)
+        ])
+
+    def _execution_orders(self, trade_ids: List[int]) -> List[Tuple[int, int]]:
+        """(trade_id, execution_order) pairs _insert_positions() stores for a position's trade IDs"""
+        seen = set()
+        orders = []
+        for execution_order, trade_id in enumerate(trade_ids or [], start=1):
+            # A repeated trade is skipped by INSERT OR IGNORE
+            if trade_id not in seen:
+                seen.add(trade_id)
+                orders.append((trade_id, execution_order))
+        return orders
+
+    def _comparable_row(self, row: Tuple) -> Tuple:
+        """A position row as SQLite stores it (datetimes become ISO strings), for comparison with a stored row"""
+        return tuple(value.isoformat(' ') if isinstance(value, datetime) else value for value in row)
+
+    def _save_position_to_db(self, position, trade_ids=None) -> Optional[int]:
+        """Save a Position domain object to the database with trade mappings and validation status"""
+        try:
+            return self._save_positions_to_db([(position, trade_ids)])[0]
         except Exception as e:
             logger.error(f"Failed to save position to database: {e}")
             return None
@@ -789,40 +1366,196 @@ class EnhancedPositionServiceV2:
         logger.info(f"Incremental rebuild completed: {stats['positions_affected']} positions affected")
         return stats
 
-    def rebuild_positions_for_account_instrument(self, account: str, instrument: str) -> Dict[str, Any]:
+    def rebuild_positions_for_account_instrument(self, account: str, instrument: str,
+                                                 diff: Optional[bool] = None) -> Dict[str, Any]:
         """
         Rebuild positions for a specific account/instrument combination
 
+        With a rebuild checkpoint (see _create_rebuild_checkpoints_table) only
+        the positions after the last flat point are rebuilt from the trades
+        after it; otherwise every position is rebuilt from the full trade
+        history.
+
+        In diff mode the rebuilt positions are matched to the stored ones by
+        first execution (see _apply_position_diff), so unchanged positions are
+        not rewritten and keep their IDs; otherwise the stored positions are
+        deleted and the rebuilt ones inserted.
+
         Args:
             account: Account identifier
             instrument: Instrument identifier
+            diff: Diff against the stored positions (default: POSITION_REBUILD_CONFIG['diff'])
 
         Returns:
-            Dictionary with rebuild statistics for this combination
+            Dictionary with rebuild statistics for this combination; 'position_changes'
+            lists the inserted/updated/deleted position IDs and 'changed_position_ids'
+            all of them, for cache invalidation
         """
+        if diff is None:
+            from config import POSITION_REBUILD_CONFIG
+            diff = POSITION_REBUILD_CONFIG['diff']
+
         logger.info(f"Rebuilding positions for {account}/{instrument}")
 
-        # Remove existing positions for this account/instrument
-        self._clear_positions_for_account_instrument(account, instrument)
+        # Clear and rebuild in one write job so readers never see the gap
+        def rebuild(conn):
+            refresh_running_quantities(conn, account, instrument)
+            checkpoint = self._get_rebuild_checkpoint(conn, account, instrument)
+            # Positions up to the last flat point are final
+            after_time = checkpoint['last_flat_time'] if checkpoint else None
 
-        # Get all trades for this account/instrument
-        self.cursor.execute("""
-            SELECT * FROM trades
-            WHERE account = ? AND instrument = ? AND (deleted = 0 OR deleted IS NULL)
-            ORDER BY entry_time
-        """, (account, instrument))
+            if diff:
+                stored_ids = self._positions_in_rebuild_scope(conn, account, instrument, after_time)
+            else:
+                stored_ids = self._clear_positions_for_account_instrument(
+                    account, instrument, after_flat_time=after_time
+                )
+
+            if checkpoint:
+                cursor = conn.execute("""
+                    SELECT * FROM trades
+                    WHERE account = ? AND instrument = ? AND (deleted = 0 OR deleted IS NULL)
+                      AND entry_time > ?
+                    ORDER BY entry_time, id
+                """, (account, instrument, after_time))
+            else:
+                # Get all trades for this account/instrument
+                cursor = conn.execute("""
+                    SELECT * FROM trades
+                    WHERE account = ? AND instrument = ? AND (deleted = 0 OR deleted IS NULL)
+                    ORDER BY entry_time, id
+                """, (account, instrument))
+
+            trades = [dict(row) for row in cursor.fetchall()]
+
+            if not trades:
+                if diff:
+                    _, changes = self._apply_position_diff(conn, [], stored_ids)
+                else:
+                    changes = {'inserted': [], 'updated': [], 'deleted': stored_ids}
+                if checkpoint:
+                    # Nothing after the flat point: no open position left
+                    self._save_rebuild_checkpoint(conn, account, instrument, {'checkpoint': dict(
+                        checkpoint, open_position_id=None, open_quantity=0
+                    )})
+                else:
+                    self._save_rebuild_checkpoint(conn, account, instrument, {})
+                    logger.warning(f"No trades found for {account}/{instrument}")
+                result = {'positions_created': 0, 'validation_errors': [], 'position_changes': changes}
+            else:
+                # Process trades using existing algorithm
+                result = self._process_trades_for_instrument(
+                    trades, account, instrument, replace_position_ids=stored_ids if diff else None
+                )
+                if not diff:
+                    result['position_changes']['deleted'] = stored_ids
+
+                if checkpoint and not result.get('checkpoint') and not result['validation_errors']:
+                    # No new flat point after the checkpoint: keep it, refresh the open position
+                    position_ids = result.get('position_ids', [])
+                    result['checkpoint'] = dict(
+                        checkpoint,
+                        open_position_id=position_ids[-1] if position_ids else None,
+                        open_quantity=self._running_quantity(trades)
+                    )
+                self._save_rebuild_checkpoint(conn, account, instrument, result)
+                result['trades_processed'] = len(trades)
+
+            changes = result['position_changes']
+            result['changed_position_ids'] = sorted(set(changes['inserted'] + changes['updated'] + changes['deleted']))
+            result['incremental'] = bool(checkpoint)
+            return result
+
+        result = self._run_write(rebuild)
+
+        changes = result['position_changes']
+        logger.info(
+            f"Rebuilt {result['positions_created']} positions for {account}/{instrument} "
+            f"({'from checkpoint' if result['incremental'] else 'full history'}): "
+            f"{len(changes['inserted'])} inserted, {len(changes['updated'])} updated, "
+            f"{len(changes['deleted'])} deleted"
+        )
+        return result
 
-        trades = [dict(row) for row in self.cursor.fetchall()]
+    def _positions_in_rebuild_scope(self, conn, account: str, instrument: str,
+                                    after_time: Optional[str] = None) -> List[int]:
+        """
+        IDs of the stored positions a rebuild replaces
 
-        if not trades:
-            logger.warning(f"No trades found for {account}/{instrument}")
-            return {'positions_created': 0, 'validation_errors': []}
+        Args:
+            after_time: Only positions whose first execution is after this time
+                (the last flat point of a rebuild checkpoint); by default all
+                positions of the account/instrument
+        """
+        if after_time is None:
+            cursor = conn.execute("""
+                SELECT id FROM positions WHERE account = ? AND instrument = ? ORDER BY id
+            """, (account, instrument))
+        else:
+            # Positions that lost their executions are in scope too
+            cursor = conn.execute("""
+                SELECT p.id FROM positions p
+                LEFT JOIN position_executions pe ON pe.position_id = p.id AND pe.execution_order = 1
+                LEFT JOIN trades t ON t.id = pe.trade_id
+                WHERE p.account = ? AND p.instrument = ?
+                  AND (t.id IS NULL OR t.entry_time > ?)
+                ORDER BY p.id
+            """, (account, instrument, after_time))
+        return [row[0] for row in cursor.fetchall()]
+
+    def _get_rebuild_checkpoint(self, conn, account: str, instrument: str) -> Optional[Dict[str, Any]]:
+        """Get the rebuild checkpoint for an account/instrument, if one is valid"""
+        row = conn.execute("""
+            SELECT last_flat_trade_id, last_flat_time, last_closed_position_id,
+                   open_position_id, open_quantity
+            FROM position_rebuild_checkpoints
+            WHERE account = ? AND instrument = ?
+        """, (account, instrument)).fetchone()
+
+        if not row:
+            return None
+        keys = ('last_flat_trade_id', 'last_flat_time', 'last_closed_position_id',
+                'open_position_id', 'open_quantity')
+        return dict(zip(keys, tuple(row)))
 
-        # Process trades using existing algorithm
-        result = self._process_trades_for_instrument(trades, account, instrument)
+    def _save_rebuild_checkpoint(self, conn, account: str, instrument: str, result: Dict[str, Any]):
+        """
+        Store (or drop) the rebuild checkpoint from a _process_trades_for_instrument() result.
 
-        logger.info(f"Rebuilt {result['positions_created']} positions for {account}/{instrument}")
-        return result
+        Without a checkpoint in the result the next rebuild is a full one.
+        """
+        checkpoint = result.get('checkpoint')
+        if not checkpoint:
+            conn.execute("""
+                DELETE FROM position_rebuild_checkpoints
+                WHERE account = ? AND instrument = ?
+            """, (account, instrument))
+            return
+
+        conn.execute("""
+            INSERT OR REPLACE INTO position_rebuild_checkpoints (
+                account, instrument, last_flat_trade_id, last_flat_time,
+                last_closed_position_id, open_position_id, open_quantity, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (
+            account, instrument,
+            checkpoint['last_flat_trade_id'],
+            checkpoint['last_flat_time'],
+            checkpoint['last_closed_position_id'],
+            checkpoint['open_position_id'],
+            checkpoint['open_quantity']
+        ))
+
+    def _running_quantity(self, trades: List[Dict]) -> int:
+        """Signed running quantity after the given trades (Buy/BuyToCover +, Sell/SellShort -)"""
+        quantity = 0
+        for trade in self._deduplicate_trades(trades):
+            side = (trade.get('side_of_market') or '').upper()
+            if side in ('BUY', 'BUYTOCOVER', 'LONG'):
+                quantity += abs(trade['quantity'])
+            elif side in ('SELL', 'SELLSHORT', 'SHORT'):
+                quantity -= abs(trade['quantity'])
+        return quantity
 
     def _analyze_trade_impact(self, trade_ids: List[int]) -> List[Tuple[str, str]]:
         """
@@ -850,39 +1583,54 @@ class EnhancedPositionServiceV2:
 
         return combinations
 
-    def _clear_positions_for_account_instrument(self, account: str, instrument: str):
+    def _clear_positions_for_account_instrument(self, account: str, instrument: str,
+                                                after_flat_time: Optional[str] = None) -> List[int]:
         """
         Clear existing positions and position_executions for a specific account/instrument
 
         Args:
             account: Account identifier
             instrument: Instrument identifier
+            after_flat_time: Only clear positions opened after this time (the
+                ones after a rebuild checkpoint); by default clear all of them
+                and the checkpoint
+
+        Returns:
+            IDs of the cleared positions
         """
         logger.debug(f"Clearing existing positions for {account}/{instrument}")
 
-        # Get position IDs for this account/instrument
-        self.cursor.execute("""
-            SELECT id FROM positions
-            WHERE account = ? AND instrument = ?
-        """, (account, instrument))
-
-        position_ids = [row['id'] for row in self.cursor.fetchall()]
+        def clear(conn):
+            cursor = conn.cursor()
+
+            if after_flat_time is None:
+                cursor.execute("""
+                    DELETE FROM position_rebuild_checkpoints
+                    WHERE account = ? AND instrument = ?
+                """, (account, instrument))
+
+            # Get position IDs for this account/instrument
+            position_ids = self._positions_in_rebuild_scope(conn, account, instrument, after_flat_time)
+
+            if position_ids:
+                # Remove position executions first (foreign key constraint)
+                placeholders = ','.join('?' * len(position_ids))
+                cursor.execute(f"""
+                    DELETE FROM position_executions
+                    WHERE position_id IN ({placeholders})
+                """, position_ids)
+
+                # Remove positions
+                cursor.execute(f"""
+                    DELETE FROM positions
+                    WHERE id IN ({placeholders})
+                """, position_ids)
 
-        if position_ids:
-            # Remove position executions first (foreign key constraint)
-            placeholders = ','.join('?' * len(position_ids))
-            self.cursor.execute(f"""
-                DELETE FROM position_executions
-                WHERE position_id IN ({placeholders})
-            """, position_ids)
+                logger.debug(f"Cleared {len(position_ids)} positions for {account}/{instrument}")
 
-            # Remove positions
-            self.cursor.execute("""
-                DELETE FROM positions
-                WHERE account = ? AND instrument = ?
-            """, (account, instrument))
+            return position_ids
 
-            logger.debug(f"Cleared {len(position_ids)} positions for {account}/{instrument}")
+        return self._run_write(clear)
 
     def get_position_executions(self, position_id: int) -> List[Dict[str, Any]]:
         """
@@ -933,37 +1681,100 @@ class EnhancedPositionServiceV2:
         if not position_ids:
             return 0
 
-        deleted_count = 0
+        def delete(conn):
+            cursor = conn.cursor()
 
-        try:
             # Delete in correct order due to foreign key constraints
             placeholders = ','.join('?' * len(position_ids))
 
+            # Positions behind a rebuild checkpoint are gone: next rebuild is full
+            cursor.execute(f"""
+                DELETE FROM position_rebuild_checkpoints
+                WHERE (account, instrument) IN (
+                    SELECT account, instrument FROM positions WHERE id IN ({placeholders})
+                )
+            """, position_ids)
+
             # First delete position_executions records
-            self.cursor.execute(f"""
+            cursor.execute(f"""
                 DELETE FROM position_executions
                 WHERE position_id IN ({placeholders})
             """, position_ids)
 
-            deleted_executions = self.cursor.rowcount
+            deleted_executions = cursor.rowcount
             logger.debug(f"Deleted {deleted_executions} position execution records")
 
             # Then delete positions
-            self.cursor.execute(f"""
+            cursor.execute(f"""
                 DELETE FROM positions
                 WHERE id IN ({placeholders})
             """, position_ids)
 
-            deleted_count = self.cursor.rowcount
+            deleted_count = cursor.rowcount
             logger.info(f"Successfully deleted {deleted_count} positions and {deleted_executions} associated execution records")
 
             return deleted_count
 
+        try:
+            return self._run_write(delete)
+
         except Exception as e:
             logger.error(f"Error deleting positions {position_ids}: {e}")
             raise
 
 
+def _build_group_rows(db_path: str, account: str, instrument: str) -> Dict[str, Any]:
+    """
+    Build one account/instrument group's positions in a rebuild worker process.
+
+    Reads the group's trades on its own read-only connection and returns only
+    plain values, so results pickle compactly: a (position row, trade IDs)
+    pair per position with the row in POSITION_INSERT_COLUMNS order, the
+    execution pairs per position and the flat point for the rebuild checkpoint.
+    """
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + '?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        trades = [dict(row) for row in conn.execute("""
+            SELECT * FROM trades
+            WHERE account = ? AND instrument = ? AND (deleted = 0 OR deleted IS NULL)
+            ORDER BY entry_time, id
+        """, (account, instrument))]
+    finally:
+        conn.close()
+
+    result = {
+        'account': account,
+        'instrument': instrument,
+        'positions': [],
+        'execution_pairs': [],
+        'flat_point': None,
+        'validation_errors': []
+    }
+    service = EnhancedPositionServiceV2(db_path)
+    try:
+        built = service._build_positions_for_instrument(trades, account, instrument)
+    except Exception as e:
+        error_msg = f"Failed to process trades using PositionBuilder: {str(e)}"
+        logger.error(error_msg)
+        result['validation_errors'].append(error_msg)
+        return result
+
+    if built is None:
+        result['validation_errors'].append('No valid trades to process')
+        return result
+
+    positions_with_trades, result['flat_point'], result['execution_pairs'] = built
+    statuses = service._validation_statuses(
+        positions_with_trades, {trade['id']: trade.get('trade_validation') for trade in trades}
+    )
+    result['positions'] = [
+        (service._position_row(position, status), trade_ids)
+        for (position, trade_ids), status in zip(positions_with_trades, statuses)
+    ]
+    return result
+
+
 def test_enhanced_service():
     """Test function for the enhanced service"""
     print("Testing Enhanced Position Service V2...")
@@ -37,16 +37,92 @@ import logging
 import json
 import shutil
 import threading
-import sqlite3
 import hashlib
+import io
 import uuid
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Set
+import numpy as np
 import pandas as pd
+import pytz
 import redis
 
 from config import config
+from scripts.connection_pool import get_connection_pool
+from scripts.write_queue import run_write
+from services.csv_watcher_service import CSVWatcherService
+from services.running_quantity import refresh_running_quantities, running_quantities_for_trades
+
+
+def _map_distinct(values: pd.Series, fn) -> pd.Series:
+    """Apply fn once per distinct value of a low-cardinality column"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    mapped = np.empty(len(uniques), dtype=object)
+    mapped[:] = [fn(value) for value in uniques]
+    return pd.Series(mapped[codes], index=values.index)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram (cumulative counts, Prometheus style).
+
+    Thread-safe; cheap enough to observe on every imported execution.
+    """
+
+    DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record one latency sample"""
+        slot = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                slot = i
+                break
+        with self._lock:
+            self._counts[slot] += 1
+            self._count += 1
+            self._sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound containing quantile q (None if empty or in +Inf)"""
+        with self._lock:
+            if not self._count:
+                return None
+            target = q * self._count
+            seen = 0
+            for bound, count in zip(self.buckets, self._counts):
+                seen += count
+                if seen >= target:
+                    return bound
+            return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative bucket counts plus count/sum/p50/p95"""
+        with self._lock:
+            cumulative = {}
+            seen = 0
+            for bound, count in zip(self.buckets, self._counts):
+                seen += count
+                cumulative[str(bound)] = seen
+            cumulative['+Inf'] = self._count
+            count, total = self._count, self._sum
+
+        return {
+            'buckets': cumulative,
+            'count': count,
+            'sum_seconds': round(total, 3),
+            'avg_seconds': round(total / count, 3) if count else 0.0,
+            'p50_seconds': self.quantile(0.5),
+            'p95_seconds': self.quantile(0.95),
+        }
 
 
 class NinjaTraderImportService:
@@ -66,6 +142,47 @@ class NinjaTraderImportService:
     # NinjaTrader file pattern
     FILE_PATTERN = 'NinjaTrader_Executions_*.csv'
 
+    # Execution IDs claimed per Redis pipeline round trip
+    CLAIM_BATCH_SIZE = 1000
+
+    # Bytes at the start and end of the consumed prefix covered by the
+    # tail-follow checksum (see _read_appended_rows)
+    PREFIX_CHECKSUM_WINDOW = 4096
+
+    # Watcher timing: how often the stability check re-stats a file, how
+    # long it keeps trying, and the safety rescan interval when inotify
+    # events drive imports (poll_interval applies in polling fallback)
+    STABILITY_CHECK_INTERVAL = 0.1
+    EVENT_RESCAN_INTERVAL = 300
+
+    # Executions older than this at commit time are backfills (re-imports,
+    # catch-up after downtime) and are left out of the fill latency histogram
+    LIVE_FILL_MAX_AGE_SECONDS = 3600
+
+    # NinjaTrader exports fill times in local Pacific time
+    FILL_TIMEZONE = pytz.timezone('America/Los_Angeles')
+
+    # side_of_market from "Action|e/x" (see _determine_side_of_market);
+    # actions that do not depend on E/X fall back to SIDE_OF_MARKET_BY_ACTION
+    SIDE_OF_MARKET_BY_ACTION_EX = {
+        'Buy|entry': 'Buy',          # Opening long
+        'Buy|exit': 'BuyToCover',    # Closing short
+        'Sell|entry': 'SellShort',   # Opening short
+        'Sell|exit': 'Sell',         # Closing long
+    }
+    SIDE_OF_MARKET_BY_ACTION = {
+        'Buy': 'Buy', 'Sell': 'Sell',
+        'BuyToCover': 'BuyToCover', 'SellShort': 'SellShort',
+    }
+
+    # trades columns written for each imported execution
+    TRADE_INSERT_COLUMNS = (
+        'instrument', 'account', 'side_of_market', 'quantity',
+        'entry_price', 'exit_price', 'entry_time', 'exit_time',
+        'entry_execution_id', 'commission', 'points_gain_loss', 'dollars_gain_loss',
+        'source_file', 'import_batch_id', 'trade_validation'
+    )
+
     def __init__(self, data_dir: str = None):
         """
         Initialize NinjaTrader import service.
@@ -82,6 +199,8 @@ class NinjaTraderImportService:
         # State tracking
         # Track file modification times to detect mid-day updates
         self.file_mtimes: Dict[str, float] = {}
+        # Tail-follow state per file: consumed byte offset, prefix checksum, file identity and size
+        self.file_offsets: Dict[str, Dict[str, Any]] = {}
         self.last_processed_file: Optional[str] = None
         self.last_import_time: Optional[datetime] = None
         self.error_count: int = 0
@@ -89,7 +208,14 @@ class NinjaTraderImportService:
         # Threading control (Task 5.2)
         self._watcher_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        # Set by file events (and stop) to wake the watcher loop early
+        self._wake_event = threading.Event()
         self._running = False
+        self._csv_watcher: Optional[CSVWatcherService] = None
+        self._watch_mode: Optional[str] = None  # 'events' or 'polling'
+
+        # Fill time (CSV Time column) -> DB commit latency
+        self.fill_latency = LatencyHistogram()
 
         # Polling configuration (Task 5.3)
         self._poll_interval = 30  # Default: 30 seconds (configurable 30-60s)
@@ -196,11 +322,16 @@ class NinjaTraderImportService:
 
     def _is_file_stable(self, file_path: Path, stability_seconds: int = 5) -> bool:
         """
-        Check if file size has not changed for specified seconds.
+        Check that the file has stopped growing.
+
+        Stats the file every STABILITY_CHECK_INTERVAL and returns as soon as
+        two consecutive stats see the same size and mtime, so a quiet file is
+        accepted in ~100 ms instead of after a fixed sleep.
 
         Args:
             file_path: Path to file to check
-            stability_seconds: Seconds to wait for stability (default: 5)
+            stability_seconds: Give up if still changing after this many
+                seconds (default: 5)
 
         Returns:
             True if file is stable, False otherwise
@@ -209,26 +340,27 @@ class NinjaTraderImportService:
             if not file_path.exists():
                 return False
 
-            # Get initial file size
-            initial_size = file_path.stat().st_size
+            deadline = time.monotonic() + stability_seconds
+            stat = file_path.stat()
+            previous = (stat.st_size, stat.st_mtime_ns)
 
-            # Wait for stability period
-            time.sleep(stability_seconds)
+            while True:
+                time.sleep(self.STABILITY_CHECK_INTERVAL)
+                stat = file_path.stat()
+                current = (stat.st_size, stat.st_mtime_ns)
 
-            # Check if size changed
-            current_size = file_path.stat().st_size
+                if current == previous:
+                    self.logger.debug(f"File {file_path.name} is stable ({current[0]} bytes)")
+                    return True
 
-            is_stable = (initial_size == current_size)
-
-            if is_stable:
-                self.logger.debug(f"File {file_path.name} is stable ({current_size} bytes)")
-            else:
-                self.logger.debug(
-                    f"File {file_path.name} is not stable "
-                    f"(size changed from {initial_size} to {current_size} bytes)"
-                )
+                if time.monotonic() >= deadline:
+                    self.logger.debug(
+                        f"File {file_path.name} is not stable "
+                        f"(still changing after {stability_seconds}s, now {current[0]} bytes)"
+                    )
+                    return False
 
-            return is_stable
+                previous = current
 
         except Exception as e:
             self.logger.error(f"Error checking file stability for {file_path.name}: {e}")
@@ -327,7 +459,7 @@ class NinjaTraderImportService:
                 sha256_hash.update(byte_block)
         return sha256_hash.hexdigest()
 
-    def _parse_csv(self, file_path: Path) -> Optional[pd.DataFrame]:
+    def _parse_csv(self, file_path: Path, data: bytes = None) -> Optional[pd.DataFrame]:
         """
         Parse CSV file and return DataFrame.
 
@@ -338,12 +470,14 @@ class NinjaTraderImportService:
 
         Args:
             file_path: Path to CSV file
+            data: CSV bytes to parse instead of reading file_path (header
+                line + appended rows when tail-following)
 
         Returns:
             DataFrame if successful, None otherwise
         """
         try:
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(io.BytesIO(data) if data is not None else file_path)
 
             if df.empty:
                 self.logger.info(f"CSV file {file_path.name} is empty")
@@ -368,6 +502,173 @@ class NinjaTraderImportService:
             self.logger.error(f"Unexpected error parsing CSV {file_path.name}: {e}")
             return None
 
+    def _prefix_checksum(self, f, offset: int) -> str:
+        """
+        Checksum of an already-consumed prefix of an open file.
+
+        Covers the offset plus the first and last PREFIX_CHECKSUM_WINDOW bytes
+        of the prefix (header and most recently consumed rows), so verifying
+        it costs the same no matter how large the file has grown. Bytes
+        between the two windows are not covered: a same-length edit in the
+        middle of the prefix goes unnoticed. _read_appended_rows() also
+        compares the file's identity and size to catch replaced and
+        truncated files.
+        """
+        window = self.PREFIX_CHECKSUM_WINDOW
+        checksum = hashlib.sha256(str(offset).encode())
+
+        f.seek(0)
+        checksum.update(f.read(min(offset, window)))
+        tail_start = max(0, offset - window)
+        f.seek(tail_start)
+        checksum.update(f.read(offset - tail_start))
+
+        return checksum.hexdigest()
+
+    def _read_appended_rows(self, file_path: Path):
+        """
+        Read only the rows appended since the file was last consumed.
+
+        NinjaTrader's ExecutionExporter appends to the same dated CSV all day.
+        The stored state for each file is the byte offset consumed so far, a
+        checksum of that prefix (see _prefix_checksum), and the file's
+        device/inode and size when it was read. If the file is the same one,
+        has not shrunk and the checksum still matches, only the complete
+        lines after the offset are parsed (with the header line prepended).
+        Otherwise (first sight, replaced file, truncation, rewrite) the whole
+        file is read as before.
+
+        Args:
+            file_path: Path to CSV file
+
+        Returns:
+            Tuple of (DataFrame or None, file hash, new tail state). The state
+            is only persisted by the caller once the rows have been imported.
+        """
+        file_key = str(file_path)
+        state = self._get_file_offset(file_key)
+
+        with open(file_path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            identity = [stat.st_dev, stat.st_ino]
+
+            # States saved before identity tracking have no identity or size
+            if (state and state['offset'] <= size
+                    and state.get('identity', identity) == identity
+                    and state.get('size', 0) <= size
+                    and self._prefix_checksum(f, state['offset']) == state['checksum']):
+                offset = state['offset']
+                hasher = state.get('hasher')
+                if hasher is None:
+                    # State restored from Redis: rebuild the running file hash once
+                    hasher = hashlib.sha256()
+                    f.seek(0)
+                    hasher.update(f.read(offset))
+                else:
+                    # The cached hasher belongs to the persisted state; if this
+                    # import fails, the next read must start from it unchanged
+                    hasher = hasher.copy()
+
+                f.seek(offset)
+                appended = f.read(size - offset)
+                # Only consume complete lines; a partially written row waits
+                appended = appended[:appended.rfind(b'\n') + 1]
+                hasher.update(appended)
+                new_offset = offset + len(appended)
+
+                df = None
+                if appended:
+                    f.seek(0)
+                    header = f.readline()
+                    df = self._parse_csv(file_path, header + appended)
+                    self.logger.debug(
+                        f"Tail-read {len(appended)} new bytes from {file_path.name} (offset {offset} -> {new_offset})"
+                    )
+            else:
+                if state:
+                    self.logger.info(
+                        f"{file_path.name} was replaced, truncated or rewritten since offset {state['offset']}; "
+                        "re-reading the whole file"
+                    )
+                f.seek(0)
+                data = f.read()
+                consumed = data.rfind(b'\n') + 1
+                hasher = hashlib.sha256(data[:consumed])
+                new_offset = consumed
+                # A partially written last row waits for its newline, as when tailing
+                df = self._parse_csv(file_path, data[:consumed]) if consumed else None
+
+            new_state = {
+                'offset': new_offset,
+                'checksum': self._prefix_checksum(f, new_offset),
+                'identity': identity,
+                'size': size,
+                'hasher': hasher,
+            }
+
+        return df, hasher.hexdigest(), new_state
+
+    def _get_file_offset(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get stored tail-follow state (offset, checksum, identity, size) for a file.
+
+        Args:
+            file_path: Full path to file
+
+        Returns:
+            State dict, or None if the file has not been consumed yet
+        """
+        state = self.file_offsets.get(file_path)
+        if state is not None or not self.redis_client:
+            return state
+
+        try:
+            stored = self.redis_client.get(f'file_offset:{Path(file_path).name}')
+            if stored:
+                return json.loads(stored)
+            return None
+
+        except Exception as e:
+            self.logger.error(f"Error getting file offset from Redis: {e}")
+            return None
+
+    def _save_file_offset(self, file_path: str, state: Dict[str, Any]):
+        """
+        Save tail-follow state for a file (in memory and in Redis, 30-day TTL).
+
+        Args:
+            file_path: Full path to file
+            state: State from _read_appended_rows()
+        """
+        # Always update in-memory cache (keeps the running file hash)
+        self.file_offsets[file_path] = state
+
+        if not self.redis_client:
+            return
+
+        try:
+            redis_key = f'file_offset:{Path(file_path).name}'
+            ttl_seconds = 30 * 24 * 60 * 60  # 30 days
+            persisted = {key: state[key] for key in ('offset', 'checksum', 'identity', 'size')}
+
+            self.redis_client.setex(redis_key, ttl_seconds, json.dumps(persisted))
+
+        except Exception as e:
+            self.logger.error(f"Error saving file offset to Redis: {e}")
+
+    def _clear_file_offset(self, file_path: str):
+        """Forget tail-follow state for a file (e.g. once it is archived)"""
+        self.file_offsets.pop(file_path, None)
+
+        if not self.redis_client:
+            return
+
+        try:
+            self.redis_client.delete(f'file_offset:{Path(file_path).name}')
+        except Exception as e:
+            self.logger.error(f"Error clearing file offset in Redis: {e}")
+
     def _move_to_error_folder(self, file_path: Path, reason: str):
         """
         Move corrupted file to error folder.
@@ -405,7 +706,7 @@ class NinjaTraderImportService:
 
         Uses Redis SADD which is atomic - returns 1 if newly added, 0 if exists.
         This prevents race conditions where two processes might both think
-        an execution is unprocessed.
+        an execution is unprocessed. Single-ID form of _try_claim_executions().
 
         Args:
             execution_id: Execution ID from CSV
@@ -414,32 +715,83 @@ class NinjaTraderImportService:
         Returns:
             True if successfully claimed (new), False if already processed
         """
+        return execution_id in self._try_claim_executions([execution_id], date_str)
+
+    def _try_claim_executions(self, execution_ids: List[str], date_str: str) -> Set[str]:
+        """
+        Atomically try to claim a batch of execution IDs for processing.
+
+        Sends one pipelined SADD per ID (plus a single EXPIRE) per
+        CLAIM_BATCH_SIZE IDs, so a file costs one
+        Redis round trip per chunk instead of two per row. Every SADD is
+        still atomic on its own, so of two processes claiming the same ID
+        exactly one sees it as newly added.
+
+        Args:
+            execution_ids: Execution IDs from CSV (file order, may repeat)
+            date_str: Date string in YYYYMMDD format
+
+        Returns:
+            Set of IDs newly claimed by this call; IDs repeated within the
+            batch are claimed once
+        """
         if not self.redis_client:
             # Without Redis, rely on database UNIQUE constraint as fallback
             # The INSERT OR IGNORE will handle duplicates
-            return True
+            return set(execution_ids)
 
-        try:
-            redis_key = f'processed_executions:{date_str}'
-            ttl_seconds = 14 * 24 * 60 * 60  # 14 days
+        redis_key = f'processed_executions:{date_str}'
+        ttl_seconds = 14 * 24 * 60 * 60  # 14 days
+        claimed: Set[str] = set()
 
-            # SADD is atomic: returns 1 if element was added, 0 if already existed
-            added = self.redis_client.sadd(redis_key, execution_id)
+        for start in range(0, len(execution_ids), self.CLAIM_BATCH_SIZE):
+            chunk = execution_ids[start:start + self.CLAIM_BATCH_SIZE]
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for execution_id in chunk:
+                    pipe.sadd(redis_key, execution_id)
+                # Set TTL on the key (14 days) - this is idempotent
+                pipe.expire(redis_key, ttl_seconds)
+                results = pipe.execute()
+
+                # SADD returns 1 if element was added, 0 if already existed
+                claimed.update(
+                    execution_id for execution_id, added in zip(chunk, results) if added == 1
+                )
 
-            # Set TTL on the key (14 days) - this is idempotent
-            self.redis_client.expire(redis_key, ttl_seconds)
+            except Exception as e:
+                self.logger.error(f"Error claiming executions in Redis: {e}")
+                # On Redis error, allow processing - DB constraint is backup
+                claimed.update(chunk)
 
-            if added == 1:
-                self.logger.debug(f"Claimed execution {execution_id} for processing")
-                return True
-            else:
-                self.logger.debug(f"Execution {execution_id} already claimed by another process")
-                return False
+        self.logger.debug(
+            f"Claimed {len(claimed)} of {len(execution_ids)} executions for processing"
+        )
+        return claimed
 
+    def _release_executions(self, execution_ids: List[str], date_str: str):
+        """
+        Give back execution IDs claimed by _try_claim_executions().
+
+        Used when the claimed rows could not be stored, so the next read
+        of the file claims and imports them again.
+
+        Args:
+            execution_ids: IDs this process claimed
+            date_str: Date string in YYYYMMDD format
+        """
+        if not self.redis_client or not execution_ids:
+            return
+
+        redis_key = f'processed_executions:{date_str}'
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for start in range(0, len(execution_ids), self.CLAIM_BATCH_SIZE):
+                pipe.srem(redis_key, *execution_ids[start:start + self.CLAIM_BATCH_SIZE])
+            pipe.execute()
+            self.logger.info(f"Released {len(execution_ids)} execution claims for retry")
         except Exception as e:
-            self.logger.error(f"Error claiming execution in Redis: {e}")
-            # On Redis error, allow processing - DB constraint is backup
-            return True
+            self.logger.error(f"Error releasing execution claims in Redis: {e}")
 
     def _is_execution_processed(self, execution_id: str, date_str: str) -> bool:
         """
@@ -718,8 +1070,13 @@ class NinjaTraderImportService:
                     f"{account}/{instrument}"
                 )
 
-                # Invalidate Redis cache for this account+instrument
-                self._invalidate_cache_for_account_instrument(account, instrument)
+                # Invalidate Redis cache for this account+instrument, unless
+                # the rebuild left every position as it was
+                changed_position_ids = result.get('changed_position_ids')
+                if changed_position_ids is None or changed_position_ids:
+                    self._invalidate_cache_for_account_instrument(
+                        account, instrument, position_ids=changed_position_ids
+                    )
 
                 return result
 
@@ -730,13 +1087,15 @@ class NinjaTraderImportService:
             )
             return {'positions_created': 0, 'validation_errors': [str(e)]}
 
-    def _invalidate_cache_for_account_instrument(self, account: str, instrument: str):
+    def _invalidate_cache_for_account_instrument(self, account: str, instrument: str,
+                                                 position_ids: Optional[List[int]] = None):
         """
         Invalidate Redis cache entries for account+instrument combination.
 
         Args:
             account: Account identifier
             instrument: Instrument identifier
+            position_ids: Changed positions whose execution chart entries to drop too
         """
         if not self.redis_client:
             return
@@ -753,6 +1112,20 @@ class NinjaTraderImportService:
                 self.redis_client.delete(key)
                 self.logger.debug(f"Invalidated cache key: {key}")
 
+            if position_ids:
+                # One incremental SCAN for all changed positions; KEYS would
+                # block Redis on the whole keyspace once per position
+                wanted = {str(position_id) for position_id in position_ids}
+                chart_keys = [
+                    key for key in self.redis_client.scan_iter(match='execution_chart:*', count=1000)
+                    if (key.decode() if isinstance(key, bytes) else key).split(':')[1] in wanted
+                ]
+                if chart_keys:
+                    self.redis_client.delete(*chart_keys)
+                    self.logger.debug(
+                        f"Invalidated {len(chart_keys)} execution chart keys for {len(wanted)} positions"
+                    )
+
         except Exception as e:
             self.logger.error(f"Error invalidating cache: {e}")
 
@@ -890,9 +1263,12 @@ class NinjaTraderImportService:
                     'file': file_path.name
                 }
 
-            # Parse CSV
-            df = self._parse_csv(file_path)
+            # Parse only the rows appended since the last run (whole file on
+            # first sight or after a rewrite); the file hash is kept running
+            df, file_hash, tail_state = self._read_appended_rows(file_path)
             if df is None or df.empty:
+                if df is not None:
+                    self._save_file_offset(str(file_path), tail_state)
                 return {
                     'success': True,
                     'executions_imported': 0,
@@ -903,9 +1279,6 @@ class NinjaTraderImportService:
             # Generate unique import batch ID for this import run
             import_batch_id = str(uuid.uuid4())
 
-            # Compute file hash for tracking
-            file_hash = self._compute_file_hash(file_path)
-
             # Process executions incrementally
             result = self._process_executions(
                 df, file_path,
@@ -913,9 +1286,14 @@ class NinjaTraderImportService:
                 file_hash=file_hash
             )
 
+            # Advance the tail offset only once the rows are in
+            if result['success']:
+                self._save_file_offset(str(file_path), tail_state)
+
             # Archive file if conditions met
             if result['success'] and self._should_archive_file(file_path, result['success']):
                 self._archive_file(file_path)
+                self._clear_file_offset(str(file_path))
 
             # Update service state
             self.last_processed_file = file_path.name
@@ -943,10 +1321,12 @@ class NinjaTraderImportService:
         Process executions from DataFrame.
 
         Task 4.2: Implement main processing workflow
-        - Iterate rows and check _is_execution_processed() for each
+        - Claim the file's execution IDs in one pipelined batch
+          (_try_claim_executions())
         - Skip rows with already-processed execution IDs
-        - Insert new executions with _insert_execution()
-        - Mark processed with _mark_execution_processed()
+        - Map claimed rows column-wise (_map_execution_frame()) and insert
+          them with _insert_executions_bulk() (one transaction for the file)
+        - Detect running-quantity issues from the stored running quantities
         - Collect affected (account, instrument) pairs
 
         Task 4.5: Implement incremental position rebuilding
@@ -962,6 +1342,21 @@ class NinjaTraderImportService:
         Returns:
             Dictionary with processing results
         """
+        # Rows may come from a tail read or a caller-built frame, not only
+        # from a file _validate_csv() has checked
+        missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in df.columns]
+        if missing_columns:
+            self.logger.error(
+                f"Cannot import executions from {file_path.name}: "
+                f"missing required columns {missing_columns}"
+            )
+            return {
+                'success': False,
+                'error': f"Missing required columns: {missing_columns}",
+                'executions_imported': 0,
+                'file': file_path.name
+            }
+
         # Extract date from filename for Redis key
         try:
             filename = file_path.stem
@@ -969,82 +1364,53 @@ class NinjaTraderImportService:
         except:
             date_str = datetime.now().strftime('%Y%m%d')
 
-        new_executions = 0
-        skipped_executions = 0
-        affected_combinations = set()
-
-        # Track running quantity per account+instrument for issue detection
-        running_quantities: Dict[tuple, int] = {}
-        detected_issues: List[Dict[str, Any]] = []
-
-        for index, row in df.iterrows():
-            try:
-                # Get execution ID (or generate fallback)
-                execution_id = str(row.get('ID', ''))
-                if not execution_id or pd.isna(row.get('ID')):
-                    execution_id = self._generate_fallback_key(row)
-
-                # Atomically try to claim this execution ID
-                # Uses SADD which is atomic - prevents race conditions
-                if not self._try_claim_execution(execution_id, date_str):
-                    skipped_executions += 1
-                    continue
-
-                # Insert execution into database
-                # Uses INSERT OR IGNORE as backup for any Redis failures
-                trade_id = self._insert_execution(
-                    row,
-                    source_file=file_path.name,
-                    import_batch_id=import_batch_id
-                )
-
-                if trade_id:
-                    new_executions += 1
-
-                    # Track affected account+instrument
-                    account = str(row.get('Account', ''))
-                    instrument = str(row.get('Instrument', ''))
-                    affected_combinations.add((account, instrument))
-
-                    # Detect potential issues based on running quantity
-                    action = str(row.get('Action', '')).strip()
-                    quantity = abs(int(row.get('Quantity', 0)))
-                    key = (account, instrument)
+        # Get execution IDs (or generate fallback for rows without one)
+        execution_ids = df['ID'].astype(str)
+        missing_id = df['ID'].isna() | (execution_ids == '')
+        for index in df.index[missing_id]:
+            execution_ids[index] = self._generate_fallback_key(df.loc[index].to_dict())
+
+        # Atomically claim all execution IDs in one round trip
+        # Each ID is its own SADD, so concurrent workers still never both win
+        claimed = self._try_claim_executions(execution_ids.tolist(), date_str)
+
+        # A repeated ID within the file only counts once, as with the
+        # per-row claim
+        keep = execution_ids.isin(claimed) & ~execution_ids.duplicated()
+        skipped_executions = int((~keep).sum())
+
+        # Map the claimed rows column-wise; the whole file then goes in as
+        # one bulk insert
+        trades = self._map_execution_frame(
+            df[keep],
+            source_file=file_path.name,
+            import_batch_id=import_batch_id
+        )
 
-                    prev_qty = running_quantities.get(key, 0)
+        # Insert all executions in one transaction
+        # Duplicates are skipped by the (account, entry_execution_id) check as
+        # a backup for any Redis failures
+        try:
+            trade_ids = self._insert_executions_bulk(self._execution_records(trades))
+        except Exception as e:
+            # Nothing was written: give the claims back so the rows are read
+            # again (the caller leaves the tail offset where it was)
+            self.logger.error(f"Error inserting executions from {file_path.name}: {e}", exc_info=True)
+            self._release_executions(execution_ids[keep].tolist(), date_str)
+            return {
+                'success': False,
+                'error': f'Execution insert failed: {e}',
+                'executions_imported': 0,
+                'executions_skipped': skipped_executions,
+                'file': file_path.name
+            }
 
-                    # Calculate signed quantity change
-                    if action in ['Buy', 'BuyToCover']:
-                        signed_change = quantity
-                    elif action in ['Sell', 'SellShort']:
-                        signed_change = -quantity
-                    else:
-                        signed_change = 0
-
-                    running_qty = prev_qty + signed_change
-                    running_quantities[key] = running_qty
-
-                    # Detect issues
-                    issue = self._detect_execution_issue(action, prev_qty, running_qty)
-                    if issue:
-                        detected_issues.append({
-                            'trade_id': trade_id,
-                            'account': account,
-                            'instrument': instrument,
-                            'action': action,
-                            'quantity': quantity,
-                            'prev_qty': prev_qty,
-                            'running_qty': running_qty,
-                            'issue': issue,
-                            'time': str(row.get('Time', ''))
-                        })
+        inserted = trades.assign(trade_id=trade_ids).dropna(subset=['trade_id'])
+        new_executions = len(inserted)
+        self._record_fill_latency(inserted['entry_time'].tolist())
 
-            except Exception as e:
-                self.logger.warning(
-                    f"Error processing row {index} in {file_path.name}: {e}. "
-                    "Skipping row."
-                )
-                continue
+        affected_combinations = set(zip(inserted['account'], inserted['instrument']))
+        detected_issues = self._detect_execution_issues(inserted, df)
 
         # Task 4.5: Rebuild positions for affected combinations only
         all_position_ids = []
@@ -1093,6 +1459,88 @@ class NinjaTraderImportService:
             'position_ids': all_position_ids
         }
 
+    def _record_fill_latency(self, fill_times):
+        """
+        Observe fill time -> DB commit latency for newly committed executions.
+
+        Args:
+            fill_times: entry_time strings ('YYYY-MM-DD HH:MM:SS', Pacific time)
+        """
+        committed_at = datetime.now(self.FILL_TIMEZONE).replace(tzinfo=None)
+
+        for fill_time in fill_times:
+            try:
+                latency = (committed_at - datetime.strptime(fill_time, '%Y-%m-%d %H:%M:%S')).total_seconds()
+            except (TypeError, ValueError):
+                continue
+
+            # Fill times have 1 s resolution and come from another clock
+            if -60 < latency <= self.LIVE_FILL_MAX_AGE_SECONDS:
+                self.fill_latency.observe(max(latency, 0.0))
+
+    def _detect_execution_issues(self, inserted: pd.DataFrame, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Detect potential issues for newly inserted executions, column-wise.
+
+        Running quantity before/after each execution is read from the stored
+        per-(account, instrument) running quantities (refreshed by
+        _insert_executions_bulk()), so it continues from the trades already
+        in the database; the rules are the same as _detect_execution_issue().
+
+        Args:
+            inserted: Mapped executions that were inserted, with trade_id
+            df: Source CSV DataFrame (for the raw Action and Time columns)
+
+        Returns:
+            List of issue dicts, in file order
+        """
+        if inserted.empty:
+            return []
+
+        raw = df.loc[inserted.index]
+        action = raw['Action'].astype(str).str.strip()
+
+        trade_ids = inserted['trade_id'].astype('int64')
+        with get_connection_pool(self.db_path).connection() as conn:
+            stored = running_quantities_for_trades(conn, trade_ids.tolist())
+        prev_qty = trade_ids.map(lambda trade_id: stored.get(trade_id, (0, 0))[0]).fillna(0).astype('int64')
+        running_qty = trade_ids.map(lambda trade_id: stored.get(trade_id, (0, 0))[1]).fillna(0).astype('int64')
+
+        issue = np.select(
+            [
+                (action == 'BuyToCover') & (prev_qty >= 0),
+                (action == 'SellShort') & (prev_qty < 0),
+                (action == 'Sell') & (prev_qty <= 0),
+                (action == 'Buy') & (prev_qty > 0),
+            ],
+            [
+                'BuyToCover with no short position',
+                'SellShort adding to existing short',
+                'Sell with no long position',
+                'Buy adding to existing long',
+            ],
+            default=''
+        )
+
+        flagged = issue != ''
+        if not flagged.any():
+            return []
+
+        columns = zip(
+            trade_ids.to_numpy()[flagged].tolist(),
+            inserted['account'].to_numpy()[flagged].tolist(),
+            inserted['instrument'].to_numpy()[flagged].tolist(),
+            action.to_numpy()[flagged].tolist(),
+            inserted['quantity'].to_numpy()[flagged].tolist(),
+            prev_qty.to_numpy()[flagged].tolist(),
+            running_qty.to_numpy()[flagged].tolist(),
+            issue[flagged].tolist(),
+            raw['Time'].astype(str).to_numpy()[flagged].tolist(),
+        )
+        keys = ('trade_id', 'account', 'instrument', 'action', 'quantity',
+                'prev_qty', 'running_qty', 'issue', 'time')
+        return [dict(zip(keys, values)) for values in columns]
+
     def _detect_execution_issue(self, action: str, prev_qty: int, running_qty: int) -> Optional[str]:
         """
         Detect potential issues with an execution based on position state.
@@ -1198,14 +1646,18 @@ class NinjaTraderImportService:
     # Execution Insertion into Trades Table (Task 4.3, Task Group 2.4)
     # ========================================================================
 
-    def _insert_execution(
+    def _map_execution_row(
         self,
         row: Dict,
         source_file: str = None,
         import_batch_id: str = None
-    ) -> Optional[int]:
+    ) -> Dict[str, Any]:
         """
-        Insert single execution into trades table.
+        Map a CSV row to trades table fields.
+
+        Imports map whole frames with _map_execution_frame(); this per-row
+        mapping is only the reference the tests and
+        scripts/benchmark_csv_mapping.py compare the frame mapping against.
 
         Task 4.3: Map CSV columns to trades table fields
         Task 4.4: Map CSV Action to MarketSide enum correctly
@@ -1229,126 +1681,289 @@ class NinjaTraderImportService:
             import_batch_id: Unique ID for this import batch
 
         Returns:
-            Trade ID if successful, None otherwise
+            Dictionary keyed by TRADE_INSERT_COLUMNS
+
+        Raises:
+            ValueError/TypeError if a numeric field cannot be parsed
         """
-        try:
-            # Parse commission (remove $ prefix)
-            commission_str = str(row.get('Commission', '0'))
-            commission = float(commission_str.replace('$', ''))
-
-            # Map Action + E/X to side_of_market and determine entry/exit price
-            # NinjaTrader exports: "Buy", "Sell", "BuyToCover", "SellShort"
-            # E/X column: "Entry" or "Exit" - critical for disambiguating Sell/Buy actions
-            action = str(row.get('Action', '')).strip()
-            entry_exit = str(row.get('E/X', '')).strip()
-
-            # Determine side_of_market using E/X column for correct labeling
-            side_of_market = self._determine_side_of_market(action, entry_exit)
-
-            # Set entry/exit price based on whether this is an opening or closing trade
-            price = float(row.get('Price', 0))
-            if side_of_market in ('Buy', 'SellShort'):
-                # Opening trades have entry price
-                entry_price = price
-                exit_price = None
-            else:
-                # Closing trades (Sell, BuyToCover) have exit price
-                entry_price = None
-                exit_price = price
-
-            # Parse timestamp (format: "M/d/yyyy h:mm:ss tt")
-            time_str = str(row.get('Time', ''))
-            entry_time = self._parse_ninjatrader_timestamp(time_str)
-
-            # Task Group 2.4: Map TradeValidation CSV column to trade_validation field
-            # Handle empty string as NULL, handle missing column as NULL
-            trade_validation = None
-            if 'TradeValidation' in row:
-                validation_value = str(row.get('TradeValidation', '')).strip()
-                if validation_value and not pd.isna(row.get('TradeValidation')):
-                    if validation_value in ('Valid', 'Invalid'):
-                        trade_validation = validation_value
-                        # Task Group 2.4: Log INFO message when validation data imported
-                        self.logger.info(
-                            f"Imported trade validation for execution {row.get('ID', 'unknown')}: {trade_validation}"
-                        )
+        # Parse commission (remove $ prefix)
+        commission_str = str(row.get('Commission', '0'))
+        commission = float(commission_str.replace('$', ''))
+
+        # Map Action + E/X to side_of_market and determine entry/exit price
+        # NinjaTrader exports: "Buy", "Sell", "BuyToCover", "SellShort"
+        # E/X column: "Entry" or "Exit" - critical for disambiguating Sell/Buy actions
+        action = str(row.get('Action', '')).strip()
+        entry_exit = str(row.get('E/X', '')).strip()
+
+        # Determine side_of_market using E/X column for correct labeling
+        side_of_market = self._determine_side_of_market(action, entry_exit)
+
+        # Set entry/exit price based on whether this is an opening or closing trade
+        price = float(row.get('Price', 0))
+        if side_of_market in ('Buy', 'SellShort'):
+            # Opening trades have entry price
+            entry_price = price
+            exit_price = None
+        else:
+            # Closing trades (Sell, BuyToCover) have exit price
+            entry_price = None
+            exit_price = price
+
+        # Parse timestamp (format: "M/d/yyyy h:mm:ss tt")
+        time_str = str(row.get('Time', ''))
+        entry_time = self._parse_ninjatrader_timestamp(time_str)
+
+        # Task Group 2.4: Map TradeValidation CSV column to trade_validation field
+        # Handle empty string as NULL, handle missing column as NULL
+        trade_validation = None
+        if 'TradeValidation' in row:
+            validation_value = str(row.get('TradeValidation', '')).strip()
+            if validation_value and not pd.isna(row.get('TradeValidation')):
+                if validation_value in ('Valid', 'Invalid'):
+                    trade_validation = validation_value
+                    # Task Group 2.4: Log INFO message when validation data imported
+                    self.logger.info(
+                        f"Imported trade validation for execution {row.get('ID', 'unknown')}: {trade_validation}"
+                    )
 
-            # Prepare trade data
-            trade_data = {
-                'instrument': str(row.get('Instrument', '')),
-                'account': str(row.get('Account', '')),
-                'side_of_market': side_of_market,
-                'quantity': abs(int(row.get('Quantity', 0))),  # Ensure positive
-                'entry_price': entry_price,
-                'exit_price': exit_price,
-                'entry_time': entry_time,
-                'exit_time': None,
-                'entry_execution_id': str(row.get('ID', '')),
-                'commission': commission,
-                'points_gain_loss': None,
-                'dollars_gain_loss': None,
-                'source_file': source_file,
-                'import_batch_id': import_batch_id,
-                'trade_validation': trade_validation
-            }
+        return {
+            'instrument': str(row.get('Instrument', '')),
+            'account': str(row.get('Account', '')),
+            'side_of_market': side_of_market,
+            'quantity': abs(int(row.get('Quantity', 0))),  # Ensure positive
+            'entry_price': entry_price,
+            'exit_price': exit_price,
+            'entry_time': entry_time,
+            'exit_time': None,
+            'entry_execution_id': str(row.get('ID', '')),
+            'commission': commission,
+            'points_gain_loss': None,
+            'dollars_gain_loss': None,
+            'source_file': source_file,
+            'import_batch_id': import_batch_id,
+            'trade_validation': trade_validation
+        }
 
-            # Insert into database (use atomic transaction)
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+    def _map_execution_frame(
+        self,
+        df: pd.DataFrame,
+        source_file: str = None,
+        import_batch_id: str = None
+    ) -> pd.DataFrame:
+        """
+        Map CSV rows to trades table fields, a whole column at a time.
 
-            # Check for existing execution first (belt-and-suspenders with UNIQUE index)
-            cursor.execute("""
-                SELECT id FROM trades
-                WHERE account = ? AND entry_execution_id = ?
-            """, (trade_data['account'], trade_data['entry_execution_id']))
-
-            existing = cursor.fetchone()
-            if existing:
-                conn.close()
-                self.logger.debug(f"Execution {trade_data['entry_execution_id']} already exists (id={existing[0]}), skipped")
-                return None
+        Column-wise equivalent of _map_execution_row(): one pd.to_datetime per
+        Time format, vectorized '$' stripping for Commission and a lookup
+        table for side_of_market. Rows whose Quantity, Price or Commission
+        cannot be parsed are dropped with a warning (the per-row mapping
+        raised for them).
 
+        Args:
+            df: CSV rows
+            source_file: Name of the source CSV file
+            import_batch_id: Unique ID for this import batch
+
+        Returns:
+            DataFrame with TRADE_INSERT_COLUMNS, indexed like df
+        """
+        if df.empty:
+            return pd.DataFrame(columns=list(self.TRADE_INSERT_COLUMNS))
+
+        def column(name, default):
+            return df[name] if name in df else pd.Series(default, index=df.index)
+
+        # Numeric fields; missing values pass through like float(nan) did,
+        # except Quantity which must be an integer
+        quantity_raw = column('Quantity', 0)
+        quantity = pd.to_numeric(quantity_raw, errors='coerce')
+        price_raw = column('Price', 0)
+        price = pd.to_numeric(price_raw, errors='coerce')
+        commission_raw = column('Commission', '0')
+        commission = pd.to_numeric(
+            _map_distinct(commission_raw, lambda value: str(value).replace('$', '').strip()),
+            errors='coerce'
+        )
+
+        invalid = (
+            quantity.isna()
+            | (price.isna() & price_raw.notna())
+            | (commission.isna() & commission_raw.notna())
+        )
+        if invalid.any():
+            self.logger.warning(
+                f"Skipping {int(invalid.sum())} rows in {source_file} with unparseable "
+                f"Quantity/Price/Commission (rows {df.index[invalid].tolist()[:10]})"
+            )
+            valid = ~invalid
+            df, quantity, price, commission = df[valid], quantity[valid], price[valid], commission[valid]
+
+        # Map Action + E/X to side_of_market with a lookup table
+        action = _map_distinct(column('Action', ''), lambda value: str(value).strip())
+        entry_exit = _map_distinct(column('E/X', ''), lambda value: str(value).strip().lower())
+        side_of_market = (action + '|' + entry_exit).map(self.SIDE_OF_MARKET_BY_ACTION_EX)
+        ambiguous = side_of_market.isna() & action.isin(['Buy', 'Sell'])
+        if ambiguous.any():
+            self.logger.warning(
+                f"Missing/invalid E/X value for {int(ambiguous.sum())} Buy/Sell rows in {source_file}. "
+                "Defaulting to the Action value; Sell rows may be incorrect!"
+            )
+        side_of_market = side_of_market.fillna(action.map(self.SIDE_OF_MARKET_BY_ACTION))
+        unknown = side_of_market.isna()
+        if unknown.any():
+            self.logger.warning(
+                f"Unknown action {sorted(action[unknown].unique())} in {source_file}. Defaulting to Buy."
+            )
+            side_of_market = side_of_market.fillna('Buy')
+
+        # Opening trades (Buy, SellShort) have entry price, closing trades exit price
+        opening = side_of_market.isin(['Buy', 'SellShort'])
+
+        # Parse timestamps (format: "M/d/yyyy h:mm:ss tt", or 24h without AM/PM)
+        time_str = column('Time', '').astype(str)
+        parsed = pd.to_datetime(time_str, format='%m/%d/%Y %I:%M:%S %p', errors='coerce')
+        retry = parsed.isna()
+        if retry.any():
+            parsed[retry] = pd.to_datetime(time_str[retry], format='%m/%d/%Y %H:%M:%S', errors='coerce')
+            if parsed.isna().any():
+                self.logger.warning(
+                    f"Could not parse timestamps: {time_str[parsed.isna()].unique().tolist()[:10]}"
+                )
+        entry_time = pd.Series(
+            np.char.replace(np.datetime_as_string(parsed.to_numpy(), unit='s'), 'T', ' '),
+            index=df.index, dtype=object
+        ).where(parsed.notna(), None)
+
+        # Task Group 2.4: Map TradeValidation CSV column to trade_validation field
+        # Handle empty string as NULL, handle missing column as NULL
+        trade_validation = None
+        if 'TradeValidation' in df:
+            validation_value = df['TradeValidation'].astype(str).str.strip()
+            is_set = validation_value.isin(['Valid', 'Invalid']) & df['TradeValidation'].notna()
+            trade_validation = validation_value.where(is_set, None)
+            if is_set.any():
+                self.logger.info(f"Imported trade validation for {int(is_set.sum())} executions")
+
+        return pd.DataFrame({
+            'instrument': column('Instrument', '').astype(str),
+            'account': column('Account', '').astype(str),
+            'side_of_market': side_of_market,
+            'quantity': quantity.abs().astype('int64'),  # Ensure positive
+            'entry_price': price.where(opening),
+            'exit_price': price.where(~opening),
+            'entry_time': entry_time,
+            'exit_time': None,
+            'entry_execution_id': column('ID', '').astype(str),
+            'commission': commission,
+            'points_gain_loss': None,
+            'dollars_gain_loss': None,
+            'source_file': source_file,
+            'import_batch_id': import_batch_id,
+            'trade_validation': trade_validation
+        }, index=df.index)
+
+    def _execution_records(self, trades: pd.DataFrame) -> List[tuple]:
+        """
+        Convert mapped executions to plain tuples for executemany().
+
+        Args:
+            trades: Output of _map_execution_frame()
+
+        Returns:
+            One tuple per row in TRADE_INSERT_COLUMNS order, NaN as None
+        """
+        columns = []
+        for name in self.TRADE_INSERT_COLUMNS:
+            values = trades[name].astype(object)
+            columns.append(values.where(values.notna(), None).tolist())
+        return list(zip(*columns))
+
+    def _insert_executions_bulk(self, trades: List[tuple]) -> List[Optional[int]]:
+        """
+        Insert mapped executions in a single transaction.
+
+        Rows are loaded into a TEMP staging table with one executemany() and
+        copied into trades with one INSERT...SELECT that skips executions
+        already present (same account + entry_execution_id), including
+        repeats within the batch. New trade ids are read back in bulk, and the
+        stored running quantities of the affected groups are refreshed in the
+        same transaction.
+
+        Args:
+            trades: Rows from _execution_records() (TRADE_INSERT_COLUMNS
+                order), in CSV order
+
+        Returns:
+            Trade id for each input row, or None where it was a duplicate
+        """
+        if not trades:
+            return []
+
+        columns = self.TRADE_INSERT_COLUMNS
+        column_list = ', '.join(columns)
+        select_list = ', '.join(f's.{column}' for column in columns)
+
+        def insert_all(conn):
+            cursor = conn.cursor()
+            cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS import_staging (seq INTEGER PRIMARY KEY, {column_list})")
             cursor.execute("""
-                INSERT OR IGNORE INTO trades (
-                    instrument, account, side_of_market, quantity,
-                    entry_price, exit_price, entry_time, exit_time,
-                    entry_execution_id, commission, points_gain_loss, dollars_gain_loss,
-                    source_file, import_batch_id, trade_validation
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                trade_data['instrument'],
-                trade_data['account'],
-                trade_data['side_of_market'],
-                trade_data['quantity'],
-                trade_data['entry_price'],
-                trade_data['exit_price'],
-                trade_data['entry_time'],
-                trade_data['exit_time'],
-                trade_data['entry_execution_id'],
-                trade_data['commission'],
-                trade_data['points_gain_loss'],
-                trade_data['dollars_gain_loss'],
-                trade_data['source_file'],
-                trade_data['import_batch_id'],
-                trade_data['trade_validation']
-            ))
+                CREATE INDEX IF NOT EXISTS temp.idx_import_staging_execution
+                ON import_staging(account, entry_execution_id)
+            """)
+            cursor.execute("DELETE FROM import_staging")
 
-            # Check if insert actually happened (rowcount=0 means duplicate was ignored by UNIQUE constraint)
-            if cursor.rowcount == 0:
-                conn.close()
-                self.logger.debug(f"Execution {trade_data['entry_execution_id']} already exists (DB constraint), skipped")
-                return None
+            cursor.executemany(
+                f"INSERT INTO import_staging (seq, {column_list}) VALUES (?, {', '.join('?' * len(columns))})",
+                [(seq,) + tuple(trade) for seq, trade in enumerate(trades)]
+            )
 
-            trade_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            # Single writer: every trade id above this one was inserted below
+            max_id_before = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM trades").fetchone()[0]
 
-            self.logger.debug(f"Inserted execution {trade_data['entry_execution_id']} as trade {trade_id}")
-            return trade_id
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO trades ({column_list})
+                SELECT {select_list}
+                FROM import_staging s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM trades t
+                    WHERE t.account = s.account AND t.entry_execution_id = s.entry_execution_id
+                )
+                AND s.seq = (
+                    SELECT MIN(s2.seq) FROM import_staging s2
+                    WHERE s2.account = s.account AND s2.entry_execution_id = s.entry_execution_id
+                )
+                ORDER BY s.seq
+            """)
 
-        except Exception as e:
-            self.logger.error(f"Error inserting execution: {e}", exc_info=True)
-            return None
+            cursor.execute("""
+                SELECT MIN(s.seq), t.id
+                FROM import_staging s
+                JOIN trades t
+                  ON t.account = s.account AND t.entry_execution_id = s.entry_execution_id
+                WHERE t.id > ?
+                GROUP BY t.id
+            """, (max_id_before,))
+            new_ids = cursor.fetchall()
+
+            # Store running quantities for the new rows (and anything they moved)
+            for account, instrument in cursor.execute(
+                "SELECT DISTINCT account, instrument FROM import_staging"
+            ).fetchall():
+                refresh_running_quantities(conn, account, instrument)
+
+            cursor.execute("DELETE FROM import_staging")
+            return new_ids
+
+        trade_ids: List[Optional[int]] = [None] * len(trades)
+        for seq, trade_id in run_write(self.db_path, insert_all):
+            trade_ids[seq] = trade_id
+
+        self.logger.debug(
+            f"Bulk inserted {sum(1 for t in trade_ids if t)} of {len(trades)} executions "
+            f"({sum(1 for t in trade_ids if t is None)} already existed)"
+        )
+        return trade_ids
 
     def _record_import_history(
         self,
@@ -1368,8 +1983,7 @@ class NinjaTraderImportService:
             trades_imported: Number of trades imported
             accounts_affected: List of account names affected
         """
-        try:
-            conn = sqlite3.connect(self.db_path)
+        def insert_history(conn):
             cursor = conn.cursor()
 
             # Check if import_history table exists (handle older databases)
@@ -1378,9 +1992,7 @@ class NinjaTraderImportService:
                 WHERE type='table' AND name='import_history'
             """)
             if not cursor.fetchone():
-                self.logger.warning("import_history table not found, skipping history record")
-                conn.close()
-                return
+                return False
 
             cursor.execute("""
                 INSERT OR REPLACE INTO import_history (
@@ -1395,9 +2007,12 @@ class NinjaTraderImportService:
                 trades_imported,
                 json.dumps(accounts_affected)
             ))
+            return True
 
-            conn.commit()
-            conn.close()
+        try:
+            if not run_write(self.db_path, insert_history):
+                self.logger.warning("import_history table not found, skipping history record")
+                return
 
             self.logger.debug(
                 f"Recorded import history: {file_path.name} "
@@ -1443,8 +2058,10 @@ class NinjaTraderImportService:
         """
         Start background watcher thread (Task 5.2).
 
-        Creates and starts a non-daemon background thread that polls for new CSV files
-        at the configured interval.
+        File system events (inotify via CSVWatcherService) wake the watcher
+        thread as soon as NinjaTrader closes the CSV after an append. If
+        event watching is unavailable, the thread polls for new CSV files at
+        the configured interval instead.
         """
         # Don't start if already running
         if self._running:
@@ -1453,6 +2070,20 @@ class NinjaTraderImportService:
 
         # Clear stop event
         self._stop_event.clear()
+        self._wake_event.clear()
+
+        # Prefer event-driven watching; poll only when it cannot start
+        try:
+            self._csv_watcher = CSVWatcherService(csv_dir=self.data_dir)
+            self._csv_watcher.start(self._on_csv_event)
+            self._watch_mode = 'events'
+        except Exception as e:
+            self.logger.warning(
+                f"File event watching unavailable ({e}); falling back to polling "
+                f"every {self._poll_interval} seconds"
+            )
+            self._csv_watcher = None
+            self._watch_mode = 'polling'
 
         # Create and start watcher thread
         self._watcher_thread = threading.Thread(
@@ -1467,9 +2098,24 @@ class NinjaTraderImportService:
         # Start thread
         self._watcher_thread.start()
 
-        self.logger.info(
-            f"Background watcher started. Polling every {self._poll_interval} seconds."
-        )
+        if self._watch_mode == 'events':
+            self.logger.info(
+                f"Background watcher started. Importing on file events "
+                f"(rescan every {self.EVENT_RESCAN_INTERVAL} seconds)."
+            )
+        else:
+            self.logger.info(
+                f"Background watcher started. Polling every {self._poll_interval} seconds."
+            )
+
+    def _on_csv_event(self, file_path: Path):
+        """
+        File event callback from CSVWatcherService: wake the watcher loop.
+
+        Events that arrive while a scan is running coalesce into one more scan.
+        """
+        if file_path.match(self.FILE_PATTERN):
+            self._wake_event.set()
 
     def stop_watcher(self):
         """
@@ -1485,6 +2131,11 @@ class NinjaTraderImportService:
         self.logger.info("Stopping background watcher...")
         self._running = False
         self._stop_event.set()
+        self._wake_event.set()
+
+        if self._csv_watcher:
+            self._csv_watcher.stop()
+            self._csv_watcher = None
 
         # Wait for thread to finish (with timeout)
         if self._watcher_thread and self._watcher_thread.is_alive():
@@ -1503,8 +2154,9 @@ class NinjaTraderImportService:
         """
         Main background loop for file detection (Task 5.3).
 
-        Polls for CSV files at configured interval, checks stability,
-        and processes new files automatically.
+        Scans for CSV files whenever a file event wakes it (or at the
+        configured interval when polling), and processes new or updated files
+        automatically.
         """
         self.logger.info("Background watcher loop started")
 
@@ -1540,31 +2192,21 @@ class NinjaTraderImportService:
                         self.logger.error(f"Error checking file mtime for {csv_file.name}: {e}")
                         continue
 
-                    # Check file stability (waits 5 seconds internally)
-                    if self._is_file_stable(csv_file):
-                        self.logger.info(
-                            f"Detected stable file: {csv_file.name}. Processing..."
-                        )
+                    # Process the file (checks stability itself)
+                    result = self.process_csv_file(csv_file)
 
-                        # Process the file
-                        result = self.process_csv_file(csv_file)
+                    if result['success']:
+                        # Update modification time tracking (persisted to Redis)
+                        self._save_file_mtime_to_redis(file_key, current_mtime)
 
-                        if result['success']:
-                            # Update modification time tracking (persisted to Redis)
-                            self._save_file_mtime_to_redis(file_key, current_mtime)
-
-                            self.logger.info(
-                                f"Successfully processed {csv_file.name}: "
-                                f"{result.get('executions_imported', 0)} executions imported"
-                            )
-                        else:
-                            self.logger.warning(
-                                f"Failed to process {csv_file.name}: "
-                                f"{result.get('error', 'Unknown error')}"
-                            )
+                        self.logger.info(
+                            f"Successfully processed {csv_file.name}: "
+                            f"{result.get('executions_imported', 0)} executions imported"
+                        )
                     else:
-                        self.logger.debug(
-                            f"File {csv_file.name} not stable yet, will retry next cycle"
+                        self.logger.warning(
+                            f"Failed to process {csv_file.name}: "
+                            f"{result.get('error', 'Unknown error')}, will retry next cycle"
                         )
 
             except Exception as e:
@@ -1575,9 +2217,12 @@ class NinjaTraderImportService:
                 )
                 self.error_count += 1
 
-            # Wait for poll interval (or until stop event)
-            # Use wait with timeout to allow responsive shutdown
-            self._stop_event.wait(timeout=self.poll_interval)
+            # Wait for the next file event (or poll interval, or stop)
+            # Events arriving during the scan above leave the flag set, so
+            # they coalesce into exactly one more scan
+            interval = self.EVENT_RESCAN_INTERVAL if self._watch_mode == 'events' else self.poll_interval
+            self._wake_event.wait(timeout=interval)
+            self._wake_event.clear()
 
         self.logger.info("Background watcher loop stopped")
 
@@ -1607,7 +2252,9 @@ class NinjaTraderImportService:
             'last_import_time': self.last_import_time.isoformat() if self.last_import_time else None,
             'error_count': self.error_count,
             'redis_connected': self.redis_client is not None,
-            'pending_files': pending_files
+            'pending_files': pending_files,
+            'watch_mode': self._watch_mode,
+            'fill_to_commit_latency': self.fill_latency.snapshot()
         }
 
 
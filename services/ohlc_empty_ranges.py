@@ -0,0 +1,214 @@
+"""
+OHLC Empty Range Ledger
+
+Weekends, CME holidays, maintenance halts and history Yahoo Finance does
+not have all look like gaps to gap detection, and refetching them spends
+API quota on responses that stay empty. The ohlc_empty_ranges table keeps
+(instrument, timeframe, start, end) ranges confirmed empty, with the source
+that confirmed them and an expiry. Gap detection, the fetch planner and
+the sync subtract these ranges before calling the provider.
+
+An empty response alone does not confirm a range: throttling and symbol
+problems come back empty too. Only the stretches without bars of a
+response that returned data elsewhere, and empty windows covering at most
+one trading session, are recorded (see OHLCDataService._fetch_ohlc_data_internal).
+
+A range reported empty by the provider shortly after it ended may still
+fill in (delayed data), so it expires quickly; settled ranges are trusted
+much longer. Both lifetimes are set in OHLC_EMPTY_RANGE_CONFIG.
+"""
+
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import sqlite3
+
+from scripts.write_queue import run_write
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PROVIDER_SOURCE = 'yahoo'
+
+Range = Tuple[int, int]
+
+
+def create_empty_range_schema(cursor: sqlite3.Cursor) -> None:
+    """Create the empty range ledger table"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ohlc_empty_ranges (
+            id INTEGER PRIMARY KEY,
+            instrument TEXT NOT NULL,
+            timeframe TEXT NOT NULL,
+            start_timestamp INTEGER NOT NULL,
+            end_timestamp INTEGER NOT NULL,
+            source TEXT NOT NULL,                -- who confirmed the range empty (e.g. 'yahoo')
+            expires_at INTEGER,                  -- epoch seconds, NULL: never
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_ohlc_empty_ranges_lookup
+        ON ohlc_empty_ranges(instrument, timeframe, start_timestamp)
+    """)
+
+
+def empty_range_expiry(end_timestamp: int, now: Optional[float] = None) -> int:
+    """Expiry (epoch seconds) of a range the provider returned no data for"""
+    from config import OHLC_EMPTY_RANGE_CONFIG
+
+    now = time.time() if now is None else now
+    if now - end_timestamp < OHLC_EMPTY_RANGE_CONFIG['settle_hours'] * 3600:
+        return int(now + OHLC_EMPTY_RANGE_CONFIG['recent_ttl_minutes'] * 60)
+    return int(now + OHLC_EMPTY_RANGE_CONFIG['settled_ttl_days'] * 86400)
+
+
+def record_empty_range(conn: sqlite3.Connection, instrument: str, timeframe: str, start: int, end: int,
+                       source: str, expires_at: Optional[int], now: Optional[float] = None) -> None:
+    """Add a range to the ledger inside the caller's write job, dropping expired entries of its series"""
+    now = time.time() if now is None else now
+    conn.execute("""
+        DELETE FROM ohlc_empty_ranges
+        WHERE instrument = ? AND timeframe = ? AND expires_at IS NOT NULL AND expires_at <= ?
+    """, (instrument, timeframe, int(now)))
+    conn.execute("""
+        INSERT INTO ohlc_empty_ranges (instrument, timeframe, start_timestamp, end_timestamp, source, expires_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (instrument, timeframe, int(start), int(end), source, expires_at))
+
+
+def bar_free_ranges(bars: Sequence[int], start: int, end: int, interval: int) -> List[Range]:
+    """
+    Stretches of [start, end) that no bar of a response covers.
+
+    Args:
+        bars: Sorted bar start times the provider returned for [start, end)
+        interval: Bar length in seconds
+
+    Returns:
+        Before the first bar, between bars at least two intervals apart and
+        after the last bar; [] without bars (an empty response confirms nothing)
+    """
+    if not len(bars):
+        return []
+    ranges = []
+    if bars[0] > start:
+        ranges.append((start, int(bars[0])))
+    ranges.extend((int(previous) + interval, int(current))
+                  for previous, current in zip(bars, bars[1:]) if current - previous >= 2 * interval)
+    if bars[-1] + interval < end:
+        ranges.append((int(bars[-1]) + interval, end))
+    return ranges
+
+
+def known_empty_ranges(conn: sqlite3.Connection, instrument: str, timeframe: str,
+                       start: int, end: int, now: Optional[float] = None) -> List[Range]:
+    """Unexpired ledger ranges overlapping [start, end], merged and sorted"""
+    now = time.time() if now is None else now
+    rows = conn.execute("""
+        SELECT start_timestamp, end_timestamp FROM ohlc_empty_ranges
+        WHERE instrument = ? AND timeframe = ?
+          AND start_timestamp <= ? AND end_timestamp >= ?
+          AND (expires_at IS NULL OR expires_at > ?)
+        ORDER BY start_timestamp
+    """, (instrument, timeframe, int(end), int(start), int(now))).fetchall()
+
+    merged: List[List[int]] = []
+    for range_start, range_end in rows:
+        if merged and range_start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], range_end)
+        else:
+            merged.append([range_start, range_end])
+    return [(range_start, range_end) for range_start, range_end in merged]
+
+
+def subtract_ranges(ranges: Iterable[Range], empty: Sequence[Range]) -> Tuple[List[Range], int]:
+    """
+    Remove the parts of `ranges` covered by the sorted, merged `empty` ranges.
+
+    Returns:
+        (remaining ranges, number of input ranges trimmed or removed)
+    """
+    remaining: List[Range] = []
+    hits = 0
+    for start, end in ranges:
+        if end <= start:
+            # A single missing bar
+            if any(empty_start <= start <= empty_end for empty_start, empty_end in empty):
+                hits += 1
+            else:
+                remaining.append((start, end))
+            continue
+
+        pieces = []
+        cursor = start
+        for empty_start, empty_end in empty:
+            if empty_end < cursor or empty_start > end:
+                continue
+            if empty_start > cursor:
+                pieces.append((cursor, empty_start))
+            cursor = max(cursor, empty_end)
+            if cursor >= end:
+                break
+        if cursor < end:
+            pieces.append((cursor, end))
+        if pieces != [(start, end)]:
+            hits += 1
+        remaining.extend(pieces)
+    return remaining, hits
+
+
+def subtract_known_empty(conn: sqlite3.Connection, instrument: str, timeframe: str,
+                         ranges: List[Range], now: Optional[float] = None) -> Tuple[List[Range], int]:
+    """subtract_ranges() against the ledger entries of one instrument/timeframe"""
+    if not ranges:
+        return [], 0
+    empty = known_empty_ranges(conn, instrument, timeframe,
+                               min(start for start, _ in ranges), max(end for _, end in ranges), now)
+    return subtract_ranges(ranges, empty)
+
+
+class EmptyRangeLedger:
+    """The empty range ledger of one database"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        from config import config
+        self.db_path = db_path or config.db_path
+
+    def _connect(self):
+        from scripts.connection_pool import get_connection_pool
+        return get_connection_pool(self.db_path).connection()
+
+    def record(self, instrument: str, timeframe: str, start: int, end: int,
+               source: str = PROVIDER_SOURCE, expires_at: Optional[int] = None) -> None:
+        """
+        Record [start, end] as confirmed empty.
+
+        expires_at defaults to empty_range_expiry(end); pass an explicit
+        expiry for other sources.
+        """
+        self.record_ranges(instrument, timeframe, [(start, end)], source, expires_at)
+
+    def record_ranges(self, instrument: str, timeframe: str, ranges: Iterable[Range],
+                      source: str = PROVIDER_SOURCE, expires_at: Optional[int] = None) -> None:
+        """record() for several ranges of one series, in a single write job"""
+        ranges = [(start, end) for start, end in ranges if end > start]
+        if not ranges:
+            return
+
+        def write(conn):
+            for start, end in ranges:
+                record_empty_range(conn, instrument, timeframe, start, end, source,
+                                   empty_range_expiry(end) if expires_at is None else expires_at)
+
+        run_write(self.db_path, write)
+        logger.debug(f"Recorded {len(ranges)} empty ranges of {instrument} {timeframe} ({source})")
+
+    def known_empty(self, instrument: str, timeframe: str, start: int, end: int) -> List[Range]:
+        with self._connect() as conn:
+            return known_empty_ranges(conn, instrument, timeframe, start, end)
+
+    def subtract(self, instrument: str, timeframe: str, ranges: List[Range]) -> Tuple[List[Range], int]:
+        """Ranges minus the known-empty ones, and the number of ranges the ledger hit"""
+        with self._connect() as conn:
+            return subtract_known_empty(conn, instrument, timeframe, ranges)
@@ -0,0 +1,159 @@
+"""
+OHLC Fetch Planner
+
+Turns many OHLC fetch intents (instrument, timeframe, time range) into the
+smallest set of provider calls. Per-position gap fills each ask for nearly
+the same ranges after a busy trading day; fetching them one by one spends
+one Yahoo call per position, timeframe and gap.
+
+plan_fetches() groups the intents per instrument/timeframe, merges ranges
+that overlap or touch (within one bar), drops what lies beyond the
+provider's history limit or is known to be empty (services/ohlc_empty_ranges.py),
+splits what exceeds the per-request span and orders the resulting calls:
+higher priority first, then most recent data first. The plan reports the
+calls it saves over fetching each intent.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from services.ohlc_empty_ranges import subtract_ranges
+from services.ohlc_timeframes import TIMEFRAME_SECONDS
+
+# Priority of an intent; lower is fetched first
+PRIORITY_LEVELS = {'high': 0, 'normal': 1, 'low': 2}
+
+# Longest range Yahoo Finance serves in one request, in days (None: no limit)
+MAX_REQUEST_DAYS = {
+    '1m': 7,
+    '2m': 60, '5m': 60, '15m': 60, '30m': 60, '60m': 60, '90m': 60,
+    '1h': 60, '2h': 60, '4h': 60, '6h': 60, '8h': 60, '12h': 60,
+}
+
+SECONDS_PER_DAY = 86400
+
+
+class FetchIntent(NamedTuple):
+    """A range of one instrument/timeframe someone wants fetched (epoch seconds)"""
+    instrument: str
+    timeframe: str
+    start: int
+    end: int
+    priority: int = PRIORITY_LEVELS['normal']
+
+    @classmethod
+    def from_datetimes(cls, instrument: str, timeframe: str, start: datetime, end: datetime,
+                       priority: str = 'normal') -> 'FetchIntent':
+        """Intent for a datetime range (naive datetimes are local time, as datetime.timestamp() reads them)"""
+        return cls(instrument, timeframe, int(start.timestamp()), int(end.timestamp()),
+                   PRIORITY_LEVELS.get(priority, PRIORITY_LEVELS['normal']))
+
+
+class PlannedFetch(NamedTuple):
+    """One provider call of a plan (epoch seconds)"""
+    instrument: str
+    timeframe: str
+    start: int
+    end: int
+    priority: int
+    intents: int  # intents this call (or the merged range it was split from) covers
+
+    @property
+    def start_date(self) -> datetime:
+        return datetime.fromtimestamp(self.start)
+
+    @property
+    def end_date(self) -> datetime:
+        return datetime.fromtimestamp(self.end)
+
+
+class FetchPlan(NamedTuple):
+    """Provider calls for a set of intents, in execution order"""
+    fetches: List[PlannedFetch]
+    naive_calls: int  # one call per intent, as without planning
+    unreachable: int  # intents entirely older than the provider's history limit
+    ledger_hits: int = 0  # merged ranges trimmed or dropped as known empty
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'intents': self.naive_calls,
+            'naive_calls': self.naive_calls,
+            'planned_calls': len(self.fetches),
+            'calls_saved': self.naive_calls - len(self.fetches),
+            'unreachable_intents': self.unreachable,
+            'ledger_hits': self.ledger_hits,
+        }
+
+
+def _split(start: int, end: int, max_seconds: Optional[int]) -> List[tuple]:
+    if not max_seconds or end - start <= max_seconds:
+        return [(start, end)]
+    return [(chunk_start, min(chunk_start + max_seconds, end))
+            for chunk_start in range(start, end, max_seconds)]
+
+
+def plan_fetches(intents: Iterable[FetchIntent], historical_limits: Dict[str, int],
+                 now: Optional[float] = None,
+                 max_request_days: Optional[Dict[str, int]] = None,
+                 known_empty: Optional[Callable[[str, str, int, int], List[Tuple[int, int]]]] = None) -> FetchPlan:
+    """
+    Plan the provider calls covering `intents`.
+
+    Args:
+        intents: Ranges to fetch
+        historical_limits: Days of history the provider serves per timeframe
+            (OHLCDataService.HISTORICAL_LIMITS); older parts are dropped
+        now: Current epoch time (default: time of the call)
+        max_request_days: Longest range per call and timeframe (default MAX_REQUEST_DAYS)
+        known_empty: (instrument, timeframe, start, end) -> sorted, merged ranges
+            known to have no data (EmptyRangeLedger.known_empty); subtracted
+            from the merged ranges
+
+    Returns:
+        FetchPlan ordered by priority, then most recent range first
+    """
+    now = datetime.now().timestamp() if now is None else now
+    max_request_days = MAX_REQUEST_DAYS if max_request_days is None else max_request_days
+
+    groups = defaultdict(list)
+    naive_calls = 0
+    for intent in intents:
+        naive_calls += 1
+        if intent.end > intent.start:
+            groups[(intent.instrument, intent.timeframe)].append(intent)
+
+    fetches: List[PlannedFetch] = []
+    unreachable = 0
+    ledger_hits = 0
+    for (instrument, timeframe), group in groups.items():
+        history_start = int(now - historical_limits.get(timeframe, 365) * SECONDS_PER_DAY)
+        bar_seconds = TIMEFRAME_SECONDS.get(timeframe, 0)
+        request_days = max_request_days.get(timeframe)
+        max_seconds = request_days * SECONDS_PER_DAY if request_days else None
+
+        merged = []  # [start, end, priority, intents]
+        for intent in sorted(group, key=lambda intent: intent.start):
+            if intent.end <= history_start:
+                unreachable += 1
+                continue
+            start = max(intent.start, history_start)
+            if merged and start <= merged[-1][1] + bar_seconds:
+                current = merged[-1]
+                current[1] = max(current[1], intent.end)
+                current[2] = min(current[2], intent.priority)
+                current[3] += 1
+            else:
+                merged.append([start, intent.end, intent.priority, 1])
+
+        for start, end, priority, count in merged:
+            ranges = [(start, end)]
+            if known_empty is not None:
+                ranges, hits = subtract_ranges(ranges, known_empty(instrument, timeframe, start, end))
+                ledger_hits += hits
+            for range_start, range_end in ranges:
+                fetches.extend(PlannedFetch(instrument, timeframe, chunk_start, chunk_end, priority, count)
+                               for chunk_start, chunk_end in _split(range_start, range_end, max_seconds))
+
+    fetches.sort(key=lambda fetch: (fetch.priority, -fetch.end, fetch.instrument, fetch.timeframe))
+    return FetchPlan(fetches, naive_calls, unreachable, ledger_hits)
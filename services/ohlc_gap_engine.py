@@ -0,0 +1,112 @@
+"""
+OHLC Gap Engine
+
+Finds the missing bars of one instrument/timeframe in a single SQL pass.
+Stored timestamps plus two sentinels just outside the range are compared to
+their predecessor with LAG(); a step of two bar intervals or more is a gap
+from the bar after the predecessor to the bar before the current row. Only
+the gap boundaries leave SQLite, not every timestamp of the range.
+
+Gaps of intraday and daily series are then clipped to CME trading sessions
+(services/session_calendar.py), so weekends, the daily maintenance halt and
+holidays are not reported as missing data. Longer timeframes are not
+filtered.
+
+FuturesDB.find_ohlc_gaps, DataCompletenessService.get_gap_details and the
+position gap-fill tasks all detect gaps through find_gaps().
+"""
+
+from typing import List, Optional, Tuple
+
+import sqlite3
+
+from services.ohlc_timeframes import TIMEFRAME_SECONDS
+from services.session_calendar import SessionCalendar, get_session_calendar
+
+Range = Tuple[int, int]
+
+# Longest bar interval whose gaps are clipped to trading sessions
+SESSION_FILTER_MAX_SECONDS = 86400
+
+_GAP_QUERY = """
+    WITH stamps(ts) AS (
+        SELECT timestamp FROM ohlc_data
+        WHERE instrument = ? AND timeframe = ? AND timestamp BETWEEN ? AND ?
+        UNION ALL SELECT ?
+        UNION ALL SELECT ?
+    ),
+    steps AS (
+        SELECT ts, LAG(ts) OVER (ORDER BY ts) AS prev_ts FROM stamps
+    )
+    SELECT prev_ts + ?, ts - ? FROM steps
+    WHERE prev_ts IS NOT NULL AND ts - prev_ts >= ?
+    ORDER BY ts
+"""
+
+
+def raw_gaps(conn: sqlite3.Connection, instrument: str, timeframe: str,
+             start: int, end: int) -> List[Range]:
+    """
+    Inclusive (first missing bar, last missing bar) ranges in [start, end],
+    ignoring trading sessions. A gap reaching the end of the range ends at
+    `end` itself.
+    """
+    interval = TIMEFRAME_SECONDS.get(timeframe, 60)
+    rows = conn.execute(_GAP_QUERY, (
+        instrument, timeframe, int(start), int(end),
+        int(start) - interval, int(end) + interval,
+        interval, interval, 2 * interval,
+    )).fetchall()
+    return [(gap_start, gap_end) for gap_start, gap_end in rows]
+
+
+def clip_to_sessions(gaps: List[Range], interval: int, calendar: Optional[SessionCalendar] = None,
+                     split_sessions: bool = True) -> List[Range]:
+    """
+    Keep the bars of each gap that fall inside a trading session.
+
+    With split_sessions False a gap spanning several sessions stays one
+    range, trimmed to its first and last in-session bar; fetches want that,
+    one provider call per missing stretch rather than per session.
+    """
+    if not gaps:
+        return []
+    calendar = calendar or get_session_calendar(gaps[0][0], gaps[-1][1])
+    clipped = []
+    for gap_start, gap_end in gaps:
+        runs = calendar.clip_bars(gap_start, gap_end, interval)
+        if runs and not split_sessions:
+            runs = [(runs[0][0], runs[-1][1])]
+        clipped.extend(runs)
+    return clipped
+
+
+def find_gaps(conn: sqlite3.Connection, instrument: str, timeframe: str, start: int, end: int,
+              session_filter: bool = True, calendar: Optional[SessionCalendar] = None,
+              split_sessions: bool = True) -> List[Range]:
+    """
+    Missing bar ranges of one series in [start, end] (epoch seconds).
+
+    Args:
+        conn: Database connection
+        session_filter: Drop bars outside trading sessions (timeframes up to 1d)
+        calendar: Session calendar to clip with (default: the instrument's cached one)
+        split_sessions: Report a gap per session rather than per missing stretch
+
+    Returns:
+        Sorted, inclusive (first missing bar, last missing bar) ranges
+    """
+    if end < start:
+        return []
+    gaps = raw_gaps(conn, instrument, timeframe, start, end)
+    interval = TIMEFRAME_SECONDS.get(timeframe, 60)
+    if session_filter and interval <= SESSION_FILTER_MAX_SECONDS and gaps:
+        calendar = calendar or get_session_calendar(gaps[0][0], gaps[-1][1], instrument)
+        gaps = clip_to_sessions(gaps, interval, calendar, split_sessions)
+    return gaps
+
+
+def missing_bar_count(gaps: List[Range], timeframe: str) -> int:
+    """Number of bars the gaps of a series cover"""
+    interval = TIMEFRAME_SECONDS.get(timeframe, 60)
+    return sum((gap_end - gap_start) // interval + 1 for gap_start, gap_end in gaps)
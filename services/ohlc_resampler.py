@@ -0,0 +1,250 @@
+"""
+OHLC Resampler
+
+Derives higher timeframes (3m ... 1d) from the stored 1m bars instead of
+fetching each one from Yahoo Finance. Bars are aligned to the CME Globex
+session: a session opens at 17:00 Chicago time and its trading day is the
+next calendar day, so intraday bins are counted from the session open (4h
+bars start at 17:00, 21:00, 01:00, ...) and a daily bar covers one session.
+Daily bars are stamped at midnight New York time of the trading day, as
+Yahoo stamps futures daily bars, so derived and fetched daily bars share
+timestamps.
+
+Resampling is incremental: ohlc_resample_state keeps, per instrument, the
+highest 1m row id already resampled. Only the sessions containing newer 1m
+rows are re-aggregated, and the derived bars are upserted in one write job.
+
+Derived bars are marked with source = 'resampled' and source_bar_count (the
+number of 1m bars aggregated); fetched bars have source NULL and are never
+overwritten by derived ones.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sqlite3
+
+from scripts.write_queue import run_write
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+BASE_TIMEFRAME = '1m'
+RESAMPLED_SOURCE = 'resampled'
+
+CME_TIMEZONE = 'America/Chicago'
+DAILY_BAR_TIMEZONE = 'America/New_York'
+
+# Seconds from the session open (17:00 Chicago) to the start of its trading day
+SESSION_OPEN_OFFSET = 7 * 3600
+SECONDS_PER_DAY = 86400
+
+# Intraday timeframes derived from 1m bars, in minutes; '1d' is one session
+TIMEFRAME_MINUTES = {'3m': 3, '5m': 5, '15m': 15, '30m': 30, '1h': 60, '4h': 240}
+DERIVED_TIMEFRAMES = list(TIMEFRAME_MINUTES) + ['1d']
+
+
+def create_resample_schema(cursor: sqlite3.Cursor) -> None:
+    """Add the provenance columns to ohlc_data and the resample watermark table"""
+    for column in ('source TEXT', 'source_bar_count INTEGER'):
+        try:
+            cursor.execute(f"ALTER TABLE ohlc_data ADD COLUMN {column}")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e).lower():
+                raise
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ohlc_resample_state (
+            instrument TEXT PRIMARY KEY,
+            last_source_id INTEGER NOT NULL,  -- highest 1m ohlc_data.id resampled
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _session_days(timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Trading day (days since the epoch) and Chicago UTC offset (seconds) of
+    each UTC timestamp. Sessions never span a DST change (those happen on
+    Sunday morning, while the market is closed), so one offset holds for a
+    whole session.
+    """
+    utc = pd.DatetimeIndex(pd.to_datetime(timestamps, unit='s', utc=True))
+    local = utc.tz_convert(CME_TIMEZONE).tz_localize(None)
+    offsets = (local.asi8 - utc.tz_localize(None).asi8) // 10**9
+    days = (timestamps + offsets + SESSION_OPEN_OFFSET) // SECONDS_PER_DAY
+    return days, offsets
+
+
+def session_open_times(timestamps: np.ndarray) -> np.ndarray:
+    """UTC open time of the session containing each UTC timestamp"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    days, offsets = _session_days(timestamps)
+    return days * SECONDS_PER_DAY - SESSION_OPEN_OFFSET - offsets
+
+
+def session_bins(timestamps: np.ndarray, timeframe: str) -> np.ndarray:
+    """UTC start of the session-aligned `timeframe` bar containing each UTC timestamp"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    days, offsets = _session_days(timestamps)
+
+    if timeframe == '1d':
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        midnights = pd.DatetimeIndex(pd.to_datetime(unique_days * SECONDS_PER_DAY, unit='s'))
+        stamps = midnights.tz_localize(DAILY_BAR_TIMEZONE).asi8 // 10**9
+        return stamps[inverse]
+
+    bin_seconds = TIMEFRAME_MINUTES[timeframe] * 60
+    session_open = days * SECONDS_PER_DAY - SESSION_OPEN_OFFSET - offsets
+    return session_open + (timestamps - session_open) // bin_seconds * bin_seconds
+
+
+def resample_bars(bars: Dict[str, np.ndarray], timeframe: str) -> Dict[str, np.ndarray]:
+    """
+    Aggregate 1m bars (arrays sorted by timestamp) into `timeframe` bars.
+
+    Returns:
+        Arrays timestamp, open, high, low, close, volume and count (1m bars
+        per derived bar)
+    """
+    timestamps = bars['timestamp']
+    if len(timestamps) == 0:
+        return {key: np.array([], dtype=np.int64) for key in
+                ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'count')}
+
+    bins = session_bins(timestamps, timeframe)
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    ends = np.r_[starts[1:], len(bins)]
+
+    return {
+        'timestamp': bins[starts],
+        'open': bars['open'][starts],
+        'high': np.maximum.reduceat(bars['high'], starts),
+        'low': np.minimum.reduceat(bars['low'], starts),
+        'close': bars['close'][ends - 1],
+        'volume': np.add.reduceat(bars['volume'], starts),
+        'count': ends - starts,
+    }
+
+
+def _merge_ranges(starts: np.ndarray, length: int) -> List[Tuple[int, int]]:
+    """Coalesce [start, start + length) ranges into sorted, non-overlapping ones"""
+    ranges: List[Tuple[int, int]] = []
+    for start in np.unique(starts).tolist():
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], start + length)
+        else:
+            ranges.append((start, start + length))
+    return ranges
+
+
+class OHLCResampler:
+    """Incrementally derives higher timeframes from stored 1m bars"""
+
+    UPSERT_SQL = f"""
+        INSERT INTO ohlc_data (instrument, timeframe, timestamp, open_price, high_price, low_price,
+                               close_price, volume, source, source_bar_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, '{RESAMPLED_SOURCE}', ?)
+        ON CONFLICT(instrument, timeframe, timestamp) DO UPDATE SET
+            open_price = excluded.open_price,
+            high_price = excluded.high_price,
+            low_price = excluded.low_price,
+            close_price = excluded.close_price,
+            volume = excluded.volume,
+            source_bar_count = excluded.source_bar_count
+        WHERE ohlc_data.source = '{RESAMPLED_SOURCE}'
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        from config import config
+        self.db_path = db_path or config.db_path
+
+    def _connect(self):
+        from scripts.connection_pool import get_connection_pool
+        return get_connection_pool(self.db_path).connection()
+
+    def resample_instrument(self, instrument: str, timeframes: Optional[List[str]] = None,
+                            full: bool = False) -> Dict[str, object]:
+        """
+        Derive `timeframes` (default: DERIVED_TIMEFRAMES) for one instrument
+        from the 1m bars added since the last run.
+
+        Args:
+            instrument: Instrument as stored in ohlc_data (e.g. 'MNQ SEP25')
+            timeframes: Timeframes to derive
+            full: Re-derive from every stored 1m bar, ignoring the watermark
+
+        Returns:
+            Stats: sessions re-aggregated, 1m bars read and bars written per timeframe
+        """
+        timeframes = [tf for tf in (timeframes or DERIVED_TIMEFRAMES) if tf in DERIVED_TIMEFRAMES]
+        stats = {'instrument': instrument, 'sessions': 0, 'source_bars': 0,
+                 'bars_written': {timeframe: 0 for timeframe in timeframes}}
+        if not timeframes:
+            return stats
+
+        with self._connect() as conn:
+            watermark = 0
+            if not full:
+                row = conn.execute("SELECT last_source_id FROM ohlc_resample_state WHERE instrument = ?",
+                                   (instrument,)).fetchone()
+                watermark = row[0] if row else 0
+
+            new_rows = np.array(conn.execute("""
+                SELECT id, timestamp FROM ohlc_data
+                WHERE id > ? AND instrument = ? AND timeframe = ?
+            """, (watermark, instrument, BASE_TIMEFRAME)).fetchall(), dtype=np.int64).reshape(-1, 2)
+            if len(new_rows) == 0:
+                return stats
+
+            # Re-aggregate every session that received new 1m bars
+            session_opens = session_open_times(new_rows[:, 1])
+            chunks = []
+            for start, end in _merge_ranges(session_opens, SECONDS_PER_DAY):
+                chunks.extend(conn.execute("""
+                    SELECT timestamp, open_price, high_price, low_price, close_price, COALESCE(volume, 0)
+                    FROM ohlc_data
+                    WHERE instrument = ? AND timeframe = ? AND timestamp >= ? AND timestamp < ?
+                    ORDER BY timestamp
+                """, (instrument, BASE_TIMEFRAME, start, end)).fetchall())
+
+        data = np.array(chunks, dtype=np.float64).reshape(-1, 6)
+        bars = {
+            'timestamp': data[:, 0].astype(np.int64),
+            'open': data[:, 1], 'high': data[:, 2], 'low': data[:, 3], 'close': data[:, 4],
+            'volume': data[:, 5].astype(np.int64),
+        }
+        stats['sessions'] = len(np.unique(session_opens))
+        stats['source_bars'] = len(data)
+
+        rows = []
+        for timeframe in timeframes:
+            derived = resample_bars(bars, timeframe)
+            stats['bars_written'][timeframe] = len(derived['timestamp'])
+            rows.extend(zip(
+                [instrument] * len(derived['timestamp']), [timeframe] * len(derived['timestamp']),
+                derived['timestamp'].tolist(), derived['open'].tolist(), derived['high'].tolist(),
+                derived['low'].tolist(), derived['close'].tolist(), derived['volume'].tolist(),
+                derived['count'].tolist(),
+            ))
+
+        last_source_id = int(new_rows[:, 0].max())
+
+        def write(conn):
+            conn.executemany(self.UPSERT_SQL, rows)
+            conn.execute("""
+                INSERT INTO ohlc_resample_state (instrument, last_source_id, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(instrument) DO UPDATE SET
+                    last_source_id = MAX(last_source_id, excluded.last_source_id),
+                    updated_at = excluded.updated_at
+            """, (instrument, last_source_id))
+
+        run_write(self.db_path, write)
+
+        logger.info(
+            f"Resampled {stats['source_bars']} 1m bars of {instrument} over {stats['sessions']} sessions "
+            f"into {sum(stats['bars_written'].values())} bars ({', '.join(timeframes)})"
+        )
+        return stats
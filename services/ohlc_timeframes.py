@@ -0,0 +1,13 @@
+"""
+OHLC Timeframes
+
+Bar length in seconds of every timeframe the OHLC services handle. Shared
+by the session calendar, gap engine and fetch planner, which need the
+table but nothing else from one another.
+"""
+
+TIMEFRAME_SECONDS = {
+    '1m': 60, '2m': 120, '3m': 180, '5m': 300, '15m': 900, '30m': 1800, '60m': 3600, '90m': 5400,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '8h': 28800, '12h': 43200,
+    '1d': 86400, '5d': 432000, '1wk': 604800, '1mo': 2592000, '3mo': 7776000,
+}
@@ -5,13 +5,26 @@ Refactored position logic into smaller, testable pure functions.
 Implements Gemini's recommendations for modular algorithm design.
 """
 
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+import sys
+from datetime import timedelta
+from itertools import groupby
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 from decimal import Decimal
 import logging
 
+import numpy as np
+
+from domain.services import position_kernel
+from services.position_overlap_engine import PositionOverlapIndex
+
 logger = logging.getLogger('position_algorithms')
 
+# +1 adds to a long / covers a short, -1 the opposite
+SIDE_SIGNS = {
+    'Buy': 1, 'BuyToCover': 1, 'Long': 1,
+    'Sell': -1, 'SellShort': -1, 'Short': -1,
+}
+
 
 class QuantityFlow:
     """Represents a single point in quantity flow with running totals"""
@@ -35,6 +48,48 @@ class QuantityFlow:
             self.action_type = 'ADD'
 
 
+def stream_trade_groups(cursor, key: Callable[[Dict], Any], fetch_size: int = 5000) -> Iterator[Tuple[Any, List[Dict]]]:
+    """
+    Yield (key, trades) for each run of consecutive rows with the same key.
+
+    Reads an executed cursor in fetch_size chunks, so only the current group
+    is held in memory. The query must be ordered so that each key's rows are
+    contiguous (e.g. ORDER BY account, instrument, ...).
+    """
+    def rows():
+        while True:
+            chunk = cursor.fetchmany(fetch_size)
+            if not chunk:
+                return
+            yield from chunk
+
+    for group_key, group_rows in groupby((dict(row) for row in rows()), key=key):
+        yield group_key, list(group_rows)
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """
+    Peak resident set size in MB of this process, or with children=True of
+    its largest finished child process; None where the platform has no figure.
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil reports the peak working set of this process only
+        if children:
+            return None
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / 2 ** 20, 1)
+        except (ImportError, AttributeError):
+            return None
+
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+
+
 def calculate_running_quantity(executions: List[Dict]) -> List[QuantityFlow]:
     """
     Calculate running quantity through executions to identify position boundaries.
@@ -48,32 +103,25 @@ def calculate_running_quantity(executions: List[Dict]) -> List[QuantityFlow]:
     if not executions:
         return []
     
-    quantity_flows = []
-    running_quantity = 0
-    
+    known = []
+    signed_changes = []
     for execution in executions:
-        # Calculate signed quantity change
-        side = execution['side_of_market']
-        quantity = execution['quantity']
-        
-        if side in ['Buy', 'BuyToCover', 'Long']:
-            signed_change = quantity
-        elif side in ['Sell', 'SellShort', 'Short']:
-            signed_change = -quantity
-        else:
-            logger.warning(f"Unknown side_of_market: {side} in execution {execution.get('id', 'unknown')}")
+        sign = SIDE_SIGNS.get(execution['side_of_market'])
+        if sign is None:
+            logger.warning(f"Unknown side_of_market: {execution['side_of_market']} in execution {execution.get('id', 'unknown')}")
             continue
-        
-        # Update running quantity
-        previous_quantity = running_quantity
-        running_quantity += signed_change
-        
-        # Create quantity flow point
-        flow = QuantityFlow(execution, running_quantity, previous_quantity)
-        flow.signed_change = signed_change
-        
-        quantity_flows.append(flow)
-    
+        known.append(execution)
+        signed_changes.append(sign * execution['quantity'])
+
+    flow = position_kernel.quantity_flow(signed_changes)
+
+    quantity_flows = []
+    for execution, signed_change, running_quantity, previous_quantity in zip(
+            known, signed_changes, flow.running.tolist(), flow.previous.tolist()):
+        quantity_flow = QuantityFlow(execution, running_quantity, previous_quantity)
+        quantity_flow.signed_change = signed_change
+        quantity_flows.append(quantity_flow)
+
     return quantity_flows
 
 
@@ -90,27 +138,25 @@ def group_executions_by_position(quantity_flows: List[QuantityFlow]) -> List[Lis
     if not quantity_flows:
         return []
     
-    positions = []
-    current_position = []
-    
-    for flow in quantity_flows:
-        current_position.append(flow)
-        
-        # Check if position is closed (running quantity returns to 0)
-        if flow.running_quantity == 0 and len(current_position) > 0:
-            positions.append(current_position)
-            current_position = []
-    
-    # Add any remaining open position
-    if current_position:
-        # Check if the position is actually open (last flow has non-zero quantity)
-        if current_position[-1].running_quantity != 0:
-            positions.append(current_position)
-        else:
-            # Position ended flat but wasn't caught by the main loop - add as closed
-            positions.append(current_position)
-    
-    return positions
+    # A position ends at every return to flat; whatever follows the last one is still open
+    running = np.array([flow.running_quantity for flow in quantity_flows])
+    boundaries = [0] + (np.flatnonzero(running == 0) + 1).tolist()
+    if boundaries[-1] < len(quantity_flows):
+        boundaries.append(len(quantity_flows))
+
+    return [quantity_flows[start:end] for start, end in zip(boundaries, boundaries[1:])]
+
+
+def _execution_value(flows: List[QuantityFlow], price_field: str) -> Decimal:
+    """
+    Exact sum of price * quantity over flows, in integer price ticks.
+
+    Falls back to the execution's 'price' when price_field is missing or 0.
+    """
+    prices = [flow.execution.get(price_field) or flow.execution.get('price', 0) for flow in flows]
+    ticks, scale = position_kernel.decimal_ticks(prices)
+    value = sum(tick * flow.quantity_change for tick, flow in zip(ticks, flows))
+    return Decimal(str(value)) / Decimal(scale)
 
 
 def calculate_position_pnl(position_flows: List[QuantityFlow], multiplier: Decimal = Decimal('1')) -> Dict[str, Any]:
@@ -155,32 +201,13 @@ def calculate_position_pnl(position_flows: List[QuantityFlow], multiplier: Decim
     if not entry_flows or not exit_flows:
         return {'error': 'Position must have both entries and exits'}
     
-    # Calculate weighted average entry price
+    # Calculate weighted average entry and exit prices
     total_entry_quantity = sum(flow.quantity_change for flow in entry_flows)
-    total_entry_value = Decimal('0')
-    
-    for flow in entry_flows:
-        # Use appropriate price field based on position direction
-        if is_long_position:
-            price = flow.execution.get('entry_price') or flow.execution.get('price', 0)
-        else:
-            price = flow.execution.get('entry_price') or flow.execution.get('price', 0)
-        total_entry_value += Decimal(str(price)) * Decimal(str(flow.quantity_change))
-    
+    total_entry_value = _execution_value(entry_flows, 'entry_price')
     avg_entry_price = total_entry_value / Decimal(str(total_entry_quantity))
-    
-    # Calculate weighted average exit price
+
     total_exit_quantity = sum(flow.quantity_change for flow in exit_flows)
-    total_exit_value = Decimal('0')
-    
-    for flow in exit_flows:
-        # Use appropriate price field based on position direction
-        if is_long_position:
-            price = flow.execution.get('exit_price') or flow.execution.get('price', 0)
-        else:
-            price = flow.execution.get('exit_price') or flow.execution.get('price', 0)
-        total_exit_value += Decimal(str(price)) * Decimal(str(flow.quantity_change))
-    
+    total_exit_value = _execution_value(exit_flows, 'exit_price')
     avg_exit_price = total_exit_value / Decimal(str(total_exit_quantity))
     
     # Determine position direction from first entry
@@ -325,6 +352,9 @@ def detect_position_overlaps(positions_by_account: Dict[str, List[Dict]]) -> Lis
     """
     Detect overlapping positions that violate the 0 → +/- → 0 rule.
     
+    Every overlapping pair is reported, not just neighbours in entry order;
+    see PositionOverlapIndex for the sweep.
+    
     Args:
         positions_by_account: Dictionary mapping accounts to position lists
         
@@ -334,29 +364,20 @@ def detect_position_overlaps(positions_by_account: Dict[str, List[Dict]]) -> Lis
     overlaps = []
     
     for account, positions in positions_by_account.items():
-        # Sort positions by entry time
-        sorted_positions = sorted(positions, key=lambda p: p.get('entry_time', datetime.min))
-        
-        for i in range(len(sorted_positions) - 1):
-            current_pos = sorted_positions[i]
-            next_pos = sorted_positions[i + 1]
-            
-            # Check for time overlap
-            current_exit = current_pos.get('exit_time')
-            next_entry = next_pos.get('entry_time')
-            
-            if current_exit and next_entry:
-                if next_entry < current_exit:
-                    overlaps.append({
-                        'account': account,
-                        'instrument': current_pos.get('instrument'),
-                        'overlap_type': 'time_overlap',
-                        'position1_id': current_pos.get('id'),
-                        'position2_id': next_pos.get('id'),
-                        'position1_exit': current_exit,
-                        'position2_entry': next_entry,
-                        'overlap_duration': str(current_exit - next_entry)
-                    })
+        for pair in PositionOverlapIndex(positions).overlaps():
+            if pair.overlap_seconds is None:
+                continue  # open positions have no exit to compare
+
+            overlaps.append({
+                'account': account,
+                'instrument': pair.earlier.get('instrument'),
+                'overlap_type': 'time_overlap',
+                'position1_id': pair.earlier.get('id'),
+                'position2_id': pair.later.get('id'),
+                'position1_exit': pair.earlier.get('exit_time'),
+                'position2_entry': pair.later.get('entry_time'),
+                'overlap_duration': str(timedelta(seconds=pair.overlap_seconds))
+            })
     
     return overlaps
 
@@ -1,14 +1,19 @@
 """
 Position Engine - Application service for position management
 
-Orchestrates position building using domain services
+Orchestrates position building using domain services. This is the canonical
+position engine: PositionBuilder's array kernel does the quantity flow and
+FIFO work, EnhancedPositionServiceV2 rebuilds positions through it, and
+scripts/position_engine_harness.py checks it against the legacy builders.
 """
 
 from typing import List, Dict, Optional, Tuple
 import logging
 from datetime import datetime
 
+from domain.models.pnl import ExecutionPair
 from domain.models.position import Position
+from domain.models.execution_batch import ExecutionBatch
 from domain.models.trade import Trade
 from domain.services.position_builder import PositionBuilder
 from domain.services.pnl_calculator import PnLCalculator
@@ -38,6 +43,21 @@ class PositionEngine(IPositionEngine):
         Returns:
             List of Position objects
         """
+        return [position for position, _ in self.build_positions_with_executions(trades_data)]
+    
+    def build_positions_with_executions(self, trades_data: List[Dict]) -> List[Tuple[Position, List[Dict]]]:
+        """
+        Build positions from trade data, each paired with its trades
+        
+        A reversal trade closes one position and opens the next, so it is
+        listed with both.
+        
+        Args:
+            trades_data: List of trade dictionaries (from database)
+            
+        Returns:
+            List of (Position, trade dictionaries in execution order) tuples
+        """
         if not trades_data:
             return []
         
@@ -51,19 +71,40 @@ class PositionEngine(IPositionEngine):
         for (account, instrument), group_trades in account_instrument_groups.items():
             logger.info(f"Processing {len(group_trades)} trades for {account}/{instrument}")
             
-            # Convert trade dictionaries to Trade objects
-            trade_objects = [Trade.from_dict(trade_dict) for trade_dict in group_trades]
+            # Validate the group as one batch of arrays instead of a Trade per row
+            batch, rejected = ExecutionBatch.from_dicts(group_trades)
+            for trade_dict, reason in rejected:
+                logger.warning(f"Skipping invalid trade {trade_dict.get('entry_execution_id', 'Unknown')}: {reason}")
+            batch = batch.sorted_by_time()
             
             # Build positions for this account/instrument group
-            positions = self.position_builder.build_positions_from_trades(
-                trade_objects, account, instrument
+            all_positions.extend(
+                (position, batch.sources[start:end + 1])
+                for position, start, end in self.build_positions_from_batch(batch, account, instrument)
             )
-            
-            all_positions.extend(positions)
         
         logger.info(f"Built {len(all_positions)} positions from {len(trades_data)} trades")
         return all_positions
     
+    def build_positions_from_batch(self, batch: ExecutionBatch, account: str,
+                                   instrument: str) -> List[Tuple[Position, int, int]]:
+        """
+        Build one account/instrument's positions from a validated batch
+        
+        Args:
+            batch: ExecutionBatch of the trades, in chronological order
+            account: Account name
+            instrument: Instrument name
+            
+        Returns:
+            (position, first execution index, last execution index) per position
+        """
+        return self.position_builder.build_positions_from_batch(batch, account, instrument)
+    
+    def build_execution_pairs_from_batch(self, batch: ExecutionBatch, instrument: str) -> List[List[ExecutionPair]]:
+        """FIFO entry/exit pairs of each position of a chronologically sorted batch"""
+        return self.position_builder.build_execution_pairs_from_batch(batch, instrument)
+    
     def rebuild_positions_from_trades(self, trades_data: List[Dict]) -> Dict[str, int]:
         """
         Rebuild all positions from trade data
@@ -117,8 +158,7 @@ class PositionEngine(IPositionEngine):
                 trade_objects = [Trade.from_dict(trade_dict) for trade_dict in group_trades]
                 
                 # Validate using quantity flow analyzer
-                from ...domain.services.quantity_flow_analyzer import QuantityFlowAnalyzer
-                analyzer = QuantityFlowAnalyzer()
+                analyzer = self.position_builder.flow_analyzer
                 
                 warnings = analyzer.validate_quantity_flow(trade_objects)
                 flow_summary = analyzer.get_flow_summary(trade_objects)
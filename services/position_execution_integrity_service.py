@@ -14,6 +14,7 @@ from domain.services.integrity_repair_service import IntegrityRepairService, Rep
 from domain.validation_result import ValidationResult, ValidationStatus
 from domain.integrity_issue import IntegrityIssue, IssueSeverity, ResolutionStatus
 from repositories.validation_repository import ValidationRepository
+from services.batch_integrity_validator import BatchIntegrityValidator
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -31,7 +32,8 @@ class PositionExecutionIntegrityService:
         self,
         validator: PositionExecutionIntegrityValidator,
         validation_repository: ValidationRepository,
-        repair_service: Optional[IntegrityRepairService] = None
+        repair_service: Optional[IntegrityRepairService] = None,
+        batch_validator: Optional[BatchIntegrityValidator] = None
     ):
         """
         Initialize the integrity service
@@ -40,10 +42,13 @@ class PositionExecutionIntegrityService:
             validator: Domain validator for position-execution integrity
             validation_repository: Repository for persisting validation results
             repair_service: Optional service for automated repairs
+            batch_validator: Optional set-based validator for validating many
+                positions at once (defaults to one on the repository's database)
         """
         self.validator = validator
         self.validation_repository = validation_repository
         self.repair_service = repair_service or IntegrityRepairService()
+        self.batch_validator = batch_validator or BatchIntegrityValidator(validation_repository.db_path)
 
     def validate_position(
         self,
@@ -133,6 +138,259 @@ class PositionExecutionIntegrityService:
         logger.info(f"Batch validation completed: {len(results)} positions processed")
         return results
 
+    def validate_all_positions(
+        self,
+        position_status: Optional[str] = None,
+        since: Optional[str] = None,
+        id_range: Optional[Tuple[int, int]] = None,
+        include_orphans: bool = True,
+        save_results: bool = True
+    ) -> Dict:
+        """
+        Validate every position in scope with set-based checks
+
+        Runs BatchIntegrityValidator over the database and saves all results
+        and issues in one transaction, instead of loading and saving each
+        position separately.
+
+        Args:
+            position_status: Filter by status ('open', 'closed', or None for all)
+            since: Only positions entered or exited at or after this ISO time
+            id_range: Only positions with min <= id <= max
+            include_orphans: Also detect executions linked to no position
+            save_results: Whether to save validation results to database
+
+        Returns:
+            Summary dictionary (counts and one entry per position)
+        """
+        batch = self.batch_validator.validate(
+            position_status=position_status,
+            since=since,
+            id_range=id_range,
+            include_orphans=include_orphans
+        )
+
+        if save_results:
+            validations = list(batch.results)
+            if batch.orphan_issues:
+                validations.append(self._orphan_validation(batch.orphan_issues))
+            self.validation_repository.save_validations_bulk(validations)
+
+        summary = self._summarize(batch.results)
+        summary['orphaned_executions'] = len(batch.orphan_issues)
+
+        logger.info(
+            f"Validated {summary['validated']} positions: {summary['passed']} passed, "
+            f"{summary['failed']} failed, {summary['issues_found']} issues"
+        )
+        return summary
+
+    def _orphan_validation(
+        self,
+        orphan_issues: List[IntegrityIssue]
+    ) -> Tuple[ValidationResult, List[IntegrityIssue]]:
+        """System-level validation holding orphaned executions, as detect_orphaned_executions() saves them"""
+        system_result = ValidationResult(
+            position_id=1,  # Placeholder for system-level validation
+            status=ValidationStatus.FAILED,
+            timestamp=datetime.now(timezone.utc),
+            issue_count=len(orphan_issues),
+            validation_type="orphan_detection"
+        )
+        system_result.mark_failed(len(orphan_issues))
+        return system_result, orphan_issues
+
+    def _summarize(self, results: List[Tuple[ValidationResult, List[IntegrityIssue]]]) -> Dict:
+        """Summary counts and one entry per position of batch validation results"""
+        summary = {
+            'total_positions': len(results),
+            'validated': len(results),
+            'passed': 0,
+            'failed': 0,
+            'errors': 0,
+            'issues_found': 0,
+            'critical_issues': 0,
+            'orphaned_executions': 0,
+            'position_results': []
+        }
+        for result, issues in results:
+            if result.status == ValidationStatus.PASSED:
+                summary['passed'] += 1
+            else:
+                summary['failed'] += 1
+                summary['issues_found'] += len(issues)
+                summary['critical_issues'] += sum(1 for i in issues if i.severity == IssueSeverity.CRITICAL)
+            summary['position_results'].append({
+                'position_id': result.position_id,
+                'status': result.status.value,
+                'issue_count': len(issues)
+            })
+        return summary
+
+    # ------------------------------------------------------------------
+    # Chunked validation jobs
+    # ------------------------------------------------------------------
+
+    def create_validation_job(
+        self,
+        job_id: str,
+        chunk_size: int,
+        position_status: Optional[str] = None,
+        since: Optional[str] = None,
+        auto_repair: bool = False
+    ) -> Dict:
+        """
+        Split the positions in scope into chunks and record them as a job
+
+        Args:
+            job_id: Job identifier
+            chunk_size: Maximum positions per chunk
+            position_status: Filter by status ('open', 'closed', or None for all)
+            since: Only positions entered or exited at or after this ISO time
+            auto_repair: Whether to repair positions with issues when the job finishes
+
+        Returns:
+            The job (see get_validation_job)
+        """
+        chunks = self.batch_validator.plan_chunks(chunk_size, position_status, since)
+        self.validation_repository.create_validation_job(job_id, chunks, position_status, since, auto_repair)
+        return self.validation_repository.get_validation_job(job_id)
+
+    def get_validation_job(self, job_id: str) -> Optional[Dict]:
+        """Get a validation job with its chunk progress, or None"""
+        return self.validation_repository.get_validation_job(job_id)
+
+    def get_pending_job_chunks(self, job_id: str) -> List[int]:
+        """Indexes of the job's chunks that have not completed"""
+        return [
+            chunk['chunk_index']
+            for chunk in self.validation_repository.get_validation_job_chunks(job_id, status='pending')
+        ]
+
+    def validate_job_chunk(self, job_id: str, chunk_index: int) -> Optional[Dict]:
+        """
+        Validate one chunk of a job and save its results
+
+        Results are saved in the same transaction that marks the chunk
+        completed, so a chunk that was already completed is not validated
+        (or saved) again.
+
+        Returns:
+            The chunk summary, or None when the job or chunk does not exist
+            or the job was cancelled
+        """
+        job = self.validation_repository.get_validation_job(job_id)
+        if job is None or job['status'] == 'cancelled':
+            return None
+        chunk = next(
+            (c for c in self.validation_repository.get_validation_job_chunks(job_id)
+             if c['chunk_index'] == chunk_index),
+            None
+        )
+        if chunk is None:
+            return None
+        if chunk['status'] == 'completed':
+            return chunk['summary']
+
+        batch = self.batch_validator.validate(
+            position_status=job['position_status'],
+            since=job['since'],
+            id_range=(chunk['min_position_id'], chunk['max_position_id']),
+            include_orphans=False
+        )
+        summary = self._summarize(batch.results)
+        if not self.validation_repository.complete_validation_job_chunk(
+            job_id, chunk_index, list(batch.results), summary
+        ):
+            logger.info(f"Chunk {chunk_index} of validation job {job_id} was already completed")
+        return summary
+
+    def merge_validation_job(self, job_id: str) -> Dict:
+        """
+        Merge the summaries of a job's completed chunks and detect orphaned executions
+
+        Orphans are looked for once per job (they are not tied to any
+        chunk's positions) and saved as a system-level validation.
+
+        Returns:
+            Summary in the form of validate_all_positions(), plus 'status'
+            ('completed', or 'incomplete' while chunks are pending) and
+            chunk counts
+        """
+        chunks = self.validation_repository.get_validation_job_chunks(job_id)
+        completed = [chunk for chunk in chunks if chunk['status'] == 'completed']
+
+        merged = self._summarize([])
+        for chunk in completed:
+            for key, value in chunk['summary'].items():
+                if key == 'position_results':
+                    merged[key].extend(value)
+                elif isinstance(value, int):
+                    merged[key] = merged.get(key, 0) + value
+
+        orphan_issues = self.batch_validator.detect_orphaned_executions()
+        if orphan_issues:
+            self.validation_repository.save_validations_bulk([self._orphan_validation(orphan_issues)])
+        merged['orphaned_executions'] = len(orphan_issues)
+
+        merged['status'] = 'completed' if len(completed) == len(chunks) else 'incomplete'
+        merged['chunk_count'] = len(chunks)
+        merged['chunks_completed'] = len(completed)
+        return merged
+
+    def finish_validation_job(self, job_id: str, results: Dict) -> bool:
+        """Store a job's merged results (see merge_validation_job) and its final status"""
+        return self.validation_repository.update_validation_job_status(job_id, results['status'], results)
+
+    def resume_validation_job(self, job_id: str) -> bool:
+        """Mark a job running again (e.g. after cancellation); returns False if there is no such job"""
+        return self.validation_repository.update_validation_job_status(job_id, 'running')
+
+    def cancel_validation_job(self, job_id: str) -> bool:
+        """Cancel a job: its pending chunks are skipped; returns False if there is no such job"""
+        return self.validation_repository.update_validation_job_status(job_id, 'cancelled')
+
+    def get_validation_job_progress(self, job_id: str) -> Optional[Dict]:
+        """
+        Progress and throughput of a validation job
+
+        Returns:
+            Dictionary with status, chunk/position progress, elapsed seconds,
+            positions per second and estimated seconds remaining (plus the
+            merged result of a finished job), or None if there is no such job
+        """
+        job = self.validation_repository.get_validation_job(job_id)
+        if job is None:
+            return None
+
+        started = datetime.fromisoformat(job['created_at'])
+        finished = job['completed_at'] if job['status'] != 'running' else None
+        ended = datetime.fromisoformat(finished) if finished else datetime.now(timezone.utc)
+        elapsed = max((ended - started).total_seconds(), 0.0)
+
+        validated = job['positions_validated']
+        total = job['total_positions']
+        rate = validated / elapsed if elapsed > 0 else 0.0
+        remaining = max(total - validated, 0)
+
+        progress = {
+            'job_id': job_id,
+            'status': job['status'],
+            'chunks_total': job['chunk_count'],
+            'chunks_completed': job['chunks_completed'],
+            'positions_total': total,
+            'positions_validated': validated,
+            'percent_complete': round(100.0 * validated / total, 1) if total else 100.0,
+            'elapsed_seconds': round(elapsed, 3),
+            'positions_per_second': round(rate, 1),
+            'eta_seconds': round(remaining / rate, 1) if rate > 0 and job['status'] == 'running' else None,
+            'created_at': job['created_at'],
+            'completed_at': job['completed_at']
+        }
+        if job['result'] is not None:
+            progress['result'] = job['result']
+        return progress
+
     def get_validation_results_for_position(
         self,
         position_id: int,
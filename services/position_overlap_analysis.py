@@ -8,6 +8,7 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 from services.enhanced_position_service_v2 import EnhancedPositionServiceV2 as PositionService
 from scripts.TradingLog_db import FuturesDB
+from services.position_overlap_engine import OverlapPair, PositionOverlapIndex, overlap_index_cache
 
 
 class PositionOverlapAnalyzer:
@@ -17,69 +18,95 @@ class PositionOverlapAnalyzer:
         from config import config
         self.db_path = db_path or config.db_path
         
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+        
     def analyze_current_positions(self) -> Dict[str, Any]:
         """Analyze current positions for potential overlaps"""
-        with FuturesDB() as db:
-            # Get all positions ordered by account, instrument, and time
-            db.cursor.execute("""
-                SELECT id, instrument, account, position_type, entry_time, exit_time, 
-                       position_status, total_quantity, execution_count
-                FROM positions 
-                ORDER BY account, instrument, entry_time
-            """)
-            positions = [dict(row) for row in db.cursor.fetchall()]
+        with FuturesDB(self.db_path) as db:
+            # Groups whose positions are unchanged since the last analysis reuse their index
+            fingerprints = overlap_index_cache.fingerprints(db.conn)
+            
+            def loader(account, instrument):
+                def load():
+                    db.cursor.execute("""
+                        SELECT id, instrument, account, position_type, entry_time, exit_time, 
+                               position_status, total_quantity, execution_count
+                        FROM positions 
+                        WHERE account = ? AND instrument = ?
+                        ORDER BY entry_time
+                    """, (account, instrument))
+                    return [dict(row) for row in db.cursor.fetchall()]
+                return load
+            
+            indexes = {
+                key: overlap_index_cache.get((self.db_path, 'analysis') + key, fingerprint, loader(*key))
+                for key, fingerprint in fingerprints.items()
+            }
         
-        if not positions:
+        if not indexes:
             return {"message": "No positions to analyze", "overlaps": []}
-            
-        # Group positions by account and instrument
-        grouped = {}
-        for pos in positions:
-            key = (pos['account'], pos['instrument'])
-            if key not in grouped:
-                grouped[key] = []
-            grouped[key].append(pos)
         
         overlaps = []
-        for (account, instrument), group in grouped.items():
-            group_overlaps = self._detect_overlaps_in_group(group, account, instrument)
+        for (account, instrument), index in indexes.items():
+            group_overlaps = self._detect_overlaps_in_group(index.positions, account, instrument, index=index)
             overlaps.extend(group_overlaps)
         
         return {
-            "total_positions": len(positions),
-            "groups_analyzed": len(grouped),
+            "total_positions": sum(fingerprint[0] for fingerprint in fingerprints.values()),
+            "groups_analyzed": len(indexes),
             "overlaps_found": len(overlaps),
             "overlaps": overlaps
         }
     
-    def _detect_overlaps_in_group(self, positions: List[Dict], account: str, instrument: str) -> List[Dict]:
-        """Detect overlaps within a group of positions for the same account/instrument"""
+    def _detect_overlaps_in_group(self, positions: List[Dict], account: str, instrument: str,
+                                  index: Optional[PositionOverlapIndex] = None) -> List[Dict]:
+        """
+        Detect overlaps within a group of positions for the same account/instrument
+
+        Every overlapping pair comes from one sorted sweep (see
+        PositionOverlapIndex); quantity consistency is checked between
+        positions adjacent in entry order.
+        """
         overlaps = []
         
         if len(positions) < 2:
             return overlaps
-            
-        # Sort positions by entry time
-        positions_sorted = sorted(positions, key=lambda p: p['entry_time'])
         
-        for i in range(len(positions_sorted) - 1):
-            current = positions_sorted[i]
-            next_pos = positions_sorted[i + 1]
-            
-            # Check for time-based overlaps
-            overlap_info = self._check_time_overlap(current, next_pos)
-            if overlap_info:
-                overlaps.append({
-                    'type': 'time_overlap',
-                    'account': account,
-                    'instrument': instrument,
-                    'position1': current,
-                    'position2': next_pos,
-                    'overlap_info': overlap_info
-                })
-            
+        if index is None:
+            index = PositionOverlapIndex(positions)
+        
+        for position in index.unparseable:
+            overlaps.append({
+                'type': 'time_overlap',
+                'account': account,
+                'instrument': instrument,
+                'position1': position,
+                'position2': None,
+                'overlap_info': {
+                    'reason': 'invalid_timestamps',
+                    'details': f"Cannot parse timestamps: {position.get('entry_time')} / {position.get('exit_time')}"
+                }
+            })
+        
+        for pair in index.overlaps():
+            overlaps.append({
+                'type': 'time_overlap',
+                'account': account,
+                'instrument': instrument,
+                'position1': pair.earlier,
+                'position2': pair.later,
+                'overlap_info': index.pair_result('time_overlap', pair.earlier, pair.later,
+                                                  lambda *_: self._overlap_info(pair))
+            })
+        
+        for current, next_pos in index.adjacent_pairs():
             # Check for quantity consistency issues
-            consistency_issues = self._check_quantity_consistency(current, next_pos)
+            consistency_issues = index.pair_result('quantity_consistency', current, next_pos,
+                                                   self._check_quantity_consistency)
             if consistency_issues:
                 overlaps.append({
                     'type': 'quantity_inconsistency',
@@ -92,33 +119,18 @@ class PositionOverlapAnalyzer:
         
         return overlaps
     
-    def _check_time_overlap(self, pos1: Dict, pos2: Dict) -> Optional[Dict]:
-        """Check if two positions have overlapping time periods"""
-        # If pos1 is still open, it extends indefinitely
-        if pos1['position_status'] == 'open':
+    def _overlap_info(self, pair: OverlapPair) -> Dict:
+        """Why the first position of an overlapping pair overlaps the second"""
+        pos1, pos2 = pair.earlier, pair.later
+        if pair.overlap_seconds is None:
             return {
                 'reason': 'open_position_before_closed',
                 'details': f"Position {pos1['id']} is still open when position {pos2['id']} starts"
             }
-        
-        # If pos1 is closed, check if it ends after pos2 starts
-        if pos1['exit_time'] and pos2['entry_time']:
-            try:
-                exit_time = datetime.fromisoformat(pos1['exit_time'].replace('Z', '+00:00'))
-                entry_time = datetime.fromisoformat(pos2['entry_time'].replace('Z', '+00:00'))
-                
-                if exit_time > entry_time:
-                    return {
-                        'reason': 'time_overlap',
-                        'details': f"Position {pos1['id']} ends at {pos1['exit_time']} after position {pos2['id']} starts at {pos2['entry_time']}"
-                    }
-            except ValueError:
-                return {
-                    'reason': 'invalid_timestamps',
-                    'details': f"Cannot parse timestamps: {pos1['exit_time']} vs {pos2['entry_time']}"
-                }
-        
-        return None
+        return {
+            'reason': 'time_overlap',
+            'details': f"Position {pos1['id']} ends at {pos1['exit_time']} after position {pos2['id']} starts at {pos2['entry_time']}"
+        }
     
     def _check_quantity_consistency(self, pos1: Dict, pos2: Dict) -> List[Dict]:
         """Check for quantity consistency issues between adjacent positions"""
@@ -142,7 +154,7 @@ class PositionOverlapAnalyzer:
     
     def validate_position_boundaries(self) -> Dict[str, Any]:
         """Validate that positions follow proper 0 → +/- → 0 boundaries"""
-        with FuturesDB() as db:
+        with FuturesDB(self.db_path) as db:
             # Get all trades ordered by account, instrument, and time
             db.cursor.execute("""
                 SELECT id, instrument, account, side_of_market, quantity, entry_time, 
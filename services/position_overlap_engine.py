@@ -0,0 +1,240 @@
+"""
+Position Overlap Engine - Sweep-line overlap detection for position groups
+
+Positions of one account/instrument must not overlap in time: each starts
+after the previous one went flat. Comparing every position with its
+successor misses a long-running position that overlaps several later ones,
+and comparing all pairs is O(n²). PositionOverlapIndex sorts a group once by
+entry time and sweeps it with a heap of the exit times still active, finding
+every overlapping pair in O(n log n + overlaps). The sorted index also
+answers which positions a single new position overlaps with a bisect, and
+remembers per-pair check results for as long as it lives.
+
+OverlapIndexCache keeps one index per group of a database and drops it when
+an aggregate over the group's positions changes, i.e. on the next rebuild.
+"""
+
+import heapq
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class OverlapPair(NamedTuple):
+    """Two positions of a group where `earlier` is still open when `later` starts"""
+    earlier: Dict
+    later: Dict
+    overlap_seconds: Optional[float]  # None when `earlier` is still open
+
+
+class PositionCheck(NamedTuple):
+    """Where a single position falls among a group's positions"""
+    overlaps: List[OverlapPair]
+    previous: Optional[Dict]  # the position entered just before it
+    following: Optional[Dict]  # the position entered just after it
+
+
+def _seconds(value) -> float:
+    """Seconds since the epoch of an ISO string or datetime (aware times in UTC)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if not isinstance(value, datetime):
+        raise TypeError(f"Not a timestamp: {value!r}")
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds()
+
+
+def position_interval(position: Dict) -> Tuple[float, float]:
+    """
+    (start, end) of a position in epoch seconds
+
+    Open positions extend to infinity; a closed position without an exit
+    time ends where it starts. Raises ValueError/TypeError for timestamps
+    that cannot be parsed.
+    """
+    start = _seconds(position.get('entry_time'))
+    if position.get('position_status') == 'open':
+        return start, math.inf
+    exit_time = position.get('exit_time')
+    return start, (start if exit_time is None else _seconds(exit_time))
+
+
+class PositionOverlapIndex:
+    """
+    A group's positions sorted by entry time, for overlap queries
+
+    Two positions overlap when the one entered first (ties keep input
+    order) exits after the other one's entry. Positions whose timestamps
+    cannot be parsed are kept aside in `unparseable`.
+    """
+
+    def __init__(self, positions: List[Dict]):
+        self.unparseable: List[Dict] = []
+        intervals = []
+        for position in positions:
+            try:
+                start, end = position_interval(position)
+            except (ValueError, TypeError):
+                self.unparseable.append(position)
+                continue
+            intervals.append((start, end, position))
+        intervals.sort(key=lambda interval: interval[0])  # stable: ties keep input order
+
+        self._starts = [interval[0] for interval in intervals]
+        self._ends = [interval[1] for interval in intervals]
+        self.positions: List[Dict] = [interval[2] for interval in intervals]
+        # Latest exit among the positions up to each index, to cut backward scans short
+        self._reach = list(accumulate(self._ends, max))
+        self._overlaps: Optional[List[OverlapPair]] = None
+        self._pair_results: Dict[Tuple[str, int, int], Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def overlaps(self) -> List[OverlapPair]:
+        """Every overlapping pair in the group, in entry order (computed once)"""
+        with self._lock:
+            if self._overlaps is None:
+                self._overlaps = self._sweep()
+            return list(self._overlaps)
+
+    def _sweep(self) -> List[OverlapPair]:
+        found = []
+        active = []  # heap of (end, index) of positions not yet exited
+        for later, start in enumerate(self._starts):
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for earlier in sorted(index for _, index in active):
+                found.append(self._pair(earlier, later))
+            heapq.heappush(active, (self._ends[later], later))
+        return found
+
+    def _pair(self, earlier: int, later: int) -> OverlapPair:
+        end = self._ends[earlier]
+        return OverlapPair(self.positions[earlier], self.positions[later],
+                           None if end == math.inf else end - self._starts[later])
+
+    def adjacent_pairs(self) -> List[Tuple[Dict, Dict]]:
+        """Consecutive positions in entry order"""
+        return list(zip(self.positions, self.positions[1:]))
+
+    def check(self, position: Dict) -> PositionCheck:
+        """
+        The positions a new position would overlap, and its neighbours
+
+        O(log n) plus the overlaps found when the group itself does not
+        overlap. The index is not changed, see add().
+        """
+        with self._lock:
+            return self._check(position)[0]
+
+    def add(self, position: Dict) -> PositionCheck:
+        """Check a new position (see check()) and insert it into the index"""
+        with self._lock:
+            result, at, (start, end) = self._check(position)
+            self._starts.insert(at, start)
+            self._ends.insert(at, end)
+            self.positions.insert(at, position)
+            self._reach.insert(at, max(self._reach[at - 1], end) if at else end)
+            for k in range(at + 1, len(self._reach)):
+                if self._reach[k] >= end:
+                    break
+                self._reach[k] = end
+            if self._overlaps is not None:
+                self._overlaps.extend(result.overlaps)
+            return result
+
+    def _check(self, position: Dict) -> Tuple[PositionCheck, int, Tuple[float, float]]:
+        start, end = position_interval(position)
+        at = bisect_right(self._starts, start)
+
+        before = []
+        i = at - 1
+        while i >= 0 and self._reach[i] > start:
+            if self._ends[i] > start:
+                before.append(OverlapPair(self.positions[i], position,
+                                          None if self._ends[i] == math.inf else self._ends[i] - start))
+            i -= 1
+        after = [
+            OverlapPair(position, self.positions[i], None if end == math.inf else end - self._starts[i])
+            for i in range(at, bisect_left(self._starts, end))
+        ]
+
+        result = PositionCheck(
+            overlaps=before[::-1] + after,
+            previous=self.positions[at - 1] if at else None,
+            following=self.positions[at] if at < len(self.positions) else None,
+        )
+        return result, at, (start, end)
+
+    def pair_result(self, name: str, pos1: Dict, pos2: Dict, check: Callable[[Dict, Dict], Any]) -> Any:
+        """check(pos1, pos2), computed once per pair for the life of the index"""
+        key = (name, id(pos1), id(pos2))
+        try:
+            return self._pair_results[key]
+        except KeyError:
+            result = self._pair_results[key] = check(pos1, pos2)
+            return result
+
+
+class OverlapIndexCache:
+    """
+    PositionOverlapIndex per caller-chosen key, e.g. (database, account, instrument)
+
+    An index is reused while the group's positions fingerprint (a cheap
+    aggregate over the columns overlap checks read) is unchanged, so
+    repeated validation runs only redo the groups a rebuild touched.
+    """
+
+    def __init__(self):
+        self._indexes: Dict[Tuple, Tuple[Tuple, PositionOverlapIndex]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprints(conn, account: str = None, instrument: str = None) -> Dict[Tuple[str, str], Tuple]:
+        """Positions fingerprint per (account, instrument), optionally for one account/instrument"""
+        conditions, params = [], []
+        if account:
+            conditions.append("account = ?")
+            params.append(account)
+        if instrument:
+            conditions.append("instrument = ?")
+            params.append(instrument)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = conn.execute(f"""
+            SELECT account, instrument, COUNT(*), TOTAL(id), MAX(id),
+                   TOTAL(julianday(entry_time)), TOTAL(julianday(exit_time)),
+                   TOTAL(LENGTH(position_type || position_status)), TOTAL(total_quantity),
+                   TOTAL(execution_count), TOTAL(average_entry_price), TOTAL(total_dollars_pnl),
+                   MAX(updated_at)
+            FROM positions
+            {where_clause}
+            GROUP BY account, instrument
+            ORDER BY account, instrument
+        """, params).fetchall()
+        return {(row[0], row[1]): tuple(row[2:]) for row in rows}
+
+    def get(self, key: Tuple, fingerprint: Tuple, load: Callable[[], List[Dict]]) -> PositionOverlapIndex:
+        """The index cached under key, or a new one over load() when the fingerprint changed"""
+        with self._lock:
+            cached = self._indexes.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        index = PositionOverlapIndex(load())
+        with self._lock:
+            self._indexes[key] = (fingerprint, index)
+        return index
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+overlap_index_cache = OverlapIndexCache()
@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+from services.position_overlap_engine import OverlapPair, PositionOverlapIndex, overlap_index_cache
+
 logger = logging.getLogger('position_overlap_prevention')
 
 
@@ -358,8 +360,16 @@ class PositionOverlapPrevention:
         
         return corrected
     
-    def validate_positions_after_building(self, positions: List[Dict], account: str, instrument: str) -> Dict[str, Any]:
-        """Validate positions after they've been built to detect overlaps"""
+    def validate_positions_after_building(self, positions: List[Dict], account: str, instrument: str,
+                                          index: Optional[PositionOverlapIndex] = None) -> Dict[str, Any]:
+        """
+        Validate positions after they've been built to detect overlaps
+
+        Every overlapping pair is found in one sorted sweep (see
+        PositionOverlapIndex), not just overlaps between neighbours; boundary
+        and consistency checks compare each position with the next one.
+        Pass the group's cached index to reuse its per-pair results.
+        """
         validation_results = {
             'valid': True,
             'overlaps': [],
@@ -370,36 +380,85 @@ class PositionOverlapPrevention:
         if len(positions) < 2:
             return validation_results
         
-        # Sort positions by entry time
-        sorted_positions = sorted(positions, key=lambda p: p.get('entry_time', ''))
+        if index is None:
+            index = PositionOverlapIndex(positions)
         
-        for i in range(len(sorted_positions) - 1):
-            current = sorted_positions[i]
-            next_pos = sorted_positions[i + 1]
-            
-            # Check for time overlaps
-            time_overlap = self._check_position_time_overlap(current, next_pos)
-            if time_overlap:
-                validation_results['overlaps'].append(time_overlap)
-                validation_results['valid'] = False
-            
+        for position in index.unparseable:
+            validation_results['overlaps'].append(self._timestamp_parse_error(position))
+        
+        for pair in index.overlaps():
+            validation_results['overlaps'].append(
+                index.pair_result('overlap', pair.earlier, pair.later, lambda *_: self._overlap_issue(pair))
+            )
+        
+        for current, next_pos in index.adjacent_pairs():
             # Check for boundary violations
-            boundary_violation = self._check_position_boundary(current, next_pos)
+            boundary_violation = index.pair_result('boundary', current, next_pos, self._check_position_boundary)
             if boundary_violation:
                 validation_results['boundary_violations'].append(boundary_violation)
-                validation_results['valid'] = False
             
             # Check for consistency issues
+            consistency_issue = index.pair_result('consistency', current, next_pos, self._check_position_consistency)
+            if consistency_issue:
+                validation_results['consistency_issues'].append(consistency_issue)
+        
+        validation_results['valid'] = not (validation_results['overlaps'] or validation_results['boundary_violations'])
+        return validation_results
+    
+    def validate_new_position(self, position: Dict, account: str, instrument: str) -> Dict[str, Any]:
+        """
+        Validate a single new position against the stored positions of its account/instrument
+
+        Uses the group's cached overlap index, so only the new position's
+        overlaps and its two neighbours are checked.
+        """
+        validation_results = {
+            'valid': True,
+            'overlaps': [],
+            'boundary_violations': [],
+            'consistency_issues': []
+        }
+        
+        try:
+            check = self._group_index(account, instrument).check(position)
+        except (ValueError, TypeError):
+            validation_results['overlaps'].append(self._timestamp_parse_error(position))
+            validation_results['valid'] = False
+            return validation_results
+        
+        validation_results['overlaps'] = [self._overlap_issue(pair) for pair in check.overlaps]
+        for current, next_pos in ((check.previous, position), (position, check.following)):
+            if current is None or next_pos is None:
+                continue
+            boundary_violation = self._check_position_boundary(current, next_pos)
+            if boundary_violation:
+                validation_results['boundary_violations'].append(boundary_violation)
             consistency_issue = self._check_position_consistency(current, next_pos)
             if consistency_issue:
                 validation_results['consistency_issues'].append(consistency_issue)
         
+        validation_results['valid'] = not (validation_results['overlaps'] or validation_results['boundary_violations'])
         return validation_results
     
-    def _check_position_time_overlap(self, pos1: Dict, pos2: Dict) -> Optional[Dict]:
-        """Check if two positions overlap in time"""
-        # If first position is still open
-        if pos1.get('position_status') == 'open':
+    def _group_index(self, account: str, instrument: str, fingerprint: Optional[Tuple] = None) -> PositionOverlapIndex:
+        """Cached overlap index of an account/instrument's stored positions"""
+        if fingerprint is None:
+            fingerprint = overlap_index_cache.fingerprints(self.conn, account, instrument).get((account, instrument))
+        
+        def load():
+            self.cursor.execute("""
+                SELECT * FROM positions
+                WHERE account = ? AND instrument = ?
+                ORDER BY entry_time
+            """, (account, instrument))
+            return [dict(row) for row in self.cursor.fetchall()]
+        
+        return overlap_index_cache.get((self.db_path, 'prevention', account, instrument), fingerprint, load)
+    
+    def _overlap_issue(self, pair: OverlapPair) -> Dict:
+        """Overlap result for a pair where the first position is still open when the second starts"""
+        pos1, pos2 = pair.earlier, pair.later
+        if pair.overlap_seconds is None:
             return {
                 'type': 'open_position_overlap',
                 'position1_id': pos1.get('id'),
@@ -407,33 +466,23 @@ class PositionOverlapPrevention:
                 'message': f"Position {pos1.get('id')} is still open when position {pos2.get('id')} starts",
                 'severity': 'high'
             }
-        
-        # Check time overlap for closed positions
-        if pos1.get('exit_time') and pos2.get('entry_time'):
-            try:
-                exit_time = datetime.fromisoformat(pos1['exit_time'].replace('Z', '+00:00'))
-                entry_time = datetime.fromisoformat(pos2['entry_time'].replace('Z', '+00:00'))
-                
-                if exit_time > entry_time:
-                    overlap_duration = exit_time - entry_time
-                    return {
-                        'type': 'time_overlap',
-                        'position1_id': pos1.get('id'),
-                        'position2_id': pos2.get('id'),
-                        'overlap_duration_seconds': overlap_duration.total_seconds(),
-                        'message': f"Position {pos1.get('id')} ends after position {pos2.get('id')} starts",
-                        'severity': 'high'
-                    }
-            except ValueError:
-                return {
-                    'type': 'timestamp_parse_error',
-                    'position1_id': pos1.get('id'),
-                    'position2_id': pos2.get('id'),
-                    'message': 'Cannot parse position timestamps for overlap detection',
-                    'severity': 'medium'
-                }
-        
-        return None
+        return {
+            'type': 'time_overlap',
+            'position1_id': pos1.get('id'),
+            'position2_id': pos2.get('id'),
+            'overlap_duration_seconds': pair.overlap_seconds,
+            'message': f"Position {pos1.get('id')} ends after position {pos2.get('id')} starts",
+            'severity': 'high'
+        }
+    
+    def _timestamp_parse_error(self, position: Dict) -> Dict:
+        return {
+            'type': 'timestamp_parse_error',
+            'position1_id': position.get('id'),
+            'position2_id': None,
+            'message': 'Cannot parse position timestamps for overlap detection',
+            'severity': 'medium'
+        }
     
     def _check_position_boundary(self, pos1: Dict, pos2: Dict) -> Optional[Dict]:
         """Check for position boundary violations"""
@@ -545,48 +594,27 @@ class PositionOverlapPrevention:
         
         report.append("")
         
-        # Get positions to analyze
-        if account and instrument:
-            where_clause = "WHERE account = ? AND instrument = ?"
-            params = [account, instrument]
-        elif account:
-            where_clause = "WHERE account = ?"
-            params = [account]
-        else:
-            where_clause = ""
-            params = []
-        
-        self.cursor.execute(f"""
-            SELECT * FROM positions 
-            {where_clause}
-            ORDER BY account, instrument, entry_time
-        """, params)
+        # Positions fingerprint per account/instrument group; groups whose
+        # positions did not change since the last report reuse their index
+        fingerprints = overlap_index_cache.fingerprints(self.conn, account, instrument)
         
-        positions = [dict(row) for row in self.cursor.fetchall()]
-        
-        if not positions:
+        if not fingerprints:
             report.append("No positions found to analyze.")
             return "\n".join(report)
         
-        # Group positions by account/instrument
-        grouped = {}
-        for pos in positions:
-            key = (pos['account'], pos['instrument'])
-            if key not in grouped:
-                grouped[key] = []
-            grouped[key].append(pos)
-        
         total_overlaps = 0
         total_violations = 0
         
         report.append(f"ANALYSIS SUMMARY")
         report.append("-" * 40)
-        report.append(f"Total positions: {len(positions)}")
-        report.append(f"Account/instrument groups: {len(grouped)}")
+        report.append(f"Total positions: {sum(fingerprint[0] for fingerprint in fingerprints.values())}")
+        report.append(f"Account/instrument groups: {len(fingerprints)}")
         report.append("")
         
         # Analyze each group
-        for (acc, instr), group in grouped.items():
+        for (acc, instr), fingerprint in fingerprints.items():
+            index = self._group_index(acc, instr, fingerprint)
+            group = index.positions + index.unparseable
             report.append(f"GROUP: {acc}/{instr}")
             report.append("-" * 40)
             report.append(f"Positions: {len(group)}")
@@ -597,7 +625,7 @@ class PositionOverlapPrevention:
                 continue
             
             # Validate this group
-            validation = self.validate_positions_after_building(group, acc, instr)
+            validation = self.validate_positions_after_building(group, acc, instr, index=index)
             
             group_overlaps = len(validation['overlaps'])
             group_violations = len(validation['boundary_violations'])
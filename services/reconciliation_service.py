@@ -17,6 +17,8 @@ from dataclasses import dataclass
 
 from config import config
 from domain.integrity_issue import IssueType, IssueSeverity
+from services.position_algorithms import SIDE_SIGNS
+from services.running_quantity import ensure_running_quantities
 
 logger = logging.getLogger('reconciliation')
 
@@ -133,6 +135,10 @@ class ReconciliationService:
         """
         Get trade sequence with running quantity for an account.
 
+        Running quantity is the account's net quantity across instruments,
+        read from the stored per-(account, instrument) running quantities:
+        it starts from the quantity held at start_date rather than zero.
+
         Args:
             account: Account to analyze
             start_date: Optional start date filter
@@ -146,6 +152,23 @@ class ReconciliationService:
         cursor = conn.cursor()
 
         try:
+            ensure_running_quantities(self.db_path, conn, account)
+
+            running_qty = 0
+            if start_date:
+                # Quantity held in each instrument just before the window
+                cursor.execute("""
+                    SELECT COALESCE(SUM((
+                        SELECT t.running_qty_after FROM trades t
+                        WHERE t.account = g.account AND t.instrument = g.instrument
+                          AND (t.deleted = 0 OR t.deleted IS NULL) AND t.entry_time < ?
+                        ORDER BY t.entry_time DESC, t.id DESC
+                        LIMIT 1
+                    )), 0)
+                    FROM (SELECT DISTINCT account, instrument FROM trades WHERE account = ?) g
+                """, (start_date, account))
+                running_qty = cursor.fetchone()[0]
+
             query = """
                 SELECT
                     id,
@@ -156,7 +179,9 @@ class ReconciliationService:
                     exit_price,
                     entry_time,
                     entry_execution_id,
-                    source_file
+                    source_file,
+                    running_qty_before,
+                    running_qty_after
                 FROM trades
                 WHERE deleted = 0 AND account = ?
                 {date_filter}
@@ -176,15 +201,13 @@ class ReconciliationService:
             cursor.execute(query, params)
 
             trades = []
-            running_qty = 0
 
             for row in cursor.fetchall():
-                # Calculate signed change
-                if row['side_of_market'] in ('Buy', 'BuyToCover'):
-                    signed_change = row['quantity']
+                if row['running_qty_after'] is None:
+                    # Inserted since the refresh above
+                    signed_change = SIDE_SIGNS.get(row['side_of_market'], 0) * (row['quantity'] or 0)
                 else:
-                    signed_change = -row['quantity']
-
+                    signed_change = row['running_qty_after'] - row['running_qty_before']
                 running_qty += signed_change
 
                 trades.append({
@@ -194,6 +217,7 @@ class ReconciliationService:
                     'quantity': row['quantity'],
                     'signed_change': signed_change,
                     'running_quantity': running_qty,
+                    'instrument_running_quantity': row['running_qty_after'],
                     'entry_price': row['entry_price'],
                     'exit_price': row['exit_price'],
                     'entry_time': row['entry_time'],
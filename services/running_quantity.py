@@ -0,0 +1,207 @@
+"""
+Running Quantity
+
+Stored running position quantity for trades. Every live trade carries the
+running quantity of its (account, instrument) group before and after it
+(running_qty_before / running_qty_after), in (entry_time, id) order, so
+execution review, reconciliation and import issue detection read a window
+of rows instead of replaying the group from its first execution.
+
+A trade whose running_qty_after is NULL is stale. New trades are stale
+until refreshed; triggers mark a trade stale when an edit or delete changes
+the quantity flow at or after it (the edited trade itself and the next live
+trade after its old position). refresh_running_quantities() recomputes each
+stale group from its earliest stale trade, seeded with the stored running
+quantity just before it, so appending executions only touches the new rows.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import sqlite3
+
+from services.position_algorithms import SIDE_SIGNS
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Bound parameters per IN (...) lookup, below SQLite's default variable limit
+SQL_VARIABLE_CHUNK = 900
+
+LIVE_TRADE_SQL = "(deleted = 0 OR deleted IS NULL)"
+
+# Next live trade after OLD in OLD's group, in (entry_time, id) order
+_NEXT_LIVE_TRADE_SQL = f"""
+    SELECT id FROM trades
+    WHERE account = OLD.account AND instrument = OLD.instrument AND {LIVE_TRADE_SQL}
+      AND (OLD.entry_time IS NULL OR entry_time > OLD.entry_time
+           OR (entry_time = OLD.entry_time AND id > OLD.id))
+    ORDER BY entry_time, id
+    LIMIT 1
+"""
+
+
+def create_running_quantity_schema(cursor: sqlite3.Cursor) -> None:
+    """Add the running quantity columns, indexes and invalidation triggers to trades"""
+    for column in ('running_qty_before', 'running_qty_after'):
+        try:
+            cursor.execute(f"ALTER TABLE trades ADD COLUMN {column} INTEGER")
+        except sqlite3.OperationalError as e:
+            if "duplicate column name" not in str(e).lower():
+                raise
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_trades_account_instrument_entry_time
+        ON trades(account, instrument, entry_time, id)
+    """)
+    cursor.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_trades_running_qty_stale
+        ON trades(account, instrument, entry_time)
+        WHERE running_qty_after IS NULL AND {LIVE_TRADE_SQL}
+    """)
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trades_running_qty_update
+        AFTER UPDATE OF account, instrument, side_of_market, quantity, entry_time, deleted
+        ON trades
+        WHEN OLD.account IS NOT NEW.account OR OLD.instrument IS NOT NEW.instrument
+          OR OLD.side_of_market IS NOT NEW.side_of_market OR OLD.quantity IS NOT NEW.quantity
+          OR OLD.entry_time IS NOT NEW.entry_time OR OLD.deleted IS NOT NEW.deleted
+        BEGIN
+            UPDATE trades SET running_qty_before = NULL, running_qty_after = NULL
+            WHERE id = NEW.id;
+            UPDATE trades SET running_qty_after = NULL
+            WHERE id = ({_NEXT_LIVE_TRADE_SQL});
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_trades_running_qty_delete
+        AFTER DELETE ON trades
+        BEGIN
+            UPDATE trades SET running_qty_after = NULL
+            WHERE id = ({_NEXT_LIVE_TRADE_SQL});
+        END
+    """)
+
+
+def _group_filter(account: Optional[str], instrument: Optional[str]) -> Tuple[str, List[str]]:
+    clauses, params = [], []
+    if account:
+        clauses.append("account = ?")
+        params.append(account)
+    if instrument:
+        clauses.append("instrument = ?")
+        params.append(instrument)
+    return ''.join(f" AND {clause}" for clause in clauses), params
+
+
+def stale_groups(conn: sqlite3.Connection, account: Optional[str] = None,
+                 instrument: Optional[str] = None) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    (account, instrument, earliest stale entry_time) for each group with stale trades.
+
+    The entry_time is None when a stale trade has no entry_time, which
+    forces a refresh of the whole group.
+    """
+    group_filter, params = _group_filter(account, instrument)
+    rows = conn.execute(f"""
+        SELECT account, instrument, MIN(entry_time), MAX(entry_time IS NULL)
+        FROM trades
+        WHERE running_qty_after IS NULL AND {LIVE_TRADE_SQL}{group_filter}
+        GROUP BY account, instrument
+    """, params).fetchall()
+    return [(row[0], row[1], None if row[3] else row[2]) for row in rows]
+
+
+def _seed_quantity(conn: sqlite3.Connection, account: str, instrument: str, start_time: str) -> Optional[int]:
+    """Stored running quantity after the last live trade before start_time (0 for none)"""
+    row = conn.execute(f"""
+        SELECT running_qty_after FROM trades
+        WHERE account = ? AND instrument = ? AND {LIVE_TRADE_SQL} AND entry_time < ?
+        ORDER BY entry_time DESC, id DESC
+        LIMIT 1
+    """, (account, instrument, start_time)).fetchone()
+    if row is None:
+        # Trades without entry_time sort first
+        row = conn.execute(f"""
+            SELECT running_qty_after FROM trades
+            WHERE account = ? AND instrument = ? AND {LIVE_TRADE_SQL} AND entry_time IS NULL
+            ORDER BY id DESC
+            LIMIT 1
+        """, (account, instrument)).fetchone()
+    return 0 if row is None else row[0]
+
+
+def _refresh_group(conn: sqlite3.Connection, account: str, instrument: str,
+                   start_time: Optional[str]) -> int:
+    seed = None if start_time is None else _seed_quantity(conn, account, instrument, start_time)
+    if seed is None:
+        rows = conn.execute(f"""
+            SELECT id, side_of_market, quantity, running_qty_before, running_qty_after FROM trades
+            WHERE account = ? AND instrument = ? AND {LIVE_TRADE_SQL}
+            ORDER BY entry_time, id
+        """, (account, instrument))
+        seed = 0
+    else:
+        rows = conn.execute(f"""
+            SELECT id, side_of_market, quantity, running_qty_before, running_qty_after FROM trades
+            WHERE account = ? AND instrument = ? AND {LIVE_TRADE_SQL} AND entry_time >= ?
+            ORDER BY entry_time, id
+        """, (account, instrument, start_time))
+
+    updates = []
+    running = seed
+    for trade_id, side, quantity, stored_before, stored_after in rows.fetchall():
+        before = running
+        running += SIDE_SIGNS.get(side, 0) * (quantity or 0)
+        if stored_before != before or stored_after != running:
+            updates.append((before, running, trade_id))
+
+    conn.executemany("UPDATE trades SET running_qty_before = ?, running_qty_after = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def refresh_running_quantities(conn: sqlite3.Connection, account: Optional[str] = None,
+                               instrument: Optional[str] = None) -> int:
+    """
+    Recompute the running quantities of every stale group (optionally one
+    account and/or instrument), inside the caller's write job.
+
+    Returns:
+        Number of trades whose stored running quantities changed
+    """
+    updated = 0
+    for group_account, group_instrument, start_time in stale_groups(conn, account, instrument):
+        updated += _refresh_group(conn, group_account, group_instrument, start_time)
+    if updated:
+        logger.debug(f"Refreshed running quantities of {updated} trades")
+    return updated
+
+
+def ensure_running_quantities(db_path: str, conn: sqlite3.Connection, account: Optional[str] = None,
+                              instrument: Optional[str] = None) -> int:
+    """
+    Refresh stale running quantities before reading them.
+
+    The stale check is a read on conn; a write job (see scripts/write_queue.py)
+    is only submitted when something is stale.
+    """
+    if not stale_groups(conn, account, instrument):
+        return 0
+
+    from scripts.write_queue import run_write
+    return run_write(db_path, lambda write_conn: refresh_running_quantities(write_conn, account, instrument), conn)
+
+
+def running_quantities_for_trades(conn: sqlite3.Connection,
+                                  trade_ids: Iterable[int]) -> Dict[int, Tuple[Optional[int], Optional[int]]]:
+    """Stored (running_qty_before, running_qty_after) by trade id"""
+    trade_ids = list(trade_ids)
+    quantities = {}
+    for start in range(0, len(trade_ids), SQL_VARIABLE_CHUNK):
+        chunk = trade_ids[start:start + SQL_VARIABLE_CHUNK]
+        rows = conn.execute(f"""
+            SELECT id, running_qty_before, running_qty_after FROM trades
+            WHERE id IN ({','.join('?' * len(chunk))})
+        """, chunk).fetchall()
+        quantities.update((row[0], (row[1], row[2])) for row in rows)
+    return quantities
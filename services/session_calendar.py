@@ -0,0 +1,242 @@
+"""
+Session Calendar
+
+CME Globex trading sessions as sorted arrays of UTC open/close times. A
+session opens at 17:00 Chicago time on the evening before its trading day
+and closes at 16:00 on the trading day; trading days are Monday to Friday
+except market holidays. Weekends, the daily maintenance halt and holidays
+are the gaps between sessions.
+
+Calendars are materialized once per product schedule and span of years and
+cached, so session lookups are binary searches instead of per-timestamp
+datetime logic. Cumulative session lengths answer "how many bars should
+exist between t1 and t2" with two binary searches; completeness scoring,
+gap detection and freshness checks all count expected bars this way.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from services.ohlc_timeframes import TIMEFRAME_SECONDS
+
+CME_TIMEZONE = 'America/Chicago'
+SESSION_OPEN_HOUR = 17   # Chicago time, evening before the trading day
+SESSION_CLOSE_HOUR = 16  # Chicago time, on the trading day
+SECONDS_PER_DAY = 86400
+
+GLOBEX_HOURS = (SESSION_OPEN_HOUR, SESSION_CLOSE_HOUR)
+
+Timestamp = Union[int, float, datetime]
+
+
+def _calculate_easter(year: int) -> date:
+    """Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b = year // 100
+    c = year % 100
+    d = b // 4
+    e = b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i = c // 4
+    k = c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = ((h + l - 7 * m + 114) % 31) + 1
+    return date(year, month, day)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _observed(holiday: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday"""
+    if holiday.weekday() == 5:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == 6:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+@lru_cache(maxsize=None)
+def market_holidays(year: int) -> Tuple[date, ...]:
+    """Major US market holidays that close futures trading, in date order"""
+    may_31 = date(year, 5, 31)
+    return (
+        date(year, 1, 1),                                  # New Year's Day
+        _nth_weekday(year, 1, 0, 3),                       # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),                       # Presidents Day
+        _calculate_easter(year) - timedelta(days=2),       # Good Friday
+        may_31 - timedelta(days=may_31.weekday()),         # Memorial Day
+        _observed(date(year, 7, 4)),                       # Independence Day
+        _nth_weekday(year, 9, 0, 1),                       # Labor Day
+        _nth_weekday(year, 11, 3, 4),                      # Thanksgiving
+        _observed(date(year, 12, 25)),                     # Christmas
+    )
+
+
+def session_hours(product: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Session (open hour, close hour) of a product or contract, Chicago time.
+
+    Every product traded here keeps the standard Globex hours; a product
+    with its own schedule would be looked up here.
+    """
+    return GLOBEX_HOURS
+
+
+def _epoch(value: Timestamp) -> int:
+    """Epoch seconds of a timestamp (naive datetimes are local time, as datetime.timestamp() reads them)"""
+    return int(value.timestamp()) if isinstance(value, datetime) else int(value)
+
+
+class SessionCalendar:
+    """Trading sessions of a span of years as sorted UTC epoch-second arrays"""
+
+    def __init__(self, first_year: int, last_year: int,
+                 open_hour: int = SESSION_OPEN_HOUR, close_hour: int = SESSION_CLOSE_HOUR):
+        self.first_year = first_year
+        self.last_year = last_year
+
+        holidays = [holiday for year in range(first_year, last_year + 1) for holiday in market_holidays(year)]
+        trading_days = pd.bdate_range(date(first_year, 1, 1), date(last_year, 12, 31))
+        trading_days = trading_days[~trading_days.isin(pd.DatetimeIndex(holidays))]
+
+        opens = (trading_days - pd.Timedelta(days=1) + pd.Timedelta(hours=open_hour)).tz_localize(CME_TIMEZONE)
+        closes = (trading_days + pd.Timedelta(hours=close_hour)).tz_localize(CME_TIMEZONE)
+        self.trading_days = trading_days
+        self.opens = opens.asi8 // 10**9
+        self.closes = closes.asi8 // 10**9
+        self.lengths = self.closes - self.opens
+
+        # Session seconds before each session, and bars before each session per bar interval
+        self.cumulative_seconds = np.concatenate(([0], np.cumsum(self.lengths)))
+        self._cumulative_bars: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.opens)
+
+    def sessions_between(self, start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(opens, closes) of the sessions overlapping [start, end]"""
+        first = np.searchsorted(self.closes, start, side='right')
+        last = np.searchsorted(self.opens, end, side='right')
+        return self.opens[first:last], self.closes[first:last]
+
+    def is_open(self, timestamp: int) -> bool:
+        """Whether a session is trading at `timestamp`"""
+        index = np.searchsorted(self.opens, timestamp, side='right') - 1
+        return bool(index >= 0 and timestamp < self.closes[index])
+
+    def _elapsed(self, timestamps: np.ndarray) -> np.ndarray:
+        """Session seconds from the first session open to each timestamp"""
+        index = np.searchsorted(self.opens, timestamps, side='right') - 1
+        session = np.maximum(index, 0)
+        within = np.clip(timestamps - self.opens[session], 0, self.lengths[session])
+        return np.where(index >= 0, self.cumulative_seconds[session] + within, 0)
+
+    def session_seconds(self, start: int, end: int) -> int:
+        """Trading seconds in [start, end)"""
+        if end <= start:
+            return 0
+        elapsed = self._elapsed(np.array([start, end], dtype=np.int64))
+        return int(elapsed[1] - elapsed[0])
+
+    def _bars_before(self, interval: int) -> np.ndarray:
+        bars = self._cumulative_bars.get(interval)
+        if bars is None:
+            bars = np.concatenate(([0], np.cumsum(-(-self.lengths // interval))))
+            self._cumulative_bars[interval] = bars
+        return bars
+
+    def expected_bars(self, start: int, end: int, interval: int) -> int:
+        """
+        Bars of `interval` seconds starting in [start, end), with bars laid
+        out from each session open. Sessions fully inside the range are
+        counted from the cumulative bar counts; only the two boundary
+        sessions are computed.
+        """
+        if end <= start:
+            return 0
+        first = int(np.searchsorted(self.closes, start, side='right'))
+        last = int(np.searchsorted(self.opens, end, side='left')) - 1
+        if last < first:
+            return 0
+
+        def bars_in(session: int, low: int, high: int) -> int:
+            # Bar starts open + k * interval in [low, high)
+            session_open = self.opens[session]
+            low = max(low, session_open) - session_open
+            high = min(high, self.closes[session]) - session_open
+            return int(-(-high // interval) - -(-low // interval))
+
+        if first == last:
+            return bars_in(first, start, end)
+        bars_before = self._bars_before(interval)
+        middle = int(bars_before[last] - bars_before[first + 1])
+        return bars_in(first, start, end) + middle + bars_in(last, start, end)
+
+    def clip_bars(self, start: int, end: int, step: int) -> List[Tuple[int, int]]:
+        """
+        Bar start times start, start + step, ... up to end that fall inside
+        a session, as inclusive (first, last) runs.
+        """
+        runs = []
+        for session_open, session_close in zip(*self.sessions_between(start, end)):
+            first = start + -(-(max(start, session_open) - start) // step) * step
+            last = start + (min(end, session_close - 1) - start) // step * step
+            if last >= first:
+                runs.append((int(first), int(last)))
+        return runs
+
+
+@lru_cache(maxsize=16)
+def _calendar(first_year: int, last_year: int, hours: Tuple[int, int]) -> SessionCalendar:
+    return SessionCalendar(first_year, last_year, *hours)
+
+
+def get_session_calendar(start: Optional[Timestamp] = None, end: Optional[Timestamp] = None,
+                         product: Optional[str] = None) -> SessionCalendar:
+    """
+    Cached calendar of a product's sessions covering [start, end] (default: now).
+
+    Calendars span whole decades, so nearby ranges and products trading the
+    same hours share one.
+    """
+    now = datetime.now(timezone.utc).timestamp()
+    start_year = datetime.fromtimestamp(now if start is None else _epoch(start), timezone.utc).year
+    end_year = datetime.fromtimestamp(now if end is None else _epoch(end), timezone.utc).year
+    return _calendar(start_year // 10 * 10 - 1, end_year // 10 * 10 + 10, session_hours(product))
+
+
+def expected_bars(start: Timestamp, end: Timestamp, timeframe: str, product: Optional[str] = None) -> int:
+    """
+    Bars of `timeframe` a complete series has in [start, end).
+
+    Intraday and daily bars are counted within trading sessions; longer
+    timeframes by calendar time.
+    """
+    start, end = _epoch(start), _epoch(end)
+    interval = TIMEFRAME_SECONDS.get(timeframe, 60)
+    if interval > SECONDS_PER_DAY:
+        return max(end - start, 0) // interval
+    return get_session_calendar(start, end, product).expected_bars(start, end, interval)
+
+
+def session_seconds(start: Timestamp, end: Timestamp, product: Optional[str] = None) -> int:
+    """Trading seconds in [start, end)"""
+    start, end = _epoch(start), _epoch(end)
+    return get_session_calendar(start, end, product).session_seconds(start, end)
+
+
+def is_session_open(timestamp: Timestamp, product: Optional[str] = None) -> bool:
+    """Whether the product is trading at `timestamp`"""
+    timestamp = _epoch(timestamp)
+    return get_session_calendar(timestamp, timestamp, product).is_open(timestamp)
@@ -16,6 +16,7 @@ import pandas as pd
 
 from config import config
 from services.import_logs_service import ImportLogsService
+from services.running_quantity import SQL_VARIABLE_CHUNK
 
 # Import database with fallback for different environments
 try:
@@ -629,58 +630,66 @@ class UnifiedCSVImportService:
         - Sell with no long position
         - Adding to existing positions unexpectedly
 
+        Running quantity before/after each trade is read from the stored
+        per-(account, instrument) running quantities of the imported rows
+        (looked up by account + execution ID), so it continues from the
+        trades already in the database.
+
         Args:
             trades: List of trade dictionaries that were imported
 
         Returns:
             List of issue dictionaries containing details about potential problems
         """
-        if not trades:
+        if not trades or not FuturesDB:
             return []
 
-        detected_issues = []
-        running_quantities: Dict[tuple, int] = {}
-
-        # Sort by entry_time for proper analysis
-        sorted_trades = sorted(trades, key=lambda t: t.get('entry_time', t.get('Entry Time', '')))
-
-        for trade in sorted_trades:
-            # Get trade details (handle both formats)
+        # Execution IDs per account (handle both formats)
+        execution_ids: Dict[str, set] = {}
+        for trade in trades:
             account = trade.get('Account', trade.get('account', ''))
-            instrument = trade.get('Instrument', trade.get('instrument', ''))
-            action = trade.get('action', trade.get('Side of Market', trade.get('side_of_market', '')))
-            quantity = abs(int(trade.get('quantity', trade.get('Quantity', 0))))
-            entry_time = trade.get('entry_time', trade.get('Entry Time', ''))
+            exec_id = trade.get('execution_id', trade.get('ID', ''))
+            if account and exec_id:
+                execution_ids.setdefault(account, set()).add(str(exec_id))
+
+        stored = []
+        with FuturesDB() as db:
+            for account, ids in execution_ids.items():
+                db.refresh_running_quantities(account)
+                ids = sorted(ids)
+                for start in range(0, len(ids), SQL_VARIABLE_CHUNK):
+                    chunk = ids[start:start + SQL_VARIABLE_CHUNK]
+                    db.cursor.execute(f"""
+                        SELECT id, account, instrument, side_of_market, quantity, entry_time,
+                               entry_execution_id, running_qty_before, running_qty_after
+                        FROM trades
+                        WHERE account = ? AND entry_execution_id IN ({','.join('?' * len(chunk))})
+                          AND (deleted = 0 OR deleted IS NULL)
+                    """, [account] + chunk)
+                    stored.extend(dict(row) for row in db.cursor.fetchall())
 
-            if not account or not instrument or not action:
+        detected_issues = []
+        for trade in sorted(stored, key=lambda t: (t['entry_time'] or '', t['id'])):
+            action = trade['side_of_market']
+            if not trade['instrument'] or not action or trade['running_qty_after'] is None:
                 continue
 
-            key = (account, instrument)
-            prev_qty = running_quantities.get(key, 0)
-
-            # Calculate signed quantity change
-            if action in ['Buy', 'BuyToCover']:
-                signed_change = quantity
-            elif action in ['Sell', 'SellShort']:
-                signed_change = -quantity
-            else:
-                signed_change = 0
-
-            running_qty = prev_qty + signed_change
-            running_quantities[key] = running_qty
+            prev_qty = trade['running_qty_before']
+            running_qty = trade['running_qty_after']
 
             # Detect issues
             issue = self._detect_single_issue(action, prev_qty, running_qty)
             if issue:
                 detected_issues.append({
-                    'account': account,
-                    'instrument': instrument,
+                    'account': trade['account'],
+                    'instrument': trade['instrument'],
                     'action': action,
-                    'quantity': quantity,
+                    'quantity': trade['quantity'],
                     'prev_qty': prev_qty,
                     'running_qty': running_qty,
                     'issue': issue,
-                    'time': str(entry_time)
+                    'time': str(trade['entry_time']),
+                    'execution_id': trade['entry_execution_id']
                 })
 
         if detected_issues:
@@ -690,7 +699,6 @@ class UnifiedCSVImportService:
             )
             # Log details of each issue
             for issue_detail in detected_issues:
-                exec_id = trade.get('execution_id', trade.get('entry_execution_id', 'Unknown'))
                 self.logger.warning(
                     f"  Issue: {issue_detail['issue']} - {issue_detail['account']}/{issue_detail['instrument']} "
                     f"Action={issue_detail['action']} Qty={issue_detail['quantity']} "
@@ -359,6 +359,11 @@ def check_gap_status(instrument: str, timeframe: str, days_back: int = 7):
         return {'status': 'error', 'error': str(e)}
 
 
+# Pending fetch intents shared by all workers, planned together by run_fetch_plan
+FETCH_INTENTS_KEY = 'ohlc_fetch:intents'
+FETCH_PLAN_SCHEDULED_KEY = 'ohlc_fetch:plan_scheduled'
+
+
 @app.task(base=CallbackTask, bind=True, queue='gap_filling')
 def fetch_position_ohlc_data(self, position_id: int, instrument: str,
                             start_date: str, end_date: str,
@@ -368,6 +373,9 @@ def fetch_position_ohlc_data(self, position_id: int, instrument: str,
     Triggered automatically when a position is imported.
 
     Uses smart fetching - only downloads data we don't already have to respect API quotas.
+    The gaps found are queued as fetch intents and fetched by run_fetch_plan,
+    which coalesces the intents of every position queued in the meantime.
+    Without Redis the position's own intents are planned and fetched here.
 
     Args:
         position_id: Position identifier (for logging)
@@ -378,7 +386,7 @@ def fetch_position_ohlc_data(self, position_id: int, instrument: str,
         priority: Task priority ('high' or 'normal')
 
     Returns:
-        Dict with fetch results and quota usage
+        Dict with queued intents, or fetch results and quota usage
     """
     try:
         logger.info(f"Fetching OHLC data for position {position_id}: {instrument} from {start_date} to {end_date}")
@@ -399,21 +407,10 @@ def fetch_position_ohlc_data(self, position_id: int, instrument: str,
             instruments_to_fetch.append(root_symbol)
             logger.info(f"Will also fetch continuous contract: {root_symbol}")
 
-        total_fetched = 0
-        total_gaps_filled = 0
-        api_calls_made = 0
-        results = {}
+        from services.ohlc_fetch_planner import FetchIntent
 
-        # Check API quota before starting
-        quota_status = _check_and_update_quota()
-        if not quota_status['can_proceed']:
-            logger.warning(f"API quota limit reached: {quota_status}")
-            return {
-                'status': 'quota_exceeded',
-                'position_id': position_id,
-                'message': 'Daily API quota exceeded',
-                'quota_status': quota_status
-            }
+        intents = []
+        results = {}
 
         for inst in instruments_to_fetch:
             inst_results = {}
@@ -429,37 +426,9 @@ def fetch_position_ohlc_data(self, position_id: int, instrument: str,
                         continue
 
                     logger.info(f"Found {len(gaps)} gaps to fill for {inst} {tf}")
-
-                    # Fill each gap with rate limiting
-                    for gap_start, gap_end in gaps:
-                        try:
-                            filled = _fill_gaps_for_instrument_timeframe(
-                                inst, tf, gap_start, gap_end
-                            )
-                            total_gaps_filled += filled
-                            api_calls_made += 1
-
-                            # Check quota after each API call
-                            if api_calls_made % 10 == 0:  # Check every 10 calls
-                                quota_status = _check_and_update_quota()
-                                if not quota_status['can_proceed']:
-                                    logger.warning("Quota limit reached mid-fetch")
-                                    break
-
-                            # Rate limiting: 1 second between calls (safe for Yahoo Finance)
-                            import time
-                            time.sleep(1.0)
-
-                        except Exception as e:
-                            logger.error(f"Error filling gap {gap_start} to {gap_end}: {e}")
-                            continue
-
-                    inst_results[tf] = {
-                        'status': 'success',
-                        'gaps_found': len(gaps),
-                        'gaps_filled': total_gaps_filled
-                    }
-                    total_fetched += len(gaps)
+                    intents.extend(FetchIntent.from_datetimes(inst, tf, gap_start, gap_end, priority)
+                                   for gap_start, gap_end in gaps)
+                    inst_results[tf] = {'status': 'queued', 'gaps_found': len(gaps)}
 
                 except Exception as e:
                     logger.error(f"Error fetching {inst} {tf}: {e}")
@@ -468,28 +437,221 @@ def fetch_position_ohlc_data(self, position_id: int, instrument: str,
 
             results[inst] = inst_results
 
-        # Invalidate cache for affected instruments
-        if total_gaps_filled > 0:
-            _invalidate_relevant_cache(instruments_to_fetch)
-
-        logger.info(f"Position OHLC fetch complete: {total_fetched} segments fetched, {total_gaps_filled} gaps filled, {api_calls_made} API calls")
-
-        return {
+        result = {
             'status': 'success',
             'position_id': position_id,
             'instruments_processed': instruments_to_fetch,
             'timeframes': timeframes,
-            'total_gaps_filled': total_gaps_filled,
-            'api_calls_made': api_calls_made,
-            'quota_remaining': quota_status.get('remaining', 'unknown'),
+            'intents': len(intents),
             'results': results
         }
 
+        if not intents:
+            return result
+
+        if _queue_fetch_intents(intents):
+            logger.info(f"Queued {len(intents)} fetch intents for position {position_id}")
+            result['status'] = 'queued'
+            return result
+
+        # No shared intent queue: plan and fetch this position's intents now
+        report = _execute_fetch_plan(intents)
+        report['unfetched_calls'] = len(report.pop('unfetched'))
+        result.update(report)
+        return result
+
     except Exception as e:
         logger.error(f"Error in fetch_position_ohlc_data: {e}")
         raise self.retry(exc=e, countdown=60, max_retries=2)
 
 
+@app.task(base=CallbackTask, bind=True, queue='gap_filling')
+def run_fetch_plan(self):
+    """
+    Plan and fetch every queued fetch intent.
+
+    Scheduled (debounced) by fetch_position_ohlc_data; intents queued while
+    the plan runs schedule the next run. Intents the plan could not fetch -
+    quota exhausted before or during the run, or an error - go back on the
+    queue for a later run.
+    """
+    intents = []
+    try:
+        intents = _drain_fetch_intents()
+        if not intents:
+            return {'status': 'no_intents', 'intents': 0}
+        report = _execute_fetch_plan(intents)
+        unfetched = report.pop('unfetched')
+        report['requeued'] = len(unfetched)
+        if unfetched:
+            _requeue_fetch_intents(unfetched)
+        return report
+
+    except Exception as e:
+        logger.error(f"Error in run_fetch_plan: {e}")
+        if intents:
+            _requeue_fetch_intents(intents)
+        raise self.retry(exc=e, countdown=60, max_retries=2)
+
+
+def _get_redis_client():
+    """Redis client of the cache service, or None when Redis is unavailable"""
+    cache_service = get_cache_service()
+    return getattr(cache_service, 'redis_client', None) if cache_service else None
+
+
+def _queue_fetch_intents(intents: List) -> bool:
+    """
+    Add intents to the shared queue and schedule run_fetch_plan once per
+    debounce window.
+
+    Returns:
+        False when there is no shared queue (Redis unavailable)
+    """
+    redis_client = _get_redis_client()
+    if redis_client is None:
+        return False
+
+    import json
+    from config import OHLC_FETCH_PLANNER_CONFIG
+
+    try:
+        redis_client.rpush(FETCH_INTENTS_KEY, *[json.dumps(intent._asdict()) for intent in intents])
+        debounce = OHLC_FETCH_PLANNER_CONFIG['debounce_seconds']
+        if redis_client.set(FETCH_PLAN_SCHEDULED_KEY, 1, nx=True, ex=max(debounce * 10, 60)):
+            run_fetch_plan.apply_async(countdown=debounce)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not queue fetch intents, fetching directly: {e}")
+        return False
+
+
+def _drain_fetch_intents() -> List:
+    """Take every queued intent off the shared queue"""
+    redis_client = _get_redis_client()
+    if redis_client is None:
+        return []
+
+    import json
+    from services.ohlc_fetch_planner import FetchIntent
+
+    # Clear the schedule flag first so intents queued from now on schedule a new run
+    redis_client.delete(FETCH_PLAN_SCHEDULED_KEY)
+    pipeline = redis_client.pipeline(transaction=True)
+    pipeline.lrange(FETCH_INTENTS_KEY, 0, -1)
+    pipeline.delete(FETCH_INTENTS_KEY)
+    queued, _ = pipeline.execute()
+    return [FetchIntent(**json.loads(item)) for item in queued]
+
+
+def _requeue_fetch_intents(intents: List) -> None:
+    """
+    Put intents a plan did not fetch back on the shared queue.
+
+    No run is scheduled: the next queued position schedules one, or the
+    retry of a failed run drains them.
+    """
+    redis_client = _get_redis_client()
+    if redis_client is None:
+        logger.error(f"Dropping {len(intents)} unfetched fetch intents: no shared queue")
+        return
+
+    import json
+
+    try:
+        redis_client.rpush(FETCH_INTENTS_KEY, *[json.dumps(intent._asdict()) for intent in intents])
+        logger.info(f"Requeued {len(intents)} unfetched fetch intents")
+    except Exception as e:
+        logger.error(f"Could not requeue {len(intents)} fetch intents: {e}")
+
+
+def _as_intents(fetches: List) -> List:
+    """Planned fetches as the intents that would plan them again"""
+    from services.ohlc_fetch_planner import FetchIntent
+
+    return [FetchIntent(fetch.instrument, fetch.timeframe, fetch.start, fetch.end, fetch.priority)
+            for fetch in fetches]
+
+
+def _execute_fetch_plan(intents: List) -> Dict[str, Any]:
+    """
+    Coalesce intents into a fetch plan and run it, respecting the API quota.
+
+    The report's 'unfetched' lists the plan's calls that did not run, as
+    intents, when the quota ran out before or during the plan.
+    """
+    import time
+    from config import OHLC_FETCH_PLANNER_CONFIG
+    from services.data_service import OHLCDataService
+    from services.ohlc_empty_ranges import EmptyRangeLedger
+    from services.ohlc_fetch_planner import plan_fetches
+
+    plan = plan_fetches(intents, OHLCDataService.HISTORICAL_LIMITS, known_empty=EmptyRangeLedger().known_empty)
+    summary = plan.summary()
+    logger.info(
+        f"Fetch plan: {summary['planned_calls']} provider calls for {summary['intents']} intents "
+        f"({summary['calls_saved']} saved, {summary['unreachable_intents']} beyond provider history, "
+        f"{summary['ledger_hits']} ranges trimmed as known empty)"
+    )
+
+    total_gaps_filled = 0
+    api_calls_made = 0
+    filled_instruments = set()
+    unfetched = []
+
+    # Check API quota before starting
+    quota_status = _check_and_update_quota()
+    if not quota_status['can_proceed']:
+        logger.warning(f"API quota limit reached: {quota_status}")
+        return {
+            'status': 'quota_exceeded',
+            'message': 'Daily API quota exceeded',
+            'quota_status': quota_status,
+            'unfetched': _as_intents(plan.fetches),
+            **summary
+        }
+
+    for index, fetch in enumerate(plan.fetches):
+        try:
+            filled = _fill_gaps_for_instrument_timeframe(
+                fetch.instrument, fetch.timeframe, fetch.start_date, fetch.end_date
+            )
+            total_gaps_filled += filled
+            api_calls_made += 1
+            if filled:
+                filled_instruments.add(fetch.instrument)
+
+            # Check quota after each API call
+            if api_calls_made % 10 == 0:  # Check every 10 calls
+                quota_status = _check_and_update_quota()
+                if not quota_status['can_proceed']:
+                    logger.warning("Quota limit reached mid-fetch")
+                    unfetched = _as_intents(plan.fetches[index + 1:])
+                    break
+
+            # Rate limiting between calls (safe for Yahoo Finance)
+            time.sleep(OHLC_FETCH_PLANNER_CONFIG['request_interval'])
+
+        except Exception as e:
+            logger.error(f"Error filling gap {fetch.start_date} to {fetch.end_date}: {e}")
+            continue
+
+    # Invalidate cache for affected instruments
+    if filled_instruments:
+        _invalidate_relevant_cache(sorted(filled_instruments))
+
+    logger.info(f"Fetch plan complete: {api_calls_made} API calls, {total_gaps_filled} gaps filled")
+
+    return {
+        'status': 'success',
+        'total_gaps_filled': total_gaps_filled,
+        'api_calls_made': api_calls_made,
+        'quota_remaining': quota_status.get('remaining', 'unknown'),
+        'unfetched': unfetched,
+        **summary
+    }
+
+
 def needs_ohlc_data(instrument: str, start_date, end_date,
                     timeframe: str = '1m') -> bool:
     """
@@ -548,64 +710,67 @@ def _detect_gaps_for_range(instrument: str, timeframe: str,
                            start_date: datetime, end_date: datetime) -> List[tuple]:
     """
     Detect gaps in OHLC data for a specific range.
-    Returns list of (gap_start, gap_end) tuples.
+    Returns list of (gap_start, gap_end) tuples, without ranges known to be
+    empty (see services/ohlc_empty_ranges.py).
     """
     try:
-        from database_manager import DatabaseManager
-
-        with DatabaseManager() as db:
-            # Get existing data range for this instrument/timeframe
-            query = """
-                SELECT MIN(timestamp), MAX(timestamp), COUNT(*)
-                FROM ohlc_data
-                WHERE instrument = ? AND timeframe = ?
-                AND timestamp >= ? AND timestamp <= ?
-            """
+        from scripts.connection_pool import get_connection_pool
+        from services.ohlc_timeframes import TIMEFRAME_SECONDS
+        from services.ohlc_gap_engine import find_gaps, missing_bar_count
 
-            start_ts = int(start_date.timestamp())
-            end_ts = int(end_date.timestamp())
-
-            result = db.cursor.execute(query, (instrument, timeframe, start_ts, end_ts)).fetchone()
-
-            if not result or not result[0]:
-                # No data at all - entire range is a gap
-                logger.info(f"No existing data for {instrument} {timeframe} - full range is a gap")
-                return [(start_date, end_date)]
-
-            min_ts, max_ts, count = result
-
-            # Simple gap detection: if we have very little data or data is sparse, fetch the whole range
-            expected_bars = _calculate_expected_bars(start_date, end_date, timeframe)
-            coverage_ratio = count / expected_bars if expected_bars > 0 else 0
+        start_ts = int(start_date.timestamp())
+        end_ts = int(end_date.timestamp())
+        interval = TIMEFRAME_SECONDS.get(timeframe, 60)
 
-            if coverage_ratio < 0.8:  # Less than 80% coverage
-                logger.info(f"Sparse data coverage ({coverage_ratio:.1%}) for {instrument} {timeframe} - fetching full range")
-                return [(start_date, end_date)]
+        # Missing in-session stretches, one per run of missing bars
+        with get_connection_pool(config.db_path).connection() as conn:
+            gaps = find_gaps(conn, instrument, timeframe, start_ts, end_ts, split_sessions=False)
 
-            # Data looks good - no gaps to fill
-            logger.info(f"Good data coverage ({coverage_ratio:.1%}) for {instrument} {timeframe}")
+        if not gaps:
+            logger.info(f"No gaps in {instrument} {timeframe} data")
             return []
 
+        missing = missing_bar_count(gaps, timeframe)
+        expected = _calculate_expected_bars(start_date, end_date, timeframe, instrument)
+        logger.info(f"Found {len(gaps)} gaps in {instrument} {timeframe} data "
+                    f"({missing} of {expected} expected bars missing)")
+        return _without_known_empty(instrument, timeframe, [
+            (datetime.fromtimestamp(gap_start), datetime.fromtimestamp(min(gap_end + interval, end_ts)))
+            for gap_start, gap_end in gaps
+        ])
+
     except Exception as e:
         logger.error(f"Error detecting gaps: {e}")
         # On error, be conservative and fetch the whole range
         return [(start_date, end_date)]
 
 
-def _calculate_expected_bars(start_date: datetime, end_date: datetime, timeframe: str) -> int:
-    """Calculate expected number of bars for a date range and timeframe"""
-    timeframe_minutes = {
-        '1m': 1, '3m': 3, '5m': 5, '15m': 15,
-        '1h': 60, '4h': 240, '1d': 1440
-    }
+def _without_known_empty(instrument: str, timeframe: str, gaps: List[tuple]) -> List[tuple]:
+    """Gaps minus the ranges recorded as empty in the ledger"""
+    try:
+        from services.ohlc_empty_ranges import EmptyRangeLedger
 
-    total_minutes = (end_date - start_date).total_seconds() / 60
-    bar_minutes = timeframe_minutes.get(timeframe, 60)
+        remaining, ledger_hits = EmptyRangeLedger().subtract(
+            instrument, timeframe,
+            [(int(gap_start.timestamp()), int(gap_end.timestamp())) for gap_start, gap_end in gaps]
+        )
+        if not ledger_hits:
+            return gaps
+        logger.info(f"Skipped known-empty ranges for {instrument} {timeframe}")
+        return [(datetime.fromtimestamp(gap_start), datetime.fromtimestamp(gap_end)) for gap_start, gap_end in remaining]
+
+    except Exception as e:
+        logger.warning(f"Could not check empty range ledger: {e}")
+        return gaps
 
-    # Futures markets are ~23.5 hours per day (with brief closure)
-    market_factor = 0.98
 
-    return int(total_minutes * market_factor / bar_minutes)
+def _calculate_expected_bars(start_date: datetime, end_date: datetime, timeframe: str,
+                             instrument: Optional[str] = None) -> int:
+    """Calculate expected number of bars for a date range and timeframe"""
+    from services.session_calendar import expected_bars
+
+    # Counted within trading sessions (services/session_calendar.py)
+    return expected_bars(start_date, end_date, timeframe, instrument)
 
 
 def _check_and_update_quota() -> Dict[str, Any]:
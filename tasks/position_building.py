@@ -35,55 +35,47 @@ class CallbackTask(Task):
 @app.task(base=CallbackTask, bind=True)
 def rebuild_all_positions(self):
     """
-    Rebuild all positions from scratch using the new position engine
+    Rebuild all positions from scratch
     This is a heavy operation and should be used sparingly
+
+    Account/instrument groups are built in parallel worker processes on large
+    datasets (see POSITION_REBUILD_CONFIG), with progress reported per group.
     """
     try:
         logger.info("Starting full position rebuild")
-        
-        with DatabaseManager() as db:
-            # Get all non-deleted trades
-            trades_query = """
-                SELECT * FROM trades 
-                WHERE deleted = 0 OR deleted IS NULL
-                ORDER BY account, instrument, entry_time
-            """
-            
-            result = db.cursor.execute(trades_query)
-            raw_executions = [dict(row) for row in result.fetchall()]
-            
-            if not raw_executions:
-                logger.info("No trades found for position building")
-                return {'status': 'no_trades', 'positions_created': 0}
-            
-            logger.info(f"Processing {len(raw_executions)} executions for position building")
-            
-            # Use the new position engine
-            positions = PositionEngine.build_positions_from_executions(raw_executions)
-            
-            # Clear existing positions
-            db.cursor.execute("DELETE FROM positions")
-            db.cursor.execute("DELETE FROM position_executions")
-            
-            # Save new positions to database
-            positions_created = 0
-            for position in positions:
-                position_id = _save_position_to_database(db, position)
-                if position_id:
-                    positions_created += 1
-                    # Link executions to position
-                    _link_executions_to_position(db, position_id, position.executions)
-            
-            db.commit()
-            
-            logger.info(f"Position rebuild completed: {positions_created} positions created from {len(raw_executions)} executions")
-            
-            return {
-                'status': 'success',
-                'positions_created': positions_created,
-                'executions_processed': len(raw_executions)
-            }
-            
+
+        def report_progress(completed, total, account, instrument):
+            self.update_state(
+                state='PROGRESS',
+                meta={
+                    'current': completed,
+                    'total': total,
+                    'progress': int((completed / total) * 100),
+                    'account': account,
+                    'instrument': instrument,
+                    'status': f'Built {account}/{instrument}'
+                }
+            )
+
+        with EnhancedPositionServiceV2() as position_service:
+            stats = position_service.rebuild_positions_from_trades(progress_callback=report_progress)
+
+        if not stats['trades_processed']:
+            logger.info("No trades found for position building")
+            return {'status': 'no_trades', 'positions_created': 0}
+
+        logger.info(f"Position rebuild completed: {stats['positions_created']} positions created from "
+                    f"{stats['trades_processed']} executions using {stats['workers']} worker(s), "
+                    f"peak RSS {stats['peak_rss_mb']} MB")
+
+        return {
+            'status': 'success',
+            'positions_created': stats['positions_created'],
+            'executions_processed': stats['trades_processed'],
+            'workers': stats['workers'],
+            'peak_rss_mb': stats['peak_rss_mb']
+        }
+
     except Exception as e:
         logger.error(f"Error in rebuild_all_positions: {e}")
         raise self.retry(exc=e, countdown=300, max_retries=2)
@@ -3,10 +3,9 @@ Background Validation Tasks
 
 Celery tasks for automated position-execution integrity validation.
 """
-from celery import Task
+from celery import Task, chord
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta, timezone
-import sqlite3
 
 from celery_app import app
 from config import config
@@ -14,7 +13,6 @@ from domain.services.position_execution_integrity_validator import PositionExecu
 from services.position_execution_integrity_service import PositionExecutionIntegrityService
 from services.notification_service import NotificationService, NotificationPriority
 from repositories.validation_repository import ValidationRepository
-from domain.integrity_issue import IssueSeverity
 from routes.validation import _load_position_from_db, _load_executions_from_db
 from utils.logging_config import get_logger
 
@@ -23,6 +21,9 @@ logger = get_logger(__name__)
 # Initialize notification service
 notification_service = NotificationService()
 
+# Positions per chunk of a validation job
+VALIDATION_CHUNK_SIZE = 5000
+
 
 class ValidationTask(Task):
     """Base task class for validation with shared setup"""
@@ -148,98 +149,16 @@ def validate_all_positions_task(
 
         db_path = str(config.db_path)
 
-        # Build query to get positions
-        query = "SELECT id FROM positions WHERE 1=1"
-        params = []
-
-        if position_status:
-            query += " AND position_status = ?"
-            params.append(position_status)
-
+        since = None
         if days_back:
-            cutoff_date = (datetime.now(timezone.utc) - timedelta(days=days_back)).isoformat()
-            query += " AND (entry_time >= ? OR exit_time >= ?)"
-            params.extend([cutoff_date, cutoff_date])
-
-        # Fetch position IDs
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        position_ids = [row[0] for row in cursor.fetchall()]
-        conn.close()
-
-        logger.info(f"Found {len(position_ids)} positions to validate")
-
-        # Validate each position
-        results = {
-            'total_positions': len(position_ids),
-            'validated': 0,
-            'passed': 0,
-            'failed': 0,
-            'errors': 0,
-            'issues_found': 0,
-            'critical_issues': 0,
-            'repaired': 0,
-            'position_results': []
-        }
+            since = (datetime.now(timezone.utc) - timedelta(days=days_back)).isoformat()
 
-        for position_id in position_ids:
-            try:
-                # Load position and executions
-                position = _load_position_from_db(db_path, position_id)
-                if not position:
-                    continue
-
-                executions = _load_executions_from_db(db_path, position_id)
-
-                # Run validation
-                result, issues = self.service.validate_position(
-                    position,
-                    executions,
-                    save_results=True
-                )
-
-                results['validated'] += 1
-
-                if result.status.value == 'passed':
-                    results['passed'] += 1
-                elif result.status.value == 'failed':
-                    results['failed'] += 1
-                    results['issues_found'] += len(issues)
-
-                    # Count critical issues
-                    critical = sum(1 for i in issues if i.severity == IssueSeverity.CRITICAL)
-                    results['critical_issues'] += critical
-
-                    # Attempt auto-repair if requested
-                    if auto_repair:
-                        repair_results = self.service.attempt_auto_repair(
-                            position_id,
-                            position,
-                            executions,
-                            dry_run=False
-                        )
-
-                        # Count successful repairs
-                        from domain.services.integrity_repair_service import RepairStatus
-                        repaired = sum(
-                            1 for r in repair_results.values()
-                            if r.status == RepairStatus.SUCCESS
-                        )
-                        results['repaired'] += repaired
-                else:
-                    results['errors'] += 1
-
-                # Store individual result
-                results['position_results'].append({
-                    'position_id': position_id,
-                    'status': result.status.value,
-                    'issue_count': len(issues)
-                })
-
-            except Exception as e:
-                logger.error(f"Error validating position {position_id}: {e}")
-                results['errors'] += 1
+        # Set-based checks over all positions in scope, saved in one transaction
+        results = self.service.validate_all_positions(position_status=position_status, since=since)
+        results['repaired'] = 0
+
+        if auto_repair:
+            _repair_positions(self.service, db_path, results)
 
         logger.info(
             f"Batch validation completed: {results['validated']}/{results['total_positions']} validated, "
@@ -247,37 +166,7 @@ def validate_all_positions_task(
             f"{results['issues_found']} issues found, {results['repaired']} repaired"
         )
 
-        # Send notification if critical issues found
-        if results['critical_issues'] > 0 or results['failed'] > 10:
-            affected_positions = [
-                r['position_id'] for r in results['position_results']
-                if r['issue_count'] > 0
-            ]
-
-            notification_service.send_validation_alert(
-                issue_count=results['issues_found'],
-                critical_count=results['critical_issues'],
-                position_ids=affected_positions,
-                details={
-                    'total_validated': results['validated'],
-                    'passed': results['passed'],
-                    'failed': results['failed'],
-                    'repaired': results['repaired']
-                }
-            )
-
-        # Send repair summary if repairs were attempted
-        if auto_repair and results['repaired'] > 0:
-            repaired_positions = [
-                r['position_id'] for r in results['position_results']
-                if r.get('repaired', 0) > 0
-            ]
-
-            notification_service.send_repair_summary(
-                total_repaired=results['repaired'],
-                total_failed=results['issues_found'] - results['repaired'],
-                position_ids=repaired_positions
-            )
+        _send_notifications(results, auto_repair)
 
         results['timestamp'] = datetime.now(timezone.utc).isoformat()
         return results
@@ -291,6 +180,225 @@ def validate_all_positions_task(
         }
 
 
+@app.task(
+    base=ValidationTask,
+    bind=True
+)
+def run_validation_job_task(
+    self,
+    position_status: Optional[str] = None,
+    days_back: Optional[int] = None,
+    auto_repair: bool = False,
+    chunk_size: int = VALIDATION_CHUNK_SIZE,
+    job_id: Optional[str] = None
+) -> Dict:
+    """
+    Start (or resume) a chunked validation job
+
+    The positions in scope are split into ID-range chunks that are validated
+    by validate_job_chunk_task in parallel, as a chord whose callback
+    (finish_validation_job_task) merges the chunk summaries. Chunk
+    completion is persisted, so running this task again for an existing
+    job only dispatches the chunks that have not completed.
+
+    Args:
+        position_status: Filter by status ('open', 'closed', or None for all)
+        days_back: Only validate positions from last N days (None for all)
+        auto_repair: Whether to attempt automatic repair when the job finishes
+        chunk_size: Maximum positions per chunk
+        job_id: Job to resume; a new job is created under this task's ID when omitted
+
+    Returns:
+        Dictionary with the job ID and the number of chunks dispatched
+    """
+    job_id = job_id or self.request.id
+    job = self.service.get_validation_job(job_id)
+
+    if job is None:
+        since = None
+        if days_back:
+            since = (datetime.now(timezone.utc) - timedelta(days=days_back)).isoformat()
+        job = self.service.create_validation_job(job_id, chunk_size, position_status, since, auto_repair)
+        logger.info(f"Created validation job {job_id}: {job['total_positions']} positions in {job['chunk_count']} chunks")
+    elif job['status'] == 'completed':
+        logger.info(f"Validation job {job_id} already completed")
+        return {'job_id': job_id, 'chunks': job['chunk_count'], 'dispatched': 0}
+    else:
+        self.service.resume_validation_job(job_id)
+
+    pending = self.service.get_pending_job_chunks(job_id)
+    if pending:
+        chord(validate_job_chunk_task.s(job_id, chunk_index) for chunk_index in pending)(
+            finish_validation_job_task.s(job_id)
+        )
+    else:
+        finish_validation_job_task.delay([], job_id)
+
+    logger.info(f"Dispatched {len(pending)}/{job['chunk_count']} chunks of validation job {job_id}")
+    return {'job_id': job_id, 'chunks': job['chunk_count'], 'dispatched': len(pending)}
+
+
+@app.task(
+    base=ValidationTask,
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    time_limit=1800,
+    soft_time_limit=1700
+)
+def validate_job_chunk_task(self, job_id: str, chunk_index: int) -> Dict:
+    """
+    Validate one chunk of a validation job
+
+    Args:
+        job_id: ID of the validation job
+        chunk_index: Index of the chunk within the job
+
+    Returns:
+        Chunk counts (the full summary is stored with the chunk)
+    """
+    try:
+        summary = self.service.validate_job_chunk(job_id, chunk_index)
+        if summary is None:
+            return {'chunk_index': chunk_index, 'status': 'skipped'}
+
+        return {
+            'chunk_index': chunk_index,
+            'status': 'completed',
+            'validated': summary['validated'],
+            'failed': summary['failed'],
+            'issues_found': summary['issues_found']
+        }
+
+    except Exception as e:
+        logger.error(f"Error validating chunk {chunk_index} of job {job_id}: {e}")
+
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+
+        # Let the chord finish; the chunk stays pending for a resumed run
+        return {'chunk_index': chunk_index, 'status': 'error', 'message': str(e)}
+
+
+@app.task(
+    base=ValidationTask,
+    bind=True
+)
+def finish_validation_job_task(self, chunk_results: List[Dict], job_id: str) -> Dict:
+    """
+    Merge the chunk summaries of a validation job (chord callback)
+
+    Summaries are read from the database rather than chunk_results, so
+    chunks completed by an earlier, interrupted run are included.
+
+    Args:
+        chunk_results: Return values of this run's validate_job_chunk_task calls
+        job_id: ID of the validation job
+
+    Returns:
+        Merged summary of the job
+    """
+    try:
+        job = self.service.get_validation_job(job_id)
+        results = self.service.merge_validation_job(job_id)
+        if job['status'] == 'cancelled':
+            results['status'] = 'cancelled'
+        results['repaired'] = 0
+
+        if job['auto_repair'] and results['status'] != 'cancelled':
+            _repair_positions(self.service, str(config.db_path), results)
+
+        logger.info(
+            f"Validation job {job_id} {results['status']}: "
+            f"{results['chunks_completed']}/{results['chunk_count']} chunks, "
+            f"{results['validated']} validated, {results['passed']} passed, {results['failed']} failed, "
+            f"{results['issues_found']} issues found, {results['repaired']} repaired"
+        )
+
+        _send_notifications(results, job['auto_repair'])
+
+        results['timestamp'] = datetime.now(timezone.utc).isoformat()
+        self.service.finish_validation_job(job_id, results)
+        return results
+
+    except Exception as e:
+        logger.error(f"Error finishing validation job {job_id}: {e}")
+        return {
+            'status': 'error',
+            'message': str(e),
+            'timestamp': datetime.now(timezone.utc).isoformat()
+        }
+
+
+def _repair_positions(service: PositionExecutionIntegrityService, db_path: str, results: Dict) -> None:
+    """Attempt auto-repair of the positions with issues in a validation summary"""
+    from domain.services.integrity_repair_service import RepairStatus
+
+    for position_result in results['position_results']:
+        if position_result['issue_count'] == 0:
+            continue
+        position_id = position_result['position_id']
+        try:
+            position = _load_position_from_db(db_path, position_id)
+            if not position:
+                continue
+
+            executions = _load_executions_from_db(db_path, position_id)
+            repair_results = service.attempt_auto_repair(
+                position_id,
+                position,
+                executions,
+                dry_run=False
+            )
+
+            # Count successful repairs
+            repaired = sum(
+                1 for r in repair_results.values()
+                if r.status == RepairStatus.SUCCESS
+            )
+            position_result['repaired'] = repaired
+            results['repaired'] += repaired
+
+        except Exception as e:
+            logger.error(f"Error repairing position {position_id}: {e}")
+            results['errors'] += 1
+
+
+def _send_notifications(results: Dict, auto_repair: bool) -> None:
+    """Send validation alerts and repair summaries for a validation summary"""
+    # Send notification if critical issues found
+    if results['critical_issues'] > 0 or results['failed'] > 10:
+        affected_positions = [
+            r['position_id'] for r in results['position_results']
+            if r['issue_count'] > 0
+        ]
+
+        notification_service.send_validation_alert(
+            issue_count=results['issues_found'],
+            critical_count=results['critical_issues'],
+            position_ids=affected_positions,
+            details={
+                'total_validated': results['validated'],
+                'passed': results['passed'],
+                'failed': results['failed'],
+                'repaired': results['repaired']
+            }
+        )
+
+    # Send repair summary if repairs were attempted
+    if auto_repair and results['repaired'] > 0:
+        repaired_positions = [
+            r['position_id'] for r in results['position_results']
+            if r.get('repaired', 0) > 0
+        ]
+
+        notification_service.send_repair_summary(
+            total_repaired=results['repaired'],
+            total_failed=results['issues_found'] - results['repaired'],
+            position_ids=repaired_positions
+        )
+
+
 @app.task(
     base=ValidationTask,
     bind=True
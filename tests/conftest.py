@@ -3,9 +3,12 @@ Test configuration and fixtures for Futures Trading Log
 """
 import sys
 import os
+import sqlite3
 import tempfile
 from pathlib import Path
 
+import pytest
+
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -13,4 +16,73 @@ sys.path.insert(0, str(project_root))
 # Set test environment with temp directory for data
 temp_dir = tempfile.mkdtemp()
 os.environ['DATA_DIR'] = temp_dir
-os.environ['FLASK_ENV'] = 'test_local'  # Use a different value to avoid Docker path
\ No newline at end of file
+os.environ['FLASK_ENV'] = 'test_local'  # Use a different value to avoid Docker path
+# Every test gets a throwaway database (see db_path below); don't keep
+# pooled connections or a writer connection (and their -wal/-shm files) open
+# between blocks. Writes run inline; tests that use the db_writer fixture
+# run a second time with writes going through the write queue
+os.environ.setdefault('DB_POOL_MAX_IDLE', '0')
+os.environ.setdefault('DB_WRITER_ENABLED', 'false')
+
+# Imported after the environment above is set: config reads it at import time
+from config import DATABASE_WRITER_CONFIG
+from scripts.connection_pool import close_all_pools
+from scripts.database_bootstrap import bootstrap_database, reset_bootstrap_state
+from scripts.write_queue import shutdown_write_queues
+
+ACCOUNT = 'Sim101'
+INSTRUMENT = 'MNQ MAR25'  # $2 per point in data/config/instrument_multipliers.json
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    """Path for a database file that has not been bootstrapped yet"""
+    path = str(tmp_path / 'trades.db')
+    yield path
+    shutdown_write_queues()
+    close_all_pools()
+    reset_bootstrap_state(path)
+
+
+@pytest.fixture
+def db_path(db_file):
+    """A freshly bootstrapped database"""
+    bootstrap_database(db_file)
+    return db_file
+
+
+@pytest.fixture(params=[False, True], ids=['inline-writes', 'write-queue'])
+def db_writer(request, monkeypatch):
+    """Run the test with writes inline, then through the single-writer queue (the production default)"""
+    monkeypatch.setitem(DATABASE_WRITER_CONFIG, 'enabled', request.param)
+    yield request.param
+    shutdown_write_queues()
+
+
+def add_trade(db_path, execution_id, side, quantity, price, entry_time, commission=0.52,
+              account=ACCOUNT, instrument=INSTRUMENT):
+    """Insert one execution and return its trade id"""
+    opening = side in ('Buy', 'SellShort')
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute("""
+            INSERT INTO trades (instrument, account, side_of_market, quantity, entry_price, exit_price,
+                                entry_time, entry_execution_id, commission, deleted)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+        """, (instrument, account, side, quantity, price if opening else None,
+              None if opening else price, entry_time, execution_id, commission))
+        conn.commit()
+        return cursor.lastrowid
+    finally:
+        conn.close()
+
+
+def execute(db_path, sql, params=()):
+    """Run one statement on its own connection, commit and return its rows"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
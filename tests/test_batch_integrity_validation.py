@@ -0,0 +1,196 @@
+"""
+Tests for set-based position-execution integrity validation
+"""
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from domain.integrity_issue import IssueType
+from domain.services.position_execution_integrity_validator import PositionExecutionIntegrityValidator
+from domain.validation_result import ValidationStatus
+from repositories.validation_repository import ValidationRepository
+from services.batch_integrity_validator import BatchIntegrityValidator
+from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+from services.position_execution_integrity_service import PositionExecutionIntegrityService
+
+from conftest import ACCOUNT, INSTRUMENT, execute
+
+pytestmark = pytest.mark.usefixtures('db_writer')
+
+
+# Long 2 -> reversal to short 1 -> flat, then an open long 1
+TRADES = [
+    ('e1', 'Buy', 2, '2025-01-15 09:30:00'),
+    ('e2', 'Sell', 3, '2025-01-15 09:35:00'),
+    ('e3', 'BuyToCover', 1, '2025-01-15 09:40:00'),
+    ('e4', 'Buy', 1, '2025-01-15 10:00:00'),
+]
+
+
+@pytest.fixture
+def db_path(db_path):
+    conn = sqlite3.connect(db_path)
+    for execution_id, side, quantity, entry_time in TRADES:
+        opening = side in ('Buy', 'SellShort')
+        conn.execute("""
+            INSERT INTO trades (instrument, account, side_of_market, quantity, entry_price, exit_price,
+                                entry_time, entry_execution_id, commission, deleted)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0.52, 0)
+        """, (INSTRUMENT, ACCOUNT, side, quantity, 21000.0 if opening else None,
+              None if opening else 21010.0, entry_time, execution_id))
+    conn.commit()
+    conn.close()
+    with EnhancedPositionServiceV2(db_path) as service:
+        service.rebuild_positions_from_trades()
+    return db_path
+
+
+def issue_types(batch):
+    return {result.position_id: sorted(issue.issue_type.value for issue in issues) for result, issues in batch.results}
+
+
+class TestBatchIntegrityValidator:
+
+    def test_rebuilt_positions_have_no_issues(self, db_path):
+        batch = BatchIntegrityValidator(db_path).validate()
+
+        assert execute(db_path, "SELECT id, position_type, position_status, total_quantity FROM positions "
+                                "ORDER BY id") == [(1, 'Long', 'closed', 2), (2, 'Short', 'closed', 1),
+                                                   (3, 'Long', 'open', 1)]
+        assert issue_types(batch) == {1: [], 2: [], 3: []}
+        assert all(result.status == ValidationStatus.PASSED for result, _ in batch.results)
+        assert batch.orphan_issues == []
+
+    def test_quantity_mismatch(self, db_path):
+        execute(db_path, "UPDATE positions SET total_quantity = 3 WHERE id = 2")
+
+        batch = BatchIntegrityValidator(db_path).validate()
+
+        assert issue_types(batch) == {1: [], 2: [IssueType.QUANTITY_MISMATCH.value], 3: []}
+        issue = batch.results[1][1][0]
+        assert issue.metadata['expected_quantity'] == 1
+        assert issue.metadata['actual_quantity'] == 3
+
+    def test_position_going_flat_early(self, db_path):
+        # Move the open long's execution into the first position: it is flat after e2's close
+        execute(db_path, "UPDATE position_executions SET position_id = 1, execution_order = 5 WHERE trade_id = 4")
+
+        batch = BatchIntegrityValidator(db_path).validate()
+
+        assert IssueType.QUANTITY_MISMATCH.value in issue_types(batch)[1]
+        assert issue_types(batch)[3] == [IssueType.POSITION_WITHOUT_EXECUTIONS.value]
+
+    def test_timestamp_anomaly(self, db_path):
+        execute(db_path, "UPDATE positions SET entry_time = '2025-01-15 09:29:00' WHERE id = 1")
+
+        batch = BatchIntegrityValidator(db_path).validate()
+
+        assert issue_types(batch)[1] == [IssueType.TIMESTAMP_ANOMALY.value]
+
+    def test_missing_links_and_orphans(self, db_path):
+        execute(db_path, "DELETE FROM position_executions WHERE position_id = 3")
+
+        batch = BatchIntegrityValidator(db_path).validate()
+
+        assert issue_types(batch)[3] == [IssueType.POSITION_WITHOUT_EXECUTIONS.value]
+        assert [(issue.issue_type, issue.execution_id) for issue in batch.orphan_issues] == \
+            [(IssueType.ORPHANED_EXECUTION, 4)]
+
+    def test_scope(self, db_path):
+        execute(db_path, "UPDATE positions SET total_quantity = 3 WHERE id = 2")
+
+        scoped = BatchIntegrityValidator(db_path).validate(id_range=(2, 3), include_orphans=False)
+        closed = BatchIntegrityValidator(db_path).validate(position_status='closed')
+
+        # The reversal shared with position 1 is still accounted for outside the range
+        assert issue_types(scoped) == {2: [IssueType.QUANTITY_MISMATCH.value], 3: []}
+        assert sorted(issue_types(closed)) == [1, 2]
+
+
+class TestIntegrityService:
+
+    def test_validate_all_positions_saves_in_bulk(self, db_path):
+        execute(db_path, "UPDATE positions SET total_quantity = 3 WHERE id = 2")
+        execute(db_path, "DELETE FROM position_executions WHERE position_id = 3")
+        service = PositionExecutionIntegrityService(PositionExecutionIntegrityValidator(),
+                                                    ValidationRepository(db_path))
+
+        summary = service.validate_all_positions()
+
+        assert (summary['total_positions'], summary['passed'], summary['failed']) == (3, 1, 2)
+        assert summary['orphaned_executions'] == 1
+        assert summary['critical_issues'] == 1
+        assert execute(db_path, "SELECT position_id, status, issue_count FROM validation_results "
+                                "ORDER BY validation_id") == [(1, 'passed', 0), (2, 'failed', 1), (3, 'failed', 1),
+                                                   (1, 'failed', 1)]
+        assert execute(db_path, """
+            SELECT r.position_id, r.validation_type, i.issue_type
+            FROM integrity_issues i JOIN validation_results r ON r.validation_id = i.validation_id
+            ORDER BY i.issue_id
+        """) == [(2, 'full', 'quantity_mismatch'), (3, 'full', 'position_without_executions'),
+                 (1, 'orphan_detection', 'orphaned_execution')]
+
+
+class TestValidationJobs:
+
+    @pytest.fixture
+    def service(self, db_path):
+        return PositionExecutionIntegrityService(PositionExecutionIntegrityValidator(),
+                                                 ValidationRepository(db_path))
+
+    def test_chunks_cover_the_positions_in_scope(self, db_path):
+        validator = BatchIntegrityValidator(db_path)
+
+        assert validator.plan_chunks(2) == [(1, 2, 2), (3, 3, 1)]
+        assert validator.plan_chunks(2, position_status='closed') == [(1, 2, 2)]
+
+    def test_resumed_job_only_validates_pending_chunks(self, db_path, service):
+        execute(db_path, "UPDATE positions SET total_quantity = 3 WHERE id = 2")
+        job = service.create_validation_job('job-1', chunk_size=1)
+        assert (job['status'], job['chunk_count'], job['total_positions']) == ('running', 3, 3)
+
+        service.validate_job_chunk('job-1', 1)
+        progress = service.get_validation_job_progress('job-1')
+        assert (progress['chunks_completed'], progress['positions_validated'], progress['percent_complete']) == \
+            (1, 1, 33.3)
+
+        # A redelivered chunk is not validated or saved again
+        assert service.validate_job_chunk('job-1', 1)['failed'] == 1
+        assert service.get_pending_job_chunks('job-1') == [0, 2]
+
+        for chunk_index in service.get_pending_job_chunks('job-1'):
+            service.validate_job_chunk('job-1', chunk_index)
+        results = service.merge_validation_job('job-1')
+        service.finish_validation_job('job-1', results)
+
+        assert (results['status'], results['validated'], results['passed'], results['failed']) == \
+            ('completed', 3, 2, 1)
+        assert sorted(r['position_id'] for r in results['position_results']) == [1, 2, 3]
+        assert execute(db_path, "SELECT position_id, status FROM validation_results ORDER BY position_id") == \
+            [(1, 'passed'), (2, 'failed'), (3, 'passed')]
+        progress = service.get_validation_job_progress('job-1')
+        assert (progress['status'], progress['positions_validated'], progress['eta_seconds']) == ('completed', 3, None)
+        assert progress['result']['failed'] == 1
+
+    def test_cancelled_job_skips_chunks(self, service):
+        service.create_validation_job('job-2', chunk_size=2)
+        service.cancel_validation_job('job-2')
+
+        assert service.validate_job_chunk('job-2', 0) is None
+        assert service.get_pending_job_chunks('job-2') == [0, 1]
+
+    def test_task_dispatches_pending_chunks(self, db_path, service):
+        from tasks import validation_tasks
+
+        service.create_validation_job('job-3', chunk_size=1)
+        service.validate_job_chunk('job-3', 0)
+
+        with patch.object(validation_tasks.ValidationTask, '_service', service), \
+                patch.object(validation_tasks, 'chord') as chord:
+            result = validation_tasks.run_validation_job_task.run(job_id='job-3')
+
+        assert result == {'job_id': 'job-3', 'chunks': 3, 'dispatched': 2}
+        header = list(chord.call_args.args[0])
+        assert [signature.args for signature in header] == [('job-3', 1), ('job-3', 2)]
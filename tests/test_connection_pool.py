@@ -0,0 +1,157 @@
+"""
+Tests for the process-wide SQLite connection pool and one-time bootstrap
+"""
+
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from scripts.connection_pool import (
+    SQLiteConnectionPool,
+    PoolExhaustedError,
+    get_connection_pool,
+)
+from scripts import database_bootstrap
+
+
+class TestSQLiteConnectionPool:
+    """Unit tests for SQLiteConnectionPool"""
+
+    def test_same_thread_reuses_connection(self, db_file):
+        pool = SQLiteConnectionPool(db_file, max_size=4)
+
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        pool.release(second)
+
+        assert first is second
+        stats = pool.get_stats()
+        assert stats['connections_created'] == 1
+        assert stats['thread_affinity_hits'] == 1
+        assert stats['reuse_ratio'] == 0.5
+
+    def test_nested_acquire_gets_separate_connection(self, db_file):
+        pool = SQLiteConnectionPool(db_file, max_size=4)
+
+        outer = pool.acquire()
+        inner = pool.acquire()
+        assert outer is not inner
+        assert pool.get_stats()['in_use'] == 2
+
+        pool.release(inner)
+        pool.release(outer)
+        assert pool.get_stats()['idle'] == 2
+
+    def test_pool_is_bounded(self, db_file):
+        pool = SQLiteConnectionPool(db_file, max_size=1, timeout=0.05)
+
+        conn = pool.acquire()
+        with pytest.raises(PoolExhaustedError):
+            pool.acquire()
+        pool.release(conn)
+
+        assert pool.get_stats()['timeouts'] == 1
+
+    def test_waiting_thread_gets_released_connection(self, db_file):
+        pool = SQLiteConnectionPool(db_file, max_size=1, timeout=5)
+        conn = pool.acquire()
+        acquired = []
+
+        def worker():
+            other = pool.acquire()
+            acquired.append(other)
+            pool.release(other)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        pool.release(conn)
+        thread.join(timeout=5)
+
+        assert acquired == [conn]
+        assert pool.get_stats()['connections_created'] == 1
+
+    def test_release_rolls_back_uncommitted_work(self, db_file):
+        pool = SQLiteConnectionPool(db_file, max_size=2)
+
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE t (x INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+            # left uncommitted on purpose
+
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+            assert conn.row_factory is sqlite3.Row
+
+    def test_replaced_database_file_recycles_connections(self, db_file):
+        pool = SQLiteConnectionPool(db_file, max_size=2)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE old_schema (x INTEGER)")
+            conn.commit()
+
+        os.unlink(db_file)
+        sqlite3.connect(db_file).close()
+
+        with pool.connection() as conn:
+            tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
+        assert tables == []
+        assert pool.get_stats()['connections_closed'] == 1
+
+    def test_max_idle_closes_surplus_connections(self, db_file):
+        pool = SQLiteConnectionPool(db_file, max_size=4, max_idle=1)
+
+        first = pool.acquire()
+        second = pool.acquire()
+        pool.release(second)
+        pool.release(first)
+
+        stats = pool.get_stats()
+        assert stats['idle'] == 1
+        assert stats['connections_closed'] == 1
+
+    def test_get_connection_pool_is_shared(self, db_file):
+        assert get_connection_pool(db_file) is get_connection_pool(db_file)
+
+
+class TestDatabaseBootstrap:
+    """FuturesDB/DatabaseManager share the pool and bootstrap exactly once"""
+
+    def test_bootstrap_runs_once_per_path(self, db_file):
+        assert database_bootstrap.bootstrap_database(db_file) is True
+        assert database_bootstrap.bootstrap_database(db_file) is False
+        assert database_bootstrap.is_database_bootstrapped(db_file)
+
+        conn = sqlite3.connect(db_file)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        conn.close()
+        assert {'trades', 'ohlc_data', 'schema_migrations', 'import_history'} <= tables
+
+    def test_reset_bootstrap_state_forgets_path(self, db_file):
+        database_bootstrap.bootstrap_database(db_file)
+
+        database_bootstrap.reset_bootstrap_state(db_file)
+
+        assert not database_bootstrap.is_database_bootstrapped(db_file)
+        assert database_bootstrap.bootstrap_database(db_file) is True
+
+    def test_futures_db_and_database_manager_share_pooled_connection(self, db_file, monkeypatch):
+        from config import DATABASE_POOL_CONFIG
+        from scripts.TradingLog_db import FuturesDB
+        from scripts.database_manager import DatabaseManager
+
+        monkeypatch.setitem(DATABASE_POOL_CONFIG, 'max_idle', 4)
+
+        database_bootstrap.bootstrap_database(db_file)
+
+        with FuturesDB(db_file) as db:
+            first_conn = db.conn
+            db.cursor.execute("SELECT COUNT(*) FROM trades")
+        with DatabaseManager(db_file) as manager:
+            assert manager.conn is first_conn
+
+        stats = get_connection_pool(db_file).get_stats()
+        assert stats['connections_created'] == 1
+        assert stats['in_use'] == 0
@@ -146,7 +146,8 @@ class TestOHLCDataService:
             (datetime(2024, 1, 6, 10, 0), False),   # Saturday - closed
             (datetime(2024, 1, 7, 23, 0), True),    # Sunday 11 PM UTC - open
             (datetime(2024, 1, 7, 20, 0), False),   # Sunday 8 PM UTC - closed
-            (datetime(2024, 1, 8, 21, 30), False),  # Monday maintenance break
+            (datetime(2024, 1, 8, 22, 30), False),  # Monday maintenance break (4-5 PM CT)
+            (datetime(2024, 1, 15, 15, 0), False),  # Martin Luther King Jr. Day
             (datetime(2024, 1, 8, 23, 0), True),    # Monday after maintenance
             (datetime(2024, 1, 12, 20, 0), True),   # Friday 8 PM UTC - open
             (datetime(2024, 1, 12, 15, 0), True),   # Friday 3 PM UTC - open
@@ -269,7 +270,6 @@ class TestOHLCDataService:
         assert service.rate_limit_delay == 1.0, "Should have 1 second rate limit"
         assert 'MNQ' in service.symbol_mapping, "Should have MNQ mapping"
         assert service.symbol_mapping['MNQ'] == 'NQ=F', "MNQ should map to NQ=F"
-        assert service.maintenance_break == (21, 22), "Should have correct maintenance hours"
     
     @patch('data_service.time.sleep')
     def test_rate_limit_enforcement(self, mock_sleep, service):
@@ -0,0 +1,121 @@
+"""
+Tests for ExecutionBatch, the array form of executions the position builder works on
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from domain.models.execution_batch import ExecutionBatch
+from domain.models.trade import MarketSide, Trade
+from domain.services.pnl_calculator import PnLCalculator
+from domain.services.position_builder import PositionBuilder
+
+
+def row(trade_id, side='Buy', quantity=1, entry_price=21000.0, exit_price=None,
+        entry_time='2025-01-15 09:30:00', **extra):
+    values = dict(id=trade_id, instrument='MNQ MAR25', account='Sim101', side_of_market=side, quantity=quantity,
+                  entry_price=entry_price, exit_price=exit_price, entry_time=entry_time,
+                  entry_execution_id=f'e{trade_id}', commission=0.52)
+    values.update(extra)
+    return values
+
+
+class TestFromDicts:
+
+    def test_rejects_what_trade_rejects(self):
+        rows = [
+            row(1),
+            row(2, quantity=0),
+            row(3, entry_price=None, exit_price=None),
+            row(4, entry_price=-1.0),
+            row(5, side='Sideways'),
+            row(6, entry_time='not a time'),
+            row(7, side='sellshort', entry_price=None, exit_price=21001.0),
+        ]
+
+        batch, rejected = ExecutionBatch.from_dicts(rows)
+
+        assert batch.ids == [1, 7]
+        assert [(r['id'], reason) for r, reason in rejected] == [
+            (5, 'Unknown side_of_market'),
+            (2, 'Quantity must be positive'),
+            (3, 'Trade must have at least entry_price or exit_price'),
+            (4, 'Entry price must be positive when set'),
+            (6, 'Invalid entry_time'),
+        ]
+        assert batch.side_sign.tolist() == [1, -1]
+
+    def test_default_side(self):
+        batch, rejected = ExecutionBatch.from_dicts([row(1, side='Sideways')], default_side=MarketSide.BUY)
+
+        assert rejected == []
+        assert batch.to_trades()[0].side_of_market == MarketSide.BUY
+
+    def test_to_trades_matches_trade_constructor(self):
+        rows = [row(1, commission=None, exit_time='2025-01-15 09:31:00'),
+                row(2, side='Sell', entry_price=None, exit_price=21004.25)]
+
+        batch, _ = ExecutionBatch.from_dicts(rows)
+        trades = batch.to_trades()
+
+        assert trades[0] == Trade(
+            id=1, entry_execution_id='e1', instrument='MNQ MAR25', account='Sim101', side_of_market=MarketSide.BUY,
+            quantity=1, entry_price=21000.0, entry_time=datetime(2025, 1, 15, 9, 30),
+            exit_time=datetime(2025, 1, 15, 9, 31), commission=0.0,
+        )
+        assert trades[1].entry_price is None and trades[1].exit_price == 21004.25
+
+    def test_times_with_utc_offset_keep_their_offset(self):
+        batch, rejected = ExecutionBatch.from_dicts([row(1, entry_time='2025-01-15T09:30:00+01:00')])
+
+        assert rejected == []
+        assert batch.entry_time(0) == datetime(2025, 1, 15, 9, 30, tzinfo=timezone(timedelta(hours=1)))
+
+
+class TestOrderingAndPrices:
+
+    def test_sorted_by_time_is_stable_with_missing_times_first(self):
+        rows = [row(1, entry_time='2025-01-15 09:31:00'), row(2, entry_time=None),
+                row(3, entry_time='2025-01-15 09:30:00'), row(4, entry_time='2025-01-15 09:31:00')]
+
+        batch, _ = ExecutionBatch.from_dicts(rows)
+
+        assert batch.sorted_by_time().ids == [2, 3, 1, 4]
+
+    def test_fifo_prices_match_pnl_calculator(self):
+        calculator = PnLCalculator()
+        trades = [
+            Trade(id=1, quantity=1, entry_price=21000.0),
+            Trade(id=2, quantity=1, exit_price=21001.0),
+            Trade(id=3, quantity=1, entry_price=21000.0, exit_price=21002.0),
+        ]
+
+        entry, exit_prices = ExecutionBatch.from_trades(trades).fifo_prices()
+
+        assert list(zip(entry.tolist(), exit_prices.tolist())) == [calculator._fifo_prices(t) for t in trades]
+
+
+class TestBuilderOnBatches:
+
+    def test_batch_build_matches_trade_build(self):
+        builder = PositionBuilder(PnLCalculator())
+        rng = random.Random(11)
+        sides = ['Buy', 'Sell', 'SellShort', 'BuyToCover']
+        start = datetime(2025, 1, 15, 9, 30)
+        rows = [
+            row(i, side=rng.choice(sides), quantity=rng.randint(1, 4),
+                entry_price=20000 + rng.randint(-400, 400) * 0.25,
+                entry_time=(start + timedelta(seconds=rng.randint(0, 50))).isoformat(' '))
+            for i in range(1, 200)
+        ]
+
+        batch, _ = ExecutionBatch.from_dicts(rows)
+        built = builder.build_positions_from_batch(batch.sorted_by_time(), 'Sim101', 'MNQ MAR25')
+        reference = builder.build_positions_with_executions(batch.to_trades(), 'Sim101', 'MNQ MAR25')
+
+        sorted_batch = batch.sorted_by_time()
+        assert [(p, sorted_batch.ids[s:e + 1]) for p, s, e in built] == \
+            [(p, [t.id for t in executions]) for p, executions in reference]
+        assert np.all(batch.quantities > 0)
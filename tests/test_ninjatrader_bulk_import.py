@@ -0,0 +1,346 @@
+"""
+Tests for bulk execution ingestion in NinjaTraderImportService._process_executions
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from services.ninjatrader_import_service import NinjaTraderImportService
+
+from conftest import execute
+
+pytestmark = pytest.mark.usefixtures('db_writer')
+
+
+def make_row(execution_id, action, entry_exit, quantity, time_str, price=21000.0, account='Sim101'):
+    return {
+        'Instrument': 'MNQ MAR25', 'Action': action, 'Quantity': quantity, 'Price': price,
+        'Time': time_str, 'ID': execution_id, 'E/X': entry_exit, 'Position': '',
+        'Order ID': f'o{execution_id}', 'Name': '', 'Commission': '$0.52', 'Rate': 1,
+        'Account': account, 'Connection': 'Sim',
+    }
+
+
+@pytest.fixture
+def service(tmp_path, db_path):
+    svc = NinjaTraderImportService(data_dir=str(tmp_path))
+    svc.db_path = db_path
+    svc.redis_client = None
+    svc.rebuilt = []
+    svc._rebuild_positions_for_account_instrument = lambda account, instrument: (
+        svc.rebuilt.append((account, instrument)) or {'position_ids': []}
+    )
+    return svc
+
+
+class FakeRedis:
+    """In-memory stand-in for the SADD/EXPIRE pipeline the importer uses"""
+
+    def __init__(self):
+        self.sets = {}
+        self.lock = threading.Lock()
+        self.round_trips = 0
+
+    def sadd(self, key, member):
+        with self.lock:
+            members = self.sets.setdefault(key, set())
+            if member in members:
+                return 0
+            members.add(member)
+            return 1
+
+    def srem(self, key, *members):
+        with self.lock:
+            members_set = self.sets.get(key, set())
+            removed = len(members_set & set(members))
+            members_set.difference_update(members)
+            return removed
+
+    def expire(self, key, seconds):
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def sadd(self, key, member):
+        self.commands.append(('sadd', key, member))
+
+    def srem(self, key, *members):
+        self.commands.append(('srem', key, *members))
+
+    def expire(self, key, seconds):
+        self.commands.append(('expire', key, seconds))
+
+    def execute(self):
+        self.client.round_trips += 1
+        return [getattr(self.client, name)(*args) for name, *args in self.commands]
+
+
+def fetch_trades(db_path):
+    return execute(db_path, "SELECT id, entry_execution_id, side_of_market, quantity, commission FROM trades ORDER BY id")
+
+
+class TestBulkExecutionIngestion:
+    """One transaction per CSV, same results as the per-row path"""
+
+    def test_inserts_all_rows_and_reports_issues(self, service):
+        df = pd.DataFrame([
+            make_row('e1', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM'),
+            make_row('e2', 'Sell', 'Exit', 1, '1/15/2025 9:31:00 AM'),
+            make_row('e3', 'Sell', 'Exit', 1, '1/15/2025 9:32:00 AM'),  # no long position
+        ])
+
+        result = service._process_executions(df, Path('NinjaTrader_Executions_20250115.csv'))
+
+        trades = fetch_trades(service.db_path)
+        assert [t[1] for t in trades] == ['e1', 'e2', 'e3']
+        assert trades[0][4] == pytest.approx(0.52)
+        assert result['executions_imported'] == 3
+        assert result['has_issues'] is True
+        assert [i['trade_id'] for i in result['issues_detected']] == [trades[2][0]]
+        assert result['issues_detected'][0]['issue'] == 'Sell with no long position'
+        assert service.rebuilt == [('Sim101', 'MNQ MAR25')]
+
+    def test_duplicates_are_skipped(self, service):
+        first = pd.DataFrame([make_row('e1', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM')])
+        service._process_executions(first, Path('NinjaTrader_Executions_20250115.csv'))
+
+        df = pd.DataFrame([
+            make_row('e1', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM'),  # already imported
+            make_row('e2', 'Sell', 'Exit', 1, '1/15/2025 9:31:00 AM'),
+            make_row('e2', 'Sell', 'Exit', 1, '1/15/2025 9:31:00 AM'),  # repeated in file
+        ])
+        result = service._process_executions(df, Path('NinjaTrader_Executions_20250115.csv'))
+
+        assert [t[1] for t in fetch_trades(service.db_path)] == ['e1', 'e2']
+        assert result['executions_imported'] == 1
+        # Running quantity continues from the stored Buy, so the Sell closes it
+        assert result['issues_detected'] == []
+
+    def test_bad_row_is_skipped_without_failing_the_file(self, service):
+        df = pd.DataFrame([
+            make_row('e1', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM'),
+            make_row('e2', 'Sell', 'Exit', 'not-a-number', '1/15/2025 9:31:00 AM'),
+            make_row('e3', 'Sell', 'Exit', 1, '1/15/2025 9:32:00 AM'),
+        ])
+
+        result = service._process_executions(df, Path('NinjaTrader_Executions_20250115.csv'))
+
+        assert [t[1] for t in fetch_trades(service.db_path)] == ['e1', 'e3']
+        assert result['executions_imported'] == 2
+        assert result['has_issues'] is False
+
+
+    def test_missing_required_columns_fail_the_file(self, service):
+        df = pd.DataFrame([make_row('e1', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM')]).drop(columns=['ID'])
+
+        result = service._process_executions(df, Path('NinjaTrader_Executions_20250115.csv'))
+
+        assert result['success'] is False
+        assert "['ID']" in result['error']
+        assert fetch_trades(service.db_path) == []
+
+    def test_failed_insert_releases_claims_for_retry(self, service, monkeypatch):
+        service.redis_client = FakeRedis()
+        df = pd.DataFrame([
+            make_row('e1', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM'),
+            make_row('e2', 'Sell', 'Exit', 1, '1/15/2025 9:31:00 AM'),
+        ])
+        insert = service._insert_executions_bulk
+
+        def locked(trades):
+            raise sqlite3.OperationalError('database is locked')
+
+        monkeypatch.setattr(service, '_insert_executions_bulk', locked)
+        failed = service._process_executions(df, Path('NinjaTrader_Executions_20250115.csv'))
+
+        assert failed['success'] is False
+        assert service.redis_client.sets['processed_executions:20250115'] == set()
+        assert service.rebuilt == []
+
+        monkeypatch.setattr(service, '_insert_executions_bulk', insert)
+        retried = service._process_executions(df, Path('NinjaTrader_Executions_20250115.csv'))
+
+        assert retried['executions_imported'] == 2
+        assert [t[1] for t in fetch_trades(service.db_path)] == ['e1', 'e2']
+
+
+class TestBatchedExecutionClaims:
+    """Execution IDs are claimed in one pipelined round trip per chunk"""
+
+    def test_claims_new_ids_in_one_round_trip(self, service):
+        service.redis_client = FakeRedis()
+
+        assert service._try_claim_executions(['e1', 'e2', 'e1'], '20250115') == {'e1', 'e2'}
+        assert service._try_claim_executions(['e2', 'e3'], '20250115') == {'e3'}
+        assert service.redis_client.round_trips == 2
+
+    def test_large_batches_are_chunked(self, service, monkeypatch):
+        service.redis_client = FakeRedis()
+        monkeypatch.setattr(service, 'CLAIM_BATCH_SIZE', 2)
+
+        claimed = service._try_claim_executions([f'e{i}' for i in range(5)], '20250115')
+
+        assert len(claimed) == 5
+        assert service.redis_client.round_trips == 3
+
+    def test_concurrent_workers_never_claim_the_same_id(self, service):
+        service.redis_client = FakeRedis()
+        ids = [f'e{i}' for i in range(500)]
+        results = []
+        barrier = threading.Barrier(4)
+
+        def worker():
+            barrier.wait()
+            results.append(service._try_claim_executions(ids, '20250115'))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(len(r) for r in results) == len(ids)
+        assert set().union(*results) == set(ids)
+
+    def test_redis_error_falls_back_to_database_dedupe(self, service):
+        class BrokenRedis(FakeRedis):
+            def pipeline(self, transaction=True):
+                raise ConnectionError("redis down")
+
+        service.redis_client = BrokenRedis()
+
+        assert service._try_claim_executions(['e1', 'e2'], '20250115') == {'e1', 'e2'}
+
+    def test_already_claimed_rows_are_skipped(self, service):
+        service.redis_client = FakeRedis()
+        service.redis_client.sadd('processed_executions:20250115', 'e1')
+        df = pd.DataFrame([
+            make_row('e1', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM'),
+            make_row('e2', 'Buy', 'Entry', 1, '1/15/2025 9:31:00 AM'),
+            make_row('e2', 'Buy', 'Entry', 1, '1/15/2025 9:31:00 AM'),
+        ])
+
+        result = service._process_executions(df, Path('NinjaTrader_Executions_20250115.csv'))
+
+        assert [t[1] for t in fetch_trades(service.db_path)] == ['e2']
+        assert result['executions_skipped'] == 2
+        assert service.redis_client.round_trips == 1
+
+
+class TestVectorizedMapping:
+    """_map_execution_frame() matches the per-row _map_execution_row()"""
+
+    def test_matches_per_row_mapping(self, service):
+        rows = [
+            make_row('e1', 'Buy', 'Entry', 2, '1/15/2025 9:30:00 AM'),
+            make_row('e2', 'Sell', 'Exit', -2, '1/15/2025 1:05:09 PM'),
+            make_row('e3', 'Sell', 'Entry', 1, '1/15/2025 13:05:09'),      # 24h clock
+            make_row('e4', 'Buy', 'Exit', 1, 'not a time'),
+            make_row('e5', 'Buy', '', 1, '1/15/2025 9:31:00 AM'),          # missing E/X
+            make_row('e6', 'SellShort', 'Exit', 1, '1/15/2025 9:32:00 AM'),
+            make_row('e7', 'Hold', 'Entry', 1, '1/15/2025 9:33:00 AM'),    # unknown action
+            make_row('e8', ' Sell ', ' EXIT ', 3, '12/31/2025 11:59:59 PM'),
+        ]
+        rows[1]['Commission'] = '1.04'
+        for row, validation in zip(rows, ['Valid', 'Invalid', '', 'bogus', None, 'Valid', '', '']):
+            row['TradeValidation'] = validation
+        df = pd.DataFrame(rows)
+
+        trades = service._map_execution_frame(df, source_file='f.csv', import_batch_id='b1')
+
+        expected = [
+            tuple(service._map_execution_row(row, 'f.csv', 'b1')[c] for c in service.TRADE_INSERT_COLUMNS)
+            for row in df.to_dict('records')
+        ]
+        assert service._execution_records(trades) == expected
+        assert list(trades['side_of_market']) == [
+            'Buy', 'Sell', 'SellShort', 'BuyToCover', 'Buy', 'SellShort', 'Buy', 'Sell'
+        ]
+
+    def test_unparseable_numbers_drop_only_that_row(self, service):
+        df = pd.DataFrame([
+            make_row('e1', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM'),
+            make_row('e2', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM', price='abc'),
+            make_row('e3', 'Buy', 'Entry', None, '1/15/2025 9:30:00 AM'),
+            make_row('e4', 'Buy', 'Entry', 1, '1/15/2025 9:30:00 AM'),
+        ])
+        df.loc[3, 'Commission'] = '$x'
+
+        trades = service._map_execution_frame(df, source_file='f.csv')
+
+        assert list(trades['entry_execution_id']) == ['e1']
+        assert list(trades.index) == [0]
+
+    def test_issue_detection_uses_stored_running_quantity(self, service):
+        df = pd.DataFrame([
+            make_row('e1', 'Buy', 'Entry', 2, '1/15/2025 9:30:00 AM'),
+            make_row('e2', 'Sell', 'Exit', 1, '1/15/2025 9:30:00 AM', account='Other'),  # other account
+            make_row('e3', 'Buy', 'Entry', 1, '1/15/2025 9:31:00 AM'),                   # adds to long
+            make_row('e4', 'Sell', 'Exit', 3, '1/15/2025 9:32:00 AM'),
+        ])
+        trades = service._map_execution_frame(df)
+        inserted = trades.assign(trade_id=service._insert_executions_bulk(service._execution_records(trades)))
+
+        issues = service._detect_execution_issues(inserted, df)
+
+        trade_ids = inserted['trade_id'].tolist()
+        assert [(i['trade_id'], i['issue'], i['prev_qty'], i['running_qty']) for i in issues] == [
+            (trade_ids[1], 'Sell with no long position', 0, -1),
+            (trade_ids[2], 'Buy adding to existing long', 2, 3),
+        ]
+
+    def test_issue_detection_continues_from_earlier_imports(self, service):
+        first = pd.DataFrame([make_row('e1', 'Buy', 'Entry', 2, '1/15/2025 9:30:00 AM')])
+        service._process_executions(first, Path('NinjaTrader_Executions_20250115.csv'))
+
+        df = pd.DataFrame([
+            make_row('e2', 'Buy', 'Entry', 1, '1/15/2025 9:31:00 AM'),  # adds to the stored long
+            make_row('e3', 'Sell', 'Exit', 3, '1/15/2025 9:32:00 AM'),
+        ])
+        result = service._process_executions(df, Path('NinjaTrader_Executions_20250115.csv'))
+
+        assert [(i['issue'], i['prev_qty'], i['running_qty']) for i in result['issues_detected']] == [
+            ('Buy adding to existing long', 2, 3),
+        ]
+
+
+class TestCacheInvalidation:
+
+    def test_chart_keys_of_changed_positions_are_dropped_in_one_scan(self, service):
+        class ScanOnlyRedis:
+            def __init__(self):
+                self.store = {key: b'1' for key in (
+                    b'execution_chart:1:1m:a', b'execution_chart:1:5m:b', b'execution_chart:12:1m:c',
+                    b'execution_chart:2:1m:d', b'positions:Sim101:MNQ MAR25',
+                )}
+                self.scans = 0
+
+            def keys(self, pattern):
+                raise AssertionError('KEYS blocks the server')
+
+            def scan_iter(self, match=None, count=None):
+                self.scans += 1
+                prefix = match.rstrip('*').encode()
+                return [key for key in list(self.store) if key.startswith(prefix)]
+
+            def delete(self, *keys):
+                for key in keys:
+                    self.store.pop(key.encode() if isinstance(key, str) else key, None)
+
+        service.redis_client = ScanOnlyRedis()
+
+        service._invalidate_cache_for_account_instrument('Sim101', 'MNQ MAR25', position_ids=[1, 2])
+
+        assert sorted(service.redis_client.store) == [b'execution_chart:12:1m:c']
+        assert service.redis_client.scans == 1
@@ -0,0 +1,166 @@
+"""
+Tests for event-driven NinjaTrader CSV watching and fill latency tracking
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from services import ninjatrader_import_service as import_module
+from services.csv_watcher_service import CSVFileEventHandler, WATCHDOG_AVAILABLE
+from services.ninjatrader_import_service import LatencyHistogram, NinjaTraderImportService
+
+
+HEADER = 'Instrument,Action,Quantity,Price,Time,ID,E/X,Position,Order ID,Name,Commission,Rate,Account,Connection\n'
+ROW = 'MNQ MAR25,Buy,1,21000,1/15/2025 9:30:00 AM,{id},Entry,,o{id},,$0.52,1,Sim101,Sim\n'
+
+
+def csv_event(path):
+    return SimpleNamespace(is_directory=False, src_path=str(path))
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = NinjaTraderImportService(data_dir=str(tmp_path))
+    svc.redis_client = None
+    svc.imported = threading.Event()
+    svc.processed = []
+
+    def fake_process(df, file_path, import_batch_id=None, file_hash=None):
+        svc.processed.append(list(df['ID']))
+        svc.imported.set()
+        return {'success': True, 'executions_imported': len(df), 'file': file_path.name}
+
+    svc._process_executions = fake_process
+    yield svc
+
+    svc.stop_watcher()
+
+
+class TestCSVFileEventHandler:
+    """Per-file events coalesce into one pending import"""
+
+    def test_close_write_pulls_pending_import_forward(self, tmp_path):
+        fired = []
+        handler = CSVFileEventHandler(fired.append, debounce_seconds=30, close_write_delay=0.01)
+        path = tmp_path / 'a.csv'
+
+        handler.on_modified(csv_event(path))
+        handler.on_closed(csv_event(path))
+        time.sleep(0.2)
+
+        assert fired == [path]
+        assert handler.pending_timers == {}
+
+    def test_later_events_do_not_postpone_pending_import(self, tmp_path):
+        fired = []
+        handler = CSVFileEventHandler(fired.append, debounce_seconds=30, close_write_delay=0.1)
+        path = tmp_path / 'a.csv'
+
+        handler.on_closed(csv_event(path))
+        timer = handler.pending_timers['a.csv']
+        handler.on_modified(csv_event(path))
+        handler.on_closed(csv_event(path))
+
+        assert handler.pending_timers['a.csv'] is timer
+        time.sleep(0.3)
+        assert fired == [path]
+
+
+class TestStabilityCheck:
+    """Stability is decided by two quick stats, not a fixed sleep"""
+
+    def test_quiet_file_is_stable_quickly(self, service):
+        path = Path(service.data_dir) / 'quiet.csv'
+        path.write_text(HEADER)
+
+        start = time.monotonic()
+        assert service._is_file_stable(path) is True
+        assert time.monotonic() - start < 1
+
+    def test_growing_file_is_not_stable(self, service):
+        path = Path(service.data_dir) / 'growing.csv'
+        path.write_text(HEADER)
+        stop = threading.Event()
+
+        def writer():
+            with open(path, 'a') as f:
+                while not stop.is_set():
+                    f.write('x')
+                    f.flush()
+                    time.sleep(0.02)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            assert service._is_file_stable(path, stability_seconds=0.5) is False
+        finally:
+            stop.set()
+            thread.join()
+
+
+class TestWatcherModes:
+    """File events drive imports; polling only when events are unavailable"""
+
+    @pytest.mark.skipif(not WATCHDOG_AVAILABLE, reason="watchdog not installed")
+    def test_append_is_imported_on_file_event(self, service, monkeypatch):
+        # Make sure the test would not pass via the safety rescan
+        monkeypatch.setattr(NinjaTraderImportService, 'EVENT_RESCAN_INTERVAL', 60)
+        path = Path(service.data_dir) / f"NinjaTrader_Executions_{datetime.now().strftime('%Y%m%d')}.csv"
+        path.write_text(HEADER + ROW.format(id='e1'))
+
+        service.start_watcher()
+        assert service.get_status()['watch_mode'] == 'events'
+        assert service.imported.wait(5)
+        service.imported.clear()
+
+        time.sleep(0.05)  # next append gets a newer mtime
+        with open(path, 'a') as f:
+            f.write(ROW.format(id='e2'))
+
+        assert service.imported.wait(5)
+        assert service.processed == [['e1'], ['e2']]
+
+    def test_falls_back_to_polling_when_events_unavailable(self, service, monkeypatch):
+        def no_inotify(self, callback):
+            raise OSError("inotify watch limit reached")
+
+        monkeypatch.setattr(import_module.CSVWatcherService, 'start', no_inotify)
+
+        service.start_watcher()
+
+        assert service.get_status()['watch_mode'] == 'polling'
+        assert service._csv_watcher is None
+
+
+class TestFillLatency:
+    """Fill time -> DB commit latency histogram"""
+
+    def test_histogram_buckets_and_quantiles(self):
+        histogram = LatencyHistogram(buckets=(0.5, 1.0, 5.0))
+        for seconds in (0.2, 0.4, 0.8, 3.0):
+            histogram.observe(seconds)
+
+        snapshot = histogram.snapshot()
+        assert snapshot['buckets'] == {'0.5': 2, '1.0': 3, '5.0': 4, '+Inf': 4}
+        assert snapshot['count'] == 4
+        assert snapshot['p50_seconds'] == 0.5
+        assert snapshot['p95_seconds'] == 5.0
+
+    def test_backfilled_fills_are_not_recorded(self, service):
+        now = datetime.now(service.FILL_TIMEZONE).replace(tzinfo=None)
+        fmt = '%Y-%m-%d %H:%M:%S'
+
+        service._record_fill_latency([
+            (now - timedelta(seconds=2)).strftime(fmt),
+            (now - timedelta(days=3)).strftime(fmt),  # re-import of an old file
+            None,
+        ])
+
+        snapshot = service.fill_latency.snapshot()
+        assert snapshot['count'] == 1
+        assert 1 <= snapshot['sum_seconds'] < 60
@@ -0,0 +1,160 @@
+"""
+Tests for append-aware (tail-follow) CSV ingestion in NinjaTraderImportService
+"""
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from services.ninjatrader_import_service import NinjaTraderImportService
+
+
+HEADER = 'Instrument,Action,Quantity,Price,Time,ID,E/X,Position,Order ID,Name,Commission,Rate,Account,Connection\n'
+
+
+def make_line(execution_id, action='Buy', entry_exit='Entry'):
+    return (
+        f'MNQ MAR25,{action},1,21000,1/15/2025 9:30:00 AM,{execution_id},{entry_exit},,'
+        f'o{execution_id},,$0.52,1,Sim101,Sim\n'
+    )
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = NinjaTraderImportService(data_dir=str(tmp_path))
+    svc.redis_client = None
+    svc.processed = []
+    svc._is_file_stable = lambda file_path, stability_seconds=5: True
+
+    def fake_process(df, file_path, import_batch_id=None, file_hash=None):
+        svc.processed.append((list(df['ID']), file_hash))
+        return {'success': True, 'executions_imported': len(df), 'file': file_path.name}
+
+    svc._process_executions = fake_process
+    return svc
+
+
+@pytest.fixture
+def csv_file(service):
+    # Today's file, so it is never archived mid-test
+    name = f"NinjaTrader_Executions_{datetime.now().strftime('%Y%m%d')}.csv"
+    return Path(service.data_dir) / name
+
+
+class TestTailFollow:
+    """Only appended rows are parsed while the consumed prefix is unchanged"""
+
+    def test_appended_rows_only(self, service, csv_file):
+        csv_file.write_text(HEADER + make_line('e1') + make_line('e2'))
+        service.process_csv_file(csv_file)
+
+        with open(csv_file, 'a') as f:
+            f.write(make_line('e3', 'Sell', 'Exit'))
+        service.process_csv_file(csv_file)
+
+        assert [ids for ids, _ in service.processed] == [['e1', 'e2'], ['e3']]
+        assert service.file_offsets[str(csv_file)]['offset'] == csv_file.stat().st_size
+        # Running hash matches a full hash of the file
+        assert service.processed[-1][1] == service._compute_file_hash(csv_file)
+
+    def test_partial_line_waits_for_newline(self, service, csv_file):
+        csv_file.write_text(HEADER + make_line('e1'))
+        service.process_csv_file(csv_file)
+
+        partial = make_line('e2')
+        with open(csv_file, 'a') as f:
+            f.write(partial[:10])
+        service.process_csv_file(csv_file)
+        with open(csv_file, 'a') as f:
+            f.write(partial[10:])
+        service.process_csv_file(csv_file)
+
+        assert [ids for ids, _ in service.processed] == [['e1'], ['e2']]
+
+    def test_no_new_rows_is_a_no_op(self, service, csv_file):
+        csv_file.write_text(HEADER + make_line('e1'))
+        service.process_csv_file(csv_file)
+        result = service.process_csv_file(csv_file)
+
+        assert result['executions_imported'] == 0
+        assert len(service.processed) == 1
+
+    def test_truncated_file_is_reread(self, service, csv_file):
+        csv_file.write_text(HEADER + make_line('e1') + make_line('e2'))
+        service.process_csv_file(csv_file)
+
+        csv_file.write_text(HEADER + make_line('e9'))
+        service.process_csv_file(csv_file)
+
+        assert service.processed[-1][0] == ['e9']
+
+    def test_rewritten_prefix_is_reread(self, service, csv_file):
+        csv_file.write_text(HEADER + make_line('e1'))
+        service.process_csv_file(csv_file)
+
+        # Same length prefix, different content, plus an appended row
+        csv_file.write_text(HEADER + make_line('x1') + make_line('x2'))
+        service.process_csv_file(csv_file)
+
+        assert service.processed[-1][0] == ['x1', 'x2']
+
+    def test_replaced_file_is_reread(self, service, csv_file):
+        # Long enough that the middle rows lie outside the prefix checksum windows
+        ids = [f'e{n:03d}' for n in range(200)]
+        csv_file.write_text(HEADER + ''.join(make_line(i) for i in ids))
+        service.process_csv_file(csv_file)
+
+        # Same length and same first and last rows, one middle row changed, new file
+        ids[100] = 'x100'
+        replacement = csv_file.with_suffix('.tmp')
+        replacement.write_text(HEADER + ''.join(make_line(i) for i in ids))
+        os.replace(replacement, csv_file)
+        service.process_csv_file(csv_file)
+
+        assert len(service.processed) == 2
+        assert 'x100' in service.processed[-1][0]
+
+    def test_shrunk_file_is_reread(self, service, csv_file):
+        csv_file.write_text(HEADER + make_line('e1') + make_line('e2')[:10])
+        service.process_csv_file(csv_file)
+
+        # The consumed prefix is intact, but the file is shorter than when last read
+        with open(csv_file, 'r+') as f:
+            f.truncate(len(HEADER) + len(make_line('e1')))
+        service.process_csv_file(csv_file)
+
+        assert [ids for ids, _ in service.processed] == [['e1'], ['e1']]
+
+    def test_offset_not_advanced_when_import_fails(self, service, csv_file):
+        csv_file.write_text(HEADER + make_line('e1'))
+        service._process_executions = lambda df, file_path, **kwargs: {'success': False, 'file': file_path.name}
+
+        service.process_csv_file(csv_file)
+
+        assert str(csv_file) not in service.file_offsets
+
+    def test_first_read_leaves_partial_last_row(self, service, csv_file):
+        partial = make_line('e2')
+        csv_file.write_text(HEADER + make_line('e1') + partial[:10])
+        service.process_csv_file(csv_file)
+        with open(csv_file, 'a') as f:
+            f.write(partial[10:])
+        service.process_csv_file(csv_file)
+
+        assert [ids for ids, _ in service.processed] == [['e1'], ['e2']]
+
+    def test_failed_tail_import_does_not_advance_the_file_hash(self, service, csv_file):
+        csv_file.write_text(HEADER + make_line('e1'))
+        service.process_csv_file(csv_file)
+        succeed = service._process_executions
+
+        with open(csv_file, 'a') as f:
+            f.write(make_line('e2', 'Sell', 'Exit'))
+        service._process_executions = lambda df, file_path, **kwargs: {'success': False, 'file': file_path.name}
+        service.process_csv_file(csv_file)
+        service._process_executions = succeed
+        service.process_csv_file(csv_file)
+
+        assert service.processed[-1] == (['e2'], service._compute_file_hash(csv_file))
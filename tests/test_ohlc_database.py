@@ -5,7 +5,7 @@ import pytest
 import tempfile
 import os
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from scripts.TradingLog_db import FuturesDB
 
 class TestOHLCDatabase:
@@ -174,6 +174,10 @@ class TestOHLCDatabase:
     
     def test_find_ohlc_gaps(self, temp_db, sample_ohlc_data):
         """Test gap detection in OHLC data"""
+        # Gaps are clipped to trading sessions; shift the bars into one (Wed 2025-01-15, 09:00 CT)
+        offset = int(datetime(2025, 1, 15, 15, 0, tzinfo=timezone.utc).timestamp()) - sample_ohlc_data[0]['timestamp']
+        sample_ohlc_data = [dict(data, timestamp=data['timestamp'] + offset) for data in sample_ohlc_data]
+
         with FuturesDB(temp_db) as db:
             # Insert data with gaps (skip 2 consecutive records every 5 records)
             for i, data in enumerate(sample_ohlc_data[:20]):
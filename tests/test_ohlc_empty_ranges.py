@@ -0,0 +1,153 @@
+"""
+Tests for the ledger of OHLC ranges confirmed empty
+"""
+
+import sqlite3
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from scripts.TradingLog_db import FuturesDB
+from services.ohlc_empty_ranges import EmptyRangeLedger, bar_free_ranges, empty_range_expiry, subtract_ranges
+from services.ohlc_fetch_planner import FetchIntent, plan_fetches
+
+
+INSTRUMENT = 'MNQ DEC25'
+DAY = 86400
+SESSION_TIME = 1_736_953_200  # Wed 2025-01-15 09:00 CT
+
+
+class TestSubtractRanges:
+
+    @pytest.mark.parametrize('ranges, empty, expected, hits', [
+        ([(0, 100)], [], [(0, 100)], 0),
+        ([(0, 100)], [(20, 30), (50, 60)], [(0, 20), (30, 50), (60, 100)], 1),
+        ([(0, 100)], [(-10, 40), (90, 200)], [(40, 90)], 1),
+        ([(0, 100), (150, 160)], [(0, 100)], [(150, 160)], 1),
+        ([(0, 100)], [(100, 200)], [(0, 100)], 0),
+        ([(50, 50), (70, 70)], [(40, 60)], [(70, 70)], 1),
+    ])
+    def test_subtract(self, ranges, empty, expected, hits):
+        assert subtract_ranges(ranges, empty) == (expected, hits)
+
+    def test_bar_free_ranges(self):
+        assert bar_free_ranges([120, 180, 420], 0, 600, 60) == [(0, 120), (240, 420), (480, 600)]
+        assert bar_free_ranges([0, 60, 120], 0, 180, 60) == []
+        assert bar_free_ranges([], 0, 600, 60) == []
+
+
+class TestLedger:
+
+    def test_recent_ranges_expire_sooner_than_settled_ones(self):
+        now = 1_760_000_000
+
+        assert empty_range_expiry(now - 3600, now) == now + 30 * 60
+        assert empty_range_expiry(now - 2 * DAY, now) == now + 30 * DAY
+
+    def test_known_empty_merges_unexpired_ranges(self, db_path):
+        ledger = EmptyRangeLedger(db_path)
+        now = int(time.time())
+        ledger.record(INSTRUMENT, '1m', 100, 200)
+        ledger.record(INSTRUMENT, '1m', 150, 300, source='calendar', expires_at=now + 60)
+        ledger.record(INSTRUMENT, '1m', 400, 500, expires_at=now - 60)
+        ledger.record(INSTRUMENT, '5m', 400, 500)
+
+        assert ledger.known_empty(INSTRUMENT, '1m', 0, 1000) == [(100, 300)]
+        assert ledger.subtract(INSTRUMENT, '1m', [(0, 1000)]) == ([(0, 100), (300, 1000)], 1)
+
+    def test_find_ohlc_gaps_skips_known_empty_ranges(self, db_path):
+        base = SESSION_TIME
+        conn = sqlite3.connect(db_path)
+        conn.executemany("""
+            INSERT INTO ohlc_data (instrument, timeframe, timestamp, open_price, high_price, low_price,
+                                   close_price, volume)
+            VALUES (?, '1m', ?, 1, 1, 1, 1, 1)
+        """, [(INSTRUMENT, base + ts) for ts in (0, 60, 600, 660)])
+        conn.commit()
+        conn.close()
+        EmptyRangeLedger(db_path).record(INSTRUMENT, '1m', base + 120, base + 540)
+
+        with FuturesDB(db_path) as db:
+            assert db.find_ohlc_gaps(INSTRUMENT, '1m', base, base + 660) == []
+            assert db.find_ohlc_gaps(INSTRUMENT, '1m', base, base + 660,
+                                     exclude_known_empty=False) == [(base + 120, base + 540)]
+
+    def test_planner_subtracts_known_empty_ranges(self, db_path):
+        now = time.time()
+        ledger = EmptyRangeLedger(db_path)
+        start = int(now) - 2 * DAY
+        ledger.record(INSTRUMENT, '1m', start, start + DAY)
+
+        plan = plan_fetches([FetchIntent(INSTRUMENT, '1m', start, start + DAY),
+                             FetchIntent(INSTRUMENT, '1m', start + DAY, start + 2 * DAY)],
+                            {'1m': 7}, now=now, known_empty=ledger.known_empty)
+
+        assert [(fetch.start, fetch.end) for fetch in plan.fetches] == [(start + DAY, start + 2 * DAY)]
+        assert plan.summary()['ledger_hits'] == 1
+
+
+def bars(timestamps):
+    """A Yahoo history frame with a bar at each epoch second"""
+    index = pd.to_datetime(timestamps, unit='s', utc=True)
+    return pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1}, index=index)
+
+
+class TestSync:
+
+    @pytest.fixture
+    def service(self, db_path):
+        from services.data_service import OHLCDataService
+
+        service = OHLCDataService()
+        service.cache_service = None
+        with patch('services.data_service.FuturesDB', lambda: FuturesDB(db_path)), \
+                patch('services.data_service.EmptyRangeLedger', lambda: EmptyRangeLedger(db_path)), \
+                patch.object(service, 'fetch_ohlc_data', side_effect=service._fetch_ohlc_data_internal), \
+                patch('services.data_service.yf.Ticker') as ticker_mock:
+            service.history = ticker_mock.return_value.history
+            yield service
+
+    def test_empty_backfill_windows_are_not_recorded(self, service, db_path):
+        # Throttling and bad symbols come back empty too
+        service.history.return_value = pd.DataFrame()
+
+        first = service._sync_instrument(INSTRUMENT, ['1m', '1wk'])
+        second = service._sync_instrument(INSTRUMENT, ['1m', '1wk'])
+
+        assert (first['api_calls'], first['ledger_hits']) == (2, 0)
+        assert (second['api_calls'], second['ledger_hits']) == (2, 0)
+        assert EmptyRangeLedger(db_path).known_empty(INSTRUMENT, '1wk', 0, int(time.time())) == []
+
+    def test_bar_free_stretches_of_a_response_are_recorded(self, service, db_path):
+        start = SESSION_TIME
+        service.history.return_value = bars([start + 120, start + 180, start + 600])
+
+        records = service._fetch_ohlc_data_internal(INSTRUMENT, '1m', datetime.fromtimestamp(start),
+                                                    datetime.fromtimestamp(start + 900))
+
+        assert len(records) == 3
+        assert EmptyRangeLedger(db_path).known_empty(INSTRUMENT, '1m', 0, start + DAY) == [
+            (start, start + 120), (start + 240, start + 600), (start + 660, start + 900)
+        ]
+
+    def test_empty_window_within_one_session_is_recorded(self, service, db_path):
+        service.history.return_value = pd.DataFrame()
+        ledger = EmptyRangeLedger(db_path)
+
+        # Saturday: no session at all; then a single session, as on an unlisted holiday
+        saturday = SESSION_TIME + 3 * DAY
+        service._fetch_ohlc_data_internal(INSTRUMENT, '1h', datetime.fromtimestamp(saturday),
+                                          datetime.fromtimestamp(saturday + 6 * 3600))
+        service._fetch_ohlc_data_internal(INSTRUMENT, '1h', datetime.fromtimestamp(SESSION_TIME),
+                                          datetime.fromtimestamp(SESSION_TIME + 3 * 3600))
+        # Across the daily halt: two sessions
+        service._fetch_ohlc_data_internal(INSTRUMENT, '5m', datetime.fromtimestamp(SESSION_TIME),
+                                          datetime.fromtimestamp(SESSION_TIME + 12 * 3600))
+
+        assert ledger.known_empty(INSTRUMENT, '1h', 0, saturday + DAY) == [
+            (SESSION_TIME, SESSION_TIME + 3 * 3600), (saturday, saturday + 6 * 3600)
+        ]
+        assert ledger.known_empty(INSTRUMENT, '5m', 0, saturday + DAY) == []
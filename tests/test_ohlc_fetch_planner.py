@@ -0,0 +1,92 @@
+"""
+Tests for coalescing OHLC fetch intents into provider calls
+"""
+
+from datetime import datetime
+
+from services.ohlc_fetch_planner import FetchIntent, PlannedFetch, plan_fetches
+
+
+HOUR = 3600
+DAY = 86400
+NOW = 1_760_000_000 // DAY * DAY
+
+LIMITS = {'1m': 7, '5m': 60, '1h': 60, '1d': 365}
+
+
+def intent(start_hours, end_hours, timeframe='1m', instrument='MNQ DEC25', priority=1):
+    """Intent for [NOW - start_hours, NOW - end_hours)"""
+    return FetchIntent(instrument, timeframe, NOW - start_hours * HOUR, NOW - end_hours * HOUR, priority)
+
+
+class TestPlanFetches:
+
+    def test_overlapping_and_adjacent_ranges_become_one_call(self):
+        plan = plan_fetches([
+            intent(10, 6), intent(8, 4),            # overlap
+            FetchIntent('MNQ DEC25', '1m', NOW - 4 * HOUR + 60, NOW - 2 * HOUR),  # one bar after
+            intent(30, 28),                         # separate
+        ], LIMITS, now=NOW)
+
+        assert [(f.start, f.end, f.intents) for f in plan.fetches] == [
+            (NOW - 10 * HOUR, NOW - 2 * HOUR, 3),
+            (NOW - 30 * HOUR, NOW - 28 * HOUR, 1),
+        ]
+        assert plan.summary() == {'intents': 4, 'naive_calls': 4, 'planned_calls': 2,
+                                  'calls_saved': 2, 'unreachable_intents': 0, 'ledger_hits': 0}
+
+    def test_ranges_are_merged_per_instrument_and_timeframe(self):
+        plan = plan_fetches([
+            intent(10, 6), intent(10, 6, timeframe='5m'), intent(10, 6, instrument='MNQ'), intent(9, 5),
+        ], LIMITS, now=NOW)
+
+        assert sorted((f.instrument, f.timeframe, f.intents) for f in plan.fetches) == [
+            ('MNQ', '1m', 1), ('MNQ DEC25', '1m', 2), ('MNQ DEC25', '5m', 1),
+        ]
+
+    def test_history_limit_clips_and_drops_ranges(self):
+        plan = plan_fetches([
+            intent(10 * 24, 9 * 24),                # older than 7 days of 1m history
+            intent(8 * 24, 6 * 24),                 # straddles the limit
+            intent(10 * 24, 9 * 24, timeframe='1h'),
+        ], LIMITS, now=NOW)
+
+        assert [(f.timeframe, f.start, f.end) for f in plan.fetches] == [
+            ('1m', NOW - 7 * DAY, NOW - 6 * DAY),
+            ('1h', NOW - 10 * DAY, NOW - 9 * DAY),
+        ]
+        assert plan.unreachable == 1
+
+    def test_long_ranges_are_split_to_the_request_maximum(self):
+        plan = plan_fetches([intent(50 * 24, 0, timeframe='5m')], LIMITS, now=NOW,
+                            max_request_days={'5m': 20})
+
+        assert [(f.start, f.end) for f in plan.fetches] == [
+            (NOW - 10 * DAY, NOW),
+            (NOW - 30 * DAY, NOW - 10 * DAY),
+            (NOW - 50 * DAY, NOW - 30 * DAY),
+        ]
+        assert plan.summary()['calls_saved'] == -2
+
+    def test_calls_are_ordered_by_priority_then_recency(self):
+        plan = plan_fetches([
+            intent(50, 48), intent(10, 8), intent(100, 98, timeframe='5m', priority=0),
+        ], LIMITS, now=NOW)
+
+        assert [(f.timeframe, f.end) for f in plan.fetches] == [
+            ('5m', NOW - 98 * HOUR), ('1m', NOW - 8 * HOUR), ('1m', NOW - 48 * HOUR),
+        ]
+
+    def test_merged_range_keeps_highest_priority(self):
+        plan = plan_fetches([intent(10, 6, priority=1), intent(8, 4, priority=0)], LIMITS, now=NOW)
+
+        assert plan.fetches == [PlannedFetch('MNQ DEC25', '1m', NOW - 10 * HOUR, NOW - 4 * HOUR, 0, 2)]
+
+    def test_intents_from_datetimes(self):
+        start, end = datetime(2025, 1, 15, 9, 30), datetime(2025, 1, 15, 16, 0)
+
+        created = FetchIntent.from_datetimes('MNQ DEC25', '5m', start, end, 'high')
+
+        assert created == FetchIntent('MNQ DEC25', '5m', int(start.timestamp()), int(end.timestamp()), 0)
+        planned = PlannedFetch(*created, intents=1)
+        assert (planned.start_date, planned.end_date) == (start, end)
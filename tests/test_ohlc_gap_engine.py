@@ -0,0 +1,142 @@
+"""
+Tests for window-query OHLC gap detection and the session calendar
+"""
+
+import sqlite3
+from datetime import date, datetime, timezone
+
+import pytest
+
+from services.ohlc_gap_engine import find_gaps, missing_bar_count, raw_gaps
+from services.session_calendar import (expected_bars, get_session_calendar, market_holidays, session_hours,
+                                       session_seconds)
+
+
+INSTRUMENT = 'MNQ DEC25'
+MINUTE = 60
+
+
+def utc(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(':memory:')
+    connection.execute('CREATE TABLE ohlc_data (instrument TEXT, timeframe TEXT, timestamp INTEGER)')
+    yield connection
+    connection.close()
+
+
+def insert_bars(conn, timestamps, timeframe='1m'):
+    conn.executemany('INSERT INTO ohlc_data VALUES (?, ?, ?)',
+                     [(INSTRUMENT, timeframe, ts) for ts in timestamps])
+
+
+def minutes(start, count):
+    return [start + i * MINUTE for i in range(count)]
+
+
+class TestSessionCalendar:
+
+    def test_sessions_open_the_evening_before_in_chicago_time(self):
+        calendar = get_session_calendar(utc(2025, 1, 1))
+
+        opens, closes = calendar.sessions_between(utc(2025, 1, 15, 12), utc(2025, 1, 15, 12))
+        assert (list(opens), list(closes)) == ([utc(2025, 1, 14, 23)], [utc(2025, 1, 15, 22)])
+        # Daylight saving time: one hour earlier in UTC
+        assert calendar.is_open(utc(2025, 7, 15, 22, 30))
+        assert not calendar.is_open(utc(2025, 7, 15, 21, 30))
+
+    def test_weekends_and_holidays_are_closed(self):
+        calendar = get_session_calendar(utc(2025, 1, 1))
+
+        assert not calendar.is_open(utc(2025, 1, 25, 12))   # Saturday
+        assert not calendar.is_open(utc(2025, 1, 19, 23, 30))  # Sunday evening before MLK Day
+        assert calendar.is_open(utc(2025, 1, 26, 23, 30))   # Sunday evening session
+
+    def test_market_holidays(self):
+        holidays = market_holidays(2027)
+
+        assert date(2027, 3, 26) in holidays   # Good Friday
+        assert date(2027, 12, 24) in holidays  # Christmas observed on Friday
+        assert date(2027, 7, 5) in holidays    # Independence Day observed on Monday
+
+
+class TestExpectedBars:
+
+    # Sessions of the week of 2025-01-13: Sunday 23:00 UTC to Friday 22:00 UTC, 23 hours each
+    WEEK = (utc(2025, 1, 12), utc(2025, 1, 19))
+
+    @pytest.mark.parametrize('timeframe, bars', [
+        ('1m', 5 * 1380), ('5m', 5 * 276), ('1h', 5 * 23), ('4h', 5 * 6), ('1d', 5), ('1wk', 1),
+    ])
+    def test_full_week(self, timeframe, bars):
+        assert expected_bars(*self.WEEK, timeframe) == bars
+
+    def test_partial_sessions_count_bar_starts_in_range(self):
+        assert expected_bars(utc(2025, 1, 15, 15, 0, 30), utc(2025, 1, 15, 15, 5), '1m') == 4
+        # Ten bars before the daily halt, ten after the reopen
+        assert expected_bars(utc(2025, 1, 15, 21, 50), utc(2025, 1, 15, 23, 10), '1m') == 20
+        assert expected_bars(datetime(2025, 1, 25, 12), datetime(2025, 1, 26, 12), '1m') == 0
+
+    def test_matches_counting_bars_session_by_session(self):
+        calendar = get_session_calendar(utc(2025, 1, 1))
+        start, end = utc(2025, 3, 5, 13, 17), utc(2025, 4, 23, 8, 41)  # spans DST change and Good Friday
+
+        for interval in (60, 900, 14400):
+            counted = sum(start <= bar < end
+                          for session_open, session_close in zip(*calendar.sessions_between(start, end))
+                          for bar in range(session_open, session_close, interval))
+            assert calendar.expected_bars(start, end, interval) == counted
+
+    def test_session_seconds_skip_weekends_and_holidays(self):
+        # Friday 21:00 UTC to Tuesday 00:00 UTC across MLK Day: Friday's last hour, then Monday 23:00 reopen
+        assert session_seconds(utc(2025, 1, 17, 21), utc(2025, 1, 21)) == 2 * 3600
+
+    def test_contract_names_resolve_to_their_product(self):
+        assert session_hours('MNQ DEC25') == session_hours('MNQ') == (17, 16)
+        assert session_hours('UNKNOWN') == session_hours() == (17, 16)
+
+
+class TestFindGaps:
+
+    def test_raw_gaps_from_window_query(self, conn):
+        start = utc(2025, 1, 15, 15)
+        insert_bars(conn, [start + 2 * MINUTE, start + 3 * MINUTE, start + 7 * MINUTE])
+
+        assert raw_gaps(conn, INSTRUMENT, '1m', start, start + 9 * MINUTE) == [
+            (start, start + MINUTE),
+            (start + 4 * MINUTE, start + 6 * MINUTE),
+            (start + 8 * MINUTE, start + 9 * MINUTE),
+        ]
+        assert raw_gaps(conn, INSTRUMENT, '5m', start, start + 9 * MINUTE) == [(start, start + 9 * MINUTE)]
+
+    def test_weekend_is_not_a_gap(self, conn):
+        friday_close = utc(2025, 1, 24, 22)
+        sunday_open = utc(2025, 1, 26, 23)
+        insert_bars(conn, minutes(friday_close - 10 * MINUTE, 10) + minutes(sunday_open, 10))
+
+        assert len(raw_gaps(conn, INSTRUMENT, '1m', friday_close - 10 * MINUTE, sunday_open + 9 * MINUTE)) == 1
+        assert find_gaps(conn, INSTRUMENT, '1m', friday_close - 10 * MINUTE, sunday_open + 9 * MINUTE) == []
+        assert find_gaps(conn, INSTRUMENT, '1m', friday_close - 10 * MINUTE, sunday_open + 9 * MINUTE,
+                         session_filter=False) == [(friday_close, sunday_open - MINUTE)]
+
+    def test_gap_across_maintenance_halt(self, conn):
+        halt_start = utc(2025, 1, 15, 22)
+        halt_end = utc(2025, 1, 15, 23)
+        insert_bars(conn, [halt_start - 10 * MINUTE, halt_end + 10 * MINUTE])
+
+        gaps = find_gaps(conn, INSTRUMENT, '1m', halt_start - 10 * MINUTE, halt_end + 10 * MINUTE)
+
+        assert gaps == [(halt_start - 9 * MINUTE, halt_start - MINUTE), (halt_end, halt_end + 9 * MINUTE)]
+        assert missing_bar_count(gaps, '1m') == 19
+        assert find_gaps(conn, INSTRUMENT, '1m', halt_start - 10 * MINUTE, halt_end + 10 * MINUTE,
+                         split_sessions=False) == [(halt_start - 9 * MINUTE, halt_end + 9 * MINUTE)]
+
+    def test_long_timeframes_are_not_session_filtered(self, conn):
+        week = 7 * 86400
+        start = utc(2025, 1, 5)
+        insert_bars(conn, [start, start + 3 * week], timeframe='1wk')
+
+        assert find_gaps(conn, INSTRUMENT, '1wk', start, start + 3 * week) == [(start + week, start + 2 * week)]
@@ -0,0 +1,173 @@
+"""
+Tests for deriving higher OHLC timeframes from stored 1m bars
+"""
+
+import sqlite3
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from scripts.TradingLog_db import FuturesDB
+from services.ohlc_empty_ranges import EmptyRangeLedger
+from services.ohlc_resampler import OHLCResampler, session_bins
+
+
+INSTRUMENT = 'MNQ MAR25'
+
+
+def utc(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+# Wednesday 2025-01-15 session: opens 17:00 CST on the 14th (23:00 UTC)
+SESSION_OPEN = utc(2025, 1, 14, 23, 0)
+
+
+def minute_bars(start, count, instrument=INSTRUMENT):
+    """1m rows with open = minute index, high = open + 1, low = open - 1, close = open + 0.5"""
+    return [(instrument, '1m', start + i * 60, float(i), i + 1.0, i - 1.0, i + 0.5, 10)
+            for i in range(count)]
+
+
+def insert(db_path, rows, source=None):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany("""
+            INSERT INTO ohlc_data (instrument, timeframe, timestamp, open_price, high_price, low_price,
+                                   close_price, volume, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [row + (source,) for row in rows])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def bars(db_path, timeframe):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("""
+            SELECT timestamp, open_price, high_price, low_price, close_price, volume, source, source_bar_count
+            FROM ohlc_data WHERE instrument = ? AND timeframe = ?
+            ORDER BY timestamp
+        """, (INSTRUMENT, timeframe)).fetchall()
+    finally:
+        conn.close()
+
+
+class TestSessionBins:
+
+    def test_intraday_bins_count_from_the_session_open(self):
+        timestamps = [SESSION_OPEN - 60, SESSION_OPEN, utc(2025, 1, 15, 2, 59), utc(2025, 1, 15, 3, 0)]
+
+        assert session_bins(timestamps, '4h').tolist() == [
+            utc(2025, 1, 14, 19, 0), SESSION_OPEN, SESSION_OPEN, utc(2025, 1, 15, 3, 0),
+        ]
+        assert session_bins(timestamps, '1h').tolist() == [
+            utc(2025, 1, 14, 22, 0), SESSION_OPEN, utc(2025, 1, 15, 2, 0), utc(2025, 1, 15, 3, 0),
+        ]
+
+    def test_session_open_follows_daylight_saving(self):
+        # 17:00 CDT is 22:00 UTC
+        assert session_bins([utc(2025, 7, 14, 22, 30)], '4h').tolist() == [utc(2025, 7, 14, 22, 0)]
+        assert session_bins([utc(2025, 7, 14, 21, 59)], '4h').tolist() == [utc(2025, 7, 14, 18, 0)]
+
+    def test_daily_bars_are_stamped_at_new_york_midnight_of_the_trading_day(self):
+        timestamps = [SESSION_OPEN - 60, SESSION_OPEN, utc(2025, 1, 15, 21, 59)]
+
+        assert session_bins(timestamps, '1d').tolist() == [
+            utc(2025, 1, 14, 5, 0), utc(2025, 1, 15, 5, 0), utc(2025, 1, 15, 5, 0),
+        ]
+        assert session_bins([utc(2025, 7, 14, 22, 0)], '1d').tolist() == [utc(2025, 7, 15, 4, 0)]
+
+
+class TestResampler:
+
+    def test_aggregates_one_minute_bars(self, db_path):
+        insert(db_path, minute_bars(SESSION_OPEN, 12))
+
+        stats = OHLCResampler(db_path).resample_instrument(INSTRUMENT, ['5m', '1d'])
+
+        assert stats['bars_written'] == {'5m': 3, '1d': 1}
+        assert bars(db_path, '5m') == [
+            (SESSION_OPEN, 0.0, 5.0, -1.0, 4.5, 50, 'resampled', 5),
+            (SESSION_OPEN + 300, 5.0, 10.0, 4.0, 9.5, 50, 'resampled', 5),
+            (SESSION_OPEN + 600, 10.0, 12.0, 9.0, 11.5, 20, 'resampled', 2),
+        ]
+        assert bars(db_path, '1d') == [(utc(2025, 1, 15, 5, 0), 0.0, 12.0, -1.0, 11.5, 120, 'resampled', 12)]
+
+    def test_only_sessions_with_new_bars_are_reaggregated(self, db_path):
+        resampler = OHLCResampler(db_path)
+        insert(db_path, minute_bars(SESSION_OPEN, 10))
+        resampler.resample_instrument(INSTRUMENT, ['5m', '1d'])
+
+        assert resampler.resample_instrument(INSTRUMENT, ['5m', '1d'])['source_bars'] == 0
+
+        # Next session, and a late bar for the first one
+        insert(db_path, minute_bars(SESSION_OPEN + 86400, 5))
+        insert(db_path, [(INSTRUMENT, '1m', SESSION_OPEN + 600, 20.0, 30.0, 15.0, 25.0, 10)])
+        stats = resampler.resample_instrument(INSTRUMENT, ['5m', '1d'])
+
+        assert (stats['sessions'], stats['source_bars']) == (2, 16)
+        assert [bar[0] for bar in bars(db_path, '5m')] == [
+            SESSION_OPEN, SESSION_OPEN + 300, SESSION_OPEN + 600, SESSION_OPEN + 86400,
+        ]
+        assert bars(db_path, '1d')[0][2:5] == (30.0, -1.0, 25.0)
+
+    def test_provider_bars_are_not_overwritten(self, db_path):
+        insert(db_path, minute_bars(SESSION_OPEN, 10))
+        insert(db_path, [(INSTRUMENT, '5m', SESSION_OPEN, 100.0, 101.0, 99.0, 100.5, 7)])
+
+        OHLCResampler(db_path).resample_instrument(INSTRUMENT, ['5m'])
+
+        assert bars(db_path, '5m') == [
+            (SESSION_OPEN, 100.0, 101.0, 99.0, 100.5, 7, None, None),
+            (SESSION_OPEN + 300, 5.0, 10.0, 4.0, 9.5, 50, 'resampled', 5),
+        ]
+
+
+class TestSync:
+
+    @pytest.fixture
+    def service(self, db_path):
+        from services.data_service import OHLCDataService
+
+        service = OHLCDataService()
+        service.cache_service = None
+        with patch('services.data_service.FuturesDB', lambda: FuturesDB(db_path)), \
+                patch('services.data_service.OHLCResampler', lambda: OHLCResampler(db_path)), \
+                patch('services.data_service.EmptyRangeLedger', lambda: EmptyRangeLedger(db_path)):
+            yield service
+
+    def test_resampled_timeframes_only_fetch_history_older_than_one_minute_bars(self, service, db_path):
+        first_minute = (int(time.time()) // 86400 - 2) * 86400
+
+        def fetch(instrument, timeframe, start_date, end_date):
+            if timeframe == '1m':
+                rows = minute_bars(first_minute, 120)
+            else:
+                rows = [(INSTRUMENT, timeframe, int(start_date.timestamp()) // 60 * 60, 1.0, 2.0, 0.5, 1.5, 10)]
+            return [dict(zip(('instrument', 'timeframe', 'timestamp', 'open', 'high', 'low', 'close', 'volume'),
+                             row)) for row in rows]
+
+        with patch.object(service, 'fetch_ohlc_data', side_effect=fetch) as fetch_mock:
+            stats = service._sync_instrument(INSTRUMENT, ['1m', '3m', '5m', '1h'])
+
+            # 3m is not a Yahoo interval; 5m and 1h stop where the 1m bars begin
+            calls = [(call.args[1], call.args[3]) for call in fetch_mock.call_args_list]
+            assert [timeframe for timeframe, _ in calls] == ['1m', '5m', '1h']
+            assert all(end_date == datetime.fromtimestamp(first_minute) for _, end_date in calls[1:])
+            assert stats['resampled_timeframes'] == ['3m', '5m', '1h']
+            assert (stats['timeframes_synced'], stats['timeframes_failed']) == (4, 0)
+            assert stats['candles_added'] == 122
+            assert stats['candles_resampled'] == 40 + 24 + 2
+
+            fetch_mock.reset_mock()
+            stats = service._sync_instrument(INSTRUMENT, ['1m', '3m', '5m', '1h'])
+
+            assert [call.args[1] for call in fetch_mock.call_args_list] == ['1m']
+            assert stats['candles_resampled'] == 0
+
+        assert len(bars(db_path, '3m')) == 40
+        assert {bar[6] for bar in bars(db_path, '3m')} == {'resampled'}
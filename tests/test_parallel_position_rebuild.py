@@ -0,0 +1,146 @@
+"""
+Tests for the parallel full rebuild in EnhancedPositionServiceV2.rebuild_positions_from_trades
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import billiard
+import pytest
+
+from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+
+pytestmark = pytest.mark.usefixtures('db_writer')
+
+
+def seed_trades(db_path, accounts=('Sim101', 'Sim102', 'Sim103'), instruments=('MNQ MAR25', 'ES MAR25')):
+    """Long, short and reversal round trips per group, ending on an open position"""
+    rows = []
+    start = datetime(2025, 1, 15, 9, 30)
+    for a, account in enumerate(accounts):
+        for i, instrument in enumerate(instruments):
+            sides = [('Buy', 2), ('Sell', 1), ('Sell', 1), ('SellShort', 1), ('BuyToCover', 1), ('Buy', 3)]
+            for n, (side, quantity) in enumerate(sides):
+                opening = side in ('Buy', 'SellShort')
+                price = 21000.0 + a * 10 + i + n
+                rows.append((
+                    instrument, account, side, quantity,
+                    price if opening else None, None if opening else price,
+                    (start + timedelta(minutes=n)).strftime('%Y-%m-%d %H:%M:%S'),
+                    f'{account}-{instrument}-{n}', 'Valid' if n % 2 else None
+                ))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO trades (instrument, account, side_of_market, quantity, entry_price, exit_price,
+                                      entry_time, entry_execution_id, trade_validation, commission, deleted)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0.52, 0)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        positions = conn.execute("""
+            SELECT id, account, instrument, position_type, entry_time, exit_time, total_quantity,
+                   average_entry_price, average_exit_price, total_dollars_pnl, position_status,
+                   execution_count, validation_status
+            FROM positions ORDER BY id
+        """).fetchall()
+        mappings = conn.execute(
+            "SELECT position_id, trade_id, execution_order FROM position_executions ORDER BY position_id, execution_order"
+        ).fetchall()
+        checkpoints = conn.execute(
+            "SELECT * FROM position_rebuild_checkpoints ORDER BY account, instrument"
+        ).fetchall()
+        pairs = conn.execute(
+            "SELECT * FROM position_execution_pairs ORDER BY position_id, pair_number"
+        ).fetchall()
+        return positions, mappings, [row[:-1] for row in checkpoints], [row[1:] for row in pairs]  # without ids
+    finally:
+        conn.close()
+
+
+def rebuild(db_path, **kwargs):
+    with EnhancedPositionServiceV2(db_path) as service:
+        return service.rebuild_positions_from_trades(**kwargs)
+
+
+def rebuild_in_daemon(db_path, results, **kwargs):
+    """Rebuild inside a daemonic process, the way a Celery prefork worker runs the task"""
+    results.put(rebuild(db_path, **kwargs)['workers'])
+
+
+class TestParallelRebuild:
+    """Worker processes build groups, one write job persists them"""
+
+    def test_matches_serial_rebuild(self, db_path):
+        seed_trades(db_path)
+
+        serial = rebuild(db_path, workers=1)
+        serial_snapshot = snapshot(db_path)
+        parallel = rebuild(db_path, workers=2)
+
+        assert parallel['workers'] == 2
+        assert serial['workers'] == 1
+        assert snapshot(db_path) == serial_snapshot
+        assert len(serial_snapshot[0]) > 6
+        assert len(serial_snapshot[2]) == 6
+        for key in ('positions_created', 'trades_processed', 'accounts_processed',
+                    'instruments_processed', 'validation_errors'):
+            assert parallel[key] == serial[key]
+        assert sorted(parallel['position_ids']) == [p[0] for p in serial_snapshot[0]]
+
+    def test_reports_progress_per_group(self, db_path):
+        seed_trades(db_path)
+        progress = []
+
+        rebuild(db_path, workers=2, progress_callback=lambda *args: progress.append(args))
+
+        assert [p[:2] for p in progress] == [(n, 6) for n in range(1, 7)]
+        assert {p[2:] for p in progress} == {
+            (account, instrument)
+            for account in ('Sim101', 'Sim102', 'Sim103')
+            for instrument in ('MNQ MAR25', 'ES MAR25')
+        }
+
+    def test_trades_changed_during_build_falls_back_to_serial(self, db_path, monkeypatch):
+        seed_trades(db_path)
+        rebuild(db_path, workers=1)
+        expected = snapshot(db_path)
+
+        fingerprints = iter([('before',), ('after',)])
+        monkeypatch.setattr(EnhancedPositionServiceV2, '_trades_fingerprint', lambda self, conn: next(fingerprints))
+
+        result = rebuild(db_path, workers=2)
+
+        assert result['workers'] == 1
+        assert snapshot(db_path) == expected
+
+    def test_small_rebuilds_stay_serial(self, db_path, monkeypatch):
+        from config import POSITION_REBUILD_CONFIG
+        seed_trades(db_path)
+
+        assert rebuild(db_path)['workers'] == 1
+
+        monkeypatch.setitem(POSITION_REBUILD_CONFIG, 'parallel_min_trades', 1)
+        monkeypatch.setitem(POSITION_REBUILD_CONFIG, 'workers', 3)
+        assert rebuild(db_path)['workers'] == 3
+
+    def test_daemonic_process_builds_in_parallel(self, db_path):
+        seed_trades(db_path)
+        rebuild(db_path, workers=1)
+        expected = snapshot(db_path)
+        results = billiard.Queue()
+
+        process = billiard.Process(target=rebuild_in_daemon, args=(db_path, results), kwargs={'workers': 2})
+        process.daemon = True
+        process.start()
+        workers = results.get(timeout=60)
+        process.join(timeout=60)
+
+        assert workers == 2
+        assert process.exitcode == 0
+        assert snapshot(db_path) == expected
@@ -0,0 +1,92 @@
+"""
+Tests for batched position persistence in EnhancedPositionServiceV2._save_positions_to_db
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from domain.models.position import Position, PositionStatus, PositionType
+from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+
+from conftest import execute
+
+
+@pytest.fixture
+def db_path(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO trades (id, instrument, account, side_of_market, quantity, entry_price,
+                            entry_time, entry_execution_id, trade_validation, deleted)
+        VALUES (?, 'MNQ MAR25', 'Sim101', 'Buy', 1, 21000.0, '2025-01-15 09:30:00', ?, ?, 0)
+    """, [(1, 'e1', 'Valid'), (2, 'e2', 'Valid'), (3, 'e3', 'Invalid'), (4, 'e4', None)])
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def make_position(instrument='MNQ MAR25', quantity=1):
+    return Position(
+        instrument=instrument, account='Sim101',
+        position_type=PositionType.LONG, position_status=PositionStatus.CLOSED,
+        entry_time=datetime(2025, 1, 15, 9, 30), exit_time=datetime(2025, 1, 15, 9, 35),
+        total_quantity=quantity, max_quantity=quantity,
+        average_entry_price=21000.0, average_exit_price=21010.0, execution_count=2
+    )
+
+
+class TestBulkPositionPersistence:
+    """Positions and mappings are written in batches inside one write job"""
+
+    def test_saves_positions_mappings_and_validation_status(self, db_path):
+        with EnhancedPositionServiceV2(db_path) as service:
+            position_ids = service._save_positions_to_db([
+                (make_position(), [1, 2]),
+                (make_position(), [2, 3]),
+                (make_position(), [4]),
+            ])
+
+        assert position_ids == [1, 2, 3]
+        assert execute(db_path, "SELECT id, validation_status FROM positions ORDER BY id") == [
+            (1, 'Valid'), (2, 'Mixed'), (3, None)
+        ]
+        assert execute(db_path, "SELECT position_id, trade_id, execution_order FROM position_executions ORDER BY id") == [
+            (1, 1, 1), (1, 2, 2), (2, 2, 1), (2, 3, 2), (3, 4, 1)
+        ]
+
+    def test_validation_from_trade_dicts_skips_the_query(self, db_path):
+        trades = [{'id': 1, 'trade_validation': 'Invalid'}, {'id': 2, 'trade_validation': 'Invalid'}]
+
+        with EnhancedPositionServiceV2(db_path) as service:
+            service._save_positions_to_db([(make_position(), [1, 2])], trades)
+
+        assert execute(db_path, "SELECT validation_status FROM positions") == [('Invalid',)]
+
+    def test_ids_continue_after_existing_positions(self, db_path):
+        with EnhancedPositionServiceV2(db_path) as service:
+            first = service._save_position_to_db(make_position(), [1])
+            rest = service._save_positions_to_db([(make_position(), [2]), (make_position(), [3])])
+
+        assert first == 1
+        assert rest == [2, 3]
+
+    def test_failed_batch_leaves_nothing_behind(self, db_path):
+        with EnhancedPositionServiceV2(db_path) as service:
+            with pytest.raises(sqlite3.IntegrityError):
+                service._save_positions_to_db([
+                    (make_position(), [1]),
+                    (make_position(instrument=None), [2]),  # instrument is NOT NULL
+                ])
+            assert service._save_position_to_db(make_position(instrument=None), [3]) is None
+
+        assert execute(db_path, "SELECT COUNT(*) FROM positions") == [(0,)]
+        assert execute(db_path, "SELECT COUNT(*) FROM position_executions") == [(0,)]
+
+    def test_repeated_trade_in_a_position_is_mapped_once(self, db_path):
+        with EnhancedPositionServiceV2(db_path) as service:
+            service._save_positions_to_db([(make_position(), [1, 1, 2])])
+
+        assert execute(db_path, "SELECT trade_id, execution_order FROM position_executions ORDER BY id") == [
+            (1, 1), (2, 3)
+        ]
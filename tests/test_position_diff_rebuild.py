@@ -0,0 +1,156 @@
+"""
+Tests for diff-mode position rebuilds: rebuilt positions are matched to the
+stored ones by first execution and only the differences are written
+"""
+
+import pytest
+
+from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+
+from conftest import ACCOUNT, INSTRUMENT, add_trade, execute
+
+pytestmark = pytest.mark.usefixtures('db_writer')
+
+
+def rebuild(db_path, diff=True):
+    with EnhancedPositionServiceV2(db_path) as service:
+        return service.rebuild_positions_for_account_instrument(ACCOUNT, INSTRUMENT, diff=diff)
+
+
+def snapshot(db_path):
+    columns = ', '.join(EnhancedPositionServiceV2.POSITION_INSERT_COLUMNS)
+    return (
+        execute(db_path, f"SELECT id, {columns} FROM positions ORDER BY id"),
+        execute(db_path, "SELECT position_id, trade_id, execution_order FROM position_executions "
+                         "ORDER BY position_id, execution_order"),
+    )
+
+
+def without_ids(db_path):
+    """Positions and their executions in entry order, independent of position IDs"""
+    rows, executions = snapshot(db_path)
+    trades_by_position = {}
+    for position_id, trade_id, execution_order in executions:
+        trades_by_position.setdefault(position_id, []).append((trade_id, execution_order))
+    return sorted((row[1:], tuple(trades_by_position.get(row[0], []))) for row in rows)
+
+
+@pytest.fixture
+def built(db_path):
+    """A closed long, a closed short, then an open long of 2 - no checkpoint, so rebuilds are full"""
+    add_trade(db_path, 'e1', 'Buy', 1, 21000.0, '2025-01-15 09:30:00')
+    add_trade(db_path, 'e2', 'Sell', 1, 21010.0, '2025-01-15 09:31:00')
+    add_trade(db_path, 'e3', 'SellShort', 1, 21010.0, '2025-01-15 09:32:00')
+    add_trade(db_path, 'e4', 'BuyToCover', 1, 21005.0, '2025-01-15 09:33:00')
+    add_trade(db_path, 'e5', 'Buy', 2, 21000.0, '2025-01-15 09:34:00')
+    rebuild(db_path, diff=False)
+    execute(db_path, "DELETE FROM position_rebuild_checkpoints")
+    return db_path
+
+
+class TestDiffRebuild:
+
+    def test_unchanged_rebuild_writes_nothing(self, built):
+        before = snapshot(built)
+        execute(built, "UPDATE positions SET updated_at = '2000-01-01 00:00:00'")
+
+        result = rebuild(built)
+
+        assert snapshot(built) == before
+        assert result['position_changes'] == {'inserted': [], 'updated': [], 'deleted': []}
+        assert result['changed_position_ids'] == []
+        assert execute(built, "SELECT DISTINCT updated_at FROM positions") == [('2000-01-01 00:00:00',)]
+
+    def test_new_execution_updates_only_its_position(self, built):
+        ids_before = [row[0] for row in snapshot(built)[0]]
+        execute(built, "DELETE FROM position_rebuild_checkpoints")
+        trade_id = add_trade(built, 'e6', 'Sell', 2, 21004.0, '2025-01-15 09:35:00')
+
+        result = rebuild(built)
+
+        rows, executions = snapshot(built)
+        assert [row[0] for row in rows] == ids_before
+        assert result['position_changes'] == {'inserted': [], 'updated': [ids_before[-1]], 'deleted': []}
+        assert result['changed_position_ids'] == [ids_before[-1]]
+        assert (ids_before[-1], trade_id, 2) in executions
+        status = EnhancedPositionServiceV2.POSITION_INSERT_COLUMNS.index('position_status')
+        assert rows[-1][status + 1] == 'closed'
+
+    def test_removed_execution_deletes_its_position(self, built):
+        ids_before = [row[0] for row in snapshot(built)[0]]
+        execute(built, "UPDATE trades SET deleted = 1 WHERE entry_execution_id IN ('e3', 'e4')")
+        execute(built, "DELETE FROM position_rebuild_checkpoints")
+
+        result = rebuild(built)
+
+        assert [row[0] for row in snapshot(built)[0]] == [ids_before[0], ids_before[2]]
+        assert result['position_changes'] == {'inserted': [], 'updated': [], 'deleted': [ids_before[1]]}
+        assert execute(built, "SELECT COUNT(*) FROM position_executions WHERE position_id = ?",
+                       (ids_before[1],)) == [(0,)]
+
+    def test_split_position_is_inserted(self, built):
+        ids_before = [row[0] for row in snapshot(built)[0]]
+        # An earlier execution closes part of the open long, starting a new position
+        execute(built, "UPDATE trades SET quantity = 1 WHERE entry_execution_id = 'e5'")
+        add_trade(built, 'e6', 'Sell', 1, 21002.0, '2025-01-15 09:35:00')
+        add_trade(built, 'e7', 'Buy', 1, 21001.0, '2025-01-15 09:36:00')
+        execute(built, "DELETE FROM position_rebuild_checkpoints")
+
+        result = rebuild(built)
+
+        rows = snapshot(built)[0]
+        assert [row[0] for row in rows][:3] == ids_before
+        assert result['position_changes']['updated'] == [ids_before[2]]
+        assert result['position_changes']['inserted'] == [rows[3][0]]
+
+    def test_matches_a_full_replace(self, built):
+        add_trade(built, 'e6', 'Sell', 3, 21004.0, '2025-01-15 09:35:00')
+        add_trade(built, 'e7', 'BuyToCover', 1, 21003.0, '2025-01-15 09:36:00')
+        execute(built, "UPDATE trades SET deleted = 1 WHERE entry_execution_id = 'e1'")
+
+        execute(built, "DELETE FROM position_rebuild_checkpoints")
+        rebuild(built, diff=False)
+        expected = without_ids(built)
+
+        execute(built, "DELETE FROM position_rebuild_checkpoints")
+        execute(built, "DELETE FROM position_executions")
+        execute(built, "DELETE FROM positions")
+        rebuild(built, diff=False)
+        add_trade(built, 'e8', 'Buy', 1, 21002.0, '2025-01-15 09:37:00')
+        execute(built, "UPDATE trades SET deleted = 1 WHERE entry_execution_id = 'e8'")
+        execute(built, "DELETE FROM position_rebuild_checkpoints")
+        rebuild(built)
+
+        assert without_ids(built) == expected
+
+    def test_checkpointed_rebuild_only_touches_positions_after_the_flat_point(self, db_path):
+        add_trade(db_path, 'e1', 'Buy', 1, 21000.0, '2025-01-15 09:30:00')
+        add_trade(db_path, 'e2', 'Sell', 1, 21010.0, '2025-01-15 09:31:00')
+        add_trade(db_path, 'e3', 'Buy', 2, 21000.0, '2025-01-15 09:32:00')
+        first = rebuild(db_path)
+        add_trade(db_path, 'e4', 'Sell', 2, 21005.0, '2025-01-15 09:33:00')
+
+        result = rebuild(db_path)
+
+        assert result['incremental'] is True
+        assert result['position_changes'] == {'inserted': [], 'updated': [first['position_ids'][-1]], 'deleted': []}
+        assert [row[0] for row in snapshot(db_path)[0]] == first['position_ids']
+
+    def test_no_trades_deletes_stored_positions(self, built):
+        ids_before = [row[0] for row in snapshot(built)[0]]
+        execute(built, "UPDATE trades SET deleted = 1")
+
+        result = rebuild(built)
+
+        assert snapshot(built) == ([], [])
+        assert result['position_changes']['deleted'] == ids_before
+        assert result['changed_position_ids'] == ids_before
+
+    def test_full_replace_reports_changes(self, built):
+        ids_before = [row[0] for row in snapshot(built)[0]]
+
+        result = rebuild(built, diff=False)
+
+        assert result['position_changes']['deleted'] == ids_before
+        assert result['position_changes']['inserted'] == [row[0] for row in snapshot(built)[0]]
+        assert result['changed_position_ids'] == sorted(set(ids_before + result['position_changes']['inserted']))
@@ -0,0 +1,147 @@
+"""
+Tests for the canonical position engine and the differential harness that
+checks it against the legacy position builders
+"""
+
+import sqlite3
+
+import pytest
+
+from domain.interfaces.position_service_interface import IPositionEngine
+from scripts import position_engine_harness as harness
+from services.position_engine import PositionEngine
+
+
+def trade(trade_id, side, quantity, price, entry_time):
+    opening = side in ('Buy', 'SellShort')
+    return {
+        'id': trade_id, 'instrument': 'MNQ MAR25', 'account': 'Sim101', 'side_of_market': side,
+        'quantity': quantity, 'entry_price': price if opening else None, 'exit_price': None if opening else price,
+        'entry_time': entry_time, 'entry_execution_id': f'e{trade_id}', 'commission': 0.52,
+    }
+
+
+class TestPositionEngine:
+
+    def test_is_the_position_engine_implementation(self):
+        assert isinstance(PositionEngine(), IPositionEngine)
+
+    def test_positions_come_with_their_trades(self):
+        trades = [
+            trade(1, 'Buy', 2, 21000.0, '2025-01-15 09:30:00'),
+            trade(2, 'Sell', 3, 21010.0, '2025-01-15 09:31:00'),  # reversal into a short of 1
+            trade(3, 'BuyToCover', 1, 21005.0, '2025-01-15 09:32:00'),
+        ]
+
+        built = PositionEngine().build_positions_with_executions(trades)
+
+        assert [[t['id'] for t in executions] for _, executions in built] == [[1, 2], [2, 3]]
+        assert [position.position_type.value for position, _ in built] == ['Long', 'Short']
+        assert PositionEngine().build_positions_from_trades(trades) == [position for position, _ in built]
+
+    def test_skips_trades_it_cannot_convert(self):
+        trades = [
+            trade(1, 'Buy', 1, 21000.0, '2025-01-15 09:30:00'),
+            trade(2, 'Sideways', 1, 21000.0, '2025-01-15 09:30:30'),
+            trade(3, 'Sell', 1, 21010.0, '2025-01-15 09:31:00'),
+        ]
+
+        built = PositionEngine().build_positions_with_executions(trades)
+
+        assert [[t['id'] for t in executions] for _, executions in built] == [[1, 3]]
+
+    def test_enhanced_position_service_builds_through_the_engine(self, monkeypatch):
+        from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+
+        calls = []
+        build = PositionEngine.build_positions_from_batch
+        monkeypatch.setattr(PositionEngine, 'build_positions_from_batch',
+                            lambda engine, *args: calls.append(args[1:]) or build(engine, *args))
+        trades = [
+            trade(1, 'Buy', 2, 21000.0, '2025-01-15 09:30:00'),
+            trade(2, 'Sell', 2, 21010.0, '2025-01-15 09:31:00'),
+        ]
+
+        built = EnhancedPositionServiceV2(':memory:')._build_positions_for_instrument(trades, 'Sim101', 'MNQ MAR25')
+
+        assert calls == [('Sim101', 'MNQ MAR25')]
+        assert [trade_ids for _, trade_ids in built[0]] == [[1, 2]]
+
+
+class TestHarness:
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_all_engines_agree_on_generated_streams(self, seed):
+        trades = harness.generate_executions(accounts=2, instruments=2, executions=300, seed=seed)
+
+        report = harness.run_harness(trades)
+
+        assert report['identical'], report
+        assert set(report['engines']) == set(harness.ENGINES)
+        for stats in report['engines'].values():
+            assert stats['positions'] > 0
+            assert stats['executions_per_second'] > 0
+
+    def test_generated_streams_cover_reversals_and_open_positions(self):
+        trades = harness.generate_executions(accounts=1, instruments=1, executions=300, seed=1)
+        built = PositionEngine().build_positions_with_executions(trades)
+
+        reversals = sum(1 for (_, a), (_, b) in zip(built, built[1:]) if a[-1] is b[0])
+        assert reversals > 0
+        assert {'Buy', 'Sell', 'SellShort', 'BuyToCover'} <= {t['side_of_market'] for t in trades}
+
+    def test_reports_differences(self):
+        trades = harness.generate_executions(accounts=1, instruments=1, executions=100, seed=1)
+        harness.ENGINES['drops_last_position'] = lambda trades: harness.run_position_engine(trades)[:-1]
+        try:
+            report = harness.run_harness(trades, ['position_engine', 'drops_last_position'])
+        finally:
+            del harness.ENGINES['drops_last_position']
+
+        assert not report['identical']
+        assert report['engines']['position_engine']['mismatches'] == []
+        assert report['engines']['drops_last_position']['mismatches']
+
+    def test_reports_quantity_and_pnl_differences(self):
+        trades = harness.generate_executions(accounts=1, instruments=1, executions=100, seed=1)
+
+        def off_by_a_tick(trades):
+            records = harness.run_position_service(trades)
+            records[0]['total_dollars_pnl'] += 0.5
+            return records
+
+        harness.ENGINES['off_by_a_tick'] = off_by_a_tick
+        try:
+            report = harness.run_harness(trades, ['position_engine', 'off_by_a_tick'])
+        finally:
+            del harness.ENGINES['off_by_a_tick']
+
+        assert report['engines']['off_by_a_tick']['positions'] == report['engines']['position_engine']['positions']
+        assert len(report['engines']['off_by_a_tick']['mismatches']) == 1
+        assert 'total_dollars_pnl' in report['engines']['off_by_a_tick']['mismatches'][0]
+
+    def test_legacy_service_reports_pnl(self):
+        trades = harness.generate_executions(accounts=1, instruments=1, executions=100, seed=1)
+
+        closed = [record for record in harness.run_position_service(trades) if record['status'] == 'closed']
+
+        assert closed and all('total_dollars_pnl' in record and 'average_exit_price' in record for record in closed)
+        assert 'total_quantity' not in closed[0]
+
+    def test_replays_recorded_streams(self, db_path):
+        trades = harness.generate_executions(accounts=1, instruments=2, executions=200, seed=4)
+        conn = sqlite3.connect(db_path)
+        conn.executemany("""
+            INSERT INTO trades (id, instrument, account, side_of_market, quantity, entry_price, exit_price,
+                                entry_time, entry_execution_id, commission, deleted)
+            VALUES (:id, :instrument, :account, :side_of_market, :quantity, :entry_price, :exit_price,
+                    :entry_time, :entry_execution_id, :commission, :deleted)
+        """, trades)
+        conn.execute("UPDATE trades SET deleted = 1 WHERE id = ?", (trades[-1]['id'],))
+        conn.commit()
+        conn.close()
+
+        recorded = harness.load_recorded_executions(db_path)
+
+        assert sorted(t['id'] for t in recorded) == [t['id'] for t in trades[:-1]]
+        assert harness.run_harness(recorded)['identical']
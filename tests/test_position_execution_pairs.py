@@ -0,0 +1,177 @@
+"""
+Tests for FIFO execution pairs: computed by the position builder, stored in
+position_execution_pairs with their positions and read back by FuturesDB
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from domain.services import position_kernel
+from scripts.TradingLog_db import FuturesDB
+from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+
+from conftest import ACCOUNT, INSTRUMENT, add_trade, execute
+
+
+def stored_pairs(db_path):
+    columns = ', '.join(EnhancedPositionServiceV2.EXECUTION_PAIR_COLUMNS)
+    return execute(db_path, f"SELECT position_id, pair_number, {columns} FROM position_execution_pairs "
+                            "ORDER BY position_id, pair_number")
+
+
+def execution_pairs(db_path, position_id, **kwargs):
+    with FuturesDB(db_path) as db:
+        return db.get_position_execution_pairs(position_id, **kwargs)
+
+
+class TestKernelPairs:
+
+    @pytest.mark.parametrize('seed', [1, 2, 3, 4])
+    def test_lots_match_unit_by_unit_fifo(self, seed):
+        rng = np.random.default_rng(seed)
+        n = 400
+        side_sign = rng.choice([1, -1], size=n)
+        quantities = rng.integers(1, 6, size=n)
+        prices = 20000 + rng.integers(-200, 200, size=n) * 0.25
+        flow = position_kernel.quantity_flow(side_sign * quantities)
+        spans = position_kernel.position_spans(flow.events)
+        direction = np.sign(flow.running[spans.starts])
+
+        lots = position_kernel.span_fifo_pairs(spans, side_sign, quantities, prices, prices, direction)
+        pnl = position_kernel.span_fifo_pnl(spans, side_sign, quantities, prices, prices, direction)
+
+        expected = []
+        for k, (start, end) in enumerate(zip(spans.starts, spans.ends)):
+            members = range(start, end + 1)
+            entry_units = [i for i in members if side_sign[i] == direction[k] for _ in range(quantities[i])]
+            exit_units = [i for i in members if side_sign[i] == -direction[k] for _ in range(quantities[i])]
+            expected.extend((k, e, x) for e, x in zip(entry_units, exit_units))
+
+        units = [
+            (k, e, x)
+            for k, e, x, q in zip(lots.span, lots.entry_index, lots.exit_index, lots.quantity)
+            for _ in range(q)
+        ]
+        assert units == expected
+        lot_pnl = np.bincount(lots.span, weights=lots.points_pnl, minlength=len(spans.starts))
+        np.testing.assert_allclose(lot_pnl, pnl.points_pnl, atol=1e-9)
+
+    def test_no_spans(self):
+        spans = position_kernel.position_spans(np.zeros(0, dtype=np.int8))
+
+        lots = position_kernel.span_fifo_pairs(spans, [], [], [], [], [])
+
+        assert len(lots.span) == 0
+
+
+class TestStoredPairs:
+
+    def test_rebuild_stores_pairs_with_their_positions(self, db_path):
+        e1 = add_trade(db_path, 'e1', 'Buy', 2, 21000.0, '2025-01-15 09:30:00')
+        e2 = add_trade(db_path, 'e2', 'Buy', 1, 21002.0, '2025-01-15 09:31:00')
+        e3 = add_trade(db_path, 'e3', 'Sell', 3, 21005.0, '2025-01-15 09:32:00', commission=1.56)
+        e4 = add_trade(db_path, 'e4', 'SellShort', 1, 21010.0, '2025-01-15 09:33:00')
+        e5 = add_trade(db_path, 'e5', 'BuyToCover', 1, 21012.0, '2025-01-15 09:34:00')
+
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.rebuild_positions_from_trades(workers=1)
+
+        long_id, short_id = [row[0] for row in execute(db_path, "SELECT id FROM positions ORDER BY entry_time")]
+        assert stored_pairs(db_path) == [
+            (long_id, 1, e1, e3, '2025-01-15 09:30:00', '2025-01-15 09:32:00', 2, 21000.0, 21005.0,
+             10.0, 20.0, 0.52, 1.04),
+            (long_id, 2, e2, e3, '2025-01-15 09:31:00', '2025-01-15 09:32:00', 1, 21002.0, 21005.0,
+             3.0, 6.0, 0.52, 0.52),
+            (short_id, 1, e4, e5, '2025-01-15 09:33:00', '2025-01-15 09:34:00', 1, 21010.0, 21012.0,
+             -2.0, -4.0, 0.52, 0.52),
+        ]
+
+        result = execution_pairs(db_path, long_id)
+        assert result['success']
+        assert [(p['pair_number'], p['quantity'], p['dollars_pnl'], p['duration_display'])
+                for p in result['execution_pairs']] == [(1, 2, 20.0, '2m'), (2, 1, 6.0, '1m')]
+        assert result['summary']['total_quantity'] == 3
+        assert result['summary']['total_points_pnl'] == 13.0
+        assert execute(db_path, "SELECT total_points_pnl FROM positions WHERE id = ?", (long_id,)) == [(13.0,)]
+
+        short = execution_pairs(db_path, short_id, instrument_multiplier=5.0)
+        assert [p['dollars_pnl'] for p in short['execution_pairs']] == [-10.0]
+
+    def test_diff_rebuild_rewrites_only_changed_pairs(self, db_path):
+        add_trade(db_path, 'e1', 'Buy', 1, 21000.0, '2025-01-15 09:30:00')
+        add_trade(db_path, 'e2', 'Sell', 1, 21010.0, '2025-01-15 09:31:00')
+        add_trade(db_path, 'e3', 'Buy', 2, 21000.0, '2025-01-15 09:32:00')
+        e4 = add_trade(db_path, 'e4', 'Sell', 1, 21001.0, '2025-01-15 09:32:00')
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.rebuild_positions_for_account_instrument(ACCOUNT, INSTRUMENT, diff=True)
+        before = stored_pairs(db_path)
+
+        # Moving the fill within its minute changes no position row, only the pair
+        execute(db_path, "UPDATE trades SET entry_time = '2025-01-15 09:32:30' WHERE id = ?", (e4,))
+        with EnhancedPositionServiceV2(db_path) as service:
+            result = service.rebuild_positions_for_account_instrument(ACCOUNT, INSTRUMENT, diff=True)
+
+        open_id = before[-1][0]
+        assert result['changed_position_ids'] == [open_id]
+        after = stored_pairs(db_path)
+        assert after[:-1] == before[:-1]
+        assert after[-1][5] == '2025-01-15 09:32:30'
+
+    def test_missing_pairs_are_backfilled_by_a_diff_rebuild(self, db_path):
+        add_trade(db_path, 'e1', 'Buy', 1, 21000.0, '2025-01-15 09:30:00')
+        add_trade(db_path, 'e2', 'Sell', 1, 21010.0, '2025-01-15 09:31:00')
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.rebuild_positions_from_trades(workers=1)
+        expected = stored_pairs(db_path)
+        execute(db_path, "DELETE FROM position_execution_pairs")
+        execute(db_path, "DELETE FROM position_rebuild_checkpoints")  # rebuild the full history
+
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.rebuild_positions_for_account_instrument(ACCOUNT, INSTRUMENT, diff=True)
+
+        assert stored_pairs(db_path) == expected
+
+    def test_deleted_positions_drop_their_pairs(self, db_path):
+        add_trade(db_path, 'e1', 'Buy', 1, 21000.0, '2025-01-15 09:30:00')
+        add_trade(db_path, 'e2', 'Sell', 1, 21010.0, '2025-01-15 09:31:00')
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.rebuild_positions_from_trades(workers=1)
+            position_id = service.conn.execute("SELECT id FROM positions").fetchone()[0]
+            service.delete_positions([position_id])
+
+        assert stored_pairs(db_path) == []
+
+    def test_positions_without_stored_pairs_are_matched_on_read(self, db_path):
+        add_trade(db_path, 'e1', 'Buy', 2, 21000.0, '2025-01-15 09:30:00')
+        add_trade(db_path, 'e2', 'Sell', 2, 21004.0, '2025-01-15 09:31:00')
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.rebuild_positions_from_trades(workers=1)
+        position_id = execute(db_path, "SELECT id FROM positions")[0][0]
+        execute(db_path, "DELETE FROM position_execution_pairs")
+
+        result = execution_pairs(db_path, position_id)
+
+        assert [(p['quantity'], p['points_pnl'], p['dollars_pnl']) for p in result['execution_pairs']] == \
+            [(1, 4.0, 8.0), (1, 4.0, 8.0)]
+        assert result['summary']['total_quantity'] == 2
+
+    def test_unknown_position(self, db_path):
+        assert execution_pairs(db_path, 999) == {'success': False, 'error': 'Position not found'}
+
+    def test_pair_pnl_adds_up_to_position_pnl(self, db_path):
+        rng = random.Random(5)
+        sides = ['Buy', 'Sell', 'SellShort', 'BuyToCover']
+        for n in range(200):
+            add_trade(db_path, f'e{n}', rng.choice(sides), rng.randint(1, 4), 21000 + rng.randint(-40, 40) * 0.25,
+                      f'2025-01-15 {9 + n // 60:02d}:{n % 60:02d}:00')
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.rebuild_positions_from_trades(workers=1)
+
+        totals = dict(execute(db_path, "SELECT position_id, SUM(points_pnl) FROM position_execution_pairs "
+                                       "GROUP BY position_id"))
+        positions = execute(db_path, "SELECT id, total_points_pnl FROM positions")
+        assert totals
+        for position_id, points_pnl in positions:
+            assert totals.get(position_id, 0.0) == pytest.approx(points_pnl, abs=1e-9)
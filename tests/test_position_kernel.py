@@ -0,0 +1,149 @@
+"""
+Tests for the array-based position kernel and the builders that use it
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from domain.models.trade import Trade, MarketSide
+from domain.services import position_kernel
+from domain.services.pnl_calculator import PnLCalculator
+from domain.services.position_builder import PositionBuilder
+
+
+def make_trades(sides_and_quantities, prices, start=datetime(2025, 1, 2, 9, 30)):
+    return [
+        Trade(
+            id=i + 1, instrument='MNQ MAR25', account='Sim101', side_of_market=side,
+            quantity=quantity, entry_price=price, entry_time=start + timedelta(seconds=i), commission=0.52,
+        )
+        for i, ((side, quantity), price) in enumerate(zip(sides_and_quantities, prices))
+    ]
+
+
+def random_trades(rng, count):
+    sides = [MarketSide.BUY, MarketSide.SELL, MarketSide.SELL_SHORT, MarketSide.BUY_TO_COVER]
+    return make_trades(
+        [(rng.choice(sides), rng.randint(1, 4)) for _ in range(count)],
+        [20000 + rng.randint(-400, 400) * 0.25 for _ in range(count)],
+    )
+
+
+def position_fields(position):
+    return (
+        position.position_type, position.entry_time, position.exit_time, position.total_quantity,
+        position.max_quantity, position.position_status, position.execution_count,
+        position.average_entry_price, position.average_exit_price, position.total_points_pnl,
+        position.total_dollars_pnl, position.total_commission, position.risk_reward_ratio,
+    )
+
+
+class TestQuantityFlow:
+
+    def test_events_and_spans(self):
+        flow = position_kernel.quantity_flow([2, 1, -3, -1, 3, -2, 0])
+
+        assert flow.running.tolist() == [2, 3, 0, -1, 2, 0, 0]
+        assert flow.previous.tolist() == [0, 2, 3, 0, -1, 2, 0]
+        assert [position_kernel.EVENT_TYPES[e] for e in flow.events] == [
+            'position_start', 'position_modify', 'position_close', 'position_start',
+            'position_reversal', 'position_close', None,
+        ]
+
+        spans = position_kernel.position_spans(flow.events)
+        # The reversal at index 4 ends the short and starts the long
+        assert spans.starts.tolist() == [0, 3, 4]
+        assert spans.ends.tolist() == [2, 4, 5]
+        assert spans.closed.tolist() == [True, True, True]
+
+    def test_open_last_span(self):
+        flow = position_kernel.quantity_flow([1, -1, -2])
+        spans = position_kernel.position_spans(flow.events)
+
+        assert spans.starts.tolist() == [0, 2]
+        assert spans.ends.tolist() == [1, 2]
+        assert spans.closed.tolist() == [True, False]
+
+    def test_span_members_repeat_reversals(self):
+        spans = position_kernel.PositionSpans(np.array([0, 3, 4]), np.array([2, 4, 5]), np.array([True] * 3))
+
+        index, span = position_kernel.span_members(spans)
+
+        assert index.tolist() == [0, 1, 2, 3, 4, 4, 5]
+        assert span.tolist() == [0, 0, 0, 1, 1, 2, 2]
+        assert position_kernel.span_offsets(spans).tolist() == [0, 3, 5]
+
+
+class TestFifoPnl:
+
+    def test_price_scale(self):
+        assert position_kernel.price_scale([21000.25, 21000.5]) == 100
+        assert position_kernel.price_scale([0.1, 0.2]) == 10
+        assert position_kernel.price_scale([4500.0]) == 1
+        assert position_kernel.price_scale([1 / 3]) is None
+
+    def test_partial_fills_match_in_order(self):
+        # 2 @ 100 then 2 @ 101 in, 3 out @ 102: FIFO matches 2 @ 100 and 1 @ 101
+        matched, points = position_kernel.fifo_pnl([2, 2], [100.0, 101.0], [3], [102.0])
+
+        assert matched == 3
+        assert points == 2 * 2 + 1 * 1
+
+    def test_decimal_prices_are_exact(self):
+        matched, points = position_kernel.fifo_pnl([1, 1, 1], [0.1, 0.2, 0.3], [3], [0.7], direction=-1)
+
+        assert matched == 3
+        assert points == -1.5
+
+    def test_missing_side_has_no_pnl(self):
+        assert position_kernel.fifo_pnl([1], [100.0], [], []) == (0, 0.0)
+
+    def test_matches_fifo_calculator(self):
+        calculator = PnLCalculator()
+        rng = random.Random(11)
+        for _ in range(200):
+            entries = [{'quantity': rng.randint(1, 5), 'entry_price': 4500 + rng.randint(0, 40) * 0.25,
+                        'entry_time': f'2025-01-02T09:{i:02d}'} for i in range(rng.randint(1, 5))]
+            exits = [{'quantity': rng.randint(1, 5), 'exit_price': 4500 + rng.randint(0, 40) * 0.25,
+                      'entry_time': f'2025-01-02T10:{i:02d}'} for i in range(rng.randint(1, 5))]
+            position_type = rng.choice(['Long', 'Short'])
+
+            result = calculator.calculate_fifo_pnl(entries, exits, position_type)
+            reference = calculator.fifo_calculator.calculate_pnl(entries, exits, position_type)
+
+            # Quarter-point prices keep the float reference exact too
+            assert result['points_pnl'] == reference.points_pnl
+            assert result['matched_quantity'] == reference.matched_quantity
+
+
+class TestPositionBuilderKernel:
+    """_build_positions_with_kernel() matches the per-event reference builder"""
+
+    def test_matches_reference_builder(self):
+        builder = PositionBuilder(PnLCalculator())
+        rng = random.Random(5)
+        for _ in range(300):
+            trades = random_trades(rng, rng.randint(1, 15))
+
+            built = builder._build_positions_with_kernel(trades, 'Sim101', 'MNQ MAR25')
+            reference = builder._aggregate_executions_into_positions(trades, 'Sim101', 'MNQ MAR25')
+
+            assert [position_fields(p) for p, _ in built] == [position_fields(p) for p in reference]
+
+    def test_reversal_is_listed_with_both_positions(self):
+        trades = make_trades(
+            [(MarketSide.BUY, 2), (MarketSide.SELL, 3), (MarketSide.BUY_TO_COVER, 1)],
+            [21000.0, 21002.5, 21001.0],
+        )
+        builder = PositionBuilder(PnLCalculator())
+
+        built = builder.build_positions_with_executions(trades, 'Sim101', 'MNQ MAR25')
+
+        assert [[t.id for t in executions] for _, executions in built] == [[1, 2], [2, 3]]
+        long_position, short_position = (position for position, _ in built)
+        assert long_position.total_quantity == 2
+        assert long_position.total_points_pnl == 5.0
+        assert short_position.position_type.value == 'Short'
+        assert short_position.total_points_pnl == 1.5
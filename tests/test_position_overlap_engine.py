@@ -0,0 +1,196 @@
+"""
+Tests for sweep-line position overlap detection and its use by the overlap
+validators
+"""
+
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.position_algorithms import detect_position_overlaps
+from services.position_overlap_analysis import PositionOverlapAnalyzer
+from services.position_overlap_engine import PositionOverlapIndex, overlap_index_cache, position_interval
+from services.position_overlap_prevention import PositionOverlapPrevention
+
+
+BASE = datetime(2025, 1, 15, 9, 30)
+
+
+def position(position_id, start, end=None, position_type='Long', **extra):
+    """Position starting/ending `start`/`end` minutes after BASE; open when end is None"""
+    values = dict(
+        id=position_id, account='Sim101', instrument='MNQ MAR25', position_type=position_type,
+        entry_time=(BASE + timedelta(minutes=start)).strftime('%Y-%m-%d %H:%M:%S'),
+        exit_time=None if end is None else (BASE + timedelta(minutes=end)).strftime('%Y-%m-%d %H:%M:%S'),
+        position_status='open' if end is None else 'closed',
+        total_quantity=position_id, execution_count=2, average_entry_price=21000.0 + position_id,
+        total_dollars_pnl=10.0,
+    )
+    values.update(extra)
+    return values
+
+
+def brute_force_overlaps(positions):
+    ordered = sorted(positions, key=lambda p: position_interval(p)[0])
+    return [
+        (a['id'], b['id'])
+        for i, a in enumerate(ordered)
+        for b in ordered[i + 1:]
+        if position_interval(a)[1] > position_interval(b)[0]
+    ]
+
+
+def random_positions(rng, n):
+    positions = []
+    for position_id in range(1, n + 1):
+        start = rng.randint(0, 300)
+        end = None if rng.random() < 0.05 else start + rng.choice([0, 1, 2, 5, 30])
+        positions.append(position(position_id, start, end))
+    return positions
+
+
+class TestIndex:
+
+    @pytest.mark.parametrize('seed', [1, 2, 3])
+    def test_sweep_finds_every_overlapping_pair(self, seed):
+        positions = random_positions(random.Random(seed), 150)
+
+        found = PositionOverlapIndex(positions).overlaps()
+
+        assert sorted((p.earlier['id'], p.later['id']) for p in found) == sorted(brute_force_overlaps(positions))
+
+    def test_long_position_overlaps_every_later_one(self):
+        positions = [position(1, 0, 60), position(2, 5, 10), position(3, 20, 30), position(4, 60, 70)]
+
+        found = PositionOverlapIndex(positions).overlaps()
+
+        assert [(p.earlier['id'], p.later['id'], p.overlap_seconds) for p in found] == \
+            [(1, 2, 3300.0), (1, 3, 2400.0)]
+
+    def test_unparseable_positions_are_set_aside(self):
+        positions = [position(1, 0, 5), position(2, 1, 3, entry_time='not a time')]
+
+        index = PositionOverlapIndex(positions)
+
+        assert index.overlaps() == []
+        assert [p['id'] for p in index.unparseable] == [2]
+
+    @pytest.mark.parametrize('seed', [4, 5])
+    def test_incremental_checks_match_a_full_sweep(self, seed):
+        rng = random.Random(seed)
+        positions = random_positions(rng, 120)
+        index = PositionOverlapIndex(positions[:60])
+        index.overlaps()
+
+        for new in positions[60:]:
+            check = index.check(new)
+            assert index.add(new) == check
+            ordered = index.positions
+            at = next(i for i, p in enumerate(ordered) if p is new)
+            assert check.previous is (ordered[at - 1] if at else None)
+            assert check.following is (ordered[at + 1] if at + 1 < len(ordered) else None)
+
+        expected = sorted(brute_force_overlaps(positions))
+        assert sorted((p.earlier['id'], p.later['id']) for p in index.overlaps()) == expected
+        assert sorted((p.earlier['id'], p.later['id']) for p in PositionOverlapIndex(index.positions).overlaps()) \
+            == expected
+
+    def test_pair_results_are_computed_once(self):
+        a, b = position(1, 0, 1), position(2, 2, 3)
+        index = PositionOverlapIndex([a, b])
+        calls = []
+
+        for _ in range(2):
+            index.pair_result('check', a, b, lambda x, y: calls.append((x['id'], y['id'])) or 'result')
+
+        assert calls == [(1, 2)]
+
+
+class TestValidators:
+
+    def test_validate_positions_after_building(self):
+        positions = [position(1, 0, 10), position(2, 5, 8), position(3, 20), position(4, 30, 40, 'Short')]
+
+        validator = PositionOverlapPrevention(':memory:')
+        result = validator.validate_positions_after_building(positions, 'Sim101', 'MNQ MAR25')
+
+        assert not result['valid']
+        assert [(o['type'], o['position1_id'], o['position2_id'], o.get('overlap_duration_seconds'))
+                for o in result['overlaps']] == [('time_overlap', 1, 2, 300.0), ('open_position_overlap', 3, 4, None)]
+        assert [(v['position1_id'], v['position2_id']) for v in result['boundary_violations']] == [(1, 2), (2, 3)]
+
+    def test_detect_position_overlaps_reports_every_pair(self):
+        positions = [position(1, 0, 60), position(2, 5, 10), position(3, 20, 30)]
+
+        overlaps = detect_position_overlaps({'Sim101': positions})
+
+        assert [(o['position1_id'], o['position2_id'], o['overlap_duration']) for o in overlaps] == \
+            [(1, 2, '0:55:00'), (1, 3, '0:40:00')]
+
+
+@pytest.fixture
+def db_path(db_path):
+    overlap_index_cache.clear()
+    yield db_path
+    overlap_index_cache.clear()
+
+
+def store(db_path, *positions):
+    conn = sqlite3.connect(db_path)
+    try:
+        for p in positions:
+            conn.execute("""
+                INSERT INTO positions (id, instrument, account, position_type, entry_time, exit_time,
+                                       total_quantity, average_entry_price, total_dollars_pnl,
+                                       position_status, execution_count)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (p['id'], p['instrument'], p['account'], p['position_type'], p['entry_time'], p['exit_time'],
+                  p['total_quantity'], p['average_entry_price'], p['total_dollars_pnl'], p['position_status'],
+                  p['execution_count']))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class TestStoredPositions:
+
+    def test_group_index_is_reused_until_positions_change(self, db_path):
+        store(db_path, position(1, 0, 10), position(2, 20, 30, 'Short'))
+
+        with PositionOverlapPrevention(db_path) as validator:
+            first = validator._group_index('Sim101', 'MNQ MAR25')
+            assert validator._group_index('Sim101', 'MNQ MAR25') is first
+            assert 'Overlaps: 0' in validator.generate_prevention_report()
+
+        store(db_path, position(3, 25, 40))
+        with PositionOverlapPrevention(db_path) as validator:
+            second = validator._group_index('Sim101', 'MNQ MAR25')
+            report = validator.generate_prevention_report()
+
+        assert second is not first
+        assert [p['id'] for p in second.positions] == [1, 2, 3]
+        assert 'time_overlap: Positions 2 & 3' in report
+
+    def test_validate_new_position(self, db_path):
+        store(db_path, position(1, 0, 10), position(2, 20, 30, 'Short'))
+
+        with PositionOverlapPrevention(db_path) as validator:
+            result = validator.validate_new_position(position(3, 5, 12, 'Short'), 'Sim101', 'MNQ MAR25')
+            clean = validator.validate_new_position(position(4, 40, 50), 'Sim101', 'MNQ MAR25')
+
+        assert [(o['position1_id'], o['position2_id']) for o in result['overlaps']] == [(1, 3)]
+        assert [(v['position1_id'], v['position2_id']) for v in result['boundary_violations']] == [(3, 2)]
+        assert clean['valid']
+
+    def test_analyzer(self, db_path):
+        store(db_path, position(1, 0, 60), position(2, 5, 10, 'Short'), position(3, 20, 30, 'Short'))
+
+        with PositionOverlapAnalyzer(db_path) as analyzer:
+            analysis = analyzer.analyze_current_positions()
+
+        assert analysis['total_positions'] == 3
+        assert [(o['type'], o['position1']['id'], o['position2']['id']) for o in analysis['overlaps']] == [
+            ('time_overlap', 1, 2), ('time_overlap', 1, 3), ('quantity_inconsistency', 2, 3),
+        ]
@@ -0,0 +1,113 @@
+"""
+Tests for checkpointed incremental position rebuilds in EnhancedPositionServiceV2
+"""
+
+import pytest
+
+from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+
+from conftest import ACCOUNT, INSTRUMENT, add_trade, execute
+
+pytestmark = pytest.mark.usefixtures('db_writer')
+
+
+def rebuild(db_path):
+    with EnhancedPositionServiceV2(db_path) as service:
+        return service.rebuild_positions_for_account_instrument(ACCOUNT, INSTRUMENT)
+
+
+def positions(db_path):
+    return execute(db_path, """
+        SELECT position_type, entry_time, exit_time, total_quantity, position_status, execution_count
+        FROM positions WHERE account = ? AND instrument = ? ORDER BY entry_time
+    """, (ACCOUNT, INSTRUMENT))
+
+
+def checkpoint(db_path):
+    rows = execute(db_path, """
+        SELECT last_flat_trade_id, last_flat_time, open_quantity
+        FROM position_rebuild_checkpoints WHERE account = ? AND instrument = ?
+    """, (ACCOUNT, INSTRUMENT))
+    return rows[0] if rows else None
+
+
+@pytest.fixture
+def built(db_path):
+    """One closed long, then an open long of 2, with a checkpoint at the close"""
+    add_trade(db_path, 'e1', 'Buy', 1, 21000.0, '2025-01-15 09:30:00')
+    flat_id = add_trade(db_path, 'e2', 'Sell', 1, 21010.0, '2025-01-15 09:31:00')
+    add_trade(db_path, 'e3', 'Buy', 2, 21000.0, '2025-01-15 09:40:00')
+
+    result = rebuild(db_path)
+    assert result['incremental'] is False
+    assert checkpoint(db_path) == (flat_id, '2025-01-15 09:31:00', 2)
+    return flat_id
+
+
+class TestRebuildCheckpoint:
+    """Appended executions rebuild only from the last flat point"""
+
+    def test_append_rebuilds_from_checkpoint(self, db_path, built):
+        first_position_id = execute(db_path, "SELECT MIN(id) FROM positions")[0][0]
+        close_id = add_trade(db_path, 'e4', 'Sell', 2, 21020.0, '2025-01-15 09:45:00')
+
+        result = rebuild(db_path)
+
+        assert result['incremental'] is True
+        assert result['trades_processed'] == 2
+        assert checkpoint(db_path) == (close_id, '2025-01-15 09:45:00', 0)
+        # Positions before the checkpoint were not touched
+        assert execute(db_path, "SELECT MIN(id) FROM positions")[0][0] == first_position_id
+
+        incremental = positions(db_path)
+        execute(db_path, "DELETE FROM position_rebuild_checkpoints")
+        assert rebuild(db_path)['incremental'] is False
+        assert positions(db_path) == incremental
+        assert [p[4] for p in incremental] == ['closed', 'closed']
+
+    def test_open_position_is_carried_without_new_flat_point(self, db_path, built):
+        add_trade(db_path, 'e4', 'Buy', 1, 21005.0, '2025-01-15 09:50:00')
+
+        result = rebuild(db_path)
+
+        assert result['incremental'] is True
+        assert checkpoint(db_path)[0] == built
+        assert checkpoint(db_path)[2] == 3
+        assert [(p[3], p[4]) for p in positions(db_path)] == [(1, 'closed'), (3, 'open')]
+
+    def test_backdated_insert_forces_full_rebuild(self, db_path, built):
+        add_trade(db_path, 'e0', 'Buy', 1, 20990.0, '2025-01-15 09:00:00')
+
+        assert checkpoint(db_path) is None
+        assert rebuild(db_path)['incremental'] is False
+
+    def test_trade_at_checkpoint_time_forces_full_rebuild(self, db_path, built):
+        add_trade(db_path, 'e9', 'Buy', 1, 20990.0, '2025-01-15 09:31:00')
+
+        assert checkpoint(db_path) is None
+
+    def test_edit_or_delete_before_checkpoint_forces_full_rebuild(self, db_path, built):
+        execute(db_path, "UPDATE trades SET quantity = 2 WHERE entry_execution_id = 'e1'")
+        assert checkpoint(db_path) is None
+
+        rebuild(db_path)
+        assert checkpoint(db_path) is None  # 2 bought, 1 sold: never flat now
+
+        execute(db_path, "UPDATE trades SET deleted = 1 WHERE entry_execution_id = 'e1'")
+        rebuild(db_path)
+        assert checkpoint(db_path) is None
+
+    def test_notes_edit_keeps_checkpoint(self, db_path, built):
+        execute(db_path, "UPDATE trades SET notes = 'good trade' WHERE entry_execution_id = 'e1'")
+
+        assert checkpoint(db_path) is not None
+
+    def test_deleting_positions_drops_checkpoint(self, db_path, built):
+        position_id = execute(db_path, "SELECT MIN(id) FROM positions")[0][0]
+
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.delete_positions([position_id])
+
+        assert checkpoint(db_path) is None
+        rebuild(db_path)
+        assert len(positions(db_path)) == 2
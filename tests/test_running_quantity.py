@@ -0,0 +1,193 @@
+"""
+Tests for stored per-(account, instrument) running quantities on trades
+"""
+
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from scripts.TradingLog_db import FuturesDB
+from services.position_algorithms import SIDE_SIGNS
+from services.reconciliation_service import ReconciliationService
+from services.running_quantity import refresh_running_quantities, stale_groups
+
+from conftest import ACCOUNT, INSTRUMENT
+
+pytestmark = pytest.mark.usefixtures('db_writer')
+
+
+TRADES = [
+    # execution id, account, instrument, side, quantity, entry_time
+    ('e1', ACCOUNT, INSTRUMENT, 'Buy', 2, '2025-01-15 09:30:00'),
+    ('e2', ACCOUNT, 'MES MAR25', 'SellShort', 1, '2025-01-15 09:31:00'),
+    ('e3', ACCOUNT, INSTRUMENT, 'Sell', 3, '2025-01-15 09:35:00'),
+    ('e4', ACCOUNT, INSTRUMENT, 'BuyToCover', 1, '2025-01-15 09:40:00'),
+    ('e5', 'Other', INSTRUMENT, 'Sell', 1, '2025-01-15 09:41:00'),
+    ('e6', ACCOUNT, INSTRUMENT, 'Buy', 1, '2025-01-16 10:00:00'),
+    ('e7', ACCOUNT, INSTRUMENT, 'Buy', 1, '2025-01-16 10:00:00'),
+]
+
+
+@pytest.fixture
+def db_path(db_path):
+    insert(db_path, TRADES)
+    return db_path
+
+
+def insert(db_path, trades):
+    execute(db_path, *[("""
+        INSERT INTO trades (entry_execution_id, account, instrument, side_of_market, quantity,
+                            entry_price, entry_time, deleted)
+        VALUES (?, ?, ?, ?, ?, 21000.0, ?, 0)
+    """, trade) for trade in trades])
+
+
+def execute(db_path, *statements):
+    conn = sqlite3.connect(db_path)
+    try:
+        for sql, params in statements:
+            rows = conn.execute(sql, params).fetchall()
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+
+def refresh(db_path, account=None, instrument=None):
+    conn = sqlite3.connect(db_path)
+    try:
+        updated = refresh_running_quantities(conn, account, instrument)
+        conn.commit()
+        return updated
+    finally:
+        conn.close()
+
+
+def stored(db_path):
+    """(execution id, before, after) of every live trade"""
+    return execute(db_path, ("""
+        SELECT entry_execution_id, running_qty_before, running_qty_after FROM trades
+        WHERE deleted = 0 OR deleted IS NULL
+        ORDER BY account, instrument, entry_time, id
+    """, ()))
+
+
+def replayed(db_path):
+    """The same, replayed from the first trade of each group"""
+    rows = execute(db_path, ("""
+        SELECT entry_execution_id, account, instrument, side_of_market, quantity FROM trades
+        WHERE deleted = 0 OR deleted IS NULL
+        ORDER BY account, instrument, entry_time, id
+    """, ()))
+    expected, running = [], {}
+    for execution_id, account, instrument, side, quantity in rows:
+        before = running.get((account, instrument), 0)
+        running[(account, instrument)] = before + SIDE_SIGNS[side] * quantity
+        expected.append((execution_id, before, running[(account, instrument)]))
+    return expected
+
+
+class TestRefresh:
+
+    def test_new_trades_are_stale_until_refreshed(self, db_path):
+        assert len(stale_groups(sqlite3.connect(db_path))) == 3
+
+        assert refresh(db_path) == len(TRADES)
+
+        assert stored(db_path) == replayed(db_path)
+        assert dict((row[0], row[1:]) for row in stored(db_path))['e4'] == (-1, 0)
+        assert stale_groups(sqlite3.connect(db_path)) == []
+
+    def test_appended_trades_only_update_new_rows(self, db_path):
+        refresh(db_path)
+        insert(db_path, [('e8', ACCOUNT, INSTRUMENT, 'Sell', 2, '2025-01-16 10:05:00')])
+
+        assert stale_groups(sqlite3.connect(db_path)) == [(ACCOUNT, INSTRUMENT, '2025-01-16 10:05:00')]
+        assert refresh(db_path) == 1
+        assert stored(db_path) == replayed(db_path)
+
+    def test_refresh_can_be_scoped_to_a_group(self, db_path):
+        assert refresh(db_path, ACCOUNT, INSTRUMENT) == 5
+
+        assert sorted(group[:2] for group in stale_groups(sqlite3.connect(db_path))) == \
+            [('Other', INSTRUMENT), (ACCOUNT, 'MES MAR25')]
+
+    @pytest.mark.parametrize('change', [
+        ("UPDATE trades SET side_of_market = 'Buy' WHERE entry_execution_id = 'e3'", ()),
+        ("UPDATE trades SET quantity = 5 WHERE entry_execution_id = 'e1'", ()),
+        ("UPDATE trades SET entry_time = '2025-01-16 11:00:00' WHERE entry_execution_id = 'e3'", ()),
+        ("UPDATE trades SET account = 'Other' WHERE entry_execution_id = 'e1'", ()),
+        ("UPDATE trades SET deleted = 1 WHERE entry_execution_id = 'e3'", ()),
+        ("DELETE FROM trades WHERE entry_execution_id = 'e1'", ()),
+        ("""INSERT INTO trades (entry_execution_id, account, instrument, side_of_market, quantity, entry_time)
+            VALUES ('e9', 'Sim101', 'MNQ MAR25', 'Sell', 1, '2025-01-15 09:32:00')""", ()),
+    ])
+    def test_edits_invalidate_later_trades(self, db_path, change):
+        refresh(db_path)
+
+        execute(db_path, change)
+        refresh(db_path)
+
+        assert stored(db_path) == replayed(db_path)
+
+    def test_restoring_a_deleted_trade(self, db_path):
+        execute(db_path, ("UPDATE trades SET deleted = 1 WHERE entry_execution_id = 'e1'", ()))
+        refresh(db_path)
+
+        execute(db_path, ("UPDATE trades SET deleted = 0 WHERE entry_execution_id = 'e1'", ()))
+        refresh(db_path)
+
+        assert stored(db_path) == replayed(db_path)
+
+    def test_unchanged_values_do_not_invalidate(self, db_path):
+        refresh(db_path)
+
+        execute(db_path, ("UPDATE trades SET side_of_market = side_of_market, notes = 'x'", ()))
+
+        assert stale_groups(sqlite3.connect(db_path)) == []
+
+
+class TestReaders:
+
+    @pytest.fixture
+    def client(self, db_path):
+        from app import app
+
+        app.config['TESTING'] = True
+        with patch('routes.execution_review.FuturesDB', lambda: FuturesDB(db_path)), \
+                app.test_client() as client:
+            yield client
+
+    def test_execution_review_pages(self, client):
+        first = client.get(f'/executions/api/list?account={ACCOUNT}&limit=3').get_json()
+        cursor = first['next_cursor']
+        second = client.get(f'/executions/api/list?account={ACCOUNT}&limit=3'
+                            f'&after_time={cursor["after_time"]}&after_id={cursor["after_id"]}').get_json()
+
+        executions = first['executions'] + second['executions']
+        assert [e['execution_id'] for e in executions] == ['e1', 'e2', 'e3', 'e4', 'e6', 'e7']
+        assert [e['running_qty'] for e in executions] == [2, -1, -1, 0, 1, 2]
+        assert [e['issue'] for e in executions][3:] == [None, None, 'Adding to long position']
+        assert (first['total_count'], first['final_quantity']) == (6, 1)
+        assert second['next_cursor'] is None
+        assert 'total_count' not in second
+
+    def test_execution_review_date_window(self, client):
+        data = client.get(f'/executions/api/list?instrument={INSTRUMENT}&start_date=2025-01-16'
+                          '&end_date=2025-01-16').get_json()
+
+        # Running quantity carries over from the earlier day
+        assert [(e['execution_id'], e['running_qty']) for e in data['executions']] == [('e6', 1), ('e7', 2)]
+        assert (data['total_count'], data['final_quantity']) == (2, 2)
+
+    def test_reconciliation_sequence_starts_from_held_quantity(self, db_path):
+        trades = ReconciliationService(db_path=db_path).get_account_trade_sequence(
+            ACCOUNT, start_date='2025-01-15 09:35:00'
+        )
+
+        # Long 2 MNQ and short 1 MES are held going into the window
+        assert [(t['entry_execution_id'], t['signed_change'], t['running_quantity']) for t in trades] == [
+            ('e3', -3, -2), ('e4', 1, -1), ('e6', 1, 0), ('e7', 1, 1),
+        ]
+        assert trades[-1]['instrument_running_quantity'] == 2
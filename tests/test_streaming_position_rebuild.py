@@ -0,0 +1,152 @@
+"""
+Tests for the streaming full rebuild: trades are read in chunks and built one
+account/instrument group at a time
+"""
+
+import sqlite3
+
+import pytest
+
+from services.enhanced_position_service_v2 import EnhancedPositionServiceV2
+from services.position_algorithms import peak_rss_mb, stream_trade_groups
+
+pytestmark = pytest.mark.usefixtures('db_writer')
+
+
+def seed_trades(db_path):
+    rows = []
+    for account in ('Sim101', 'Sim102'):
+        for instrument in ('ES MAR25', 'MNQ MAR25', 'NQ MAR25'):
+            for n, (side, quantity) in enumerate([('Buy', 2), ('Sell', 2), ('SellShort', 1), ('BuyToCover', 1), ('Buy', 1)]):
+                price = 21000.0 + n
+                opening = side in ('Buy', 'SellShort')
+                rows.append((instrument, account, side, quantity, price if opening else None,
+                             None if opening else price, f'2025-01-15 09:3{n}:00', f'{account}-{instrument}-{n}'))
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany("""
+        INSERT INTO trades (instrument, account, side_of_market, quantity, entry_price, exit_price,
+                            entry_time, entry_execution_id, commission, deleted)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0.52, 0)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = ', '.join(EnhancedPositionServiceV2.POSITION_INSERT_COLUMNS)
+        return (
+            conn.execute(f"SELECT id, {columns} FROM positions ORDER BY id").fetchall(),
+            conn.execute("SELECT position_id, trade_id, execution_order FROM position_executions ORDER BY id").fetchall(),
+        )
+    finally:
+        conn.close()
+
+
+class CountingCursor:
+    """Wraps a cursor to record every fetchmany() call"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.fetches = 0
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        return self.cursor.fetchmany(size)
+
+
+class TestStreamTradeGroups:
+
+    def test_yields_consecutive_groups_reading_in_chunks(self):
+        conn = sqlite3.connect(':memory:')
+        conn.row_factory = sqlite3.Row
+        conn.execute("CREATE TABLE trades (id INTEGER PRIMARY KEY, account TEXT)")
+        conn.executemany("INSERT INTO trades (account) VALUES (?)", [('a',), ('a',), ('a',), ('b',), ('c',), ('c',)])
+        cursor = CountingCursor(conn.execute("SELECT * FROM trades ORDER BY account, id"))
+
+        groups = [(key, [t['id'] for t in trades])
+                  for key, trades in stream_trade_groups(cursor, key=lambda t: t['account'], fetch_size=2)]
+
+        assert groups == [('a', [1, 2, 3]), ('b', [4]), ('c', [5, 6])]
+        assert cursor.fetches == 4  # three full chunks and the empty one that ends the stream
+
+    def test_empty_cursor(self):
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.execute("SELECT 1 WHERE 0")
+
+        assert list(stream_trade_groups(cursor, key=lambda t: t, fetch_size=10)) == []
+
+
+class TestStreamingRebuild:
+
+    def test_chunk_size_does_not_change_the_result(self, db_path, monkeypatch):
+        from config import POSITION_REBUILD_CONFIG
+        seed_trades(db_path)
+
+        with EnhancedPositionServiceV2(db_path) as service:
+            expected_stats = service.rebuild_positions_from_trades(workers=1)
+        expected = snapshot(db_path)
+
+        monkeypatch.setitem(POSITION_REBUILD_CONFIG, 'fetch_size', 3)
+        built = []
+        original = EnhancedPositionServiceV2._process_trades_for_instrument
+
+        def process(self, trades, account, instrument):
+            built.append((account, instrument, len(trades)))
+            return original(self, trades, account, instrument)
+
+        monkeypatch.setattr(EnhancedPositionServiceV2, '_process_trades_for_instrument', process)
+        with EnhancedPositionServiceV2(db_path) as service:
+            stats = service.rebuild_positions_from_trades(workers=1)
+
+        assert snapshot(db_path) == expected
+        assert built == [(account, instrument, 5) for account in ('Sim101', 'Sim102')
+                         for instrument in ('ES MAR25', 'MNQ MAR25', 'NQ MAR25')]
+        for key in ('positions_created', 'trades_processed', 'accounts_processed', 'instruments_processed'):
+            assert stats[key] == expected_stats[key]
+        assert stats['trades_processed'] == 30
+
+    def test_reports_progress_and_peak_rss(self, db_path):
+        seed_trades(db_path)
+        progress = []
+
+        with EnhancedPositionServiceV2(db_path) as service:
+            stats = service.rebuild_positions_from_trades(workers=1, progress_callback=lambda *args: progress.append(args))
+
+        assert [p[:2] for p in progress] == [(n, 6) for n in range(1, 7)]
+        assert stats['peak_rss_mb'] > 0
+
+    def test_parallel_rebuild_reports_worker_peak_rss(self, db_path):
+        seed_trades(db_path)
+        with EnhancedPositionServiceV2(db_path) as service:
+            service.rebuild_positions_from_trades(workers=1)
+        expected = snapshot(db_path)
+
+        with EnhancedPositionServiceV2(db_path) as service:
+            stats = service.rebuild_positions_from_trades(workers=2)
+
+        assert snapshot(db_path) == expected
+        assert stats['workers'] == 2
+        assert stats['worker_peak_rss_mb'] > 0
+        assert stats['peak_rss_mb'] <= peak_rss_mb()
+
+
+class TestLegacyStreamingRebuild:
+
+    def test_more_trades_than_fetch_size(self, db_path, monkeypatch):
+        from config import POSITION_REBUILD_CONFIG
+        from position_service import PositionService
+        seed_trades(db_path)
+
+        with PositionService(db_path) as service:
+            expected = service.rebuild_positions_from_trades()
+
+        # Saving positions between chunks must not cut the trade stream short
+        monkeypatch.setitem(POSITION_REBUILD_CONFIG, 'fetch_size', 3)
+        with PositionService(db_path) as service:
+            stats = service.rebuild_positions_from_trades()
+
+        assert stats['positions_created'] == expected['positions_created']
+        assert stats['trades_processed'] == expected['trades_processed'] == 30
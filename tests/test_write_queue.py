@@ -0,0 +1,161 @@
+"""
+Tests for the single-writer group-commit queue
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+
+import pytest
+
+from scripts.write_queue import SQLiteWriteQueue, WriteResult, run_write
+
+
+@pytest.fixture
+def db_path():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    conn.commit()
+    conn.close()
+    yield path
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+
+@pytest.fixture
+def write_queue(db_path):
+    wq = SQLiteWriteQueue(db_path, max_batch_size=64, max_batch_delay=0.05, idle_timeout=1.0)
+    yield wq
+    wq.shutdown()
+
+
+def count_items(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestSQLiteWriteQueue:
+    """Unit tests for SQLiteWriteQueue"""
+
+    def test_execute_returns_lastrowid(self, write_queue, db_path):
+        result = write_queue.execute("INSERT INTO items (name) VALUES (?)", ('a',))
+
+        assert isinstance(result, WriteResult)
+        assert result.rowcount == 1
+        assert result.lastrowid == 1
+        assert count_items(db_path) == 1
+
+    def test_concurrent_submissions_share_one_commit(self, write_queue, db_path):
+        gate = threading.Event()
+        # Hold the writer on a first job so the rest pile up behind it
+        first = write_queue.submit(lambda conn: gate.wait(5))
+        futures = [
+            write_queue.submit(lambda conn, i=i: conn.execute("INSERT INTO items (name) VALUES (?)", (f"n{i}",)).lastrowid)
+            for i in range(20)
+        ]
+        gate.set()
+
+        first.result(5)
+        ids = [f.result(5) for f in futures]
+
+        assert len(set(ids)) == 20
+        assert count_items(db_path) == 20
+        stats = write_queue.get_stats()
+        assert stats['jobs_completed'] == 21
+        assert stats['batches_committed'] < 21
+        assert stats['max_batch_size_seen'] > 1
+
+    def test_failing_job_only_rolls_back_itself(self, write_queue, db_path):
+        gate = threading.Event()
+        write_queue.submit(lambda conn: gate.wait(5))
+        ok_before = write_queue.submit(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('x')"))
+
+        def failing(conn):
+            conn.execute("INSERT INTO items (name) VALUES ('y')")
+            conn.execute("INSERT INTO items (name) VALUES ('x')")  # UNIQUE violation
+
+        bad = write_queue.submit(failing)
+        ok_after = write_queue.submit(lambda conn: conn.execute("INSERT INTO items (name) VALUES ('z')"))
+        gate.set()
+
+        ok_before.result(5)
+        ok_after.result(5)
+        with pytest.raises(sqlite3.IntegrityError):
+            bad.result(5)
+
+        conn = sqlite3.connect(db_path)
+        names = {row[0] for row in conn.execute("SELECT name FROM items")}
+        conn.close()
+        assert names == {'x', 'z'}
+        assert write_queue.get_stats()['jobs_failed'] == 1
+
+    def test_readers_do_not_wait_on_writer(self, write_queue, db_path):
+        gate = threading.Event()
+        started = threading.Event()
+
+        def slow_write(conn):
+            conn.execute("INSERT INTO items (name) VALUES ('slow')")
+            started.set()
+            gate.wait(5)
+
+        future = write_queue.submit(slow_write)
+        assert started.wait(5)
+
+        reader = sqlite3.connect(db_path, timeout=0.1)
+        assert reader.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+        reader.close()
+
+        gate.set()
+        future.result(5)
+        assert count_items(db_path) == 1
+
+    def test_nested_submit_runs_inline(self, write_queue, db_path):
+        def outer(conn):
+            conn.execute("INSERT INTO items (name) VALUES ('outer')")
+            return write_queue.run(lambda c: c.execute("INSERT INTO items (name) VALUES ('inner')").lastrowid)
+
+        assert write_queue.run(outer, timeout=5) == 2
+        assert count_items(db_path) == 2
+
+    def test_stats_report_queue_depth_and_latency(self, write_queue):
+        write_queue.execute("INSERT INTO items (name) VALUES ('a')")
+        stats = write_queue.get_stats()
+
+        assert stats['queue_depth'] == 0
+        assert stats['batches_committed'] == 1
+        assert stats['commit_latency_max_ms'] >= stats['commit_latency_avg_ms'] > 0
+
+
+class TestRunWrite:
+    """run_write() falls back to the caller's connection when it must"""
+
+    def test_open_transaction_runs_inline(self, db_path):
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO items (name) VALUES ('pending')")
+        assert conn.in_transaction
+
+        # Going through the writer here would deadlock on our own lock
+        run_write(db_path, lambda c: c.execute("INSERT INTO items (name) VALUES ('inline')"), conn)
+        conn.commit()
+        conn.close()
+
+        assert count_items(db_path) == 2
+
+    def test_disabled_queue_commits_on_callers_connection(self, db_path, monkeypatch):
+        from config import DATABASE_WRITER_CONFIG
+        monkeypatch.setitem(DATABASE_WRITER_CONFIG, 'enabled', False)
+
+        conn = sqlite3.connect(db_path)
+        rowid = run_write(db_path, lambda c: c.execute("INSERT INTO items (name) VALUES ('a')").lastrowid, conn)
+        conn.close()
+
+        assert rowid == 1
+        assert count_items(db_path) == 1